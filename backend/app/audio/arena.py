@@ -0,0 +1,321 @@
+"""Shared-memory arena for handing audio to other processes without copies.
+
+One ``multiprocessing.shared_memory`` segment is split into fixed-size
+slabs of float32 samples. A buffer takes a run of contiguous slabs and
+is identified by an ``AudioHandle``, a small picklable descriptor that
+another process turns into a zero-copy numpy view of the same memory.
+
+Slab ownership and reference counts live in the segment's header and
+change under a lock shared with child processes, so a decode process
+can allocate a buffer, fill it and hand back only the handle. Processes
+attached without the lock (engine workers) may only read views.
+
+Segment layout::
+
+    magic, slab_samples, slabs      3 x int64
+    owners                          int32 per slab: first slab of its run + 1, 0 if free
+    sizes                           int32 per slab: run length (first slab only)
+    refs                            int32 per slab: reference count (first slab only)
+    samples                         float32, from a page-aligned offset
+"""
+
+import logging
+import math
+import multiprocessing
+import threading
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+_MAGIC = 0x5354544152454E41  # "STTARENA"
+_META_BYTES = 24
+_PAGE = 4096
+
+
+@dataclass(frozen=True)
+class AudioHandle:
+    """A view of ``length`` samples, ``start`` samples into an allocation.
+
+    The allocation is the run of ``slabs`` slabs starting at ``slab`` in
+    the arena named ``arena``.
+    """
+
+    arena: str
+    slab: int
+    slabs: int
+    start: int
+    length: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without handing it to the resource tracker.
+
+    The tracker would otherwise unlink the creator's segment when this
+    process exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        from multiprocessing import resource_tracker
+
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+class AudioArena:
+    """Slab allocator over one shared-memory segment.
+
+    Args:
+        size_bytes: Sample capacity in bytes (rounded down to whole slabs).
+        slab_samples: Samples per slab; allocations are whole slabs.
+    """
+
+    def __init__(self, size_bytes: int, slab_samples: int = SAMPLE_RATE) -> None:
+        slabs = size_bytes // (slab_samples * 4)
+        if slabs < 1:
+            raise ValueError(f"Arena of {size_bytes} bytes holds no {slab_samples}-sample slab")
+        data_offset = math.ceil((_META_BYTES + 12 * slabs) / _PAGE) * _PAGE
+        segment = shared_memory.SharedMemory(
+            create=True, size=data_offset + slabs * slab_samples * 4
+        )
+        np.ndarray(3, np.int64, segment.buf)[:] = (_MAGIC, slab_samples, slabs)
+        self._setup(segment, multiprocessing.get_context("spawn").RLock(), owner=True)
+        self._owners[:] = 0
+        logger.info(
+            "Audio arena %s: %d slabs of %d samples (%.0f MB)",
+            self.name, slabs, slab_samples, slabs * slab_samples * 4 / 2**20,
+        )
+
+    @classmethod
+    def attach(cls, name: str, lock=None) -> "AudioArena":
+        """Attach to an arena created by another process.
+
+        Without the creator's ``lock`` the arena is read-only: views work,
+        allocation and reference counting do not.
+        """
+        try:
+            segment = _open_segment(name)
+        except FileNotFoundError:
+            raise ValueError(f"Audio arena {name!r} does not exist on this host")
+        magic = int(np.ndarray(1, np.int64, segment.buf)[0])
+        if magic != _MAGIC:
+            segment.close()
+            raise ValueError(f"Shared memory {name!r} is not an audio arena")
+        arena = cls.__new__(cls)
+        arena._setup(segment, lock, owner=False)
+        return arena
+
+    def _setup(self, segment: shared_memory.SharedMemory, lock, owner: bool) -> None:
+        self._segment = segment
+        self._lock = lock
+        self._owner = owner
+        _, self.slab_samples, self.slabs = (int(v) for v in np.ndarray(3, np.int64, segment.buf))
+        slabs = self.slabs
+        self._owners = np.ndarray(slabs, np.int32, segment.buf, offset=_META_BYTES)
+        self._sizes = np.ndarray(slabs, np.int32, segment.buf, offset=_META_BYTES + 4 * slabs)
+        self._refs = np.ndarray(slabs, np.int32, segment.buf, offset=_META_BYTES + 8 * slabs)
+        self._data_offset = math.ceil((_META_BYTES + 12 * slabs) / _PAGE) * _PAGE
+        self._samples = np.ndarray(
+            slabs * self.slab_samples, np.float32, segment.buf, offset=self._data_offset
+        )
+        self._data_start = self._samples.__array_interface__["data"][0]
+
+    @property
+    def name(self) -> str:
+        return self._segment.name
+
+    @property
+    def lock(self):
+        """The allocation lock, for handing to child processes at start-up."""
+        return self._lock
+
+    @property
+    def closed(self) -> bool:
+        return self._owners is None
+
+    @property
+    def free_slabs(self) -> int:
+        return int(np.count_nonzero(self._owners == 0))
+
+    def _locked(self):
+        if self._lock is None:
+            raise RuntimeError(f"Audio arena {self.name} is attached read-only")
+        return self._lock
+
+    def alloc(self, n_samples: int) -> AudioHandle | None:
+        """Allocate room for ``n_samples``, with one reference; None if full."""
+        n_slabs = max(1, math.ceil(n_samples / self.slab_samples))
+        with self._locked():
+            free = np.concatenate(([0], (self._owners == 0).view(np.int8), [0]))
+            edges = np.diff(free)
+            starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            fits = np.flatnonzero(ends - starts >= n_slabs)
+            if not len(fits):
+                return None
+            first = int(starts[fits[0]])
+            self._owners[first : first + n_slabs] = first + 1
+            self._sizes[first] = n_slabs
+            self._refs[first] = 1
+        return AudioHandle(self.name, first, n_slabs, 0, n_samples)
+
+    def view(self, handle: AudioHandle) -> np.ndarray:
+        """Zero-copy (writable) view of the samples ``handle`` describes."""
+        if handle.arena != self.name:
+            raise ValueError(f"Handle belongs to arena {handle.arena!r}, not {self.name!r}")
+        start = handle.slab * self.slab_samples + handle.start
+        if handle.start + handle.length > handle.slabs * self.slab_samples:
+            raise ValueError("Handle extends past its allocation")
+        return self._samples[start : start + handle.length]
+
+    def retain(self, handle: AudioHandle) -> None:
+        """Add a reference to the allocation behind ``handle``."""
+        with self._locked():
+            if self._owners[handle.slab] != handle.slab + 1 or self._refs[handle.slab] < 1:
+                raise ValueError("Handle refers to a freed allocation")
+            self._refs[handle.slab] += 1
+
+    def release(self, handle: AudioHandle) -> None:
+        """Drop a reference; the slabs are free once the last one is gone."""
+        with self._locked():
+            if self._owners[handle.slab] != handle.slab + 1 or self._refs[handle.slab] < 1:
+                raise ValueError("Handle released more often than retained")
+            self._refs[handle.slab] -= 1
+            if self._refs[handle.slab] == 0:
+                self._owners[handle.slab : handle.slab + handle.slabs] = 0
+
+    def find(self, array: np.ndarray) -> AudioHandle | None:
+        """Handle of a contiguous float32 view into this arena; None if it is not one."""
+        if array.dtype != np.float32 or array.ndim != 1 or not array.flags.c_contiguous:
+            return None
+        offset, rest = divmod(array.__array_interface__["data"][0] - self._data_start, 4)
+        if rest or offset < 0 or offset + len(array) > len(self._samples):
+            return None
+        slab = offset // self.slab_samples
+        first = int(self._owners[slab]) - 1
+        if first < 0:
+            return None
+        start = offset - first * self.slab_samples
+        slabs = int(self._sizes[first])
+        if start + len(array) > slabs * self.slab_samples:
+            return None
+        return AudioHandle(self.name, first, slabs, start, len(array))
+
+    def share(self, array: np.ndarray) -> AudioHandle | None:
+        """A retained handle to ``array``'s samples for another process.
+
+        Arrays already in the arena are shared in place; others are copied
+        into a new allocation. Returns None when the arena is full. Release
+        the handle when the other process is done with it.
+        """
+        with self._locked():
+            handle = self.find(array)
+            if handle is not None:
+                self._refs[handle.slab] += 1
+                return handle
+        handle = self.alloc(len(array))
+        if handle is not None:
+            self.view(handle)[:] = array
+        return handle
+
+    def close(self) -> None:
+        """Detach; the creating process also removes the segment."""
+        self._owners = self._sizes = self._refs = self._samples = None
+        try:
+            self._segment.close()
+        except BufferError:
+            # Views are still alive; the mapping goes when they do
+            logger.debug("Audio arena %s closed with live views", self.name)
+        if self._owner:
+            self._segment.unlink()
+
+
+_arena: AudioArena | None = None
+_arena_lock = threading.Lock()
+# Arenas of other processes this process has attached to, by name
+_attached: dict[str, AudioArena] = {}
+
+
+def get_arena() -> AudioArena | None:
+    """This process's arena, created on first use; None if ``STT_AUDIO_ARENA_MB`` is 0."""
+    global _arena
+    if _arena is None and settings.audio_arena_mb > 0:
+        with _arena_lock:
+            if _arena is None:
+                _arena = AudioArena(
+                    settings.audio_arena_mb * 2**20,
+                    max(1, int(settings.audio_arena_slab_s * SAMPLE_RATE)),
+                )
+    return _arena
+
+
+def close_arena() -> None:
+    global _arena
+    with _arena_lock:
+        if _arena is not None:
+            _arena.close()
+            _arena = None
+
+
+# The owner's arena in a pool process started with ``pool_initializer``
+_pool_arena: AudioArena | None = None
+
+
+def _attach_pool_arena(name: str, lock) -> None:
+    global _pool_arena
+    _pool_arena = AudioArena.attach(name, lock)
+
+
+def pool_initializer(arena: AudioArena | None) -> dict:
+    """``ProcessPoolExecutor`` kwargs that attach ``arena`` in each pool process."""
+    if arena is None:
+        return {}
+    return {"initializer": _attach_pool_arena, "initargs": (arena.name, arena.lock)}
+
+
+def to_owner(audio: np.ndarray) -> "np.ndarray | AudioHandle":
+    """Return value for ``audio`` computed in a pool process.
+
+    A handle to a copy in the owner's arena when the pool was started
+    with one and it has room, so only the handle is pickled; otherwise
+    the array itself.
+    """
+    if _pool_arena is not None:
+        handle = _pool_arena.share(audio)
+        if handle is not None:
+            return handle
+    return audio
+
+
+def from_pool(
+    arena: AudioArena | None, value: "np.ndarray | AudioHandle"
+) -> tuple[np.ndarray, AudioHandle | None]:
+    """The audio a pool process returned, and the handle to release when done with it."""
+    if isinstance(value, AudioHandle):
+        return arena.view(value), value
+    return value, None
+
+
+def open_views(handles: list[dict]) -> list[np.ndarray]:
+    """Zero-copy views of handles from another process (attaching as needed).
+
+    Raises:
+        ValueError: A handle names an arena that does not exist here.
+    """
+    views = []
+    for fields in handles:
+        handle = AudioHandle(**fields)
+        arena = _attached.get(handle.arena)
+        if arena is None:
+            arena = _attached[handle.arena] = AudioArena.attach(handle.arena)
+        views.append(arena.view(handle))
+    return views
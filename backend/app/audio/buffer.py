@@ -0,0 +1,165 @@
+"""Growable float32 audio buffer with optional spill to an mmap'd scratch file."""
+
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+from app.audio.arena import AudioArena, AudioHandle
+
+
+def _release(arena: AudioArena, handle: AudioHandle) -> None:
+    # Snapshots can outlive the arena at shutdown
+    if not arena.closed:
+        arena.release(handle)
+
+
+class AudioBuffer:
+    """Contiguous float32 sample buffer for a streaming session.
+
+    Appends amortise into a pre-grown array so the accumulated audio can
+    be handed to the engine as a view, without ``np.concatenate``. An
+    idle buffer can be spilled to a memory-mapped scratch file to release
+    its RAM; the next append pages it back in.
+
+    With an ``arena`` the samples live in shared memory (falling back to
+    private memory when the arena is full), so the views handed to the
+    engine can reach engine workers without a copy.
+    """
+
+    _MIN_CAPACITY = 16000
+
+    def __init__(self, arena: AudioArena | None = None) -> None:
+        self._arena = arena
+        # Arena allocation backing _data (None: private memory)
+        self._handle: AudioHandle | None = None
+        self._data = np.empty(0, dtype=np.float32)
+        self._length = 0
+        self._spilled = False
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def samples(self) -> np.ndarray:
+        """The buffered samples (a view; valid until the next mutation)."""
+        return self._data[: self._length]
+
+    def snapshot(self) -> np.ndarray:
+        """The buffered samples as a view that survives growth and release.
+
+        Use it for audio handed to the engine. An arena-backed snapshot
+        holds a reference to its allocation until the array is garbage
+        collected. The slabs are therefore not reused by another buffer
+        while a queued or running job still reads them. Private memory is
+        kept alive by the view itself.
+        """
+        view = self.samples
+        if self._handle is not None:
+            self._arena.retain(self._handle)
+            weakref.finalize(view, _release, self._arena, self._handle).atexit = False
+        return view
+
+    @property
+    def is_spilled(self) -> bool:
+        return self._spilled
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of RAM held by the buffer (0 while spilled)."""
+        return 0 if self._spilled else self._data.nbytes
+
+    @property
+    def spilled_bytes(self) -> int:
+        """Bytes held in the scratch file while spilled."""
+        return self._length * 4 if self._spilled else 0
+
+    def append(self, samples: np.ndarray) -> None:
+        """Append float32 samples, growing capacity geometrically."""
+        start, end = self._reserve(len(samples))
+        self._data[start:end] = samples
+        self._length = end
+
+    def append_pcm16(self, samples: np.ndarray) -> None:
+        """Append int16 PCM samples, converting to float32 in place.
+
+        Accepts strided views (e.g. one channel of interleaved audio) and
+        writes straight into the buffer without a temporary array.
+        """
+        start, end = self._reserve(len(samples))
+        target = self._data[start:end]
+        target[:] = samples
+        target *= 1.0 / 32768.0
+        self._length = end
+
+    def _reserve(self, n_samples: int) -> tuple[int, int]:
+        """Make room for ``n_samples`` more samples; return the target slice bounds."""
+        if self._spilled:
+            self._unspill()
+        needed = self._length + n_samples
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data), self._MIN_CAPACITY)
+            self._replace(capacity)
+        return self._length, needed
+
+    def _replace(self, capacity: int) -> None:
+        """Move the samples to a new allocation of ``capacity`` samples."""
+        handle = self._arena.alloc(capacity) if self._arena is not None else None
+        if handle is not None:
+            grown = self._arena.view(handle)
+        else:
+            grown = np.empty(capacity, dtype=np.float32)
+        grown[: self._length] = self._data[: self._length]
+        self._free()
+        self._data, self._handle = grown, handle
+
+    def _free(self) -> None:
+        """Drop the buffer's reference to its arena allocation (snapshots keep theirs)."""
+        if self._handle is not None:
+            self._arena.release(self._handle)
+            self._handle = None
+
+    def clear(self) -> None:
+        """Drop the buffered samples but keep the allocated capacity."""
+        if self._spilled:
+            self._data = np.empty(0, dtype=np.float32)
+            self._spilled = False
+        self._length = 0
+
+    def release(self) -> None:
+        """Drop the buffered samples and free the allocation."""
+        self._free()
+        self._data = np.empty(0, dtype=np.float32)
+        self._length = 0
+        self._spilled = False
+
+    def spill(self, directory: str | None = None) -> int:
+        """Move the samples to an mmap'd scratch file and free the RAM.
+
+        The file is unlinked as soon as it is mapped, so it disappears
+        with the mapping even if the process dies.
+
+        Returns:
+            Number of bytes of RAM released.
+        """
+        if self._spilled or self._length == 0:
+            return 0
+        freed = self._data.nbytes
+        fd, path = tempfile.mkstemp(prefix="stt-spill-", suffix=".f32", dir=directory or None)
+        os.close(fd)
+        try:
+            mapped = np.memmap(path, dtype=np.float32, mode="w+", shape=(self._length,))
+            mapped[:] = self._data[: self._length]
+            mapped.flush()
+        finally:
+            os.unlink(path)
+        self._free()
+        self._data = mapped
+        self._spilled = True
+        return freed
+
+    def _unspill(self) -> None:
+        """Copy spilled samples back into RAM."""
+        self._replace(max(self._length, self._MIN_CAPACITY))
+        self._spilled = False
@@ -0,0 +1,144 @@
+"""Bounded process pool for decoding uploaded audio files.
+
+librosa's decoding and resampling hold the GIL for most of their run, so
+decoding uploads in threads serializes them on the GIL and stalls the
+event loop that serves WebSocket frames. Uploads are decoded in a
+dedicated pool of processes instead. Admission is bounded: when
+``max_pending`` uploads are already decoding or waiting, the next one
+is refused with ``DecodeBusy`` (HTTP 429) rather than queued without
+limit.
+
+With a shared audio arena (``STT_AUDIO_ARENA_MB``) the decoded samples
+come back through shared memory; only a handle is pickled.
+"""
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator
+
+import numpy as np
+
+from app.audio.arena import (
+    AudioArena,
+    AudioHandle,
+    from_pool,
+    get_arena,
+    pool_initializer,
+    to_owner,
+)
+from app.audio.decoder import decode_audio
+
+logger = logging.getLogger(__name__)
+
+
+class DecodeBusy(Exception):
+    """Every decode slot is taken; the request should be retried later."""
+
+
+def _decode(raw: bytes) -> np.ndarray | AudioHandle:
+    """Pool process entry point: decode ``raw`` and hand it to the owner."""
+    return to_owner(decode_audio(raw))
+
+
+class DecodePool:
+    """Decodes uploads in ``workers`` processes, admitting ``max_pending`` at once.
+
+    Args:
+        workers: Decoder processes; 0 decodes in a thread instead (still
+            bounded by ``max_pending``).
+        max_pending: Uploads decoding or waiting for a process before new
+            ones are refused.
+        arena: Shared audio arena the processes return samples through.
+    """
+
+    _instance: "DecodePool | None" = None
+    _lock = threading.Lock()
+
+    def __init__(self, workers: int, max_pending: int, arena: AudioArena | None = None) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.arena = arena
+        # Uploads admitted and not yet decoded (event loop only)
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def get_instance(cls) -> "DecodePool":
+        """Return the singleton instance, creating it from settings if necessary."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    from app.config import settings
+
+                    cls._instance = cls(
+                        settings.decode_workers, settings.decode_max_pending, get_arena()
+                    )
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Shut down and reset the singleton."""
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.shutdown()
+            cls._instance = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                **pool_initializer(self.arena),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _discard(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            if isinstance(future.result(), AudioHandle):
+                self.arena.release(future.result())
+
+    @contextlib.asynccontextmanager
+    async def decode(self, raw: bytes) -> AsyncIterator[np.ndarray]:
+        """Decode ``raw`` to 16 kHz mono float32, valid inside the ``with`` block.
+
+        Raises:
+            DecodeBusy: ``max_pending`` uploads are already admitted.
+            Exception: Whatever decoding the file raised.
+        """
+        if self.pending >= self.max_pending:
+            raise DecodeBusy(f"{self.pending} uploads already decoding")
+        self.pending += 1
+        try:
+            if self.workers > 0:
+                future = self._pool().submit(_decode, raw)
+                try:
+                    result = await asyncio.wrap_future(future)
+                except asyncio.CancelledError:
+                    # The request went away; free the samples once they arrive
+                    future.add_done_callback(self._discard)
+                    raise
+                except BrokenProcessPool:
+                    # A decoder process died (e.g. a crashing codec); start afresh
+                    logger.warning("Decode pool broken; restarting it")
+                    self.shutdown()
+                    raise
+            else:
+                result = await asyncio.to_thread(decode_audio, raw)
+        finally:
+            self.pending -= 1
+        audio, handle = from_pool(self.arena, result)
+        try:
+            yield audio
+        finally:
+            if handle is not None:
+                self.arena.release(handle)
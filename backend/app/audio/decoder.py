@@ -0,0 +1,24 @@
+"""Decoding of compressed audio files to 16 kHz mono float32."""
+
+import io
+from pathlib import Path
+
+import librosa
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# File suffixes treated as audio when scanning directories and archives
+AUDIO_EXTENSIONS = frozenset({".wav", ".mp3", ".flac", ".ogg", ".oga", ".opus", ".m4a", ".aac"})
+
+
+def decode_audio(source: bytes | str | Path) -> np.ndarray:
+    """Decode and resample audio to 16kHz mono float32 (thread-safe).
+
+    Args:
+        source: Encoded file contents (WAV, MP3, FLAC, OGG, ...) or a path.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    audio, _ = librosa.load(source, sr=SAMPLE_RATE, mono=True)
+    return audio
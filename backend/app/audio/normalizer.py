@@ -18,3 +18,22 @@ def pcm_to_float32(data: bytes) -> np.ndarray:
     """
     samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
     return samples / 32768.0
+
+
+def pcm16_channels(data: bytes, channels: int) -> np.ndarray:
+    """View interleaved PCM int16 little-endian bytes as per-channel rows.
+
+    No samples are copied: row ``c`` of the result is a strided view of
+    channel ``c`` over the input buffer. A trailing partial frame is
+    ignored.
+
+    Args:
+        data: Interleaved PCM bytes (int16, little-endian).
+        channels: Number of interleaved channels.
+
+    Returns:
+        Int16 array of shape ``(channels, frames)``.
+    """
+    frames = len(data) // (2 * channels)
+    samples = np.frombuffer(data, dtype="<i2", count=frames * channels)
+    return samples.reshape(frames, channels).T
@@ -0,0 +1,68 @@
+"""Energy-based voice activity detection (mirrors the frontend chunker)."""
+
+import numpy as np
+
+# 100 ms at 16 kHz, the same window the frontend uses for silence detection
+FRAME_SAMPLES = 1600
+
+
+def calculate_rms(samples: np.ndarray) -> float:
+    """Root mean square of the samples (0.0 for an empty array)."""
+    if len(samples) == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(np.square(samples, dtype=np.float32))))
+
+
+def has_speech(
+    samples: np.ndarray,
+    threshold: float = 0.01,
+    frame_samples: int = FRAME_SAMPLES,
+) -> bool:
+    """Return True if any frame of ``samples`` has RMS at or above ``threshold``.
+
+    Frames are evaluated independently so a short utterance inside a long
+    silent window still counts as speech.
+    """
+    n_frames = len(samples) // frame_samples
+    if n_frames == 0:
+        return calculate_rms(samples) >= threshold
+    framed = samples[: n_frames * frame_samples].reshape(n_frames, frame_samples)
+    rms = np.sqrt(np.mean(np.square(framed, dtype=np.float32), axis=1))
+    if bool(np.any(rms >= threshold)):
+        return True
+    return calculate_rms(samples[n_frames * frame_samples :]) >= threshold
+
+
+def chunk_bounds(
+    samples: np.ndarray,
+    chunk_samples: int,
+    search_samples: int = 20 * FRAME_SAMPLES,
+    frame_samples: int = FRAME_SAMPLES,
+) -> list[tuple[int, int]]:
+    """Split ``samples`` into chunks of at most ``chunk_samples``.
+
+    Each cut is placed in the quietest frame of the last ``search_samples``
+    (at most a quarter) of the chunk, so cuts tend to fall between words.
+
+    Returns:
+        ``(start, end)`` sample bounds covering all of ``samples``.
+    """
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    while len(samples) - start > chunk_samples:
+        end = start + chunk_samples
+        search_start = end - min(search_samples, chunk_samples // 4)
+        n_frames = (end - search_start) // frame_samples
+        if n_frames == 0:
+            cut = end
+        else:
+            framed = samples[search_start : search_start + n_frames * frame_samples]
+            framed = framed.reshape(n_frames, frame_samples)
+            rms = np.sqrt(np.mean(np.square(framed, dtype=np.float32), axis=1))
+            # Latest of equally quiet frames, to keep chunks long
+            quietest = n_frames - 1 - int(np.argmin(rms[::-1]))
+            cut = search_start + quietest * frame_samples + frame_samples // 2
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, len(samples)))
+    return bounds
@@ -0,0 +1,440 @@
+"""Offline transcription of audio corpora (``stt-local batch``).
+
+Files are decoded and resampled in a process pool while the engine
+transcribes earlier ones; decoded audio waits in a bounded queue, so
+memory stays flat however large the corpus is. With a shared audio
+arena the pool writes decoded audio straight into shared memory and
+returns only a handle, instead of pickling the samples back. Each result is written
+as soon as it is done, and the output doubles as the manifest: a rerun
+with the same output skips every file already in it, so a crashed run
+resumes where it stopped. Files recorded with an error are retried; their
+newer record follows the failed one.
+
+Outputs:
+    ``*.jsonl``    one JSON record per line, flushed per record
+    ``*.parquet``  a directory of ``part-NNNNN.parquet`` files (needs
+                   ``pyarrow``); a part becomes visible once complete
+"""
+
+import asyncio
+import collections
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from app.audio.arena import AudioArena, AudioHandle, from_pool, pool_initializer, to_owner
+from app.audio.decoder import AUDIO_EXTENSIONS, SAMPLE_RATE, decode_audio
+from app.engine.options import DecodeOptions
+from app.engine.results import segments_from_result
+from app.engine.scheduler import BATCH
+
+logger = logging.getLogger(__name__)
+
+
+def find_audio(inputs: list[str | Path]) -> list[Path]:
+    """Audio files among ``inputs`` (files or directories, searched recursively).
+
+    Returns absolute paths, sorted, so reruns visit files in the same order.
+    """
+    found: set[Path] = set()
+    for item in map(Path, inputs):
+        if item.is_dir():
+            found.update(
+                p for p in item.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS and p.is_file()
+            )
+        elif item.is_file():
+            found.add(item)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {item}")
+    return sorted(p.resolve() for p in found)
+
+
+def load_file(path: str) -> tuple[np.ndarray | AudioHandle | None, str | None]:
+    """Decode one file in a pool process; returns ``(audio, None)`` or ``(None, error)``.
+
+    In a pool attached to an arena the audio comes back as a handle to
+    a copy in the arena (or as an array if the arena is full).
+    """
+    try:
+        return to_owner(decode_audio(path)), None
+    except Exception as e:
+        return None, f"Could not decode audio file: {e}"
+
+
+class JsonlSink:
+    """Appends records to a JSON Lines file, flushing after each one."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._file = None
+
+    def completed(self) -> set[str]:
+        """Paths recorded without an error. A final line cut short by a crash is removed."""
+        if not self.path.exists():
+            return set()
+        done: set[str] = set()
+        valid_bytes = 0
+        with self.path.open("rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if not record.get("error"):
+                        done.add(record["path"])
+                except (ValueError, KeyError, AttributeError):
+                    break
+                valid_bytes += len(line)
+        if valid_bytes < self.path.stat().st_size:
+            logger.warning("Dropping truncated record at the end of %s", self.path)
+            os.truncate(self.path, valid_bytes)
+        return done
+
+    def write(self, record: dict) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink:
+    """Writes records to a directory of Parquet part files.
+
+    Each part is written under a temporary name and renamed once
+    complete, so a crash loses at most the records of the open part.
+    """
+
+    def __init__(self, path: str | Path, rows_per_part: int = 1000) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install -e '.[parquet]')")
+        self.path = Path(path)
+        self.rows_per_part = rows_per_part
+        self._rows: list[dict] = []
+
+    def _parts(self) -> list[Path]:
+        return sorted(self.path.glob("part-*.parquet"))
+
+    def completed(self) -> set[str]:
+        """Paths recorded without an error."""
+        import pyarrow.parquet as pq
+
+        for stale in self.path.glob("*.tmp"):
+            stale.unlink()
+        done: set[str] = set()
+        for part in self._parts():
+            table = pq.read_table(part, columns=["path", "error"])
+            done.update(
+                path
+                for path, error in zip(table["path"].to_pylist(), table["error"].to_pylist())
+                if not error
+            )
+        return done
+
+    def write(self, record: dict) -> None:
+        self._rows.append(record)
+        if len(self._rows) >= self.rows_per_part:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        parts = self._parts()
+        index = int(parts[-1].stem.split("-")[1]) + 1 if parts else 0
+        target = self.path / f"part-{index:05d}.parquet"
+        tmp = target.with_suffix(".tmp")
+        pq.write_table(pa.Table.from_pylist(self._rows, schema=_parquet_schema()), tmp)
+        os.replace(tmp, target)
+        self._rows = []
+
+
+def _parquet_schema():
+    """Fixed schema, so parts with only failures (all-null columns) still match."""
+    import pyarrow as pa
+
+    segment = pa.struct([("text", pa.string()), ("start_ms", pa.int64()), ("end_ms", pa.int64())])
+    return pa.schema([
+        ("path", pa.string()),
+        ("text", pa.string()),
+        ("segments", pa.list_(segment)),
+        ("duration_ms", pa.float64()),
+        ("language", pa.string()),
+        ("error", pa.string()),
+    ])
+
+
+def open_sink(output: str | Path) -> JsonlSink | ParquetSink:
+    """Sink for ``output``: Parquet if it ends in ``.parquet``, JSON Lines otherwise."""
+    if str(output).endswith(".parquet"):
+        return ParquetSink(output)
+    return JsonlSink(output)
+
+
+@dataclass
+class BatchStats:
+    """Throughput of a batch run."""
+
+    files: int = 0
+    failed: int = 0
+    skipped: int = 0
+    audio_s: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def files_per_s(self) -> float:
+        return self.files / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def audio_hours_per_hour(self) -> float:
+        """Hours of audio transcribed per hour of wall time (the real-time speed-up)."""
+        return self.audio_s / self.elapsed_s if self.elapsed_s else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "audio_hours": round(self.audio_s / 3600, 3),
+            "elapsed_s": round(self.elapsed_s, 1),
+            "files_per_s": round(self.files_per_s, 2),
+            "audio_hours_per_hour": round(self.audio_hours_per_hour, 1),
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} files ({self.failed} failed, {self.skipped} skipped), "
+            f"{self.files_per_s:.2f} files/s, {self.audio_hours_per_hour:.1f} audio-h/h"
+        )
+
+
+def _record(path: Path, audio: np.ndarray, result: dict, language: str | None) -> dict:
+    segments = segments_from_result(result)
+    return {
+        "path": str(path),
+        "text": " ".join(seg["text"] for seg in segments).strip(),
+        "segments": segments,
+        "duration_ms": round(len(audio) / SAMPLE_RATE * 1000, 1),
+        "language": result.get("language") or language,
+        "error": None,
+    }
+
+
+def _error_record(path: Path, error: str) -> dict:
+    return {
+        "path": str(path),
+        "text": "",
+        "segments": [],
+        "duration_ms": 0.0,
+        "language": None,
+        "error": error,
+    }
+
+
+async def _decode_ahead(
+    paths: list[Path],
+    executor: Executor,
+    queue: asyncio.Queue,
+    lookahead: int,
+    arena: AudioArena | None = None,
+) -> None:
+    """Decode files in ``executor`` (at most ``lookahead`` at once) and queue them in order.
+
+    Queued items are ``(path, audio, error, handle)``; ``handle`` is the
+    arena allocation behind ``audio``, to release once it is transcribed.
+    If cancelled, the allocations of queued and in-flight decodes are
+    released, since nothing will transcribe them.
+    """
+    # Decodes not queued yet, oldest first; one stays here until it is queued
+    pending: collections.deque = collections.deque()
+
+    async def _put(path: Path, future: Future) -> None:
+        audio, error = await asyncio.wrap_future(future)
+        if error is not None:
+            await queue.put((path, None, error, None))
+        else:
+            audio, handle = from_pool(arena, audio)
+            await queue.put((path, audio, None, handle))
+
+    try:
+        for path in paths:
+            pending.append((path, executor.submit(load_file, str(path))))
+            if len(pending) >= lookahead:
+                await _put(*pending[0])
+                pending.popleft()
+        while pending:
+            await _put(*pending[0])
+            pending.popleft()
+        await queue.put(None)
+    except asyncio.CancelledError:
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None and item[3] is not None:
+                arena.release(item[3])
+        for _, future in pending:
+            if not future.cancel():
+                # Already running: drop its allocation once it finishes
+                future.add_done_callback(functools.partial(_release_result, arena))
+        raise
+
+
+def _release_result(arena: AudioArena | None, future: Future) -> None:
+    """Release the arena allocation of a decode nobody will transcribe."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    audio, _ = future.result()
+    if isinstance(audio, AudioHandle) and not arena.closed:
+        arena.release(audio)
+
+
+async def run_batch(
+    engine,
+    paths: list[Path],
+    sink: JsonlSink | ParquetSink,
+    language: str | None = None,
+    precision: str | None = None,
+    chunk_s: float = 30.0,
+    decode_workers: int = 2,
+    queue_size: int = 8,
+    batch_size: int = 8,
+    progress_s: float = 30.0,
+    options: DecodeOptions | None = None,
+    arena: AudioArena | None = None,
+) -> BatchStats:
+    """Transcribe ``paths`` with ``engine`` and write one record per file.
+
+    Args:
+        engine: A loaded engine (``TranscriptionEngine`` or ``RemoteEngine``).
+        paths: Files to transcribe; those already in ``sink`` are skipped.
+        sink: Where records go (also the resume manifest).
+        language: Language code (engine default if None).
+        precision: Weight precision variant to run.
+        chunk_s: Files longer than this are transcribed in chunks.
+        decode_workers: Decoder processes; 0 decodes in a thread instead.
+        queue_size: Decoded files held waiting for the engine.
+        batch_size: Short files (up to ``chunk_s``) taken from the queue
+            together are transcribed as one engine batch, up to this many.
+        progress_s: Seconds between progress log lines.
+        options: Decode options (engine default if None).
+        arena: Shared audio arena decode processes write into (with
+            ``decode_workers`` > 0); None pickles the audio back instead.
+    """
+    stats = BatchStats()
+    done = sink.completed()
+    todo = [p for p in paths if str(p) not in done]
+    stats.skipped = len(paths) - len(todo)
+    if stats.skipped:
+        logger.info("Resuming: %d of %d files already done", stats.skipped, len(paths))
+
+    if decode_workers > 0:
+        executor: Executor = ProcessPoolExecutor(
+            decode_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            **pool_initializer(arena),
+        )
+    else:
+        executor = ThreadPoolExecutor(1, thread_name_prefix="decode")
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    producer = asyncio.create_task(
+        _decode_ahead(todo, executor, queue, max(decode_workers, 1) * 2, arena)
+    )
+    next_report = time.monotonic() + progress_s
+
+    def _write(record: dict, audio: np.ndarray | None = None) -> None:
+        sink.write(record)
+        stats.files += 1
+        if record["error"]:
+            stats.failed += 1
+            logger.warning("%s: %s", record["path"], record["error"])
+        elif audio is not None:
+            stats.audio_s += len(audio) / SAMPLE_RATE
+
+    try:
+        finished = False
+        while not finished:
+            items = [await queue.get()]
+            while len(items) < batch_size and not queue.empty():
+                items.append(queue.get_nowait())
+            if items[-1] is None:
+                items.pop()
+                finished = True
+
+            short = []
+            try:
+                for path, audio, error, _ in items:
+                    if error is not None:
+                        _write(_error_record(path, error))
+                    elif len(audio) <= chunk_s * SAMPLE_RATE:
+                        short.append((path, audio))
+                    else:
+                        await _transcribe_long(
+                            engine, path, audio, language, precision, chunk_s, options, _write
+                        )
+                if short:
+                    await _transcribe_short(engine, short, language, precision, options, _write)
+            finally:
+                for *_, handle in items:
+                    if handle is not None:
+                        arena.release(handle)
+
+            if time.monotonic() >= next_report:
+                logger.info("Progress: %s", stats.summary())
+                next_report = time.monotonic() + progress_s
+        await producer
+    finally:
+        producer.cancel()
+        # Let it release the audio it queued before the executor goes away
+        await asyncio.gather(producer, return_exceptions=True)
+        sink.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+    return stats
+
+
+async def _transcribe_short(engine, items, language, precision, options, write) -> None:
+    audios = [audio for _, audio in items]
+    try:
+        results = await engine.transcribe_batch_async(
+            audios, language, precision=precision, job_class=BATCH, options=options
+        )
+    except Exception as e:
+        logger.exception("Batch of %d files failed", len(items))
+        for path, _ in items:
+            write(_error_record(path, f"Transcription failed: {e}"))
+        return
+    for (path, audio), result in zip(items, results):
+        write(_record(path, audio, result, language), audio)
+
+
+async def _transcribe_long(engine, path, audio, language, precision, chunk_s, options, write) -> None:
+    try:
+        result = await engine.transcribe_chunked_async(
+            audio, language, precision=precision, chunk_s=chunk_s, job_class=BATCH, options=options
+        )
+    except Exception as e:
+        logger.exception("Transcription of %s failed", path)
+        write(_error_record(path, f"Transcription failed: {e}"))
+        return
+    write(_record(path, audio, result, language), audio)
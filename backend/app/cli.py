@@ -0,0 +1,174 @@
+"""``stt-local`` command line: offline batch transcription, engine workers, replay.
+
+::
+
+    stt-local batch corpus/ -o transcripts.jsonl --language en
+    stt-local worker --listen tcp://127.0.0.1:9101
+    stt-local replay recordings/ --speed 4 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from app.config import settings
+
+
+def _setup_logging() -> None:
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
+async def _batch(args: argparse.Namespace) -> int:
+    from app.audio.arena import close_arena, get_arena
+    from app.batch import find_audio, open_sink, run_batch
+    from app.engine.factory import TranscriptionEngine, get_engine, load_kwargs_from_settings
+    from app.engine.options import DecodeOptions, resolve_options
+
+    try:
+        overrides = DecodeOptions.model_validate_json(args.options) if args.options else None
+        options = resolve_options(args.preset, overrides)
+    except ValueError as e:
+        print(f"Invalid decode options: {e}", file=sys.stderr)
+        return 2
+    paths = find_audio(args.inputs)
+    sink = open_sink(args.output)
+    engine = get_engine()
+    if isinstance(engine, TranscriptionEngine):
+        await asyncio.to_thread(engine.load, **load_kwargs_from_settings())
+    elif not await engine.wait_until_loaded(args.wait_s):
+        print("No engine worker is ready", file=sys.stderr)
+        return 1
+    if args.precision and args.precision not in engine.precisions:
+        print(f"Precision {args.precision!r} is not enabled", file=sys.stderr)
+        return 2
+
+    try:
+        stats = await run_batch(
+            engine,
+            paths,
+            sink,
+            language=args.language,
+            precision=args.precision,
+            chunk_s=args.chunk_s,
+            decode_workers=args.decode_workers,
+            queue_size=args.queue_size,
+            batch_size=args.batch_size,
+            progress_s=args.progress_s,
+            options=options,
+            arena=get_arena(),
+        )
+    finally:
+        if not isinstance(engine, TranscriptionEngine):
+            await engine.close()
+        close_arena()
+    logging.getLogger(__name__).info("Done: %s", stats.summary())
+    print(json.dumps(stats.as_dict()))
+    return 1 if stats.failed else 0
+
+
+async def _replay(args: argparse.Namespace) -> int:
+    from app.replay import ReplayError, compare, default_url, find_recordings, replay
+
+    recordings = find_recordings(args.recordings)
+    if not recordings:
+        print("No recordings found", file=sys.stderr)
+        return 2
+    try:
+        stats = await replay(
+            recordings,
+            args.url or default_url(),
+            speed=args.speed,
+            concurrency=args.concurrency,
+            repeat=args.repeat,
+            timeout_s=args.timeout_s,
+        )
+    except ReplayError as e:
+        print(e, file=sys.stderr)
+        return 2
+    summary = stats.summary()
+    print(json.dumps(summary))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    regressed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows, regressed = compare(json.load(f), summary, args.max_regression)
+        for row in rows:
+            print(
+                f"{row['metric']:<8} {row['percentile']:<4} {row['baseline_ms']:>10.1f} ms "
+                f"-> {row['current_ms']:>10.1f} ms  {row['change']:+.1%}"
+                + ("  REGRESSED" if row["regressed"] else "")
+            )
+    return 1 if stats.failed or regressed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="stt-local", description="STT Local command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch",
+        help="Transcribe audio files offline",
+        description="Transcribe audio files and directories to JSONL or Parquet. "
+        "Rerunning with the same output resumes after the files already written. "
+        "Uses the engine workers in STT_ENGINE_WORKERS if set, else loads the model.",
+    )
+    batch.add_argument("inputs", nargs="+", help="Audio files or directories (searched recursively)")
+    batch.add_argument("-o", "--output", required=True, help="Output .jsonl file or .parquet directory")
+    batch.add_argument("--language", default=settings.language, help="Language code")
+    batch.add_argument("--precision", default=None, help="Weight precision variant to run")
+    batch.add_argument("--preset", default=None, help="Decode preset: fast, balanced or accurate")
+    batch.add_argument("--options", default=None, help="Decode options as a JSON object")
+    batch.add_argument("--decode-workers", type=int, default=2, help="Decoder processes (0: decode in a thread)")
+    batch.add_argument("--queue-size", type=int, default=8, help="Decoded files held waiting for the engine")
+    batch.add_argument("--batch-size", type=int, default=8, help="Short files transcribed per engine batch")
+    batch.add_argument("--chunk-s", type=float, default=settings.upload_chunk_s, help="Chunk length for long files")
+    batch.add_argument("--progress-s", type=float, default=30.0, help="Seconds between progress lines")
+    batch.add_argument("--wait-s", type=float, default=60.0, help="Seconds to wait for engine workers")
+
+    worker = commands.add_parser("worker", help="Run an engine worker for a gateway")
+    worker.add_argument("--listen", default=settings.worker_listen, help="tcp://host:port or unix:///path")
+
+    replay = commands.add_parser(
+        "replay",
+        help="Replay recorded WebSocket sessions against a server",
+        description="Replay sessions recorded with STT_RECORD_DIR and report partial, final "
+        "and done latency percentiles. With --baseline, compare against an earlier --json "
+        "and exit 1 if a percentile regressed.",
+    )
+    replay.add_argument("recordings", nargs="+", help="Recording files or directories")
+    replay.add_argument(
+        "--url", help="WebSocket URL (default: the server at STT_HOST and STT_PORT)"
+    )
+    replay.add_argument("--speed", type=float, default=1.0, help="Playback speed (0: as fast as possible)")
+    replay.add_argument("--concurrency", type=int, default=8, help="Sessions replayed at once")
+    replay.add_argument("--repeat", type=int, default=1, help="Times each recording is replayed")
+    replay.add_argument("--timeout-s", type=float, default=60.0, help="Seconds to wait for a session to finish")
+    replay.add_argument("--json", help="Also write the summary to this file")
+    replay.add_argument("--baseline", help="Summary of an earlier run to compare against")
+    replay.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown per percentile (fraction)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    _setup_logging()
+    if args.command == "worker":
+        from app.rpc.worker import serve
+
+        asyncio.run(serve(args.listen))
+        return 0
+    if args.command == "replay":
+        return asyncio.run(_replay(args))
+    return asyncio.run(_batch(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,15 +12,45 @@ MODEL_REPO_MAP: dict[str, str] = {
     "large-v3-turbo": "mlx-community/whisper-large-v3-turbo",
 }
 
+# Quantized variants per precision; fp16 uses MODEL_REPO_MAP
+QUANTIZED_REPO_MAP: dict[str, dict[str, str]] = {
+    "int8": {
+        "tiny": "mlx-community/whisper-tiny-mlx-8bit",
+        "base": "mlx-community/whisper-base-mlx-8bit",
+        "small": "mlx-community/whisper-small-mlx-8bit",
+        "medium": "mlx-community/whisper-medium-mlx-8bit",
+        "large": "mlx-community/whisper-large-v3-mlx-8bit",
+        "large-v3": "mlx-community/whisper-large-v3-mlx-8bit",
+        "large-v3-turbo": "mlx-community/whisper-large-v3-turbo-8bit",
+    },
+    "int4": {
+        "tiny": "mlx-community/whisper-tiny-mlx-4bit",
+        "base": "mlx-community/whisper-base-mlx-4bit",
+        "small": "mlx-community/whisper-small-mlx-4bit",
+        "medium": "mlx-community/whisper-medium-mlx-4bit",
+        "large": "mlx-community/whisper-large-v3-mlx-4bit",
+        "large-v3": "mlx-community/whisper-large-v3-mlx-4bit",
+        "large-v3-turbo": "mlx-community/whisper-large-v3-turbo-q4",
+    },
+}
+
+MODEL_PRECISIONS: tuple[str, ...] = ("fp16", "int8", "int4")
+
 
-def get_model_repo(model_size: str) -> str:
-    """Map a short model name to its HuggingFace repo path."""
+def get_model_repo(model_size: str, precision: str = "fp16") -> str:
+    """Map a short model name and precision to its HuggingFace repo path."""
+    if precision not in MODEL_PRECISIONS:
+        raise ValueError(
+            f"Unknown model precision {precision!r}. "
+            f"Valid options: {', '.join(MODEL_PRECISIONS)}"
+        )
+    repo_map = MODEL_REPO_MAP if precision == "fp16" else QUANTIZED_REPO_MAP[precision]
     try:
-        return MODEL_REPO_MAP[model_size]
+        return repo_map[model_size]
     except KeyError:
         raise ValueError(
             f"Unknown model size {model_size!r}. "
-            f"Valid options: {', '.join(MODEL_REPO_MAP)}"
+            f"Valid options: {', '.join(repo_map)}"
         )
 
 
@@ -34,7 +64,42 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8765
     model_size: str = "large-v3-turbo"
+    # Weight precision loaded at startup: fp16, int8 or int4
+    model_precision: str = "fp16"
+    # Further precisions requests may select per call (loaded on first use)
+    model_extra_precisions: list[str] = []
+    # Window lengths (seconds) short clips are padded to instead of 30 s;
+    # empty disables the short-clip fast path
+    short_clip_buckets_s: list[float] = [5.0, 10.0, 15.0]
+    # Batch sizes every short-clip bucket is warmed up at during model load
+    # (the full 30 s window always is); [] skips the bucket warm-up
+    warmup_batch_sizes: list[int] = [1]
+    # MLX device the engine runs on: "gpu" (Metal) or "cpu"
+    mlx_device: str = "gpu"
+    # Short-clip jobs whose mel + encoder stage may run ahead of the decoder
+    # on a second thread (each holds its encoder output until decoded);
+    # 0 runs both stages back-to-back. Needs mlx_device "cpu": Metal must
+    # only be driven from the MLX thread
+    engine_pipeline_depth: int = 0
+    # Decode token budget: guard_min_tokens + guard_tokens_per_s per second
+    # of audio (per 30 s window); 0 disables the budget
+    guard_tokens_per_s: float = 12.0
+    guard_min_tokens: int = 24
+    # Skip decoding short clips whose no-speech probability exceeds this
+    # (checked on the first decoder step); 1.0 disables the check
+    guard_no_speech_prob: float = 0.8
+    # Decode preset requests use unless they name another: fast, balanced
+    # or accurate (mlx-whisper's defaults)
+    decode_preset: str = "accurate"
+    # Default language code; "auto" detects it
     language: str = "cs"
+    # Sessions with language "auto" detect it once and then lock it. The
+    # lock is re-checked after this many seconds (0: only on low confidence)
+    language_recheck_s: float = 60.0
+    # Lock a detected language only at or above this probability
+    language_min_probability: float = 0.5
+    # Re-check the lock when a segment's average log-probability is below this
+    language_recheck_logprob: float = -1.0
     cors_origins: list[str] = [
         "http://localhost:5173",
         "http://localhost:5174",
@@ -42,8 +107,78 @@ class Settings(BaseSettings):
         "http://localhost:4173",
     ]
     log_level: str = "info"
+    # Seconds a request waits for the model to finish loading before it is
+    # rejected with 503 (HTTP) or close code 1013 (WebSocket)
+    ready_wait_s: float = 0.0
+    # Retry-After hint (seconds) sent with "not ready" rejections
+    retry_after_s: int = 5
+    # Global budget for audio/features/results held by streaming sessions
+    session_memory_budget_mb: int = 1024
+    # Close sessions that have sent nothing for this long
+    session_idle_timeout_s: float = 300.0
+    # Sessions idle this long may be spilled to disk when over budget
+    session_spill_after_s: float = 10.0
+    # Directory for spill scratch files (system temp dir if empty)
+    session_spill_dir: str = ""
+    # Live partials still queued this long after they were requested are
+    # dropped (a newer partial or the final supersedes them anyway)
+    partial_deadline_s: float = 2.0
+    # How often sessions get partials: "adaptive" derives each session's
+    # interval from the engine's live real-time factor, the partials in
+    # flight and which sessions are speaking; "fixed" sends one every 2 s
+    partial_cadence: str = "adaptive"
+    # Bounds of the adaptive interval (quiet sessions use the ceiling)
+    partial_interval_min_s: float = 0.5
+    partial_interval_max_s: float = 4.0
+    # Share of engine time live partials may use, split evenly among the
+    # sessions that are speaking
+    partial_engine_share: float = 0.5
+    # Uploads are decoded in chunks of this length so live work can run
+    # between chunks
+    upload_chunk_s: float = 30.0
+    # Processes decoding uploaded files (0: decode in a thread)
+    decode_workers: int = 2
+    # Uploads decoding or waiting to decode; more are refused with 429
+    decode_max_pending: int = 16
+    # Engine worker addresses (tcp://host:port or unix:///path). When set,
+    # this process is a gateway and forwards all decoding to the workers
+    engine_workers: list[str] = []
+    # Shared-memory audio arena (MB) for handing audio to engine workers on
+    # this host and to upload decode processes without copies; 0 disables it
+    audio_arena_mb: int = 0
+    # Arena slab length in seconds of 16 kHz audio (allocations are whole slabs)
+    audio_arena_slab_s: float = 1.0
+    # Address an engine worker (python -m app.rpc.worker) listens on
+    worker_listen: str = "tcp://127.0.0.1:9100"
+    # Record per-request spans (receive, queue, mel, encode, decode, send);
+    # the slowest traces are served at /admin/traces
+    trace_enabled: bool = False
+    # Finished traces kept (the slowest ones)
+    trace_slowest: int = 50
+    # OTLP/HTTP collector to export traces to, e.g. http://localhost:4318
+    # (needs the "tracing" extra); empty keeps them in memory only
+    trace_otlp_endpoint: str = ""
+    # Log the event loop's stack when it is blocked for longer than this
+    # (milliseconds); 0 disables the lag monitor
+    loop_lag_threshold_ms: float = 200.0
+    # Longest profile GET /admin/profile may take
+    profile_max_s: float = 60.0
+    # Directory to record each WebSocket session's inbound frames to, for
+    # replay with stt-local replay; empty disables recording
+    record_dir: str = ""
+    # Stand in for mlx-whisper with a model-free fake that sleeps
+    # fake_engine_rtf x the audio duration per call (for replays and load
+    # tests on machines without the model, e.g. Linux CI)
+    fake_engine: bool = False
+    fake_engine_rtf: float = 0.05
+    # RMS level above which a 100 ms frame counts as speech (multi-channel VAD)
+    vad_rms_threshold: float = 0.01
+    # Grace period during which a dropped session can be resumed
+    session_resume_ttl_s: float = 60.0
+    # Maximum number of dropped sessions kept for resumption
+    session_resume_max_entries: int = 256
 
-    model_config = {"env_prefix": "STT_"}
+    model_config = {"env_prefix": "STT_", "protected_namespaces": ("settings_",)}
 
 
 settings = Settings()
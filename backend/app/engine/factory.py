@@ -1,24 +1,142 @@
 """Thread-safe singleton for mlx-whisper transcription engine."""
 
 import asyncio
+import functools
 import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Hashable
 
 import numpy as np
 
+from app import tracing
+from app.audio.vad import chunk_bounds
+from app.config import Settings, get_model_repo, settings
+from app.engine import fake, guards, langid, window
+from app.engine.guards import GuardConfig
+from app.engine.langid import AUTO_LANGUAGE
+from app.engine.options import DecodeOptions, preset_options
+from app.engine.scheduler import BATCH, UPLOAD, Scheduler
+from app.engine.stream import StreamState
+from app.metrics import DECODE_ABORTS
+
+if TYPE_CHECKING:
+    from app.rpc.pool import RemoteEngine
+
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+# Weight files are read ahead in chunks of this size, reporting progress per chunk
+WEIGHTS_READ_CHUNK = 16 * 1024 * 1024
+
+
+def _weights_files(model_repo: str) -> list[Path]:
+    """Return a model's weight files, or [] if they are not on disk yet.
+
+    Only looks at local paths and the HuggingFace cache; never downloads.
+    """
+    path = Path(model_repo)
+    if not path.is_dir():
+        try:
+            from huggingface_hub import snapshot_download
+
+            path = Path(snapshot_download(repo_id=model_repo, local_files_only=True))
+        except Exception:
+            return []
+    return sorted(f for f in path.glob("weights.*") if f.is_file())
+
+
+def _weights_size(model_repo: str) -> int:
+    """Return the on-disk size of a model's weight files, or 0 if unknown."""
+    return sum(f.stat().st_size for f in _weights_files(model_repo))
+
+
+def _read_weights(files: list[Path], progress: Callable[[int], None]) -> None:
+    """Read weight files into the OS page cache, calling ``progress`` with the bytes read.
+
+    mlx reads each weight file in one call that reports nothing until it
+    returns; after this pass that read is served from memory, so the
+    reported progress tracks the slow part of the load.
+    """
+    buffer = bytearray(WEIGHTS_READ_CHUNK)
+    done = 0
+    for path in files:
+        with open(path, "rb", buffering=0) as f:
+            while n := f.readinto(buffer):
+                done += n
+                progress(done)
+
+
+def _load_weights(model_repo: str) -> None:
+    """Load weights into mlx-whisper's model cache ahead of the warm-up.
+
+    A no-op when the mlx internals are unavailable (e.g. under test stubs),
+    in which case the warm-up call loads the weights instead.
+    """
+    try:
+        import mlx.core as mx
+        from mlx_whisper.transcribe import ModelHolder
+    except ImportError:
+        return
+    ModelHolder.get_model(model_repo, mx.float16)
+
+
+def load_kwargs_from_settings(config: Settings = settings) -> dict[str, Any]:
+    """Build ``TranscriptionEngine.load()`` arguments from application settings."""
+    return {
+        "model_repo": get_model_repo(config.model_size, config.model_precision),
+        "language": config.language,
+        "precision": config.model_precision,
+        "variants": {
+            precision: get_model_repo(config.model_size, precision)
+            for precision in config.model_extra_precisions
+        },
+        "short_clip_buckets_s": config.short_clip_buckets_s,
+        "guard_config": GuardConfig(
+            tokens_per_s=config.guard_tokens_per_s,
+            min_tokens=config.guard_min_tokens,
+            no_speech_prob=config.guard_no_speech_prob,
+        ),
+        "decode_options": preset_options(config.decode_preset),
+        "fake_rtf": config.fake_engine_rtf if config.fake_engine else None,
+        "device": config.mlx_device,
+        "pipeline_depth": config.engine_pipeline_depth,
+        "warmup_batch_sizes": config.warmup_batch_sizes,
+    }
+
+
+def get_engine() -> "TranscriptionEngine | RemoteEngine":
+    """Return the engine routes should use.
+
+    The local singleton, or the pool of remote engine workers when
+    ``engine_workers`` is configured (gateway mode).
+    """
+    if settings.engine_workers:
+        from app.rpc.pool import RemoteEngine
+
+        return RemoteEngine.get_instance()
+    return TranscriptionEngine.get_instance()
+
+
+def _decode_language(language: str | None) -> str | None:
+    """Language argument for mlx-whisper: None asks it to detect the language."""
+    return None if language == AUTO_LANGUAGE else language
+
 
 class TranscriptionEngine:
     """Singleton wrapper around mlx_whisper.transcribe().
 
     Loads the model once at startup (via a warm-up call) and provides
-    a thread-safe transcribe() method for all routes.
+    a thread-safe transcribe() method for all routes. Loading may run in
+    a background thread; ``status`` and ``load_progress`` report how far
+    it has got so readiness probes can be answered while it runs.
 
     All MLX calls are serialized through a single dedicated thread to
-    avoid Metal GPU memory corruption from concurrent thread access.
+    avoid Metal GPU memory corruption from concurrent thread access. The
+    thread is fed by a priority/deadline ``Scheduler``; async methods take
+    the job class (and optionally a deadline and a session key) of the
+    request they serve.
     """
 
     _instance: "TranscriptionEngine | None" = None
@@ -27,8 +145,27 @@ class TranscriptionEngine:
     def __init__(self) -> None:
         self._model_repo: str = ""
         self._language: str = ""
+        self._precision: str = ""
+        # precision -> repo for every variant requests may select
+        self._variants: dict[str, str] = {}
+        # Length buckets (seconds) served by the short-clip fast path
+        self._short_clip_buckets_s: list[float] = []
+        self._guards = GuardConfig()
+        # Server default decode options; request options are layered on top
+        self._decode_options = DecodeOptions()
         self._loaded = False
-        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlx")
+        self._status = "idle"
+        self._load_error = ""
+        self._weights_bytes_total = 0
+        self._weights_bytes_loaded = 0
+        self._warmup_done = False
+        # One {"window_s", "batch", "ms"} row per warmed-up input shape
+        self._warmup: list[dict] = []
+        self._load_lock = threading.Lock()
+        self._scheduler = Scheduler(name="mlx")
+        self._device = "gpu"
+        # MLX stream of the pipeline's encoder stage (created on first use)
+        self._encode_stream = None
 
     @classmethod
     def get_instance(cls) -> "TranscriptionEngine":
@@ -49,49 +186,266 @@ class TranscriptionEngine:
     def is_loaded(self) -> bool:
         return self._loaded
 
+    @property
+    def status(self) -> str:
+        """One of ``idle``, ``loading``, ``ready`` or ``failed``."""
+        return self._status
+
+    def _weights_read(self, nbytes: int) -> None:
+        self._weights_bytes_loaded = nbytes
+
+    @property
+    def load_progress(self) -> dict:
+        """Model load progress for readiness reporting."""
+        return {
+            "status": self._status,
+            "weights_bytes_total": self._weights_bytes_total,
+            "weights_bytes_loaded": self._weights_bytes_loaded,
+            "warmup_done": self._warmup_done,
+            "warmup": self._warmup,
+            "error": self._load_error,
+        }
+
     @property
     def model_size(self) -> str:
         return self._model_repo
 
+    @property
+    def precision(self) -> str:
+        """Weight precision of the default model (``fp16``, ``int8`` or ``int4``)."""
+        return self._precision
+
+    @property
+    def precisions(self) -> list[str]:
+        """Precisions that requests may select."""
+        return list(self._variants)
+
+    @property
+    def short_clip_buckets_s(self) -> list[float]:
+        """Length buckets of the short-clip fast path (empty when disabled)."""
+        return list(self._short_clip_buckets_s)
+
+    @property
+    def decode_options(self) -> DecodeOptions:
+        """Server default decode options (fields left None use mlx-whisper's)."""
+        return self._decode_options
+
+    @property
+    def scheduler(self) -> Scheduler:
+        """The scheduler feeding the MLX thread."""
+        return self._scheduler
+
     @property
     def backend(self) -> str:
         return "mlx-whisper" if self._loaded else ""
 
     @property
     def device(self) -> str:
-        return "mps" if self._loaded else ""
+        if not self._loaded:
+            return ""
+        return "cpu" if self._device == "cpu" else "mps"
+
+    def load(
+        self,
+        model_repo: str,
+        language: str,
+        precision: str = "fp16",
+        variants: dict[str, str] | None = None,
+        short_clip_buckets_s: list[float] | None = None,
+        guard_config: GuardConfig | None = None,
+        decode_options: DecodeOptions | None = None,
+        fake_rtf: float | None = None,
+        device: str = "gpu",
+        pipeline_depth: int = 0,
+        warmup_batch_sizes: list[int] | None = None,
+    ) -> None:
+        """Load the model weights, then run a warm-up transcription on silence.
+
+        Blocks until done; call it from a worker thread to keep the event
+        loop responsive. Failures are recorded in ``load_progress`` and
+        re-raised.
 
-    def load(self, model_repo: str, language: str) -> None:
-        """Load the model by running a warm-up transcription on silence."""
-        with self._lock:
+        Args:
+            model_repo: Repo or local path of the default model.
+            language: Default language code.
+            precision: Weight precision of ``model_repo``.
+            variants: Other precisions (precision -> repo) that requests may
+                select; their weights load on first use.
+            short_clip_buckets_s: Window lengths (seconds, under 30) that
+                short clips are padded to instead of 30 s. Ignored when the
+                backend does not support a truncated encoder.
+            guard_config: Token budget and no-speech settings of the
+                hallucination guards (budget and no-speech check off if None).
+            decode_options: Server default decode options (mlx-whisper's
+                defaults if None).
+            fake_rtf: Replace mlx-whisper with the model-free fake
+                (``app/engine/fake.py``) running at this real-time factor.
+            device: MLX device to run on, ``"gpu"`` or ``"cpu"``.
+            pipeline_depth: Short-clip jobs whose encoder stage may run
+                ahead of the decoder on the scheduler's prefetch thread
+                (CPU device only; 0 disables the pipeline).
+            warmup_batch_sizes: Batch sizes each short-clip bucket is
+                warmed up at (``[1]`` if None; empty warms up only the
+                full window).
+        """
+        with self._load_lock:
             if self._loaded:
                 logger.warning("TranscriptionEngine already loaded, skipping reload")
                 return
 
-            logger.info("Loading model: repo=%s, language=%s", model_repo, language)
+            logger.info(
+                "Loading model: repo=%s, precision=%s, language=%s",
+                model_repo, precision, language,
+            )
+            self._status = "loading"
+            self._load_error = ""
+            buckets = sorted(b for b in short_clip_buckets_s or () if 0 < b < window.MAX_WINDOW_S)
+            if buckets and not window.is_supported():
+                logger.info("Short-clip fast path unavailable on this backend")
+                buckets = []
 
-            import mlx_whisper
+            try:
+                if fake_rtf is not None:
+                    fake.install(fake_rtf)
+                import mlx_whisper
 
-            # Warm-up: transcribe 1 second of silence to load weights
-            silence = np.zeros(16000, dtype=np.float32)
-            mlx_whisper.transcribe(
-                silence,
-                path_or_hf_repo=model_repo,
-                language=language,
-            )
+                if device == "cpu":
+                    import mlx.core as mx
+
+                    mx.set_default_device(mx.cpu)
+
+                files = _weights_files(model_repo)
+                self._weights_bytes_total = sum(f.stat().st_size for f in files)
+                _read_weights(files, self._weights_read)
+                _load_weights(model_repo)
+                # The weights are cached locally now even if they were not before
+                self._weights_bytes_total = _weights_size(model_repo) or self._weights_bytes_total
+                self._weights_bytes_loaded = self._weights_bytes_total
+
+                self._warmup = self._warm_up(
+                    model_repo,
+                    _decode_language(language),
+                    buckets,
+                    [1] if warmup_batch_sizes is None else warmup_batch_sizes,
+                    guard_config or GuardConfig(),
+                )
+                self._warmup_done = True
+            except Exception as e:
+                self._status = "failed"
+                self._load_error = str(e)
+                logger.exception("Model load failed")
+                raise
 
             self._model_repo = model_repo
             self._language = language
+            self._precision = precision
+            self._variants = {precision: model_repo, **(variants or {})}
+            self._short_clip_buckets_s = buckets
+            if pipeline_depth > 0 and device != "cpu":
+                logger.warning(
+                    "Encoder/decoder pipelining needs the CPU device "
+                    "(STT_MLX_DEVICE=cpu); running jobs whole"
+                )
+                pipeline_depth = 0
+            self._device = device
+            self._scheduler.prefetch = max(0, pipeline_depth)
+            self._guards = guard_config or GuardConfig()
+            self._decode_options = decode_options or DecodeOptions()
             self._loaded = True
+            self._status = "ready"
 
             logger.info("Model loaded successfully")
 
-    def transcribe(self, audio: np.ndarray, language: str | None = None) -> dict:
+    def _warm_up(
+        self,
+        model_repo: str,
+        language: str | None,
+        buckets: list[float],
+        batch_sizes: list[int],
+        guard_config: GuardConfig,
+    ) -> list[dict]:
+        """Run each input shape requests will use once, on silence.
+
+        MLX builds kernels and grows its buffer cache on the first call of
+        each shape, so without this the first request per shape after a
+        start pays for it. Covers the full 30 s window (which also loads
+        the weights when the preload was a no-op) and every short-clip
+        bucket at every batch size. The no-speech check is off so the
+        decoder runs too. Freed buffers stay in MLX's cache, so the
+        largest batch leaves its memory reserved for requests.
+
+        Returns one timing row per shape.
+        """
+        import mlx_whisper
+
+        rows = []
+
+        def timed(window_s: float, batch: int, fn: Callable[[], Any]) -> None:
+            started = time.perf_counter()
+            fn()
+            ms = round(1000 * (time.perf_counter() - started), 1)
+            rows.append({"window_s": window_s, "batch": batch, "ms": ms})
+            logger.info("Warm-up: %g s window x %d took %.0f ms", window_s, batch, ms)
+
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        timed(window.MAX_WINDOW_S, 1, lambda: mlx_whisper.transcribe(
+            silence, path_or_hf_repo=model_repo, language=language
+        ))
+        if not buckets:
+            return rows
+
+        import mlx.core as mx
+        from mlx_whisper.transcribe import ModelHolder
+
+        model = ModelHolder.get_model(model_repo, mx.float16)
+        guards_off = GuardConfig(guard_config.tokens_per_s, guard_config.min_tokens, 1.0)
+        for bucket in buckets:
+            clip = np.zeros(int(bucket * SAMPLE_RATE), dtype=np.float32)
+            for batch in sorted(set(batch_sizes)):
+                timed(bucket, batch, lambda: window.decode_windows(
+                    model, [clip] * batch, bucket, guards_off, language=language
+                ))
+        return rows
+
+    async def wait_until_loaded(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for the model to finish loading.
+
+        Returns whether the engine is loaded. Polls instead of blocking a
+        thread so any number of waiting requests stays cheap.
+        """
+        deadline = time.monotonic() + timeout
+        while not self._loaded and self._status != "failed":
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.05)
+        return self._loaded
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        prefix: str | None = None,
+        options: DecodeOptions | None = None,
+        features=None,
+    ) -> dict:
         """Transcribe audio synchronously using mlx_whisper.
 
         Args:
             audio: Float32 numpy array of audio samples at 16kHz.
-            language: Override language (defaults to engine language).
+            language: Override language (defaults to engine language);
+                ``"auto"`` detects it.
+            initial_prompt: Text that conditions the decoder, e.g. the
+                transcript committed before this audio.
+            precision: Weight precision variant to run (defaults to the
+                precision loaded at startup).
+            prefix: Text forced as the start of the transcript. The result
+                then holds only the text after it, without timestamps.
+            options: Decode options of this request, layered over the
+                server default. ``initial_prompt`` wins over theirs.
+            features: Encoder output for ``audio`` computed ahead by the
+                pipeline (short clips only).
 
         Returns:
             The mlx_whisper result dict with 'text' and 'segments' keys.
@@ -101,21 +455,412 @@ class TranscriptionEngine:
                 "TranscriptionEngine has not been loaded. Call load() first."
             )
 
+        repo = self.repo_for(precision)
+        language = _decode_language(language or self._language)
+        options = self._decode_options.merged(options)
+        initial_prompt = initial_prompt or options.initial_prompt
+        bucket = window.bucket_for(len(audio), self._short_clip_buckets_s)
+        if bucket is not None:
+            result = self._transcribe_windows(
+                [audio], bucket, repo, language, initial_prompt, prefix, options, features=features
+            )[0]
+            if result is not None:
+                return result
+        return self._transcribe_full(audio, repo, language, initial_prompt, prefix, options)
+
+    def _transcribe_full(
+        self,
+        audio: np.ndarray,
+        repo: str,
+        language: str | None,
+        initial_prompt: str | None = None,
+        prefix: str | None = None,
+        options: DecodeOptions | None = None,
+    ) -> dict:
+        """Transcribe through mlx_whisper.transcribe() (30 s windows).
+
+        Looping segments are collapsed or dropped after the fact; only the
+        token budget bounds the work inside each window. Windows that ran
+        out of budget are counted from the result's token counts.
+        """
         import mlx_whisper
 
-        return mlx_whisper.transcribe(
+        kwargs: dict[str, Any] = options.transcribe_kwargs() if options else {}
+        if initial_prompt:
+            kwargs["initial_prompt"] = initial_prompt
+        if prefix:
+            kwargs["prefix"] = prefix
+            kwargs["without_timestamps"] = True
+        sample_len = self._guards.token_budget(len(audio) / SAMPLE_RATE)
+        if sample_len:
+            kwargs["sample_len"] = sample_len
+
+        # mel, encoder and decoder all run inside mlx-whisper here
+        with tracing.span("transcribe", window_s=30.0):
+            result = mlx_whisper.transcribe(
+                audio,
+                path_or_hf_repo=repo,
+                language=language,
+                **kwargs,
+            )
+        stops = guards.budget_stops(result, sample_len) if sample_len else 0
+        result, reasons = guards.clean_result(result)
+        for reason in [guards.TOKEN_BUDGET] * stops + reasons:
+            DECODE_ABORTS.inc(reason=reason)
+        return result
+
+    def _transcribe_windows(
+        self,
+        audios: list[np.ndarray],
+        bucket_s: float,
+        repo: str,
+        language: str | None,
+        initial_prompt: str | None = None,
+        prefix: str | None = None,
+        options: DecodeOptions | None = None,
+        features=None,
+    ) -> list[dict | None]:
+        """Decode short clips as one batch padded to ``bucket_s`` seconds.
+
+        Returns one result per clip; None where the result failed the
+        quality thresholds and must be re-run on the full window (where
+        the rest of the temperature fallback schedule applies). ``features``
+        is the clips' ``_encode_windows`` output if the pipeline computed it.
+        """
+        import mlx.core as mx
+        from mlx_whisper.transcribe import ModelHolder
+
+        options = options or DecodeOptions()
+        decode_kwargs: dict[str, Any] = {}
+        if options.temperature:
+            decode_kwargs["temperature"] = options.temperature[0]
+        model = ModelHolder.get_model(repo, mx.float16)
+        outcomes = window.decode_windows(
+            model,
+            audios,
+            bucket_s,
+            self._guards,
+            features,
+            language=language,
+            prompt=initial_prompt,
+            prefix=prefix,
+            **decode_kwargs,
+        )
+        thresholds = options.thresholds()
+        results = []
+        for (decoded, reason), audio in zip(outcomes, audios):
+            if reason is not None:
+                DECODE_ABORTS.inc(reason=reason)
+            results.append(
+                window.to_result(decoded, len(audio) / SAMPLE_RATE, language, reason, **thresholds)
+            )
+        return results
+
+    def _encode_windows(self, audios: list[np.ndarray], bucket_s: float, repo: str):
+        """Mel + encoder stage of ``_transcribe_windows``, run ahead by the pipeline."""
+        import mlx.core as mx
+        from mlx_whisper.transcribe import ModelHolder
+
+        if self._encode_stream is None:
+            # Its own stream, so it does not queue behind the decoder's work
+            self._encode_stream = mx.new_stream(mx.cpu)
+        model = ModelHolder.get_model(repo, mx.float16)
+        with mx.stream(self._encode_stream):
+            return window.encode_windows(model, audios, bucket_s)
+
+    def _pipelined(
+        self, call: Callable[..., dict], audio: np.ndarray, precision: str | None
+    ) -> tuple[Callable[..., dict], Callable[[], Any] | None]:
+        """Split a transcription job into its encoder stage and the rest.
+
+        Returns ``(fn, prepare)`` for ``Scheduler.run``. With pipelining on,
+        a short clip's encoder stage may run on the prefetch thread while
+        the MLX thread decodes earlier jobs; ``call`` then receives its
+        output as ``features``. Full-window jobs are encoded inside
+        mlx-whisper and stay whole.
+        """
+        if not self._scheduler.prefetch:
+            return call, None
+        bucket = window.bucket_for(len(audio), self._short_clip_buckets_s)
+        if bucket is None:
+            return call, None
+        prepare = functools.partial(self._encode_windows, [audio], bucket, self.repo_for(precision))
+        return (lambda features: call(features=features)), prepare
+
+    def repo_for(self, precision: str | None) -> str:
+        """Return the model repo serving ``precision`` (default if None)."""
+        if not precision:
+            return self._model_repo
+        try:
+            return self._variants[precision]
+        except KeyError:
+            raise ValueError(
+                f"Precision {precision!r} is not enabled. "
+                f"Available: {', '.join(self._variants)}"
+            )
+
+    def detect_language(self, audios: list[np.ndarray], precision: str | None = None) -> list[dict]:
+        """Identify the spoken language of each clip from its first 30 s.
+
+        Clips are grouped by length bucket like ``transcribe_batch()``, so
+        each group costs one encoder pass and one decoder step. Returns
+        ``{"language", "probability"}`` per clip; the probability is None
+        when the backend lacks the internals to compute it and the
+        language comes from a one-token transcription instead.
+        """
+        if not self._loaded:
+            raise RuntimeError(
+                "TranscriptionEngine has not been loaded. Call load() first."
+            )
+        repo = self.repo_for(precision)
+        clips = [audio[: int(window.MAX_WINDOW_S * SAMPLE_RATE)] for audio in audios]
+        if not window.is_supported():
+            import mlx_whisper
+
+            return [
+                {
+                    "language": mlx_whisper.transcribe(
+                        clip, path_or_hf_repo=repo, language=None, sample_len=1, temperature=0.0
+                    ).get("language"),
+                    "probability": None,
+                }
+                for clip in clips
+            ]
+
+        import mlx.core as mx
+        from mlx_whisper.transcribe import ModelHolder
+
+        model = ModelHolder.get_model(repo, mx.float16)
+        results: list[dict] = [{}] * len(clips)
+        for bucket, indices in window.group_by_bucket(clips, self._short_clip_buckets_s).items():
+            with tracing.span("detect_language", clips=len(indices)):
+                detected = langid.detect(
+                    model, [clips[i] for i in indices], bucket or window.MAX_WINDOW_S
+                )
+            for index, (language, probability) in zip(indices, detected):
+                results[index] = {"language": language, "probability": round(probability, 4)}
+        return results
+
+    def open_stream(self) -> StreamState:
+        """Create decode state for one streaming session."""
+        return StreamState()
+
+    def transcribe_stream(
+        self,
+        state: StreamState,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        options: DecodeOptions | None = None,
+        features=None,
+    ) -> dict:
+        """Transcribe the current window of a stream incrementally.
+
+        Reuses the previous result when the window is unchanged; otherwise
+        forces the prefix earlier partials agreed on, so the decoder only
+        steps through new tokens. Returns a result for the whole window.
+        """
+        cached = state.cached_result(audio)
+        if cached is not None:
+            return cached
+        prefix = state.prefix
+        call = self._call(
             audio,
-            path_or_hf_repo=self._model_repo,
-            language=language or self._language,
+            language,
+            initial_prompt=initial_prompt,
+            precision=precision,
+            prefix=prefix,
+            options=options,
         )
+        result = call() if features is None else call(features=features)
+        return state.merge(audio, result, prefix, len(audio) / SAMPLE_RATE)
+
+    def transcribe_batch(
+        self,
+        audios: list[np.ndarray],
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        options: DecodeOptions | None = None,
+    ) -> list[dict]:
+        """Transcribe several related clips (e.g. the channels of one call).
+
+        Short clips are grouped by length bucket and each group is decoded
+        as one batch; longer clips, and short ones whose windowed result
+        failed the quality checks, run one by one on the full window.
+
+        Returns one result dict per clip, in order.
+        """
+        if not self._short_clip_buckets_s:
+            return [
+                self._call(
+                    audio, language, initial_prompt=initial_prompt, precision=precision, options=options
+                )()
+                for audio in audios
+            ]
+
+        if not self._loaded:
+            raise RuntimeError(
+                "TranscriptionEngine has not been loaded. Call load() first."
+            )
+        repo = self.repo_for(precision)
+        language = _decode_language(language or self._language)
+        options = self._decode_options.merged(options)
+        initial_prompt = initial_prompt or options.initial_prompt
+        results: list[dict | None] = [None] * len(audios)
+        for bucket, indices in window.group_by_bucket(audios, self._short_clip_buckets_s).items():
+            if bucket is None:
+                continue
+            batch = self._transcribe_windows(
+                [audios[i] for i in indices], bucket, repo, language, initial_prompt, None, options
+            )
+            for index, result in zip(indices, batch):
+                results[index] = result
+        return [
+            result if result is not None
+            else self._transcribe_full(audio, repo, language, initial_prompt, None, options)
+            for audio, result in zip(audios, results)
+        ]
 
-    async def transcribe_async(self, audio: np.ndarray, language: str | None = None) -> dict:
+    async def transcribe_async(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        prefix: str | None = None,
+        options: DecodeOptions | None = None,
+    ) -> dict:
         """Transcribe audio without blocking the event loop.
 
-        All calls are serialized through a single-thread executor to
+        All calls are serialized through the scheduler's single thread to
         prevent concurrent Metal GPU access which causes memory corruption.
+        ``prefix`` is forced as the start of the transcript (see
+        ``transcribe()``). Raises ``JobDropped`` if the scheduler drops the job.
+        """
+        fn, prepare = self._pipelined(
+            self._call(
+                audio,
+                language,
+                initial_prompt=initial_prompt,
+                precision=precision,
+                prefix=prefix,
+                options=options,
+            ),
+            audio,
+            precision,
+        )
+        return await self._scheduler.run(fn, job_class, deadline_s, key, prepare)
+
+    async def transcribe_chunked_async(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        chunk_s: float = 30.0,
+        job_class: str = UPLOAD,
+        options: DecodeOptions | None = None,
+    ) -> dict:
+        """Transcribe long audio as a sequence of scheduled chunks.
+
+        Each chunk is its own job, so live work can run between chunks.
+        Chunks end at the quietest point near ``chunk_s`` and are
+        conditioned on the previous chunk's text (unless the options turn
+        ``condition_on_previous_text`` off); segment times are shifted
+        back onto the whole recording. A language detected in the first
+        chunk is kept for the rest.
+        """
+        bounds = chunk_bounds(audio, int(chunk_s * SAMPLE_RATE))
+        if len(bounds) <= 1:
+            return await self.transcribe_async(
+                audio, language, initial_prompt, precision, job_class, options=options
+            )
+
+        condition = self._decode_options.merged(options).condition_on_previous_text is not False
+        results: list[dict] = []
+        segments: list[dict] = []
+        prompt = initial_prompt
+        for start, end in bounds:
+            result = await self.transcribe_async(
+                audio[start:end], language, prompt, precision, job_class, options=options
+            )
+            results.append(result)
+            if (language or self._language) == AUTO_LANGUAGE:
+                language = result.get("language") or language
+            offset = start / SAMPLE_RATE
+            for seg in result.get("segments", []):
+                segments.append({**seg, "start": seg["start"] + offset, "end": seg["end"] + offset})
+            if condition:
+                prompt = result.get("text", "").strip() or prompt
+        text = " ".join(r.get("text", "").strip() for r in results if r.get("text", "").strip())
+        return {**results[0], "text": text, "segments": segments}
+
+    async def transcribe_stream_async(
+        self,
+        state: StreamState,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        options: DecodeOptions | None = None,
+    ) -> dict:
+        """Run transcribe_stream() on the scheduler."""
+        fn, prepare = self._pipelined(
+            functools.partial(
+                self.transcribe_stream, state, audio, language, initial_prompt, precision, options
+            ),
+            audio,
+            precision,
+        )
+        return await self._scheduler.run(fn, job_class, deadline_s, key, prepare)
+
+    async def transcribe_batch_async(
+        self,
+        audios: list[np.ndarray],
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        job_class: str = BATCH,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        options: DecodeOptions | None = None,
+    ) -> list[dict]:
+        """Transcribe related clips as a single scheduler job.
+
+        The clips run back-to-back, so a multi-channel session takes one
+        slot in the engine queue instead of one per channel.
         """
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            self._executor, self.transcribe, audio, language
+        return await self._scheduler.run(
+            functools.partial(
+                self.transcribe_batch, audios, language, initial_prompt, precision, options
+            ),
+            job_class,
+            deadline_s,
+            key,
+        )
+
+    async def detect_language_async(
+        self,
+        audios: list[np.ndarray],
+        precision: str | None = None,
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+    ) -> list[dict]:
+        """Run detect_language() as a single scheduler job."""
+        return await self._scheduler.run(
+            functools.partial(self.detect_language, audios, precision), job_class, deadline_s, key
         )
+
+    def _call(self, audio: np.ndarray, language: str | None, **options: Any) -> functools.partial:
+        """Bind a transcribe() call, passing only the options that are set."""
+        options = {key: value for key, value in options.items() if value}
+        return functools.partial(self.transcribe, audio, language, **options)
@@ -0,0 +1,66 @@
+"""Model-free stand-in for mlx-whisper (``STT_FAKE_ENGINE``).
+
+Lets session replays and load tests drive the whole server (scheduler,
+buffering, WebSocket protocol) on machines without Apple silicon or the
+model weights, such as Linux CI. ``transcribe`` sleeps for ``rtf`` times
+the audio duration in place of decoding and returns one deterministic
+segment per second of audio; the language is the requested one, or
+``en`` when asked to detect it.
+"""
+
+import logging
+import sys
+import time
+from types import ModuleType
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel")
+
+
+def transcribe(
+    audio: np.ndarray,
+    *,
+    path_or_hf_repo: str = "",
+    language: str | None = None,
+    rtf: float = 0.0,
+    **kwargs,
+) -> dict:
+    """Sleep like a decode of ``audio`` would, then return a fixed transcript."""
+    duration_s = len(audio) / SAMPLE_RATE
+    time.sleep(duration_s * rtf)
+    segments = [
+        {
+            "text": f" {WORDS[i % len(WORDS)]}",
+            "start": float(i),
+            "end": min(float(i + 1), duration_s),
+        }
+        for i in range(int(np.ceil(duration_s)))
+    ]
+    if kwargs.get("sample_len") == 1:
+        segments = []
+    if kwargs.get("prefix"):
+        # Like mlx-whisper with a forced prefix: only the text after it, untimed
+        words = "".join(seg["text"] for seg in segments).split()
+        text = " ".join(words[len(kwargs["prefix"].split()):])
+        return {"text": text, "segments": [], "language": language or "en"}
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language or "en",
+    }
+
+
+def install(rtf: float) -> None:
+    """Make ``import mlx_whisper`` return the fake for the rest of the process."""
+    module = ModuleType("mlx_whisper")
+
+    def fake_transcribe(audio, **kwargs):
+        return transcribe(audio, rtf=rtf, **kwargs)
+
+    module.transcribe = fake_transcribe  # type: ignore[attr-defined]
+    sys.modules["mlx_whisper"] = module
+    logger.warning("Using the fake engine (rtf=%.3f); transcripts are placeholders", rtf)
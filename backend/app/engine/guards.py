@@ -0,0 +1,220 @@
+"""Hallucination and repetition guards that bound decode work.
+
+On silent or noisy audio Whisper tends to loop, repeating a phrase until
+it runs out of tokens, which makes such a decode several times slower
+than a normal one and produces text nobody said. The guards cap that
+work:
+
+- a token budget proportional to the audio duration (``sample_len``);
+- a no-speech check on the first decoder step, before any text is
+  sampled (windowed decodes only);
+- n-gram repetition and compression-ratio checks inside the decode loop
+  that force end-of-text for the looping row (windowed decodes only);
+- the same repetition and compression checks applied to the segments of
+  full-window results after the fact.
+
+Every guard that fires is counted in ``stt_decode_aborts_total``.
+"""
+
+import functools
+import math
+import zlib
+
+NO_SPEECH = "no_speech"
+REPETITION = "repetition"
+COMPRESSION = "compression"
+TOKEN_BUDGET = "token_budget"
+
+# mlx-whisper's default threshold for repetitive (looping) text
+COMPRESSION_RATIO_THRESHOLD = 2.4
+# A tail n-gram of at most REPEAT_MAX_NGRAM items repeated at least
+# REPEAT_MIN_COUNT times and spanning at least REPEAT_MIN_ITEMS items
+REPEAT_MAX_NGRAM = 8
+REPEAT_MIN_COUNT = 3
+REPEAT_MIN_ITEMS = 16
+# In-loop compression checks start at this many tokens and repeat every
+# COMPRESSION_CHECK_EVERY tokens (short texts never compress well)
+COMPRESSION_MIN_TOKENS = 32
+COMPRESSION_CHECK_EVERY = 8
+# Whisper samples at most half its 448-token text context per window
+MAX_SAMPLE_LEN = 224
+
+
+class GuardConfig:
+    """Guard settings for one engine.
+
+    The defaults disable the token budget and the no-speech check; the
+    repetition and compression checks are always on.
+    """
+
+    def __init__(
+        self,
+        tokens_per_s: float = 0.0,
+        min_tokens: int = 24,
+        no_speech_prob: float = 1.0,
+    ) -> None:
+        self.tokens_per_s = tokens_per_s
+        self.min_tokens = min_tokens
+        self.no_speech_prob = no_speech_prob
+
+    def token_budget(self, duration_s: float) -> int | None:
+        """Tokens a decode of ``duration_s`` seconds may sample (None: no budget).
+
+        Applies per 30 s window, so longer audio gets a full window's budget.
+        """
+        if self.tokens_per_s <= 0:
+            return None
+        seconds = min(duration_s, 30.0)
+        return min(MAX_SAMPLE_LEN, self.min_tokens + math.ceil(self.tokens_per_s * seconds))
+
+
+def compression_ratio(text: str) -> float:
+    """Ratio of the UTF-8 size of ``text`` to its zlib-compressed size."""
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
+
+
+def repeated_tail(items: list) -> tuple[int, int] | None:
+    """Find an n-gram that repeats back-to-back at the end of ``items``.
+
+    Returns:
+        ``(n, count)`` for the shortest such n-gram, or None.
+    """
+    for n in range(1, REPEAT_MAX_NGRAM + 1):
+        needed = max(REPEAT_MIN_COUNT, math.ceil(REPEAT_MIN_ITEMS / n))
+        if len(items) < n * needed:
+            continue
+        gram = items[-n:]
+        count = 1
+        while (count + 1) * n <= len(items) and items[-(count + 1) * n : -count * n] == gram:
+            count += 1
+        if count >= needed:
+            return n, count
+    return None
+
+
+def collapse_repetition(items: list) -> list:
+    """Drop all but the first copy of a repeated tail n-gram."""
+    found = repeated_tail(items)
+    if found is None:
+        return items
+    n, count = found
+    return items[: len(items) - (count - 1) * n]
+
+
+def budget_stops(result: dict, sample_len: int) -> int:
+    """Count the 30 s windows of a full-window result that used their whole token budget.
+
+    mlx_whisper reports each segment's tokens (text and timestamps) and
+    the ``seek`` of the window it was decoded in; a window whose segments
+    hold ``sample_len`` tokens stopped at the budget, not at end-of-text.
+    Tokens after a window's last timestamp pair are decoded again with the
+    next window instead of being reported, so such a stop can go uncounted.
+    """
+    tokens: dict[int, int] = {}
+    for segment in result.get("segments", []):
+        seek = segment.get("seek", 0)
+        tokens[seek] = tokens.get(seek, 0) + len(segment.get("tokens", ()))
+    return sum(1 for count in tokens.values() if count >= sample_len)
+
+
+def clean_result(result: dict) -> tuple[dict, list[str]]:
+    """Strip looping text from a full-window mlx_whisper result.
+
+    Repeated tails of a segment are collapsed to one copy; segments that
+    still compress too well are dropped.
+
+    Returns:
+        The cleaned result (``result`` itself if nothing changed) and the
+        reasons of the guards that fired.
+    """
+    reasons = []
+    segments = []
+    for segment in result.get("segments", []):
+        text = segment.get("text", "")
+        words = text.split()
+        collapsed = collapse_repetition(words)
+        if len(collapsed) < len(words):
+            reasons.append(REPETITION)
+            leading = text[: len(text) - len(text.lstrip())]
+            text = leading + " ".join(collapsed)
+            segment = {**segment, "text": text}
+        if compression_ratio(text) > COMPRESSION_RATIO_THRESHOLD:
+            reasons.append(COMPRESSION)
+            continue
+        segments.append(segment)
+
+    if not reasons:
+        return result, reasons
+    text = "".join(segment["text"] for segment in segments)
+    return {**result, "text": text, "segments": segments}, reasons
+
+
+def no_speech_probs(model, audio_features, tokenizer) -> list[float]:
+    """Probability of the no-speech token after start-of-transcript, per row.
+
+    Costs one single-token decoder step; matches the probability Whisper
+    reports for decodes without an initial prompt.
+    """
+    import mlx.core as mx
+
+    tokens = mx.full((audio_features.shape[0], 1), tokenizer.sot, dtype=mx.int32)
+    logits = model.logits(tokens, audio_features)[:, 0].astype(mx.float32)
+    return mx.softmax(logits, axis=-1)[:, tokenizer.no_speech].tolist()
+
+
+def guard_filter(tokenizer, sample_begin: int, n_batch: int):
+    """Build a logit filter that forces end-of-text for looping rows.
+
+    The filter's ``reasons`` list holds, per row, the guard that fired
+    (or None); ``kept`` holds the number of sampled tokens to keep.
+    """
+    return _filter_class()(tokenizer, sample_begin, n_batch)
+
+
+@functools.cache
+def _filter_class():
+    """LogitFilter subclass (built lazily: needs mlx)."""
+    import mlx.core as mx
+    import numpy as np
+    from mlx_whisper.decoding import LogitFilter
+
+    class GuardFilter(LogitFilter):
+        def __init__(self, tokenizer, sample_begin: int, n_batch: int) -> None:
+            self.tokenizer = tokenizer
+            self.sample_begin = sample_begin
+            self.reasons: list[str | None] = [None] * n_batch
+            self.kept: list[int | None] = [None] * n_batch
+
+        def apply(self, logits, tokens):
+            eot = self.tokenizer.eot
+            stop = []
+            for row, sampled in enumerate(tokens[:, self.sample_begin :].tolist()):
+                if self.reasons[row] is not None or (sampled and sampled[-1] == eot):
+                    continue
+                reason = self._check(row, sampled)
+                if reason is not None:
+                    self.reasons[row] = reason
+                    stop.append(row)
+            if not stop:
+                return logits
+            mask = np.zeros(logits.shape, dtype=bool)
+            mask[stop] = True
+            mask[stop, eot] = False
+            return mx.where(mx.array(mask), -mx.inf, logits)
+
+        def _check(self, row: int, sampled: list[int]) -> str | None:
+            found = repeated_tail(sampled)
+            if found is not None:
+                n, count = found
+                self.kept[row] = len(sampled) - (count - 1) * n
+                return REPETITION
+            if (
+                len(sampled) >= COMPRESSION_MIN_TOKENS
+                and len(sampled) % COMPRESSION_CHECK_EVERY == 0
+                and compression_ratio(self.tokenizer.decode(sampled)) > COMPRESSION_RATIO_THRESHOLD
+            ):
+                return COMPRESSION
+            return None
+
+    return GuardFilter
@@ -0,0 +1,60 @@
+"""Spoken-language identification from encoded audio features.
+
+Whisper identifies the language with one decoder step: after the
+start-of-transcript token, the most probable language token wins. The
+functions here take features from ``window.encode()``, so detection
+works on truncated short-clip windows and a batch of clips shares one
+encoder pass.
+"""
+
+import numpy as np
+
+from app.engine import window
+
+# Language value that asks for detection instead of naming a language
+AUTO_LANGUAGE = "auto"
+
+
+def language_probs(model, audio_features, tokenizer) -> tuple[list[int], list[dict[str, float]]]:
+    """Most probable language token and the language distribution, per row.
+
+    Mirrors ``mlx_whisper.decoding.detect_language`` without its encoder
+    pass, which only admits full-window features.
+    """
+    import mlx.core as mx
+
+    tokens = mx.full((audio_features.shape[0], 1), tokenizer.sot, dtype=mx.int32)
+    logits = model.logits(tokens, audio_features)[:, 0].astype(mx.float32)
+    mask = mx.full(logits.shape[-1], -mx.inf, dtype=mx.float32)
+    mask[list(tokenizer.all_language_tokens)] = 0.0
+    logits = logits + mask
+    best = mx.argmax(logits, axis=-1).tolist()
+    probs = np.array(mx.softmax(logits, axis=-1))
+    distributions = [
+        {
+            code: probs[row, token].item()
+            for token, code in zip(tokenizer.all_language_tokens, tokenizer.all_language_codes)
+        }
+        for row in range(probs.shape[0])
+    ]
+    return best, distributions
+
+
+def detect(model, audios: list[np.ndarray], bucket_s: float) -> list[tuple[str, float]]:
+    """Language code and its probability for each clip, padded to ``bucket_s``.
+
+    Only the first ``bucket_s`` seconds of each clip are used. English-only
+    models report ``en`` with probability 1.
+    """
+    from mlx_whisper.tokenizer import get_tokenizer
+
+    if not model.is_multilingual:
+        return [("en", 1.0)] * len(audios)
+    tokenizer = get_tokenizer(True, num_languages=model.num_languages)
+    features = window.encode(model, window.log_mels(model, audios, bucket_s))
+    _, distributions = language_probs(model, features, tokenizer)
+    results = []
+    for probs in distributions:
+        code = max(probs, key=probs.get)
+        results.append((code, probs[code]))
+    return results
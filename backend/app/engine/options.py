@@ -0,0 +1,95 @@
+"""Per-request decode options and the server-side presets built from them.
+
+``DecodeOptions`` fields left as None inherit: a request's options are
+layered over the server default (``STT_DECODE_PRESET``), which is layered
+over mlx-whisper's own defaults. Naming a preset in a request replaces
+the server default, since every preset sets every decode field.
+
+Temperature fallback is the expensive knob: each temperature after the
+first re-decodes a window whose result failed the compression-ratio or
+log-probability threshold. ``fast`` never re-decodes, ``balanced`` does
+at most twice, ``accurate`` is mlx-whisper's default schedule.
+"""
+
+from typing import Annotated, Any
+
+from pydantic import BaseModel, Field
+
+Temperature = Annotated[float, Field(ge=0.0, le=1.0)]
+
+
+class DecodeOptions(BaseModel):
+    """Validated decode settings; None means "inherit"."""
+
+    model_config = {"extra": "forbid", "frozen": True}
+
+    # Fallback schedule: retry a failed window at each next temperature
+    temperature: tuple[Temperature, ...] | None = Field(default=None, min_length=1, max_length=6)
+    # Prompt each 30 s window with the text of the previous one
+    condition_on_previous_text: bool | None = None
+    # Treat a window as silence above this no-speech probability (when
+    # its log-probability is also below logprob_threshold)
+    no_speech_threshold: float | None = Field(default=None, ge=0.0, le=1.0)
+    # Re-decode at the next temperature below this average log-probability
+    logprob_threshold: float | None = Field(default=None, le=0.0)
+    # Re-decode at the next temperature above this gzip compression ratio
+    compression_ratio_threshold: float | None = Field(default=None, gt=0.0)
+    # Text that conditions the decoder (vocabulary, names, spelling)
+    initial_prompt: str | None = Field(default=None, max_length=2000)
+
+    def merged(self, overrides: "DecodeOptions | None") -> "DecodeOptions":
+        """These options with every field ``overrides`` sets replaced."""
+        if overrides is None:
+            return self
+        return self.model_copy(update=overrides.model_dump(exclude_none=True))
+
+    def transcribe_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for ``mlx_whisper.transcribe()`` (set fields only)."""
+        kwargs = self.model_dump(exclude_none=True, exclude={"initial_prompt"})
+        if "temperature" in kwargs:
+            kwargs["temperature"] = tuple(kwargs["temperature"])
+        return kwargs
+
+    def thresholds(self) -> dict[str, float]:
+        """The quality thresholds that are set, as ``window.to_result()`` arguments."""
+        return self.model_dump(
+            exclude_none=True,
+            include={"no_speech_threshold", "logprob_threshold", "compression_ratio_threshold"},
+        )
+
+
+# Thresholds shared by all presets (mlx-whisper's defaults)
+_THRESHOLDS = {
+    "no_speech_threshold": 0.6,
+    "logprob_threshold": -1.0,
+    "compression_ratio_threshold": 2.4,
+}
+
+PRESETS: dict[str, DecodeOptions] = {
+    "fast": DecodeOptions(temperature=(0.0,), condition_on_previous_text=False, **_THRESHOLDS),
+    "balanced": DecodeOptions(temperature=(0.0, 0.4, 0.8), condition_on_previous_text=True, **_THRESHOLDS),
+    "accurate": DecodeOptions(
+        temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0), condition_on_previous_text=True, **_THRESHOLDS
+    ),
+}
+
+
+def preset_options(name: str) -> DecodeOptions:
+    """The options of preset ``name``."""
+    try:
+        return PRESETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown decode preset {name!r}. Valid options: {', '.join(PRESETS)}")
+
+
+def resolve_options(
+    preset: str | None = None, overrides: DecodeOptions | None = None
+) -> DecodeOptions | None:
+    """Options a request asked for: ``preset`` (if any) with ``overrides`` on top.
+
+    Returns None when the request set neither, so the server default applies.
+    """
+    if preset is None and overrides is None:
+        return None
+    base = preset_options(preset) if preset else DecodeOptions()
+    return base.merged(overrides)
@@ -0,0 +1,13 @@
+"""Conversion of engine results to the segment records the API returns."""
+
+
+def segments_from_result(result: dict) -> list[dict]:
+    """Extract segments with ms timing from an mlx_whisper result."""
+    segments: list[dict] = []
+    for seg in result.get("segments", []):
+        segments.append({
+            "text": seg["text"].strip(),
+            "start_ms": round(seg["start"] * 1000),
+            "end_ms": round(seg["end"] * 1000),
+        })
+    return segments
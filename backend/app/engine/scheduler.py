@@ -0,0 +1,292 @@
+"""Priority/deadline scheduler for the engine's single MLX worker thread.
+
+Every engine job is tagged with a class. The worker always runs the
+queued job of the most urgent class next, earliest deadline first within
+a class, so a live partial waits for at most the job that is already
+running instead of every upload queued before it:
+
+    live_final > live_partial > upload > batch
+
+Live partials are disposable: a queued partial is dropped when a newer
+job with the same key (the session) replaces it, and when it is still
+queued after its deadline. Other classes always run.
+
+A job may come in two stages: ``prepare`` (e.g. mel + encoder) and ``fn``,
+which receives its result (the decoder). With ``prefetch`` > 0 a second
+thread runs the prepare stage of the most urgent queued jobs while the
+worker runs the current job, for at most ``prefetch`` jobs ahead, which
+bounds the prepared results held in memory. The worker runs a job's
+prepare stage itself when it was not started ahead.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+from app import tracing
+from app.metrics import JOBS_DROPPED, QUEUE_TIME
+
+LIVE_FINAL = "live_final"
+LIVE_PARTIAL = "live_partial"
+UPLOAD = "upload"
+BATCH = "batch"
+
+# Lower runs first
+PRIORITIES: dict[str, int] = {LIVE_FINAL: 0, LIVE_PARTIAL: 1, UPLOAD: 2, BATCH: 3}
+# Classes whose jobs may be dropped instead of run
+DROPPABLE = frozenset({LIVE_PARTIAL})
+
+SUPERSEDED = "superseded"
+EXPIRED = "expired"
+
+
+class JobDropped(Exception):
+    """The scheduler dropped a job without running it."""
+
+    def __init__(self, job_class: str, reason: str) -> None:
+        super().__init__(f"{job_class} job {reason}")
+        self.job_class = job_class
+        self.reason = reason
+
+
+class _Job:
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        job_class: str,
+        deadline: float,
+        key: Hashable | None,
+        enqueued_at: float,
+        seq: int,
+        prepare: Callable[[], Any] | None = None,
+    ) -> None:
+        self.fn = fn
+        self.prepare = prepare
+        # Result of prepare() once the prefetch thread has taken the job
+        self.prepared: Future | None = None
+        self.job_class = job_class
+        self.deadline = deadline
+        self.key = key
+        self.enqueued_at = enqueued_at
+        self.future: Future = Future()
+        self.sort_key = (PRIORITIES[job_class], deadline, seq)
+        self.removed = False
+        # Trace of the submitting request; the job runs under it
+        self.trace = tracing.current()
+        self.traced_at = tracing.now() if self.trace else 0.0
+
+    def __lt__(self, other: "_Job") -> bool:
+        return self.sort_key < other.sort_key
+
+
+class Scheduler:
+    """Runs submitted callables one at a time on a dedicated thread.
+
+    Args:
+        name: Name of the worker thread.
+        clock: Monotonic clock (injectable for tests).
+        prefetch: Queued jobs whose prepare stage may run ahead of the
+            worker; 0 runs both stages on the worker.
+    """
+
+    def __init__(
+        self,
+        name: str = "mlx",
+        clock: Callable[[], float] = time.monotonic,
+        prefetch: int = 0,
+    ) -> None:
+        self.name = name
+        self.prefetch = prefetch
+        self._clock = clock
+        self._heap: list[_Job] = []
+        self._keyed: dict[Hashable, _Job] = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._prefetcher: threading.Thread | None = None
+        # Jobs taken by the prefetch thread whose result the worker has not consumed
+        self._prepared = 0
+        self._running: str | None = None
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        prepare: Callable[[], Any] | None = None,
+    ) -> Future:
+        """Queue ``fn`` and return a future for its result.
+
+        Args:
+            fn: Callable run on the worker thread.
+            job_class: One of ``PRIORITIES``.
+            deadline_s: Seconds from now by which the job should start;
+                orders jobs within a class and expires droppable jobs.
+            key: Identity of the submitter (e.g. a session). A queued
+                droppable job with the same key is superseded.
+            prepare: First stage of the job, which may run ahead on the
+                prefetch thread; ``fn`` is then called with its result.
+        """
+        if job_class not in PRIORITIES:
+            raise ValueError(f"Unknown job class {job_class!r}")
+        now = self._clock()
+        deadline = now + deadline_s if deadline_s is not None else float("inf")
+        job = _Job(fn, job_class, deadline, key, now, next(self._seq), prepare)
+        with self._cond:
+            if key is not None:
+                previous = self._keyed.get(key)
+                if previous is not None and previous.job_class in DROPPABLE:
+                    self._remove(previous, SUPERSEDED)
+                self._keyed[key] = job
+            heapq.heappush(self._heap, job)
+            self._ensure_worker()
+            if prepare is not None and self.prefetch > 0:
+                self._ensure_prefetcher()
+            self._cond.notify_all()
+        return job.future
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        prepare: Callable[[], Any] | None = None,
+    ) -> Any:
+        """Submit ``fn`` and await its result (raises JobDropped if dropped)."""
+        return await asyncio.wrap_future(self.submit(fn, job_class, deadline_s, key, prepare))
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop the queued droppable job with ``key``; False if there is none."""
+        with self._cond:
+            job = self._keyed.get(key)
+            if job is None or job.job_class not in DROPPABLE:
+                return False
+            self._remove(job, SUPERSEDED)
+            return True
+
+    def depth(self) -> dict[str, int]:
+        """Queued (not yet started) jobs per class."""
+        with self._cond:
+            counts = {job_class: 0 for job_class in PRIORITIES}
+            for job in self._heap:
+                if not job.removed:
+                    counts[job.job_class] += 1
+            return counts
+
+    @property
+    def thread_id(self) -> int | None:
+        """Ident of the worker thread (None until the first job)."""
+        return self._thread.ident if self._thread is not None else None
+
+    @property
+    def running(self) -> str | None:
+        """Class of the job currently running, if any."""
+        return self._running
+
+    def _remove(self, job: _Job, reason: str) -> None:
+        """Drop a queued job (caller holds the lock). The heap entry is skipped lazily."""
+        job.removed = True
+        if self._keyed.get(job.key) is job:
+            del self._keyed[job.key]
+        self._unprepare(job)
+        JOBS_DROPPED.inc(job_class=job.job_class, reason=reason)
+        if not job.future.done():
+            job.future.set_exception(JobDropped(job.job_class, reason))
+
+    def _unprepare(self, job: _Job) -> None:
+        """Free the job's prefetch slot and drop its result (caller holds the lock)."""
+        if job.prepared is not None:
+            job.prepared = None
+            self._prepared -= 1
+            self._cond.notify_all()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _ensure_prefetcher(self) -> None:
+        if self._prefetcher is None:
+            self._prefetcher = threading.Thread(
+                target=self._prefetch, name=f"{self.name}-prefetch", daemon=True
+            )
+            self._prefetcher.start()
+
+    def _next_job(self) -> _Job:
+        """Block until a runnable job is queued and pop it."""
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                job = heapq.heappop(self._heap)
+                if job.removed:
+                    continue
+                if self._keyed.get(job.key) is job:
+                    del self._keyed[job.key]
+                if job.job_class in DROPPABLE and self._clock() > job.deadline:
+                    self._remove(job, EXPIRED)
+                    continue
+                if not job.future.set_running_or_notify_cancel():
+                    self._unprepare(job)
+                    continue
+                self._running = job.job_class
+                return job
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            QUEUE_TIME.observe(self._clock() - job.enqueued_at, job_class=job.job_class)
+            job.trace.add("queue", job.traced_at, tracing.now(), job_class=job.job_class)
+            try:
+                with tracing.activate(job.trace), job.trace.span("run", job_class=job.job_class):
+                    result = self._call(job)
+                job.future.set_result(result)
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                self._running = None
+
+    def _call(self, job: _Job) -> Any:
+        if job.prepare is None:
+            return job.fn()
+        prepared = job.prepared
+        if prepared is None:
+            return job.fn(job.prepare())
+        try:
+            # Waits if the prefetch thread is still preparing it
+            result = prepared.result()
+        finally:
+            with self._cond:
+                self._unprepare(job)
+        return job.fn(result)
+
+    def _next_to_prepare(self) -> tuple[_Job, Future]:
+        """Block until a queued job can be prepared ahead and claim it."""
+        with self._cond:
+            while True:
+                if self._prepared < self.prefetch:
+                    now = self._clock()
+                    for job in sorted(self._heap):
+                        if job.removed or job.prepare is None or job.prepared is not None:
+                            continue
+                        if job.job_class in DROPPABLE and now > job.deadline:
+                            continue
+                        job.prepared = Future()
+                        self._prepared += 1
+                        return job, job.prepared
+                self._cond.wait()
+
+    def _prefetch(self) -> None:
+        while True:
+            job, prepared = self._next_to_prepare()
+            try:
+                with tracing.activate(job.trace), job.trace.span("prepare", job_class=job.job_class):
+                    prepared.set_result(job.prepare())
+            except BaseException as e:
+                prepared.set_exception(e)
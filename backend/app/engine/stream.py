@@ -0,0 +1,122 @@
+"""Per-session decode state for incremental (streaming) transcription.
+
+Whisper's decoder cross-attends to the encoder output, so the decoder
+keys/values of already-committed tokens are only valid for the exact
+audio they were computed on. Instead of carrying a KV cache across
+growing windows, a stream keeps the prefix that consecutive partials
+agree on and forces it into the next decode: the decoder processes the
+whole prefix in one parallel forward pass and only steps through the new
+tokens. Windows whose audio has not changed since the last decode reuse
+the previous result outright, skipping both encoder and decoder.
+"""
+
+import hashlib
+
+import numpy as np
+
+
+def count_decoder_steps(result: dict) -> int:
+    """Autoregressive decoder steps spent on a result.
+
+    One step per generated token plus the final end-of-text step; forced
+    prefix tokens are processed in the first step and are not counted.
+    """
+    return sum(len(seg.get("tokens", [])) for seg in result.get("segments", [])) + 1
+
+
+def _audio_key(audio: np.ndarray) -> tuple[int, bytes]:
+    """Cheap identity for an audio window: length plus content digest."""
+    digest = hashlib.blake2b(np.ascontiguousarray(audio).data, digest_size=16).digest()
+    return len(audio), digest
+
+
+class StreamState:
+    """Decode state carried between the partials of one audio window.
+
+    Call ``reset()`` whenever the window is finalized and the session
+    starts buffering fresh audio.
+    """
+
+    def __init__(self) -> None:
+        self._stable_words: list[str] = []
+        self._previous_words: list[str] | None = None
+        self._last_key: tuple[int, bytes] | None = None
+        self._last_result: dict | None = None
+        self.decodes = 0
+        self.reused = 0
+        self.decoder_steps = 0
+
+    @property
+    def prefix(self) -> str:
+        """Text that consecutive partials agreed on; forced into the next decode."""
+        return " ".join(self._stable_words)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held for the cached result and prefix."""
+        cached = self._last_result.get("text", "") if self._last_result else ""
+        return len(cached.encode()) + len(self.prefix.encode())
+
+    def cached_result(self, audio: np.ndarray) -> dict | None:
+        """Return the previous result if ``audio`` is identical to its window."""
+        if self._last_key is not None and self._last_key == _audio_key(audio):
+            self.reused += 1
+            return self._last_result
+        return None
+
+    def merge(self, audio: np.ndarray, result: dict, prefix: str, duration_s: float) -> dict:
+        """Fold a decode result into the stream and return the full-window result.
+
+        When ``prefix`` was forced, mlx-whisper returns only the text after
+        it (without timestamps); the prefix is prepended so callers always
+        see the whole window as a single segment.
+        """
+        self.decodes += 1
+        self.decoder_steps += count_decoder_steps(result)
+
+        if prefix:
+            new_text = result.get("text", "").strip()
+            text = f"{prefix} {new_text}".strip()
+            result = {
+                **result,
+                "text": text,
+                "segments": [{"text": text, "start": 0.0, "end": duration_s}],
+            }
+
+        self._agree(result.get("text", "").split())
+        self._last_key = _audio_key(audio)
+        self._last_result = result
+        return result
+
+    def reset(self) -> None:
+        """Forget the window (after it has been finalized)."""
+        self._stable_words = []
+        self._previous_words = None
+        self._last_key = None
+        self._last_result = None
+
+    def stats(self) -> dict:
+        """Counters for the admin session report."""
+        return {
+            "decodes": self.decodes,
+            "reused": self.reused,
+            "decoder_steps": self.decoder_steps,
+            "prefix_words": len(self._stable_words),
+        }
+
+    def _agree(self, words: list[str]) -> None:
+        """Extend the stable prefix with the words two hypotheses agree on.
+
+        The last word of a hypothesis is never committed, since the window
+        may end mid-word.
+        """
+        if self._previous_words is not None:
+            common = 0
+            for previous, current in zip(self._previous_words, words):
+                if previous != current:
+                    break
+                common += 1
+            common = min(common, len(words) - 1)
+            if common > len(self._stable_words):
+                self._stable_words = words[:common]
+        self._previous_words = words
@@ -0,0 +1,259 @@
+"""Short-clip fast path: run the encoder on less than Whisper's 30 s window.
+
+Whisper pads every input to 30 s (1500 encoder positions), so a 2 s
+partial costs as much encoder compute as 30 s of audio. The encoder's
+positional embedding is a fixed sinusoid table, so it can be truncated
+to the clip's length: the encoder then runs on 50 positions per second
+of audio and the decoder cross-attends to those only.
+
+Clips are padded up to one of a few length buckets, which keeps the
+number of distinct shapes (and MLX kernel compilations) small and lets
+clips of the same bucket be encoded and decoded as one batch.
+
+Relies on mlx-whisper internals; ``is_supported()`` reports whether they
+are available.
+"""
+
+import dataclasses
+import functools
+
+import numpy as np
+
+from app import tracing
+from app.engine import guards
+from app.engine.guards import COMPRESSION_RATIO_THRESHOLD, GuardConfig
+
+SAMPLE_RATE = 16000
+HOP_LENGTH = 160
+# Whisper's full input window; buckets must be shorter to save anything
+MAX_WINDOW_S = 30.0
+
+# mlx-whisper's default quality thresholds. A windowed result that fails
+# them is re-run on the full window instead of retrying temperatures.
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def is_supported() -> bool:
+    """Whether the mlx-whisper internals the fast path needs are importable."""
+    try:
+        import mlx.core  # noqa: F401
+        from mlx_whisper.audio import log_mel_spectrogram  # noqa: F401
+        from mlx_whisper.decoding import DecodingTask  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def bucket_for(n_samples: int, buckets_s: list[float]) -> float | None:
+    """Smallest bucket (seconds) that holds ``n_samples``; None if none does."""
+    for bucket in sorted(buckets_s):
+        if n_samples <= bucket * SAMPLE_RATE:
+            return bucket
+    return None
+
+
+def group_by_bucket(audios: list[np.ndarray], buckets_s: list[float]) -> dict[float | None, list[int]]:
+    """Group clip indices by bucket; clips too long for any bucket go under None."""
+    groups: dict[float | None, list[int]] = {}
+    for index, audio in enumerate(audios):
+        groups.setdefault(bucket_for(len(audio), buckets_s), []).append(index)
+    return groups
+
+
+def encode(model, mel):
+    """Run the audio encoder on ``mel`` with a truncated positional embedding.
+
+    Mirrors ``AudioEncoder.__call__`` except for the shape assertion, which
+    only admits the full 3000-frame window.
+    """
+    import mlx.nn as nn
+
+    encoder = model.encoder
+    x = mel.astype(encoder._positional_embedding.dtype)
+    x = nn.gelu(encoder.conv1(x))
+    x = nn.gelu(encoder.conv2(x))
+    x = x + encoder._positional_embedding[: x.shape[1]]
+    for block in encoder.blocks:
+        x, _, _ = block(x)
+    return encoder.ln_post(x)
+
+
+def log_mels(model, audios: list[np.ndarray], bucket_s: float):
+    """Log-mel spectrograms of clips padded to ``bucket_s`` seconds, stacked."""
+    import mlx.core as mx
+    from mlx_whisper.audio import log_mel_spectrogram
+
+    n_samples = int(bucket_s * SAMPLE_RATE)
+    n_frames = n_samples // HOP_LENGTH
+    mels = []
+    for audio in audios:
+        padded = np.zeros(n_samples, dtype=np.float32)
+        padded[: len(audio)] = audio[:n_samples]
+        mel = log_mel_spectrogram(mx.array(padded), n_mels=model.dims.n_mels)
+        mels.append(mel[:n_frames])
+    return mx.stack(mels)
+
+
+@functools.cache
+def _task_class():
+    """DecodingTask fed audio features from ``encode()`` (built lazily: needs mlx)."""
+    from mlx_whisper.decoding import DecodingTask
+
+    from app.engine import langid
+
+    class WindowDecodingTask(DecodingTask):
+        def _get_audio_features(self, features):
+            return features
+
+        def _detect_language(self, audio_features, tokens):
+            # The stock version re-encodes features whose shape is not the
+            # full window's, which truncated features never have
+            if self.options.language is not None:
+                return [self.options.language] * audio_features.shape[0], None
+            lang_tokens, lang_probs = langid.language_probs(self.model, audio_features, self.tokenizer)
+            tokens[:, self.sot_index + 1] = np.array(lang_tokens)
+            return [max(probs, key=probs.get) for probs in lang_probs], lang_probs
+
+    return WindowDecodingTask
+
+
+def encode_windows(model, audios: list[np.ndarray], bucket_s: float):
+    """Mel spectrograms and encoder output of clips padded to ``bucket_s``.
+
+    The result is evaluated, so the work is done on the calling thread
+    (the engine's pipeline runs this ahead of the decoder).
+    """
+    import mlx.core as mx
+
+    trace = tracing.current()
+    with trace.span("mel", clips=len(audios), bucket_s=bucket_s):
+        mel = log_mels(model, audios, bucket_s)
+        if trace:
+            # MLX is lazy: evaluate here so each stage is timed on its own
+            mx.eval(mel)
+    with trace.span("encode"):
+        features = encode(model, mel)
+        mx.eval(features)
+    return features
+
+
+def decode_windows(
+    model,
+    audios: list[np.ndarray],
+    bucket_s: float,
+    guard_config: GuardConfig | None = None,
+    features=None,
+    **options,
+) -> list[tuple[object | None, str | None]]:
+    """Decode clips padded to ``bucket_s`` seconds as one batch.
+
+    Rows whose first decoder step is confidently no-speech are not decoded
+    at all; rows that start looping are stopped by the guard filter.
+
+    Args:
+        model: A loaded mlx-whisper model.
+        audios: Float32 clips, each no longer than the bucket.
+        bucket_s: Window length to pad every clip to.
+        guard_config: Token budget and no-speech settings.
+        features: ``encode_windows`` output for these clips, if already
+            computed; encoded here otherwise.
+        **options: ``DecodingOptions`` fields (language, prompt, prefix, ...).
+            A language of None is detected per clip from its features.
+
+    Returns:
+        One ``(DecodingResult or None, guard reason or None)`` per clip,
+        in order. The result is None for clips skipped as no-speech.
+    """
+    import mlx.core as mx
+    from mlx_whisper.decoding import DecodingOptions
+
+    trace = tracing.current()
+    if features is None:
+        features = encode_windows(model, audios, bucket_s)
+
+    guard_config = guard_config or GuardConfig()
+    sample_len = guard_config.token_budget(max(len(a) for a in audios) / SAMPLE_RATE)
+    task = _task_class()(
+        model, DecodingOptions(without_timestamps=True, sample_len=sample_len, **options)
+    )
+    outcomes: list[tuple[object | None, str | None]] = [(None, None)] * len(audios)
+
+    rows = list(range(len(audios)))
+    if guard_config.no_speech_prob < 1.0 and task.tokenizer.no_speech is not None:
+        with trace.span("no_speech"):
+            probs = guards.no_speech_probs(model, features, task.tokenizer)
+        for row in rows:
+            if probs[row] > guard_config.no_speech_prob:
+                outcomes[row] = (None, guards.NO_SPEECH)
+        rows = [row for row in rows if probs[row] <= guard_config.no_speech_prob]
+        if not rows:
+            return outcomes
+        features = features[mx.array(rows)]
+
+    guard = guards.guard_filter(task.tokenizer, task.sample_begin, len(rows))
+    task.logit_filters.append(guard)
+    with trace.span("decode", rows=len(rows)):
+        decoded = task.run(features)
+    for batch_row, (row, result) in enumerate(zip(rows, decoded)):
+        reason = guard.reasons[batch_row]
+        if reason == guards.REPETITION:
+            tokens = list(result.tokens)[: guard.kept[batch_row]]
+            result = dataclasses.replace(
+                result, tokens=tokens, text=task.tokenizer.decode(tokens).strip()
+            )
+        elif reason is None and sample_len and len(result.tokens) >= sample_len:
+            reason = guards.TOKEN_BUDGET
+        outcomes[row] = (result, reason)
+    return outcomes
+
+
+def to_result(
+    decoded,
+    duration_s: float,
+    language: str | None,
+    reason: str | None = None,
+    no_speech_threshold: float = NO_SPEECH_THRESHOLD,
+    logprob_threshold: float = LOGPROB_THRESHOLD,
+    compression_ratio_threshold: float = COMPRESSION_RATIO_THRESHOLD,
+) -> dict | None:
+    """Convert a ``DecodingResult`` to mlx_whisper's result dict.
+
+    The clip becomes a single segment. Returns None when the result fails
+    the quality thresholds and should be re-run on the full window. A
+    result cut short by a guard (``reason``) is never re-run, since that
+    would spend the time the guard saved; it is emptied instead if its
+    text is still repetitive. ``language`` None takes the detected one.
+    """
+    if language is None and decoded is not None:
+        language = decoded.language
+    empty = {"text": "", "segments": [], "language": language}
+    if decoded is None or reason in (guards.NO_SPEECH, guards.COMPRESSION):
+        return empty
+    if decoded.no_speech_prob > no_speech_threshold and decoded.avg_logprob < logprob_threshold:
+        return empty
+    if reason is not None:
+        if guards.compression_ratio(decoded.text) > compression_ratio_threshold:
+            return empty
+    elif (
+        decoded.compression_ratio > compression_ratio_threshold
+        or decoded.avg_logprob < logprob_threshold
+    ):
+        return None
+
+    text = decoded.text
+    segments = []
+    if text:
+        segments.append({
+            "id": 0,
+            "seek": 0,
+            "start": 0.0,
+            "end": round(duration_s, 3),
+            "text": text,
+            "tokens": list(decoded.tokens),
+            "temperature": decoded.temperature,
+            "avg_logprob": decoded.avg_logprob,
+            "compression_ratio": decoded.compression_ratio,
+            "no_speech_prob": decoded.no_speech_prob,
+        })
+    return {"text": text, "segments": segments, "language": language}
@@ -1,5 +1,6 @@
 """FastAPI application entry point for STT Local backend."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
@@ -7,9 +8,14 @@ from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import get_model_repo, settings
-from app.engine.factory import TranscriptionEngine
-from app.routes import health, upload, websocket
+from app import tracing
+from app.audio.arena import close_arena
+from app.audio.decode_pool import DecodePool
+from app.config import settings
+from app.engine.factory import TranscriptionEngine, load_kwargs_from_settings
+from app.profiler import LoopLagMonitor
+from app.routes import admin, health, language, metrics, upload, websocket
+from app.session.manager import SessionManager
 
 
 def _setup_logging() -> None:
@@ -22,21 +28,62 @@ def _setup_logging() -> None:
     )
 
 
+async def _load_engine(engine: TranscriptionEngine, **load_kwargs) -> None:
+    """Load the model in a worker thread; failures are logged, not raised."""
+    logger = logging.getLogger(__name__)
+    try:
+        await asyncio.to_thread(engine.load, **load_kwargs)
+    except Exception:
+        # Already logged by the engine; /readyz reports the failure
+        return
+    logger.info("STT Local backend is ready")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """Application lifespan: load the transcription model at startup."""
+    """Application lifespan: start loading the transcription model.
+
+    Loading runs in the background so ``/livez`` and ``/readyz`` answer
+    while the weights load; routes wait or reject until it finishes. In
+    gateway mode (``engine_workers`` set) the workers load the model and
+    the gateway polls their status instead.
+    """
     _setup_logging()
+    tracing.configure_from_settings()
     logger = logging.getLogger(__name__)
 
-    model_repo = get_model_repo(settings.model_size)
-    logger.info("Using model repo: %s", model_repo)
+    if settings.engine_workers:
+        # Gateway mode: engine workers load the model; track their status
+        from app.rpc.pool import RemoteEngine
 
-    engine = TranscriptionEngine.get_instance()
-    engine.load(model_repo=model_repo, language=settings.language)
-    logger.info("STT Local backend is ready")
+        remote = RemoteEngine.get_instance()
+        logger.info("Forwarding decoding to engine workers: %s", ", ".join(settings.engine_workers))
+        monitor = asyncio.create_task(remote.run_monitor())
+    else:
+        load_kwargs = load_kwargs_from_settings()
+        logger.info(
+            "Using model repo: %s (%s)", load_kwargs["model_repo"], load_kwargs["precision"]
+        )
+        engine = TranscriptionEngine.get_instance()
+        app.state.engine_load_task = asyncio.create_task(_load_engine(engine, **load_kwargs))
+        monitor = None
+    reaper = asyncio.create_task(SessionManager.get_instance().run_reaper())
+    lag_monitor = None
+    if settings.loop_lag_threshold_ms > 0:
+        lag_monitor = LoopLagMonitor(settings.loop_lag_threshold_ms / 1000)
+        lag_monitor.start()
 
     yield  # Application runs here
 
+    reaper.cancel()
+    if lag_monitor is not None:
+        await lag_monitor.stop()
+    if monitor is not None:
+        monitor.cancel()
+        await remote.close()
+    DecodePool.reset_instance()
+    close_arena()
+
     logger.info("STT Local backend shutting down")
 
 
@@ -59,4 +106,7 @@ app.add_middleware(
 # Routers
 app.include_router(health.router)
 app.include_router(upload.router)
+app.include_router(language.router)
 app.include_router(websocket.router)
+app.include_router(admin.router)
+app.include_router(metrics.router)
@@ -0,0 +1,158 @@
+"""In-process metrics with Prometheus text exposition (served at ``/metrics``)."""
+
+import threading
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(labels[label] for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(labels[label] for label in self.labels), 0.0)
+
+    def reset(self) -> None:
+        """Forget all values (for testing only)."""
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram of observed values, optionally split by label values."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._values: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels[label] for label in self.labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(tuple(labels[label] for label in self.labels))
+        return entry[2] if entry else 0
+
+    def reset(self) -> None:
+        """Forget all observations (for testing only)."""
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self._values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = _labels(self.labels + ("le",), key + (f"{bound:g}",))
+                lines.append(f"{self.name}_bucket{le} {bucket_count}")
+            le = _labels(self.labels + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total:g}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, help: str, labels: tuple[str, ...] = (), **kwargs
+    ) -> Histogram:
+        metric = Histogram(name, help, labels, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def reset(self) -> None:
+        """Reset every metric (for testing only)."""
+        for metric in self._metrics:
+            metric.reset()
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+REGISTRY = Registry()
+
+DECODE_ABORTS = REGISTRY.counter(
+    "stt_decode_aborts_total",
+    "Decodes cut short or discarded by a hallucination guard",
+    ("reason",),
+)
+
+QUEUE_TIME = REGISTRY.histogram(
+    "stt_engine_queue_seconds",
+    "Time engine jobs wait in the scheduler queue before they start",
+    ("job_class",),
+)
+
+JOBS_DROPPED = REGISTRY.counter(
+    "stt_engine_jobs_dropped_total",
+    "Engine jobs dropped before they ran (superseded or past their deadline)",
+    ("job_class", "reason"),
+)
+
+LANGUAGE_DETECTIONS = REGISTRY.counter(
+    "stt_language_detections_total",
+    "Language detections run for auto-language sessions",
+    ("reason",),
+)
+
+LOOP_LAG = REGISTRY.histogram(
+    "stt_event_loop_lag_seconds",
+    "How late the event loop's heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+LOOP_BLOCKED = REGISTRY.counter(
+    "stt_event_loop_blocked_total",
+    "Times the event loop was blocked for longer than STT_LOOP_LAG_THRESHOLD_MS",
+)
@@ -2,7 +2,9 @@
 
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.engine.options import DecodeOptions
 
 
 # --- Server -> Client messages ---
@@ -15,30 +17,78 @@ class ConnectedMessage(BaseModel):
     backend: str
     device: str
     model: str
+    precision: str = ""
+    session_token: str = ""
 
 
 class ReadyMessage(BaseModel):
-    """Sent after the server has processed a configure message."""
+    """Sent after the server has processed a configure message.
+
+    When the configure message resumed a dropped session, ``sample_offset``
+    is the number of samples the server already holds; the client continues
+    streaming from that offset. ``partial_cadence`` is the server's partial
+    schedule (``fixed`` or ``adaptive``).
+    """
 
     type: Literal["ready"] = "ready"
+    resumed: bool = False
+    sample_offset: int = 0
+    partial_cadence: str = ""
 
 
 class PartialResult(BaseModel):
-    """Intermediate transcription result (may change)."""
+    """Intermediate transcription result (may change).
+
+    ``channel`` is set only in multi-channel sessions.
+    """
 
     type: Literal["partial"] = "partial"
     text: str
     start_ms: float
     end_ms: float
+    channel: int | None = None
+
+
+class SegmentDelta(BaseModel):
+    """Upsert of one partial segment: keep the first ``keep`` characters
+    (Unicode code points) of segment ``id`` and append ``text``.
+
+    ``start_ms`` / ``end_ms`` are omitted when they did not change.
+    """
+
+    id: int
+    keep: int
+    text: str
+    start_ms: float | None = None
+    end_ms: float | None = None
+
+
+class PartialDelta(BaseModel):
+    """Changes since the previous partial (sessions configured with
+    ``partials: "delta"``).
+
+    ``segments`` holds only the segments that changed. The partial now has
+    ``count`` segments, so segments with ``id >= count`` are dropped. A
+    final replaces all partial segments of its window.
+    """
+
+    type: Literal["partial_delta"] = "partial_delta"
+    count: int
+    segments: list[SegmentDelta]
+    channel: int | None = None
 
 
 class FinalResult(BaseModel):
-    """Committed transcription result (will not change)."""
+    """Committed transcription result (will not change).
+
+    ``channel`` is set only in multi-channel sessions.
+    """
 
     type: Literal["final"] = "final"
     text: str
     start_ms: float
     end_ms: float
+    channel: int | None = None
 
 
 class DoneMessage(BaseModel):
@@ -55,6 +105,17 @@ class ConfigureMessage(BaseModel):
 
     type: Literal["configure"] = "configure"
     language: str
+    session_token: str | None = None
+    # Interleaved PCM channels per binary frame (e.g. 2 for agent + customer)
+    channels: int = Field(default=1, ge=1, le=8)
+    # Weight precision variant; must be enabled on the server
+    precision: str | None = None
+    # "full" re-sends every partial segment; "delta" sends only changes
+    partials: Literal["full", "delta"] = "full"
+    # Decode preset (fast, balanced, accurate) and per-field overrides;
+    # server default if neither is set
+    preset: str | None = None
+    options: DecodeOptions | None = None
 
 
 class StopMessage(BaseModel):
@@ -0,0 +1,194 @@
+"""In-process sampling profiler and event-loop lag monitor.
+
+External profilers cannot be attached in production, so the server
+profiles itself. ``Sampler`` is a time-bounded sampling profiler: a
+background thread reads the stacks of chosen threads (the event loop
+and the engine's MLX thread) through ``sys._current_frames()`` every few
+milliseconds and counts identical stacks. It costs one short GIL hold
+per sample while it runs and nothing otherwise; ``GET /admin/profile``
+runs one at a time and returns collapsed stacks (for flamegraph.pl and
+most flame graph viewers) or speedscope JSON.
+
+``LoopLagMonitor`` watches the event loop from a watchdog thread: a
+heartbeat task on the loop stamps the time every ``interval_s``, and
+when the stamp is older than the threshold the watchdog logs the loop
+thread's stack, i.e. the code blocking the loop at that moment.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+
+from app.metrics import LOOP_BLOCKED, LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+now = time.perf_counter
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running."""
+
+
+def _label(frame: FrameType) -> tuple[str, str, int]:
+    code = frame.f_code
+    path = code.co_filename
+    # Keep the package-relative tail of the path: app/engine/window.py
+    short = os.sep.join(path.split(os.sep)[-2:])
+    return getattr(code, "co_qualname", code.co_name), short, code.co_firstlineno
+
+
+def _stack(frame: FrameType | None) -> tuple[tuple[str, str, int], ...]:
+    """The frames of a stack, outermost first."""
+    frames = []
+    while frame is not None:
+        frames.append(_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+class Sampler:
+    """Samples the stacks of ``threads`` (name -> thread id) every ``interval_s``."""
+
+    _running = threading.Lock()
+
+    def __init__(self, threads: dict[str, int], interval_s: float = 0.01) -> None:
+        self.threads = threads
+        self.interval_s = interval_s
+        # (thread name, stack) -> samples
+        self.counts: Counter[tuple[str, tuple[tuple[str, str, int], ...]]] = Counter()
+        self.samples = 0
+        self.duration_s = 0.0
+
+    def run(self, seconds: float) -> None:
+        """Sample for ``seconds`` on the calling thread (never one being sampled).
+
+        Raises:
+            ProfilerBusy: Another sampler is running in this process.
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            start = now()
+            deadline = start + seconds
+            by_id = {ident: name for name, ident in self.threads.items()}
+            while (tick := now()) < deadline:
+                frames = sys._current_frames()
+                for ident, name in by_id.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        self.counts[(name, _stack(frame))] += 1
+                del frames
+                self.samples += 1
+                time.sleep(max(0.0, self.interval_s - (now() - tick)))
+            self.duration_s = now() - start
+        finally:
+            self._running.release()
+
+    def collapsed(self) -> str:
+        """One ``thread;outer;...;inner count`` line per distinct stack."""
+        lines = []
+        for (thread, stack), count in sorted(self.counts.items()):
+            names = [thread] + [f"{name} ({path}:{line})" for name, path, line in stack]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """The samples in speedscope's file format, one profile per thread."""
+        frames: list[dict] = []
+        index: dict[tuple[str, str, int], int] = {}
+        profiles = []
+        for thread in self.threads:
+            samples, weights = [], []
+            for (name, stack), count in self.counts.items():
+                if name != thread:
+                    continue
+                for label in stack:
+                    if label not in index:
+                        index[label] = len(frames)
+                        frames.append({"name": label[0], "file": label[1], "line": label[2]})
+                samples.append([index[label] for label in stack])
+                weights.append(round(count * self.interval_s, 6))
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": samples,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"stt-local profile ({self.duration_s:.1f} s)",
+            "exporter": "stt-local",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+class LoopLagMonitor:
+    """Logs the event loop's stack whenever it is blocked for over ``threshold_s``.
+
+    Args:
+        threshold_s: Lag that counts as blocked.
+        interval_s: Heartbeat period on the loop (also the lag resolution).
+    """
+
+    def __init__(self, threshold_s: float, interval_s: float = 0.05) -> None:
+        self.threshold_s = threshold_s
+        self.interval_s = interval_s
+        self._beat = now()
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the heartbeat (on the running loop) and the watchdog thread."""
+        self._loop_thread = threading.get_ident()
+        self._beat = now()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = now() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            self._beat = now()
+            LOOP_LAG.observe(max(0.0, self._beat - expected))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(self.threshold_s / 2):
+            beat = self._beat
+            lag = now() - beat - self.interval_s
+            if lag > self.threshold_s and beat != reported:
+                reported = beat
+                LOOP_BLOCKED.inc()
+                frame = sys._current_frames().get(self._loop_thread)
+                stack = "".join(traceback.format_stack(frame, limit=12)) if frame else ""
+                logger.warning(
+                    "Event loop blocked for %.0f ms (still blocked); loop thread is at:\n%s",
+                    lag * 1000, stack,
+                )
@@ -0,0 +1,285 @@
+"""Replay recorded WebSocket sessions against a server and measure latency.
+
+Recordings come from ``STT_RECORD_DIR`` (``app/session/recorder.py``).
+Each replayed session sends its recorded frames with the recorded gaps
+divided by ``speed`` (0: no gaps at all) while reading the server's
+messages, and times three things:
+
+* ``partial``  audio frame that triggered a partial -> its first message
+* ``final``    audio frame that forced a final -> its first message
+* ``done``     ``stop`` -> ``done``
+
+Which frames trigger partials and finals is worked out from the sample
+counts with the server's fixed rule: a partial every 2 s of new audio,
+and a final at 5 s. The adaptive cadence derives its triggers from the
+server's load, which the client cannot see, so the server must run with
+``STT_PARTIAL_CADENCE=fixed``. A session checks this in the server's
+``ready`` message and the run stops with ``ReplayError`` otherwise.
+Partials may be superseded and empty windows send nothing, so a result
+is attributed to the newest trigger sent before it arrived.
+
+::
+
+    stt-local replay recordings/ --url ws://127.0.0.1:8765/ws/transcribe \\
+        --speed 4 --concurrency 16 --json run.json --baseline base.json
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.config import settings
+from app.routes.websocket import MAX_BUFFER_SAMPLES, MIN_SAMPLES_FOR_TRANSCRIBE
+from app.session.recorder import BINARY, CLOSE, SUFFIX, TEXT, Frame, read_recording
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("partial", "final", "done")
+# Partial schedule whose triggers replay can work out (see the module docstring)
+REPLAYABLE_CADENCE = "fixed"
+PERCENTILES = (50, 90, 99)
+
+
+def default_url() -> str:
+    """WebSocket URL of the server configured by ``STT_HOST``/``STT_PORT``."""
+    host = settings.host
+    if host in ("", "0.0.0.0", "::"):  # Listening on every interface
+        host = "127.0.0.1"
+    elif ":" in host:
+        host = f"[{host}]"
+    return f"ws://{host}:{settings.port}/ws/transcribe"
+
+
+class ReplayError(Exception):
+    """The server cannot be replayed against (its partial triggers are unknowable)."""
+
+
+@dataclass
+class ReplayStats:
+    """Latencies (ms) and counts of one replay run."""
+
+    latencies_ms: dict[str, list[float]] = field(
+        default_factory=lambda: {metric: [] for metric in METRICS}
+    )
+    sessions: int = 0
+    failed: int = 0
+    messages: int = 0
+    elapsed_s: float = 0.0
+
+    def summary(self) -> dict:
+        """Percentiles per metric, in the form ``compare()`` reads back."""
+        return {
+            "sessions": self.sessions,
+            "failed": self.failed,
+            "messages": self.messages,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "latency_ms": {
+                metric: percentiles(values) for metric, values in self.latencies_ms.items()
+            },
+        }
+
+
+def percentiles(values: list[float]) -> dict:
+    """Count, p50/p90/p99 and max of ``values`` (nearest rank)."""
+    ordered = sorted(values)
+    stats: dict = {"count": len(ordered)}
+    for p in PERCENTILES:
+        stats[f"p{p}"] = round(ordered[int(p / 100 * (len(ordered) - 1))], 3) if ordered else None
+    stats["max"] = round(ordered[-1], 3) if ordered else None
+    return stats
+
+
+def find_recordings(inputs: list[str]) -> list[Path]:
+    """Recording files given directly or found in the given directories, sorted."""
+    paths: list[Path] = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            paths.extend(sorted(item.rglob(f"*{SUFFIX}")))
+        else:
+            paths.append(item)
+    return paths
+
+
+def _configure_payload(text: str) -> str:
+    """The recorded configure message without the (long dead) resume token."""
+    try:
+        config = json.loads(text)
+    except json.JSONDecodeError:
+        return text
+    if isinstance(config, dict):
+        config.pop("session_token", None)
+        return json.dumps(config)
+    return text
+
+
+def _is_stop(text: str) -> bool:
+    text = text.strip()
+    if text.lower() == "stop":
+        return True
+    try:
+        return json.loads(text).get("type") == "stop"
+    except (json.JSONDecodeError, AttributeError):
+        return False
+
+
+async def replay_session(ws, frames: list[Frame], speed: float, stats: ReplayStats,
+                         timeout_s: float = 60.0) -> None:
+    """Play one recording over the open connection ``ws`` and record latencies.
+
+    ``ws`` needs ``send()``, ``close()`` and async iteration over incoming
+    text messages (a ``websockets`` client connection).
+
+    Raises:
+        ReplayError: The server does not use the fixed partial cadence.
+    """
+    # Send times of triggers not yet answered, per metric
+    pending: dict[str, list[float]] = {metric: [] for metric in METRICS}
+    ready: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def answered(metric: str) -> None:
+        if pending[metric]:
+            stats.latencies_ms[metric].append((time.perf_counter() - pending[metric][-1]) * 1000)
+            pending[metric].clear()
+
+    async def send() -> None:
+        channels = 1
+        buffered = transcribed = 0
+        configured = False
+        start = time.perf_counter()
+        for frame in frames:
+            if speed > 0:
+                await asyncio.sleep(max(0.0, start + frame.t / speed - time.perf_counter()))
+            if frame.kind == CLOSE:
+                await ws.close()
+                return
+            if frame.kind == TEXT and not configured:
+                configured = True
+                payload = _configure_payload(frame.text)
+                try:
+                    channels = int(json.loads(payload).get("channels") or 1)
+                except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+                    pass
+                await ws.send(payload)
+                # No audio before the server's schedule is known to be replayable
+                cadence = (await asyncio.wait_for(asyncio.shield(ready), timeout_s)).get(
+                    "partial_cadence"
+                )
+                if cadence and cadence != REPLAYABLE_CADENCE:
+                    raise ReplayError(
+                        f"Server uses the {cadence} partial cadence; replay needs "
+                        f"STT_PARTIAL_CADENCE={REPLAYABLE_CADENCE} on the server"
+                    )
+            elif frame.kind == TEXT:
+                await ws.send(frame.text)
+                if _is_stop(frame.text):
+                    pending["done"].append(time.perf_counter())
+                    return
+            elif frame.kind == BINARY:
+                await ws.send(frame.payload)
+                # Mirror the server's trigger rule (app/routes/websocket.py)
+                buffered += len(frame.payload) // (2 * channels)
+                if buffered >= MAX_BUFFER_SAMPLES:
+                    pending["final"].append(time.perf_counter())
+                    buffered = transcribed = 0
+                elif buffered - transcribed >= MIN_SAMPLES_FOR_TRANSCRIBE:
+                    pending["partial"].append(time.perf_counter())
+                    transcribed = buffered
+        # The recording ends without stop or disconnect (e.g. a server crash)
+        await ws.close()
+
+    async def receive() -> None:
+        async for raw in ws:
+            stats.messages += 1
+            message = json.loads(raw)
+            kind = message.get("type")
+            if kind == "ready" and not ready.done():
+                ready.set_result(message)
+            elif kind in ("partial", "partial_delta"):
+                answered("partial")
+            elif kind == "final":
+                answered("final")
+            elif kind == "done":
+                answered("done")
+                await ws.close()
+                return
+
+    receiver = asyncio.create_task(receive())
+    try:
+        await send()
+        await asyncio.wait_for(receiver, timeout_s)
+    finally:
+        receiver.cancel()
+
+
+async def replay(
+    recordings: list[Path],
+    url: str,
+    speed: float = 1.0,
+    concurrency: int = 8,
+    repeat: int = 1,
+    timeout_s: float = 60.0,
+    connect=None,
+) -> ReplayStats:
+    """Replay every recording ``repeat`` times, ``concurrency`` sessions at once.
+
+    Raises ``ReplayError`` if the server's partial triggers cannot be
+    worked out (see the module docstring).
+
+    ``connect(url)`` opens a connection (an async context manager);
+    defaults to ``websockets.connect``.
+    """
+    if connect is None:
+        from websockets.asyncio.client import connect
+
+    recorded = {path: list(read_recording(path)) for path in recordings}
+    stats = ReplayStats()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(path: Path) -> None:
+        async with slots:
+            stats.sessions += 1
+            try:
+                async with connect(url) as ws:
+                    await replay_session(ws, recorded[path], speed, stats, timeout_s)
+            except ReplayError:
+                raise
+            except Exception as e:
+                stats.failed += 1
+                logger.warning("Replay of %s failed: %s", path, e)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(path) for _ in range(repeat) for path in recordings))
+    stats.elapsed_s = time.perf_counter() - start
+    return stats
+
+
+def compare(baseline: dict, current: dict, max_regression: float = 0.2) -> tuple[list[dict], bool]:
+    """Per-percentile change of ``current`` over ``baseline`` (both ``summary()`` dicts).
+
+    Returns the rows and whether any percentile got slower by more than
+    ``max_regression`` (a fraction of the baseline).
+    """
+    rows = []
+    regressed = False
+    for metric in METRICS:
+        before = baseline.get("latency_ms", {}).get(metric, {})
+        after = current.get("latency_ms", {}).get(metric, {})
+        for p in PERCENTILES:
+            key = f"p{p}"
+            if not before.get(key) or after.get(key) is None:
+                continue
+            change = after[key] / before[key] - 1
+            worse = change > max_regression
+            regressed |= worse
+            rows.append({
+                "metric": metric,
+                "percentile": key,
+                "baseline_ms": before[key],
+                "current_ms": after[key],
+                "change": round(change, 3),
+                "regressed": worse,
+            })
+    return rows, regressed
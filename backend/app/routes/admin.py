@@ -0,0 +1,79 @@
+"""Operator endpoints for inspecting server internals."""
+
+import asyncio
+import threading
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app import tracing
+from app.config import settings
+from app.engine.factory import get_engine
+from app.profiler import ProfilerBusy, Sampler
+from app.session.manager import SessionManager
+
+router = APIRouter(prefix="/admin")
+
+
+@router.get("/sessions")
+async def sessions() -> dict:
+    """Return the memory footprint of every live streaming session."""
+    return SessionManager.get_instance().report()
+
+
+@router.get("/traces")
+async def traces(
+    limit: int = Query(20, ge=1, le=1000),
+    name: str | None = Query(None),
+) -> dict:
+    """Return the slowest recorded request traces, slowest first.
+
+    ``name`` keeps one kind of request (``ws.partial``, ``ws.final``,
+    ``upload``). Empty unless tracing is enabled (``STT_TRACE_ENABLED``).
+    """
+    return {
+        "enabled": tracing.enabled(),
+        "traces": [trace.as_dict() for trace in tracing.RECORDER.slowest(limit, name)],
+    }
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(5.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    threads: str = Query("loop,mlx"),
+):
+    """Sample thread stacks for ``seconds`` and return the profile.
+
+    ``threads`` is a comma-separated list of ``loop`` (the event loop),
+    ``mlx`` (the engine's worker thread) or ``all``. Returns collapsed
+    stacks as text, or speedscope JSON. One profile runs at a time (409).
+    """
+    if seconds > settings.profile_max_s:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.profile_max_s:g} s per profile"
+        )
+    wanted = {name.strip() for name in threads.split(",") if name.strip()}
+    unknown = wanted - {"loop", "mlx", "all"}
+    if unknown or not wanted:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown threads: {', '.join(sorted(unknown)) or '(none)'}"
+        )
+    targets: dict[str, int] = {}
+    if "all" in wanted:
+        targets.update({t.name: t.ident for t in threading.enumerate() if t.ident is not None})
+    if "loop" in wanted or "all" in wanted:
+        targets["loop"] = threading.get_ident()
+    mlx_thread = getattr(get_engine().scheduler, "thread_id", None)
+    if ("mlx" in wanted or "all" in wanted) and mlx_thread is not None:
+        targets["mlx"] = mlx_thread
+
+    sampler = Sampler(targets, interval_s=interval_ms / 1000)
+    try:
+        await asyncio.to_thread(sampler.run, seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "speedscope":
+        return sampler.speedscope()
+    return PlainTextResponse(sampler.collapsed())
@@ -0,0 +1,24 @@
+"""Helpers shared by the REST routes."""
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.engine.factory import get_engine
+
+
+async def loaded_engine(precision: str | None):
+    """The engine, once loaded (503 if it does not load in time, 400 for a disabled precision)."""
+    engine = get_engine()
+    if not await engine.wait_until_loaded(settings.ready_wait_s):
+        raise HTTPException(
+            status_code=503,
+            detail="Transcription engine not loaded",
+            headers={"Retry-After": str(settings.retry_after_s)},
+        )
+    if precision and precision not in engine.precisions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Precision {precision!r} is not enabled. "
+            f"Available: {', '.join(engine.precisions)}",
+        )
+    return engine
@@ -1,8 +1,9 @@
-"""Health-check endpoint."""
+"""Health, liveness and readiness endpoints."""
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
-from app.engine.factory import TranscriptionEngine
+from app.engine.factory import get_engine
 
 router = APIRouter()
 
@@ -10,11 +11,34 @@ router = APIRouter()
 @router.get("/health")
 async def health() -> dict:
     """Return service health and configuration information."""
-    engine = TranscriptionEngine.get_instance()
+    engine = get_engine()
+    if engine.is_loaded:
+        status = "ok"
+    else:
+        status = "failed" if engine.status == "failed" else "loading"
     return {
-        "status": "ok" if engine.is_loaded else "loading",
+        "status": status,
         "backend": engine.backend,
         "device": engine.device,
         "model": engine.model_size,
+        "precision": engine.precision,
+        "precisions": engine.precisions,
         "version": "0.1.0",
+        "load": engine.load_progress,
     }
+
+
+@router.get("/livez")
+async def livez() -> dict:
+    """Liveness probe: the process is up and serving the event loop."""
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readyz() -> JSONResponse:
+    """Readiness probe: 200 once the model is loaded, 503 while loading or failed."""
+    engine = get_engine()
+    progress = engine.load_progress
+    if engine.is_loaded:
+        return JSONResponse({"status": "ready", "load": progress})
+    return JSONResponse({"status": engine.status, "load": progress}, status_code=503)
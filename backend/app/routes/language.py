@@ -0,0 +1,66 @@
+"""REST endpoint for spoken-language identification."""
+
+import contextlib
+import logging
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from app.audio.decode_pool import DecodeBusy, DecodePool
+from app.config import settings
+from app.routes.common import loaded_engine
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Files accepted by one request (one engine job)
+MAX_FILES = 32
+
+
+@router.post("/api/language")
+async def detect_language(
+    files: list[UploadFile] = File(...),
+    precision: str | None = Form(None),
+):
+    """Identify the spoken language of one or more uploaded audio files.
+
+    Only the first 30 s of each file are used. All files are identified
+    in one engine job; files of similar length share an encoder pass.
+    """
+    engine = await loaded_engine(precision)
+    if len(files) > MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FILES} files per request")
+
+    async with contextlib.AsyncExitStack() as stack:
+        # Decoded one at a time, so a request holds at most one decode slot
+        audios = []
+        for file in files:
+            raw_bytes = await file.read()
+            if not raw_bytes:
+                raise HTTPException(status_code=400, detail=f"Empty file: {file.filename}")
+            try:
+                audios.append(
+                    await stack.enter_async_context(DecodePool.get_instance().decode(raw_bytes))
+                )
+            except DecodeBusy:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many uploads being decoded, retry later",
+                    headers={"Retry-After": str(settings.retry_after_s)},
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=400, detail=f"Could not decode audio file {file.filename}: {e}"
+                )
+
+        try:
+            detected = await engine.detect_language_async(audios, precision)
+        except Exception:
+            logger.exception("Language detection failed")
+            raise HTTPException(status_code=500, detail="Language detection failed")
+
+    return {
+        "results": [
+            {"filename": file.filename, **result} for file, result in zip(files, detected)
+        ]
+    }
@@ -1,80 +1,339 @@
-"""REST endpoint for file upload transcription."""
+"""REST endpoints for file upload transcription."""
 
 import asyncio
+import collections
+import contextlib
 import io
+import json
 import logging
+import zipfile
+import zlib
+from pathlib import PurePosixPath
+from typing import AsyncIterator
 
-import librosa
 import numpy as np
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
-from app.engine.factory import TranscriptionEngine
+from app import tracing
+from app.audio.decode_pool import DecodeBusy, DecodePool
+from app.audio.decoder import AUDIO_EXTENSIONS, SAMPLE_RATE
+from app.config import settings
+from app.engine.options import DecodeOptions, resolve_options
+from app.engine.results import segments_from_result
+from app.engine.scheduler import UPLOAD
+from app.routes.common import loaded_engine
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-SAMPLE_RATE = 16000
+# Files (after unpacking zips) accepted by one batch request
+BATCH_MAX_FILES = 256
+# Audio bytes one batch request may unpack from zips
+BATCH_MAX_UNZIPPED_BYTES = 512 * 1024 * 1024
+# Short files transcribed together as one engine job
+BATCH_CLIPS = 16
 
 
-def _decode_audio(raw_bytes: bytes) -> np.ndarray:
-    """Decode and resample audio to 16kHz mono float32 (thread-safe)."""
-    audio, _ = librosa.load(
-        io.BytesIO(raw_bytes),
-        sr=SAMPLE_RATE,
-        mono=True,
-    )
-    return audio
-
-
-def _segments_from_result(result: dict) -> list[dict]:
-    """Extract segments with ms timing from an mlx_whisper result."""
-    segments: list[dict] = []
-    for seg in result.get("segments", []):
-        segments.append({
-            "text": seg["text"].strip(),
-            "start_ms": round(seg["start"] * 1000),
-            "end_ms": round(seg["end"] * 1000),
-        })
-    return segments
+def _decode_options(preset: str | None, options: str | None) -> DecodeOptions | None:
+    """Parse the ``preset`` and ``options`` (JSON) form fields; 400 if invalid."""
+    try:
+        overrides = DecodeOptions.model_validate_json(options) if options else None
+        return resolve_options(preset or None, overrides)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid decode options: {e.errors(include_url=False)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/api/transcribe")
 async def transcribe_file(
     file: UploadFile = File(...),
     language: str = Form("cs"),
+    precision: str | None = Form(None),
+    preset: str | None = Form(None),
+    options: str | None = Form(None),
 ):
     """Transcribe an uploaded audio file.
 
     Accepts WAV, MP3, FLAC, OGG, etc. via multipart upload.
-    Returns full transcription with segments and timing.
+    Returns full transcription with segments and timing. ``precision``
+    selects one of the engine's enabled weight precisions; ``preset``
+    (fast, balanced, accurate) and ``options`` (a JSON object of decode
+    options) replace the server's default decode settings.
     """
-    engine = TranscriptionEngine.get_instance()
-    if not engine.is_loaded:
-        raise HTTPException(status_code=503, detail="Transcription engine not loaded")
+    decode_options = _decode_options(preset, options)
+    engine = await loaded_engine(precision)
+
+    trace = tracing.start("upload", filename=file.filename)
+    async with contextlib.AsyncExitStack() as stack:
+        stack.enter_context(tracing.activate(trace, finish=True))
+        with trace.span("read"):
+            raw_bytes = await file.read()
+        if not raw_bytes:
+            raise HTTPException(status_code=400, detail="Empty file")
+
+        try:
+            with trace.span("decode_audio", bytes=len(raw_bytes)):
+                # The decoded samples stay valid until the stack unwinds
+                audio = await stack.enter_async_context(
+                    DecodePool.get_instance().decode(raw_bytes)
+                )
+        except DecodeBusy:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many uploads being decoded, retry later",
+                headers={"Retry-After": str(settings.retry_after_s)},
+            )
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not decode audio file: {e}")
+
+        duration_ms = len(audio) / SAMPLE_RATE * 1000
+        trace.set(audio_s=duration_ms / 1000)
+
+        try:
+            # One queue/run span per chunk job, plus the engine's own spans
+            result = await engine.transcribe_chunked_async(
+                audio,
+                language,
+                precision=precision,
+                chunk_s=settings.upload_chunk_s,
+                options=decode_options,
+            )
+            segments = segments_from_result(result)
+        except Exception:
+            logger.exception("Transcription failed")
+            raise HTTPException(status_code=500, detail="Transcription failed")
+
+        full_text = " ".join(seg["text"] for seg in segments).strip()
+
+        return {
+            "text": full_text,
+            "segments": segments,
+            "duration_ms": round(duration_ms, 1),
+            "precision": precision or engine.precision,
+        }
+
+
+def unpack_uploads(uploads: list[tuple[str, bytes]]) -> list[tuple[str, bytes]]:
+    """Replace each zip among ``(filename, contents)`` uploads by its audio members.
+
+    Members are named ``archive.zip/path/in/archive``; members that are
+    not audio files (by suffix) are skipped.
+
+    Raises:
+        ValueError: A zip is corrupt, encrypted or uses an unsupported
+            compression method, or the request holds more than
+            ``BATCH_MAX_FILES`` files or ``BATCH_MAX_UNZIPPED_BYTES``.
+    """
+    files: list[tuple[str, bytes]] = []
+    unzipped = 0
+    for name, raw in uploads:
+        if not (name.lower().endswith(".zip") or raw[:4] == b"PK\x03\x04"):
+            files.append((name, raw))
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(raw)) as archive:
+                for info in archive.infolist():
+                    suffix = PurePosixPath(info.filename).suffix.lower()
+                    if info.is_dir() or suffix not in AUDIO_EXTENSIONS:
+                        continue
+                    unzipped += info.file_size
+                    if unzipped > BATCH_MAX_UNZIPPED_BYTES or len(files) >= BATCH_MAX_FILES:
+                        raise ValueError(
+                            f"At most {BATCH_MAX_FILES} files and "
+                            f"{BATCH_MAX_UNZIPPED_BYTES // 2**20} MB unzipped per request"
+                        )
+                    files.append((f"{name}/{info.filename}", archive.read(info)))
+        # RuntimeError: encrypted member; NotImplementedError: unsupported
+        # compression; zlib.error and EOFError: corrupt member data
+        except (zipfile.BadZipFile, RuntimeError, NotImplementedError, zlib.error, EOFError) as e:
+            raise ValueError(f"Could not read zip {name}: {e}")
+    if len(files) > BATCH_MAX_FILES:
+        raise ValueError(f"At most {BATCH_MAX_FILES} files per request")
+    return files
+
+
+class _Decoded:
+    """One file of a batch request, decoded (``audio``) or failed (``error``)."""
+
+    def __init__(self, index: int, filename: str) -> None:
+        self.index = index
+        self.filename = filename
+        self.audio: np.ndarray | None = None
+        self.error: str | None = None
+        # Holds the decoded samples (e.g. an arena allocation) until closed
+        self.stack = contextlib.AsyncExitStack()
+
+    def record(self, result: dict | None = None, error: str | None = None) -> dict:
+        segments = segments_from_result(result) if result is not None else []
+        duration_ms = len(self.audio) / SAMPLE_RATE * 1000 if self.audio is not None else 0.0
+        return {
+            "index": self.index,
+            "filename": self.filename,
+            "text": " ".join(seg["text"] for seg in segments).strip(),
+            "segments": segments,
+            "duration_ms": round(duration_ms, 1),
+            "error": error or self.error,
+        }
 
-    raw_bytes = await file.read()
-    if not raw_bytes:
-        raise HTTPException(status_code=400, detail="Empty file")
 
+async def _decode(pool: DecodePool, item: _Decoded, raw: bytes) -> _Decoded:
+    if not raw:
+        item.error = "Empty file"
+        return item
     try:
-        audio = await asyncio.to_thread(_decode_audio, raw_bytes)
+        item.audio = await item.stack.enter_async_context(pool.decode(raw))
+    except DecodeBusy:
+        item.error = "Too many uploads being decoded, retry later"
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Could not decode audio file: {e}")
+        item.error = f"Could not decode audio file: {e}"
+    return item
 
-    duration_ms = len(audio) / SAMPLE_RATE * 1000
 
+async def _decode_ahead(
+    files: list[tuple[str, bytes]], pool: DecodePool, queue: asyncio.Queue, lookahead: int
+) -> None:
+    """Decode ``files`` (at most ``lookahead`` at once) and queue them in order, then None."""
+    pending: collections.deque[asyncio.Task] = collections.deque()
+
+    async def _put(task: asyncio.Task) -> None:
+        item = await task
+        try:
+            await queue.put(item)
+        except asyncio.CancelledError:
+            await item.stack.aclose()
+            raise
+
+    try:
+        for index, (filename, raw) in enumerate(files):
+            pending.append(asyncio.ensure_future(_decode(pool, _Decoded(index, filename), raw)))
+            if len(pending) >= lookahead:
+                await _put(pending.popleft())
+        while pending:
+            await _put(pending.popleft())
+        await queue.put(None)
+    finally:
+        for task in pending:
+            task.cancel()
+            if task.done() and not task.cancelled():
+                await task.result().stack.aclose()
+
+
+async def _transcribe(engine, items: list[_Decoded], language, precision, options) -> list[dict]:
+    """Records for ``items``: short files as one engine batch, long ones chunked."""
+    records: dict[int, dict] = {}
+    short = []
+    for item in items:
+        if item.audio is None:
+            records[item.index] = item.record()
+        elif len(item.audio) <= settings.upload_chunk_s * SAMPLE_RATE:
+            short.append(item)
+        else:
+            try:
+                result = await engine.transcribe_chunked_async(
+                    item.audio, language, precision=precision,
+                    chunk_s=settings.upload_chunk_s, options=options,
+                )
+                records[item.index] = item.record(result)
+            except Exception as e:
+                logger.exception("Transcription of %s failed", item.filename)
+                records[item.index] = item.record(error=f"Transcription failed: {e}")
+    if short:
+        try:
+            results = await engine.transcribe_batch_async(
+                [item.audio for item in short], language, precision=precision,
+                job_class=UPLOAD, options=options,
+            )
+            for item, result in zip(short, results):
+                records[item.index] = item.record(result)
+        except Exception as e:
+            logger.exception("Batch of %d files failed", len(short))
+            for item in short:
+                records[item.index] = item.record(error=f"Transcription failed: {e}")
+    return [records[item.index] for item in items]
+
+
+async def _stream_batch(
+    engine, files: list[tuple[str, bytes]], language, precision, options, lookahead: int
+) -> AsyncIterator[bytes]:
+    """Yield one NDJSON record per file, in order, then a summary line.
+
+    Files are decoded ahead while the engine transcribes earlier ones;
+    the short files decoded by the time the engine is free go to it as
+    one batch (up to ``BATCH_CLIPS``), which it decodes per length bucket.
+    """
+    pool = DecodePool.get_instance()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=BATCH_CLIPS)
+    producer = asyncio.create_task(_decode_ahead(files, pool, queue, lookahead))
+    failed = 0
     try:
-        result = await engine.transcribe_async(audio, language)
-        segments = _segments_from_result(result)
-    except Exception:
-        logger.exception("Transcription failed")
-        raise HTTPException(status_code=500, detail="Transcription failed")
-
-    full_text = " ".join(seg["text"] for seg in segments).strip()
-
-    return {
-        "text": full_text,
-        "segments": segments,
-        "duration_ms": round(duration_ms, 1),
-    }
+        finished = False
+        while not finished:
+            items = [await queue.get()]
+            while len(items) < BATCH_CLIPS and not queue.empty():
+                items.append(queue.get_nowait())
+            if items[-1] is None:
+                items.pop()
+                finished = True
+            try:
+                records = await _transcribe(engine, items, language, precision, options)
+            finally:
+                for item in items:
+                    await item.stack.aclose()
+            for record in records:
+                failed += record["error"] is not None
+                yield (json.dumps(record) + "\n").encode()
+        summary = {"done": True, "files": len(files), "failed": failed,
+                   "precision": precision or engine.precision}
+        yield (json.dumps(summary) + "\n").encode()
+    finally:
+        producer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producer
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                await item.stack.aclose()
+
+
+@router.post("/api/transcribe/batch")
+async def transcribe_batch(
+    files: list[UploadFile] = File(...),
+    language: str = Form("cs"),
+    precision: str | None = Form(None),
+    preset: str | None = Form(None),
+    options: str | None = Form(None),
+):
+    """Transcribe many short files (or zips of them) in engine batches.
+
+    Streams NDJSON: one record per file, in upload order (zip members in
+    archive order), as soon as it and every file before it are done,
+    then a ``{"done": true, ...}`` summary. A file that fails to decode or
+    transcribe gets a record with ``error`` set; the rest continue.
+    """
+    decode_options = _decode_options(preset, options)
+    engine = await loaded_engine(precision)
+
+    uploads = [(file.filename or f"file{i}", await file.read()) for i, file in enumerate(files)]
+    try:
+        unpacked = await asyncio.to_thread(unpack_uploads, uploads)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not unpacked:
+        raise HTTPException(status_code=400, detail="No audio files in the upload")
+
+    pool = DecodePool.get_instance()
+    lookahead = max(1, pool.workers)
+    if pool.pending + lookahead > pool.max_pending:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many uploads being decoded, retry later",
+            headers={"Retry-After": str(settings.retry_after_s)},
+        )
+    return StreamingResponse(
+        _stream_batch(engine, unpacked, language, precision, decode_options, lookahead),
+        media_type="application/x-ndjson",
+    )
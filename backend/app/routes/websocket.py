@@ -6,46 +6,283 @@ import logging
 
 import numpy as np
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 
-from app.audio.normalizer import pcm_to_float32
-from app.engine.factory import TranscriptionEngine
+from app import tracing
+from app.audio.buffer import AudioBuffer
+from app.audio.normalizer import pcm16_channels
+from app.audio.vad import has_speech
+from app.config import settings
+from app.engine.factory import TranscriptionEngine, get_engine
+from app.engine.langid import AUTO_LANGUAGE
+from app.engine.options import resolve_options
+from app.engine.scheduler import LIVE_FINAL, LIVE_PARTIAL, JobDropped
+from app.metrics import LANGUAGE_DETECTIONS
 from app.models import (
+    ConfigureMessage,
     ConnectedMessage,
     DoneMessage,
     FinalResult,
     PartialResult,
     ReadyMessage,
 )
+from app.session.delta import PartialDiffer
+from app.session.language import LanguageLock
+from app.session.manager import Session, SessionManager
+from app.session.recorder import start_recording
+from app.session.resume import ResumeState
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 SAMPLE_RATE = 16000
-# Transcribe every 2 seconds of new audio
+# Transcribe every 2 seconds of new audio (fixed partial cadence)
 MIN_SAMPLES_FOR_TRANSCRIBE = SAMPLE_RATE * 2
 # Finalize and reset buffer every 5 seconds to keep transcript flowing
 MAX_BUFFER_SAMPLES = SAMPLE_RATE * 5
+# Committed segments kept per session for resumption and the decoder prompt
+MAX_COMMITTED_SEGMENTS = 32
+
+
+async def _session_language(
+    engine: TranscriptionEngine,
+    session: Session,
+    buffers: list[AudioBuffer],
+    precision: str | None,
+    schedule: dict,
+) -> str:
+    """Language to decode an "auto" session's window with.
+
+    Runs detection (one batched job over the voiced channels) only when
+    the session's lock is unset, due for its periodic re-check, or was
+    flagged by a low-confidence segment; otherwise returns the locked
+    language. Until a detection is confident enough to lock, windows
+    are decoded with the best guess so far.
+    """
+    lock = session.language_lock
+    async with lock.mutex:
+        reason = lock.due()
+        if reason is None:
+            return lock.language
+        voiced = [
+            buf.snapshot() for buf in buffers if has_speech(buf.samples, settings.vad_rms_threshold)
+        ]
+        if not voiced:
+            return lock.language or AUTO_LANGUAGE
+        detections = await engine.detect_language_async(
+            voiced,
+            precision,
+            job_class=schedule["job_class"],
+            deadline_s=schedule.get("deadline_s"),
+            key=schedule.get("key"),
+        )
+        LANGUAGE_DETECTIONS.inc(reason=reason)
+        best = max(detections, key=lambda d: d["probability"] if d["probability"] is not None else 1.0)
+        previous = lock.language
+        if lock.update(best["language"], best["probability"]):
+            logger.info(
+                "Session %s language locked: %s (p=%s, was %s)",
+                session.id, lock.language, best["probability"], previous,
+            )
+            if previous is not None:
+                # The agreed prefix was decoded in the old language
+                session.stream.reset()
+        return lock.language or best["language"] or AUTO_LANGUAGE
 
 
 async def _transcribe_and_send(
     ws: WebSocket,
     engine: TranscriptionEngine,
-    audio: np.ndarray,
+    buffers: list[AudioBuffer],
     language: str,
     msg_type: type[PartialResult] | type[FinalResult],
-) -> None:
-    """Run transcription off the event loop and send results over WebSocket."""
-    result = await engine.transcribe_async(audio, language)
-    for seg in result.get("segments", []):
-        text = seg["text"].strip()
-        if text:
-            msg = msg_type(
-                text=text,
-                start_ms=round(seg["start"] * 1000),
-                end_ms=round(seg["end"] * 1000),
+    session: Session | None = None,
+    prompt: str | None = None,
+    since: int = 0,
+    precision: str | None = None,
+) -> list[str]:
+    """Run transcription off the event loop and send results over WebSocket.
+
+    Mono sessions always decode their buffer, incrementally through the
+    session's stream state when a session is given. Multi-channel sessions
+    decode only the channels with speech after sample ``since``, as one
+    batch, and tag each result with its channel.
+
+    Partials are scheduled as droppable live work keyed by the session,
+    finals as the most urgent class, both with the session's decode
+    options. Sessions with language ``auto`` decode with their locked
+    language (see ``_session_language``). Sessions configured for delta
+    partials get one ``partial_delta`` per channel holding only the
+    segments that changed, or nothing if none did.
+
+    Time spent is recorded on the current trace (see ``app.tracing``).
+
+    Returns:
+        The texts of the segments that were sent.
+    """
+    if msg_type is PartialResult:
+        schedule = {
+            "job_class": LIVE_PARTIAL,
+            "deadline_s": settings.partial_deadline_s,
+            "key": session.id if session is not None else None,
+        }
+    else:
+        schedule = {"job_class": LIVE_FINAL}
+    if session is not None and session.decode_options is not None:
+        schedule["options"] = session.decode_options
+    trace = tracing.current()
+    lock = session.language_lock if session is not None else None
+    if lock is not None:
+        with trace.span("language"):
+            language = await _session_language(engine, session, buffers, precision, schedule)
+
+    engine_started = tracing.now()
+    if len(buffers) == 1:
+        channels: list[int | None] = [None]
+        if session is not None:
+            result = await engine.transcribe_stream_async(
+                session.stream, buffers[0].snapshot(), language, prompt, precision, **schedule
             )
-            await ws.send_json(msg.model_dump())
+            session.features_bytes = session.stream.nbytes
+        else:
+            result = await engine.transcribe_async(
+                buffers[0].snapshot(), language, prompt, precision, **schedule
+            )
+        results = [result]
+    else:
+        channels = [
+            c
+            for c, buf in enumerate(buffers)
+            if has_speech(buf.samples[since:], settings.vad_rms_threshold)
+        ]
+        if not channels:
+            return []
+        results = await engine.transcribe_batch_async(
+            [buffers[c].snapshot() for c in channels], language, precision=precision, **schedule
+        )
+    engine_ended = tracing.now()
+    # Queue, mel, encoder and decoder spans come from the engine
+    trace.add("engine", engine_started, engine_ended, channels=len(channels))
+    if session is not None:
+        audio_s = sum(len(buffers[c or 0]) for c in channels) / SAMPLE_RATE
+        SessionManager.get_instance().cadence.observe(engine_ended - engine_started, audio_s)
+
+    if lock is not None:
+        lock.observe(results)
+    if session is not None:
+        session.pending_bytes = sum(
+            len(seg["text"].encode()) for result in results for seg in result.get("segments", [])
+        )
+    delta = session.delta if session is not None and msg_type is PartialResult else None
+    sent: list[str] = []
+    send_started = tracing.now()
+    try:
+        for channel, result in zip(channels, results):
+            segments = [
+                (seg["text"].strip(), round(seg["start"] * 1000), round(seg["end"] * 1000))
+                for seg in result.get("segments", [])
+                if seg["text"].strip()
+            ]
+            if delta is not None:
+                update = delta.diff(segments, channel)
+                if update is not None:
+                    await ws.send_json(update.model_dump(exclude_none=True))
+                sent.extend(text for text, _, _ in segments)
+                continue
+            for text, start_ms, end_ms in segments:
+                msg = msg_type(text=text, start_ms=start_ms, end_ms=end_ms, channel=channel)
+                await ws.send_json(msg.model_dump(exclude_none=True))
+                sent.append(text)
+    finally:
+        trace.add("send", send_started, tracing.now(), messages=len(sent))
+        if session is not None:
+            session.pending_bytes = 0
+            if msg_type is FinalResult:
+                session.stream.reset()
+                session.features_bytes = 0
+                if session.delta is not None:
+                    session.delta.reset()
+    return sent
+
+
+async def _send_partial(*args, trace: tracing.Trace | None = None, **kwargs) -> None:
+    """Background partial: ``_transcribe_and_send`` that ends quietly if dropped.
+
+    Runs under ``trace`` and finishes it. Counted as in flight for the
+    partial cadence while it runs.
+    """
+    cadence = SessionManager.get_instance().cadence
+    cadence.started()
+    try:
+        with tracing.activate(trace or tracing.NULL_TRACE, finish=True):
+            await _transcribe_and_send(*args, **kwargs)
+    except JobDropped:
+        pass
+    finally:
+        cadence.finished()
+
+
+def _reap_partials(partials: set[asyncio.Task]) -> None:
+    """Forget finished partial tasks, re-raising the error of a failed one."""
+    for task in [t for t in partials if t.done()]:
+        partials.discard(task)
+        task.result()
+
+
+async def _settle_partials(
+    engine: TranscriptionEngine, session: Session, partials: set[asyncio.Task]
+) -> None:
+    """Drop the session's queued partial and wait for any partial already running.
+
+    Called before a final so that partials never arrive after it and never
+    read a buffer the final is about to clear.
+    """
+    engine.scheduler.cancel(session.id)
+    while partials:
+        await asyncio.gather(*partials)
+        _reap_partials(partials)
+
+
+def _drop_partials(
+    engine: TranscriptionEngine, session: Session, partials: set[asyncio.Task]
+) -> None:
+    """Abandon the session's partials when the session ends."""
+    engine.scheduler.cancel(session.id)
+    for task in partials:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled() and task.exception() is not None:
+            logger.debug("Partial failed after session end", exc_info=task.exception())
+    partials.clear()
+
+
+def _partial_due(
+    session: Session, buffers: list[AudioBuffer], new_samples: int, since: int
+) -> bool:
+    """Whether the session has received enough new audio for its next partial.
+
+    With the adaptive cadence the interval comes from the server-wide
+    ``PartialCadence`` (``app/session/cadence.py``) and is kept on the
+    session; the fixed cadence waits for ``MIN_SAMPLES_FOR_TRANSCRIBE``.
+    """
+    if settings.partial_cadence == "fixed":
+        return new_samples >= MIN_SAMPLES_FOR_TRANSCRIBE
+    cadence = SessionManager.get_instance().cadence
+    if new_samples < cadence.floor_s * SAMPLE_RATE:
+        return False
+    speaking = any(has_speech(buf.samples[since:], settings.vad_rms_threshold) for buf in buffers)
+    session.partial_interval_s = cadence.interval_s(
+        session.id, len(buffers[0]) / SAMPLE_RATE, speaking
+    )
+    return new_samples >= session.partial_interval_s * SAMPLE_RATE
+
+
+def _start_trace(
+    name: str, session: Session, samples: int, start: float
+) -> tracing.Trace | tracing.NullTrace:
+    """Trace of one partial or final, from the arrival of the audio that triggered it."""
+    return tracing.start(name, start, session=session.id, audio_s=samples / SAMPLE_RATE)
 
 
 @router.websocket("/ws/transcribe")
@@ -53,60 +290,185 @@ async def transcribe(ws: WebSocket) -> None:
     """Handle a single transcription session over WebSocket.
 
     Protocol:
-        1. Server accepts connection.
-        2. Server sends ``connected`` message with backend info.
-        3. Client sends ``configure`` message with desired language.
-        4. Server sends ``ready`` message.
-        5. Client streams binary PCM int16 audio frames.
-           - Server buffers audio and transcribes every 2s, sending ``partial``.
+        1. Server accepts connection. If the model is still loading it
+           waits up to ``ready_wait_s`` and otherwise closes with 1013.
+        2. Server sends ``connected`` message with backend info and a
+           ``session_token``.
+        3. Client sends ``configure`` message with desired language, the
+           number of interleaved ``channels``, and the token of a dropped
+           session to resume it.
+        4. Server sends ``ready`` message (with ``resumed`` and the
+           ``sample_offset`` to continue streaming from).
+        5. Client streams binary PCM int16 audio frames (interleaved when
+           ``channels`` > 1; each channel gets its own buffer and VAD).
+           - Server buffers audio and sends a ``partial`` every 0.5-4 s of
+             new audio, as often as the engine's load allows (every 2 s
+             with ``partial_cadence`` "fixed").
+             Partials run in the background while audio keeps arriving; a
+             queued partial is superseded by the next one. With
+             ``partials: "delta"`` in ``configure`` the server sends
+             ``partial_delta`` messages with only the changes instead.
         6. Client sends text ``"stop"`` (or JSON ``{"type":"stop"}``).
            - Server transcribes remainder, sends ``final`` + ``done``.
         7. Connection may close at any time; server handles gracefully.
+
+    The session is registered with the ``SessionManager``, which may close
+    it (code 1008) when it idles past the timeout or when the global
+    session memory budget cannot otherwise be met. If the connection drops
+    before ``stop``, the committed transcript, decoder prompt and
+    un-finalized audio are parked for ``session_resume_ttl_s``. With
+    ``record_dir`` set, the inbound messages are recorded for replay
+    (``app/session/recorder.py``).
     """
     await ws.accept()
-    engine = TranscriptionEngine.get_instance()
+    engine = get_engine()
+
+    if not await engine.wait_until_loaded(settings.ready_wait_s):
+        await ws.close(code=1013, reason="Model loading, retry later")
+        return
+
+    manager = SessionManager.get_instance()
+    session = manager.open(close=lambda reason: ws.close(code=1008, reason=reason))
+    recorder = start_recording(session.id)
 
     connected = ConnectedMessage(
         backend=engine.backend,
         device=engine.device,
         model=engine.model_size,
+        precision=engine.precision,
+        session_token=session.token,
     )
-    await ws.send_json(connected.model_dump())
+
+    # Session state, kept outside the try so a dropped session can be parked
+    configured = False
+    language = "cs"
+    buffers = session.buffers
+    buffer = session.audio
+    committed: list[str] = []
+    received_samples = 0
+    last_transcribed_samples = 0
+    # Decoder prompt restored on resume; conditions decodes until the next final
+    prompt: str | None = None
+    precision: str | None = None
+    # Background partial transcriptions in flight
+    partials: set[asyncio.Task] = set()
 
     try:
+        await ws.send_json(connected.model_dump())
+
         # Wait for configure message
         raw = await ws.receive_text()
-        config_data = json.loads(raw)
-        language = config_data.get("language", "cs")
-        logger.info("Session configured: language=%s", language)
+        recorder.text(raw)
+        try:
+            config = ConfigureMessage.model_validate(
+                {"language": "cs", **json.loads(raw), "type": "configure"}
+            )
+        except ValidationError:
+            await ws.close(code=1003, reason="Invalid configure message")
+            return
+        if config.precision and config.precision not in engine.precisions:
+            await ws.close(code=1003, reason=f"Precision {config.precision!r} is not enabled")
+            return
+        try:
+            session.decode_options = resolve_options(config.preset, config.options)
+        except ValueError as e:
+            await ws.close(code=1003, reason=str(e))
+            return
+        resume_token = config.session_token
+        resumed = manager.resumable.claim(resume_token) if resume_token else None
+        if resumed is not None and resumed.channels != config.channels:
+            # Keep it parked so a retry with the original layout can resume
+            manager.park(resume_token, resumed)
+            await ws.close(
+                code=1003,
+                reason=f"Session was parked with {resumed.channels} channel(s), "
+                f"not {config.channels}",
+            )
+            return
+        # A resumed session keeps the language it was started with
+        language = resumed.language if resumed is not None else config.language
+        precision = config.precision
+        session.delta = PartialDiffer() if config.partials == "delta" else None
+        if language == AUTO_LANGUAGE:
+            session.language_lock = LanguageLock(
+                recheck_s=settings.language_recheck_s,
+                min_probability=settings.language_min_probability,
+                recheck_logprob=settings.language_recheck_logprob,
+            )
+        buffers = session.set_channels(config.channels)
+        buffer = buffers[0]
 
-        await ws.send_json(ReadyMessage().model_dump())
+        if resumed is not None:
+            # The claimed token is spent: a later drop parks under the token
+            # this connection's ``connected`` message gave the client
+            committed = resumed.committed
+            for buf, tail in zip(buffers, np.atleast_2d(resumed.audio_tail), strict=True):
+                buf.append(tail)
+            received_samples = resumed.sample_offset
+            last_transcribed_samples = resumed.transcribed_samples
+            prompt = resumed.prompt or None
+            logger.info(
+                "Session %s resumed at sample %d", session.id, received_samples
+            )
+        configured = True
+        logger.info("Session %s configured: language=%s", session.id, language)
 
-        # Audio buffer
-        chunks: list[np.ndarray] = []
-        buffered_samples = 0
-        last_transcribed_samples = 0
+        await ws.send_json(
+            ReadyMessage(
+                resumed=resumed is not None,
+                sample_offset=received_samples,
+                partial_cadence=settings.partial_cadence,
+            ).model_dump()
+        )
 
         while True:
             message = await ws.receive()
+            recorder.message(message)
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if session.closed:
+                break
+            session.touch()
+            _reap_partials(partials)
 
             if "bytes" in message and message["bytes"]:
-                audio = pcm_to_float32(message["bytes"])
-                chunks.append(audio)
-                buffered_samples += len(audio)
+                received_at = tracing.now()
+                frames = pcm16_channels(message["bytes"], len(buffers))
+                for buf, channel_samples in zip(buffers, frames):
+                    buf.append_pcm16(channel_samples)
+                received_samples += frames.shape[1]
+                converted_at = tracing.now()
+                if not await manager.enforce_budget(session):
+                    logger.warning("Rejecting session %s: memory budget exceeded", session.id)
+                    await session.close("Memory budget exceeded")
+                    break
 
+                buffered_samples = len(buffer)
                 new_samples = buffered_samples - last_transcribed_samples
 
                 # Force-finalize at MAX_BUFFER_SAMPLES
                 if buffered_samples >= MAX_BUFFER_SAMPLES:
-                    all_audio = np.concatenate(chunks)
-                    await _transcribe_and_send(ws, engine, all_audio, language, FinalResult)
-                    chunks.clear()
-                    buffered_samples = 0
+                    trace = _start_trace("ws.final", session, buffered_samples, received_at)
+                    trace.add("convert", received_at, converted_at)
+                    with tracing.activate(trace, finish=True):
+                        with trace.span("settle"):
+                            await _settle_partials(engine, session, partials)
+                        committed += await _transcribe_and_send(
+                            ws, engine, buffers, language, FinalResult, session, prompt,
+                            precision=precision,
+                        )
+                    del committed[:-MAX_COMMITTED_SEGMENTS]
+                    for buf in buffers:
+                        buf.clear()
                     last_transcribed_samples = 0
-                elif new_samples >= MIN_SAMPLES_FOR_TRANSCRIBE:
-                    all_audio = np.concatenate(chunks)
-                    await _transcribe_and_send(ws, engine, all_audio, language, PartialResult)
+                    prompt = None
+                elif _partial_due(session, buffers, new_samples, last_transcribed_samples):
+                    trace = _start_trace("ws.partial", session, buffered_samples, received_at)
+                    trace.add("convert", received_at, converted_at)
+                    partials.add(asyncio.create_task(_send_partial(
+                        ws, engine, buffers, language, PartialResult, session, prompt,
+                        since=last_transcribed_samples, precision=precision, trace=trace,
+                    )))
                     last_transcribed_samples = buffered_samples
 
             elif "text" in message and message["text"]:
@@ -124,17 +486,40 @@ async def transcribe(ws: WebSocket) -> None:
                         pass
 
                 if is_stop:
-                    if chunks:
-                        all_audio = np.concatenate(chunks)
-                        await _transcribe_and_send(ws, engine, all_audio, language, FinalResult)
+                    trace = _start_trace("ws.final", session, len(buffer), tracing.now())
+                    with tracing.activate(trace, finish=True):
+                        with trace.span("settle"):
+                            await _settle_partials(engine, session, partials)
+                        if len(buffer):
+                            await _transcribe_and_send(
+                                ws, engine, buffers, language, FinalResult, session, prompt,
+                                precision=precision,
+                            )
                     await ws.send_json(DoneMessage().model_dump())
                     break
 
     except WebSocketDisconnect:
         logger.info("Client disconnected")
+        if configured and not session.closed:
+            state = ResumeState(
+                language=language,
+                committed=committed,
+                audio_tail=np.stack([buf.samples for buf in buffers])
+                if len(buffers) > 1
+                else buffer.samples.copy(),
+                sample_offset=received_samples,
+                transcribed_samples=last_transcribed_samples,
+            )
+            # The live buffers go before the copy is counted against the budget
+            manager.release(session)
+            manager.park(session.token, state)
     except Exception:
         logger.exception("Error in transcription WebSocket")
         try:
             await ws.close(code=1011, reason="Internal server error")
         except Exception:
             pass
+    finally:
+        recorder.close()
+        _drop_partials(engine, session, partials)
+        manager.release(session)
@@ -0,0 +1,169 @@
+"""Gateway-side connection to one engine worker."""
+
+import asyncio
+import itertools
+import logging
+
+import numpy as np
+
+from app.audio.arena import AudioArena, AudioHandle
+from app.engine.scheduler import JobDropped
+from app.rpc.protocol import (
+    ProtocolError,
+    open_connection,
+    pack_arrays,
+    read_frame,
+    write_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerError(RuntimeError):
+    """The worker failed to run a request."""
+
+
+class WorkerClient:
+    """Multiplexes concurrent requests over one connection to a worker.
+
+    Args:
+        address: ``tcp://host:port`` or ``unix:///path`` of the worker.
+        arena: Shared audio arena the worker can attach to (same host). Audio
+            is then sent as arena handles instead of frame bytes.
+    """
+
+    def __init__(self, address: str, arena: AudioArena | None = None) -> None:
+        self.address = address
+        self.arena = arena
+        # Last queue length (queued + running jobs) the worker reported
+        self.load = 0
+        # Requests sent and not yet answered
+        self.in_flight = 0
+        self._ids = itertools.count()
+        self._pending: dict[int, asyncio.Future] = {}
+        # Arena handles of requests the worker may still be reading, by request id
+        self._shared: dict[int, list[AudioHandle]] = {}
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    async def connect(self) -> None:
+        """Open the connection if it is not open (raises OSError if the worker is down)."""
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            reader, self._writer = await open_connection(self.address)
+            self._reader_task = asyncio.create_task(self._read_responses(reader))
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._disconnect(ConnectionError(f"Worker {self.address} connection closed"))
+
+    async def call(
+        self, method: str, params: dict | None = None, arrays: list[np.ndarray] = ()
+    ) -> object:
+        """Send one request and await its result.
+
+        Raises:
+            ConnectionError: The worker is unreachable or the connection
+                dropped before it answered.
+            JobDropped: The worker's scheduler dropped the job.
+            ValueError: The worker rejected the request.
+            WorkerError: The worker failed while running it.
+        """
+        try:
+            await self.connect()
+        except OSError as e:
+            raise ConnectionError(f"Worker {self.address} unreachable: {e}") from e
+        params = dict(params or {})
+        body = b""
+        handles = self._share(arrays)
+        if handles:
+            params["handles"] = [h.as_dict() for h in handles]
+        elif arrays:
+            params["lengths"], body = pack_arrays(list(arrays))
+        request_id = next(self._ids)
+        if handles:
+            # Held until the worker answers or the connection is gone, even
+            # if this call is cancelled first (e.g. a superseded partial)
+            self._shared[request_id] = handles
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.in_flight += 1
+        try:
+            write_frame(self._writer, {"id": request_id, "method": method, "params": params}, body)
+            await self._writer.drain()
+            response = await future
+        except (OSError, AttributeError) as e:
+            # Not waiting on this request any more; keep _disconnect() off it
+            self._pending.pop(request_id, None)
+            if not future.done():
+                future.cancel()
+            self._disconnect(e)
+            raise ConnectionError(f"Worker {self.address} connection lost: {e}") from e
+        finally:
+            self._pending.pop(request_id, None)
+            self.in_flight -= 1
+
+        if response["ok"]:
+            return response["result"]
+        error, message = response.get("error"), response.get("message", "")
+        if error == "dropped":
+            raise JobDropped(response.get("job_class", ""), message)
+        if error == "invalid":
+            raise ValueError(message)
+        raise WorkerError(f"Worker {self.address}: {message}")
+
+    def _share(self, arrays) -> list:
+        """Arena handles for ``arrays``, or [] to send them as frame bytes.
+
+        Falls back to bytes for all arrays when the arena cannot hold one.
+        """
+        if self.arena is None or not arrays:
+            return []
+        handles = []
+        for array in arrays:
+            handle = self.arena.share(np.asarray(array, dtype=np.float32))
+            if handle is None:
+                for shared in handles:
+                    self.arena.release(shared)
+                return []
+            handles.append(handle)
+        return handles
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                header, _ = await read_frame(reader)
+                self.load = header.get("load", self.load)
+                # The worker has answered: its views of the request's audio are done
+                self._release_shared(header.get("id"))
+                future = self._pending.get(header.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(header)
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError) as e:
+            logger.warning("Lost connection to engine worker %s", self.address)
+            self._disconnect(e)
+
+    def _release_shared(self, request_id: int | None) -> None:
+        for handle in self._shared.pop(request_id, ()):
+            if not self.arena.closed:
+                self.arena.release(handle)
+
+    def _disconnect(self, error: Exception) -> None:
+        """Drop the connection and fail every request waiting on it."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        # The worker cannot read the arena for requests it will never answer
+        for request_id in list(self._shared):
+            self._release_shared(request_id)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"Worker {self.address}: {error}"))
+        self._pending.clear()
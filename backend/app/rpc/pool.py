@@ -0,0 +1,332 @@
+"""Gateway-side engine that forwards decoding to a pool of engine workers.
+
+``RemoteEngine`` exposes the parts of ``TranscriptionEngine`` the routes
+use, so the same routes serve a single process or a gateway in front of
+several workers. Each call goes to the least-loaded reachable worker;
+stream state (agreed prefix, cached window) stays in the gateway, so a
+session's partials may be decoded by any worker.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Hashable
+
+import numpy as np
+
+from app.audio.arena import AudioArena, get_arena
+from app.engine.options import DecodeOptions
+from app.engine.scheduler import BATCH, UPLOAD
+from app.engine.stream import StreamState
+from app.rpc.client import WorkerClient
+from app.rpc.protocol import is_local
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def _wire_options(options: DecodeOptions | None) -> dict | None:
+    """Decode options as sent to workers (set fields only)."""
+    return options.model_dump(exclude_none=True) if options is not None else None
+
+
+class RemoteEngine:
+    """Least-loaded dispatch over ``WorkerClient`` connections.
+
+    Args:
+        addresses: Worker addresses (static discovery).
+        arena: Shared audio arena; workers on this host read audio from it
+            instead of receiving it in frames.
+    """
+
+    _instance: "RemoteEngine | None" = None
+    _lock = threading.Lock()
+
+    def __init__(self, addresses: list[str], arena: AudioArena | None = None) -> None:
+        if not addresses:
+            raise ValueError("RemoteEngine needs at least one worker address")
+        self.workers = [
+            WorkerClient(address, arena if is_local(address) else None) for address in addresses
+        ]
+        # Last status each worker reported (empty until it answered)
+        self._status: dict[str, dict] = {w.address: {} for w in self.workers}
+        # Worker running the latest keyed job, for cancel()
+        self._keyed: dict[Hashable, WorkerClient] = {}
+        self._background: set[asyncio.Task] = set()
+
+    @classmethod
+    def get_instance(cls) -> "RemoteEngine":
+        """Return the singleton built from ``settings.engine_workers``."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    from app.config import settings
+
+                    cls._instance = cls(settings.engine_workers, get_arena())
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Reset singleton (for testing only)."""
+        with cls._lock:
+            cls._instance = None
+
+    def _ready(self) -> list[WorkerClient]:
+        return [w for w in self.workers if self._status[w.address].get("loaded")]
+
+    @property
+    def _reference(self) -> dict:
+        """Status of the first ready worker (workers serve the same model)."""
+        ready = self._ready()
+        return self._status[ready[0].address] if ready else {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._ready())
+
+    @property
+    def status(self) -> str:
+        """``ready`` if any worker is, ``failed`` if all failed, else ``loading``."""
+        if self.is_loaded:
+            return "ready"
+        statuses = [s.get("status") for s in self._status.values()]
+        return "failed" if all(s == "failed" for s in statuses) else "loading"
+
+    @property
+    def load_progress(self) -> dict:
+        """Gateway readiness plus each worker's own load progress."""
+        return {
+            "status": self.status,
+            "workers": [
+                {
+                    "address": w.address,
+                    "connected": w.connected,
+                    "load": w.load,
+                    **self._status[w.address].get("load_progress", {}),
+                }
+                for w in self.workers
+            ],
+        }
+
+    @property
+    def model_size(self) -> str:
+        return self._reference.get("model", "")
+
+    @property
+    def precision(self) -> str:
+        return self._reference.get("precision", "")
+
+    @property
+    def precisions(self) -> list[str]:
+        return self._reference.get("precisions", [])
+
+    @property
+    def backend(self) -> str:
+        return self._reference.get("backend", "")
+
+    @property
+    def device(self) -> str:
+        return self._reference.get("device", "")
+
+    @property
+    def scheduler(self) -> "RemoteEngine":
+        """Routes cancel queued partials through ``engine.scheduler.cancel()``."""
+        return self
+
+    async def refresh(self) -> None:
+        """Ask every worker for its status; unreachable workers count as down."""
+
+        async def _poll(worker: WorkerClient) -> None:
+            try:
+                self._status[worker.address] = await worker.call("status")
+            except (ConnectionError, ValueError, RuntimeError):
+                self._status[worker.address] = {}
+
+        await asyncio.gather(*(_poll(w) for w in self.workers))
+
+    async def run_monitor(self, interval_s: float = 1.0) -> None:
+        """Refresh worker status forever (run as a background task)."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(interval_s)
+
+    async def close(self) -> None:
+        for worker in self.workers:
+            await worker.close()
+
+    async def wait_until_loaded(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a worker to be ready."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if not self.is_loaded:
+                await self.refresh()
+            if self.is_loaded or self.status == "failed" or time.monotonic() >= deadline:
+                return self.is_loaded
+            await asyncio.sleep(0.05)
+
+    def pick(self) -> WorkerClient:
+        """Least-loaded ready worker: fewest requests in flight from this
+        gateway, then shortest queue it last reported."""
+        ready = self._ready()
+        if not ready:
+            raise ConnectionError("No engine worker is ready")
+        return min(ready, key=lambda w: (w.in_flight, w.load))
+
+    async def _dispatch(
+        self,
+        method: str,
+        params: dict,
+        arrays: list[np.ndarray],
+        key: Hashable | None = None,
+    ) -> object:
+        """Run a request on the least-loaded worker, failing over once if
+        that worker turns out to be down."""
+        worker = self.pick()
+        try:
+            return await self._call_on(worker, method, params, arrays, key)
+        except ConnectionError:
+            logger.warning("Engine worker %s failed; marking it down", worker.address)
+            self._status[worker.address] = {}
+        return await self._call_on(self.pick(), method, params, arrays, key)
+
+    async def _call_on(
+        self,
+        worker: WorkerClient,
+        method: str,
+        params: dict,
+        arrays: list[np.ndarray],
+        key: Hashable | None,
+    ) -> object:
+        if key is not None:
+            self._keyed[key] = worker
+        try:
+            return await worker.call(method, params, arrays)
+        finally:
+            if key is not None and self._keyed.get(key) is worker:
+                del self._keyed[key]
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop the queued droppable job with ``key`` on its worker.
+
+        The cancel is sent in the background; the dropped call then fails
+        with ``JobDropped`` as it would locally.
+        """
+        worker = self._keyed.get(key)
+        if worker is None:
+            return False
+        task = asyncio.get_running_loop().create_task(worker.call("cancel", {"key": key}))
+        self._background.add(task)
+        task.add_done_callback(self._cancel_done)
+        return True
+
+    def _cancel_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Remote cancel failed", exc_info=task.exception())
+
+    def open_stream(self) -> StreamState:
+        """Create decode state for one streaming session."""
+        return StreamState()
+
+    async def transcribe_async(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        prefix: str | None = None,
+        options: DecodeOptions | None = None,
+    ) -> dict:
+        params = {
+            "language": language,
+            "initial_prompt": initial_prompt,
+            "precision": precision,
+            "options": _wire_options(options),
+            "prefix": prefix,
+            "job_class": job_class,
+            "deadline_s": deadline_s,
+            "key": key,
+        }
+        return await self._dispatch("transcribe", params, [audio], key)
+
+    async def transcribe_stream_async(
+        self,
+        state: StreamState,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        options: DecodeOptions | None = None,
+    ) -> dict:
+        """Incremental stream decode: the gateway keeps the state, a worker
+        decodes the window with the agreed prefix forced."""
+        cached = state.cached_result(audio)
+        if cached is not None:
+            return cached
+        prefix = state.prefix
+        result = await self.transcribe_async(
+            audio, language, initial_prompt, precision, job_class, deadline_s, key, prefix, options
+        )
+        return state.merge(audio, result, prefix, len(audio) / SAMPLE_RATE)
+
+    async def transcribe_batch_async(
+        self,
+        audios: list[np.ndarray],
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        job_class: str = BATCH,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+        options: DecodeOptions | None = None,
+    ) -> list[dict]:
+        params = {
+            "language": language,
+            "initial_prompt": initial_prompt,
+            "precision": precision,
+            "options": _wire_options(options),
+            "job_class": job_class,
+            "deadline_s": deadline_s,
+            "key": key,
+        }
+        return await self._dispatch("transcribe_batch", params, audios, key)
+
+    async def detect_language_async(
+        self,
+        audios: list[np.ndarray],
+        precision: str | None = None,
+        job_class: str = UPLOAD,
+        deadline_s: float | None = None,
+        key: Hashable | None = None,
+    ) -> list[dict]:
+        params = {"precision": precision, "job_class": job_class, "deadline_s": deadline_s, "key": key}
+        return await self._dispatch("detect_language", params, audios, key)
+
+    async def transcribe_chunked_async(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        precision: str | None = None,
+        chunk_s: float = 30.0,
+        job_class: str = UPLOAD,
+        options: DecodeOptions | None = None,
+    ) -> dict:
+        """Chunked upload decode on one worker (chunks depend on each other's text)."""
+        params = {
+            "language": language,
+            "initial_prompt": initial_prompt,
+            "precision": precision,
+            "options": _wire_options(options),
+            "chunk_s": chunk_s,
+            "job_class": job_class,
+        }
+        return await self._dispatch("transcribe_chunked", params, [audio])
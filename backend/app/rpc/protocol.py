@@ -0,0 +1,103 @@
+"""Binary framing for the gateway <-> engine worker RPC.
+
+Every message is one frame::
+
+    !II  header length, body length (big-endian uint32)
+    header  UTF-8 JSON object
+    body    raw bytes (float32 audio, native little-endian)
+
+Requests carry ``{"id", "method", "params"}``; responses carry
+``{"id", "ok", "result"}`` or ``{"id", "ok": false, "error", "message"}``
+plus the worker's current ``load``. Several arrays share one body; the
+header lists their lengths in samples. A gateway on the worker's host may
+instead list shared audio arena handles (``app.audio.arena``) and send no
+body; the worker reads the audio in place.
+
+Addresses are ``tcp://host:port`` or ``unix:///path/to/socket``.
+"""
+
+import asyncio
+import json
+import struct
+
+import numpy as np
+
+_PREFIX = struct.Struct("!II")
+# Largest frame accepted (an hour of 16 kHz float32 audio is ~230 MB)
+MAX_FRAME_BYTES = 512 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """A peer sent a malformed or oversized frame."""
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[dict, bytes]:
+    """Read one frame; raises ``asyncio.IncompleteReadError`` at EOF."""
+    header_len, body_len = _PREFIX.unpack(await reader.readexactly(_PREFIX.size))
+    if header_len + body_len > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame of {header_len + body_len} bytes exceeds limit")
+    header = json.loads(await reader.readexactly(header_len))
+    body = await reader.readexactly(body_len) if body_len else b""
+    if not isinstance(header, dict):
+        raise ProtocolError("Frame header is not a JSON object")
+    return header, body
+
+
+def write_frame(writer: asyncio.StreamWriter, header: dict, body: bytes = b"") -> None:
+    """Queue one frame on ``writer`` (call ``drain()`` afterwards)."""
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    writer.write(_PREFIX.pack(len(encoded), len(body)))
+    writer.write(encoded)
+    if body:
+        writer.write(body)
+
+
+def pack_arrays(arrays: list[np.ndarray]) -> tuple[list[int], bytes]:
+    """Concatenate float32 arrays into one body; returns their lengths and the bytes."""
+    lengths = [len(a) for a in arrays]
+    body = b"".join(np.ascontiguousarray(a, dtype="<f4").tobytes() for a in arrays)
+    return lengths, body
+
+
+def unpack_arrays(lengths: list[int], body: bytes) -> list[np.ndarray]:
+    """Split a body produced by ``pack_arrays`` back into arrays (views, no copy)."""
+    if sum(lengths) * 4 != len(body):
+        raise ProtocolError("Body size does not match array lengths")
+    data = np.frombuffer(body, dtype="<f4")
+    arrays = []
+    offset = 0
+    for length in lengths:
+        arrays.append(data[offset : offset + length])
+        offset += length
+    return arrays
+
+
+def parse_address(address: str) -> tuple[str, str, int]:
+    """Split an address into ``(scheme, host_or_path, port)``."""
+    if address.startswith("unix://"):
+        return "unix", address[len("unix://") :], 0
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://") :].rpartition(":")
+        if host and port.isdigit():
+            return "tcp", host, int(port)
+    raise ValueError(f"Invalid worker address {address!r} (use tcp://host:port or unix:///path)")
+
+
+def is_local(address: str) -> bool:
+    """Whether ``address`` is on this host (so shared memory can reach it)."""
+    scheme, host, _ = parse_address(address)
+    return scheme == "unix" or host in ("127.0.0.1", "::1", "localhost")
+
+
+async def open_connection(address: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    scheme, host, port = parse_address(address)
+    if scheme == "unix":
+        return await asyncio.open_unix_connection(host, limit=2**20)
+    return await asyncio.open_connection(host, port, limit=2**20)
+
+
+async def start_server(handler, address: str) -> asyncio.AbstractServer:
+    scheme, host, port = parse_address(address)
+    if scheme == "unix":
+        return await asyncio.start_unix_server(handler, host, limit=2**20)
+    return await asyncio.start_server(handler, host, port, limit=2**20)
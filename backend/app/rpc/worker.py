@@ -0,0 +1,194 @@
+"""Engine worker: serves a local TranscriptionEngine to gateways over RPC.
+
+Run one worker per model instance::
+
+    .venv/bin/stt-local worker --listen tcp://127.0.0.1:9101
+    .venv/bin/python -m app.rpc.worker --listen tcp://127.0.0.1:9101
+
+The worker loads the model from the usual ``STT_`` settings. Requests on
+a connection are handled concurrently and queued on the engine's
+scheduler with the job class, deadline and key the gateway sent, so
+priorities hold across gateways.
+"""
+
+import asyncio
+import logging
+
+from app.audio.arena import open_views
+from app.engine.factory import TranscriptionEngine, load_kwargs_from_settings
+from app.engine.options import DecodeOptions
+from app.engine.scheduler import UPLOAD, JobDropped
+from app.rpc.protocol import (
+    ProtocolError,
+    read_frame,
+    start_server,
+    unpack_arrays,
+    write_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerServer:
+    """RPC front-end for one engine.
+
+    Args:
+        engine: The (loaded or loading) engine to serve.
+        address: ``tcp://host:port`` or ``unix:///path`` to listen on.
+    """
+
+    def __init__(self, engine: TranscriptionEngine, address: str) -> None:
+        self.engine = engine
+        self.address = address
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        self._server = await start_server(self._handle, self.address)
+        if self.address.startswith("tcp://") and self.address.endswith(":0"):
+            # Report the port the OS picked
+            host, port = self._server.sockets[0].getsockname()[:2]
+            self.address = f"tcp://{host}:{port}"
+        logger.info("Engine worker listening on %s", self.address)
+
+    async def close(self) -> None:
+        """Stop listening and drop every open connection."""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+
+    def load(self) -> int:
+        """Jobs queued or running on the engine, reported with every response."""
+        scheduler = self.engine.scheduler
+        return sum(scheduler.depth().values()) + (scheduler.running is not None)
+
+    def status(self) -> dict:
+        engine = self.engine
+        return {
+            "status": engine.status,
+            "loaded": engine.is_loaded,
+            "backend": engine.backend,
+            "device": engine.device,
+            "model": engine.model_size,
+            "precision": engine.precision,
+            "precisions": engine.precisions,
+            "load_progress": engine.load_progress,
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    header, body = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                task = asyncio.create_task(self._respond(writer, lock, header, body))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ProtocolError:
+            logger.warning("Closing RPC connection: malformed frame", exc_info=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, lock: asyncio.Lock, header: dict, body: bytes
+    ) -> None:
+        response: dict = {"id": header.get("id")}
+        try:
+            result = await self._dispatch(header.get("method", ""), header.get("params", {}), body)
+            response.update(ok=True, result=result)
+        except JobDropped as e:
+            response.update(ok=False, error="dropped", message=e.reason, job_class=e.job_class)
+        except (ProtocolError, ValueError, KeyError, TypeError) as e:
+            response.update(ok=False, error="invalid", message=str(e))
+        except Exception as e:
+            logger.exception("RPC %s failed", header.get("method"))
+            response.update(ok=False, error="internal", message=str(e))
+        response["load"] = self.load()
+        async with lock:
+            write_frame(writer, response)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, method: str, params: dict, body: bytes) -> object:
+        engine = self.engine
+        schedule = {
+            "job_class": params.get("job_class", UPLOAD),
+            "deadline_s": params.get("deadline_s"),
+            "key": params.get("key"),
+        }
+        options = {
+            "initial_prompt": params.get("initial_prompt"),
+            "precision": params.get("precision"),
+            # Validated again here; a ValidationError answers "invalid"
+            "options": DecodeOptions.model_validate(params["options"]) if params.get("options") else None,
+        }
+        language = params.get("language")
+
+        if method == "status":
+            return self.status()
+        if method == "cancel":
+            return engine.scheduler.cancel(params["key"])
+        if not engine.is_loaded:
+            raise ValueError("Engine is not loaded")
+
+        if "handles" in params:
+            # Zero-copy views of the gateway's arena; valid until we answer
+            arrays = open_views(params["handles"])
+        else:
+            arrays = unpack_arrays(params.get("lengths", []), body)
+        if method == "transcribe":
+            return await engine.transcribe_async(
+                arrays[0], language, **options, **schedule, prefix=params.get("prefix")
+            )
+        if method == "transcribe_batch":
+            return await engine.transcribe_batch_async(arrays, language, **options, **schedule)
+        if method == "detect_language":
+            return await engine.detect_language_async(arrays, options["precision"], **schedule)
+        if method == "transcribe_chunked":
+            return await engine.transcribe_chunked_async(
+                arrays[0], language, **options,
+                chunk_s=params.get("chunk_s", 30.0), job_class=schedule["job_class"],
+            )
+        raise ValueError(f"Unknown method {method!r}")
+
+
+async def serve(address: str) -> None:
+    """Load the engine from settings and serve it until cancelled.
+
+    The server answers ``status`` while the model loads (and after a failed
+    load), so gateways can report the worker's progress.
+    """
+    engine = TranscriptionEngine.get_instance()
+    server = WorkerServer(engine, address)
+    await server.start()
+    try:
+        await asyncio.to_thread(engine.load, **load_kwargs_from_settings())
+    except Exception:
+        pass  # Already logged by the engine; reported through status
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    import sys
+
+    from app.cli import main as cli_main
+
+    sys.exit(cli_main(["worker", *sys.argv[1:]]))
+
+
+if __name__ == "__main__":
+    main()
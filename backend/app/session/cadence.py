@@ -0,0 +1,111 @@
+"""Adaptive partial cadence for streaming sessions.
+
+A fixed "partial every 2 s" is too slow on an idle engine and too fast on
+a saturated one. ``PartialCadence`` instead derives each session's
+partial interval from:
+
+* the engine's live real-time factor: engine seconds per second of
+  audio, measured on live partials and finals (queueing included, so a
+  backed-up engine reads as slower);
+* the partials in flight: a backlog stretches every interval further;
+* speech activity: only sessions that spoke recently compete for engine
+  time; quiet sessions fall back to the ceiling.
+
+The fairness target is a share of engine time (``engine_share``) that
+live partials may use, split evenly among the speaking sessions. A
+session whose partial costs ``rtf * window_s`` engine seconds may then
+send one every ``rtf * window_s * speakers / engine_share`` seconds,
+clamped to ``[floor_s, ceiling_s]``.
+"""
+
+import time
+
+
+class PartialCadence:
+    """Server-wide partial interval calculator (one per ``SessionManager``).
+
+    Args:
+        floor_s: Shortest interval between a session's partials.
+        ceiling_s: Longest interval, also used for quiet sessions.
+        engine_share: Fraction of engine time live partials may use
+            across all sessions.
+        speech_hold_s: A session counts as speaking for this long after
+            its last voiced audio.
+        alpha: Weight of each new measurement in the real-time factor
+            moving average.
+    """
+
+    def __init__(
+        self,
+        floor_s: float = 0.5,
+        ceiling_s: float = 4.0,
+        engine_share: float = 0.5,
+        speech_hold_s: float = 5.0,
+        alpha: float = 0.2,
+    ) -> None:
+        self.floor_s = floor_s
+        self.ceiling_s = max(ceiling_s, floor_s)
+        self.engine_share = engine_share
+        self.speech_hold_s = speech_hold_s
+        self.alpha = alpha
+        # Moving average of engine seconds per audio second (None until measured)
+        self.rtf: float | None = None
+        # Partials running or queued on the engine, across sessions
+        self.in_flight = 0
+        # Session id -> monotonic time of its last voiced audio
+        self._spoke_at: dict[str, float] = {}
+
+    def observe(self, engine_s: float, audio_s: float) -> None:
+        """Fold one live job (``engine_s`` for ``audio_s`` of audio) into the RTF."""
+        if audio_s <= 0:
+            return
+        rtf = engine_s / audio_s
+        self.rtf = rtf if self.rtf is None else self.rtf + self.alpha * (rtf - self.rtf)
+
+    def started(self) -> None:
+        self.in_flight += 1
+
+    def finished(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def speakers(self, now: float | None = None) -> int:
+        """Sessions that spoke within ``speech_hold_s``."""
+        now = now if now is not None else time.monotonic()
+        return sum(1 for t in self._spoke_at.values() if now - t <= self.speech_hold_s)
+
+    def interval_s(
+        self, session_id: str, window_s: float, speaking: bool, now: float | None = None
+    ) -> float:
+        """Seconds of new audio the session should wait for before its next partial.
+
+        Args:
+            session_id: The session asking.
+            window_s: Audio the next partial would decode.
+            speaking: Whether the audio since its last partial has speech.
+        """
+        now = now if now is not None else time.monotonic()
+        if speaking:
+            self._spoke_at[session_id] = now
+        elif now - self._spoke_at.get(session_id, float("-inf")) > self.speech_hold_s:
+            return self.ceiling_s
+        if self.rtf is None:
+            return self.floor_s
+        speakers = max(1, self.speakers(now))
+        interval = self.rtf * window_s * speakers / self.engine_share
+        interval *= 1 + self.in_flight / speakers
+        return min(self.ceiling_s, max(self.floor_s, interval))
+
+    def forget(self, session_id: str) -> None:
+        """Stop counting a finished session as a speaker."""
+        self._spoke_at.pop(session_id, None)
+
+    def stats(self) -> dict:
+        """Server-wide inputs of the cadence, for the admin session report."""
+        return {
+            "rtf": round(self.rtf, 4) if self.rtf is not None else None,
+            "in_flight": self.in_flight,
+            "speakers": self.speakers(),
+            "floor_s": self.floor_s,
+            "ceiling_s": self.ceiling_s,
+            "engine_share": self.engine_share,
+        }
@@ -0,0 +1,55 @@
+"""Partial-result diffing for clients that asked for ``partials: "delta"``.
+
+Consecutive partials of the same window mostly repeat what the client
+already shows: the words decoded earlier rarely change. For each channel
+the session remembers the segments it last sent. A new partial becomes
+upserts for only the segments that changed. Each upsert keeps the first
+``keep`` characters the client already has for that segment id and
+replaces the rest with ``text``; timings are sent only when they moved.
+``count`` truncates segments that went away.
+"""
+
+import os
+
+from app.models import PartialDelta, SegmentDelta
+
+# One partial segment as sent: (text, start_ms, end_ms)
+Segment = tuple[str, int, int]
+
+
+class PartialDiffer:
+    """What the client has been sent for the current window, per channel."""
+
+    def __init__(self) -> None:
+        self._sent: dict[int | None, list[Segment]] = {}
+        # Partial updates emitted
+        self.updates = 0
+
+    def diff(self, segments: list[Segment], channel: int | None = None) -> PartialDelta | None:
+        """Delta from the last partial sent for ``channel`` to ``segments``.
+
+        Records ``segments`` as sent. Returns None when nothing changed.
+        """
+        previous = self._sent.get(channel, [])
+        upserts = []
+        for index, (text, start_ms, end_ms) in enumerate(segments):
+            if index < len(previous) and previous[index] == (text, start_ms, end_ms):
+                continue
+            old_text, old_start, old_end = previous[index] if index < len(previous) else ("", None, None)
+            keep = len(os.path.commonprefix([old_text, text]))
+            upserts.append(SegmentDelta(
+                id=index,
+                keep=keep,
+                text=text[keep:],
+                start_ms=start_ms if start_ms != old_start else None,
+                end_ms=end_ms if end_ms != old_end else None,
+            ))
+        self._sent[channel] = list(segments)
+        if not upserts and len(segments) == len(previous):
+            return None
+        self.updates += 1
+        return PartialDelta(count=len(segments), segments=upserts, channel=channel)
+
+    def reset(self) -> None:
+        """Forget what was sent (after a final replaced the partials)."""
+        self._sent.clear()
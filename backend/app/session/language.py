@@ -0,0 +1,86 @@
+"""Language lock for streaming sessions configured with ``language: "auto"``.
+
+Without a lock every partial would run Whisper's language detection
+again. The session instead detects the language once, on its first
+voiced window, and decodes later windows with that language. The lock
+is re-checked every ``recheck_s`` seconds, and sooner when a segment
+decoded under it has a low average log-probability (often the sign of
+decoding one language as another).
+"""
+
+import asyncio
+import time
+
+# Why a detection runs (the ``reason`` label of stt_language_detections_total)
+INITIAL = "initial"
+CADENCE = "cadence"
+LOW_CONFIDENCE = "low_confidence"
+
+
+class LanguageLock:
+    """Detected language of one session and when to check it again.
+
+    Args:
+        recheck_s: Seconds between re-checks of a locked language; 0 only
+            re-checks on low confidence.
+        min_probability: Detections less probable than this do not lock
+            (or change) the language.
+        recheck_logprob: Segments below this average log-probability
+            trigger a re-check.
+    """
+
+    def __init__(
+        self, recheck_s: float = 60.0, min_probability: float = 0.5, recheck_logprob: float = -1.0
+    ) -> None:
+        self.recheck_s = recheck_s
+        self.min_probability = min_probability
+        self.recheck_logprob = recheck_logprob
+        self.language: str | None = None
+        self.probability: float | None = None
+        self.detections = 0
+        # Serializes detections of concurrent partials and finals
+        self.mutex = asyncio.Lock()
+        self._checked_at = 0.0
+        self._low_confidence = False
+
+    def due(self, now: float | None = None) -> str | None:
+        """Why the language should be detected now, or None if it should not."""
+        if self.language is None:
+            return INITIAL
+        if self._low_confidence:
+            return LOW_CONFIDENCE
+        now = now if now is not None else time.monotonic()
+        if self.recheck_s and now - self._checked_at >= self.recheck_s:
+            return CADENCE
+        return None
+
+    def update(self, language: str | None, probability: float | None, now: float | None = None) -> bool:
+        """Record a detection; returns whether the locked language changed.
+
+        A probability of None (not reported by the backend) counts as sure.
+        """
+        self.detections += 1
+        self._checked_at = now if now is not None else time.monotonic()
+        self._low_confidence = False
+        if language is None or (probability is not None and probability < self.min_probability):
+            return False
+        changed = language != self.language
+        self.language, self.probability = language, probability
+        return changed
+
+    def observe(self, results: list[dict]) -> None:
+        """Flag a re-check if a result decoded under the lock looks unsure."""
+        if self.language is None:
+            return
+        for result in results:
+            for seg in result.get("segments", []):
+                if seg.get("avg_logprob", 0.0) < self.recheck_logprob:
+                    self._low_confidence = True
+                    return
+
+    def stats(self) -> dict:
+        return {
+            "language": self.language,
+            "probability": self.probability,
+            "detections": self.detections,
+        }
@@ -0,0 +1,297 @@
+"""Per-session memory accounting and a global memory budget for streaming sessions."""
+
+import asyncio
+import logging
+import secrets
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from app.audio.arena import get_arena
+from app.audio.buffer import AudioBuffer
+from app.engine.options import DecodeOptions
+from app.engine.stream import StreamState
+from app.session.cadence import PartialCadence
+from app.session.delta import PartialDiffer
+from app.session.language import LanguageLock
+from app.session.resume import ResumeState, ResumeStore
+
+logger = logging.getLogger(__name__)
+
+CloseCallback = Callable[[str], Awaitable[None]]
+
+
+class Session:
+    """State held for one streaming transcription session.
+
+    Tracks the bytes held by the session's audio buffers (one per
+    channel), cached features and results computed but not yet sent, so
+    the manager can enforce a global budget and report per-session
+    footprints.
+    """
+
+    def __init__(self, close: CloseCallback | None = None) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        # Handed to the client so it can resume after a dropped connection
+        self.token = secrets.token_urlsafe(16)
+        # Buffers live in the shared audio arena when one is configured
+        self.buffers: list[AudioBuffer] = [AudioBuffer(get_arena())]
+        # Incremental decode state for mono sessions
+        self.stream = StreamState()
+        # What delta-partial clients have been sent (None: full partials)
+        self.delta: PartialDiffer | None = None
+        # Decode options the client configured (None: server default)
+        self.decode_options: DecodeOptions | None = None
+        # Detected language of "auto" sessions (None: language given)
+        self.language_lock: LanguageLock | None = None
+        # Audio (seconds) the session currently waits for between partials
+        self.partial_interval_s: float | None = None
+        self.features_bytes = 0
+        self.pending_bytes = 0
+        self.created_at = time.monotonic()
+        self.last_active = self.created_at
+        self.closed = False
+        self._close = close
+
+    @property
+    def audio(self) -> AudioBuffer:
+        """The first (for mono sessions, the only) channel's buffer."""
+        return self.buffers[0]
+
+    @property
+    def audio_bytes(self) -> int:
+        return sum(buf.nbytes for buf in self.buffers)
+
+    @property
+    def spilled_bytes(self) -> int:
+        return sum(buf.spilled_bytes for buf in self.buffers)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes of RAM attributed to the session."""
+        return self.audio_bytes + self.features_bytes + self.pending_bytes
+
+    def set_channels(self, channels: int) -> list[AudioBuffer]:
+        """Allocate one buffer per channel; returns the buffers."""
+        self.release_audio()
+        self.buffers = [AudioBuffer(get_arena()) for _ in range(channels)]
+        return self.buffers
+
+    def spill(self, directory: str | None = None) -> int:
+        """Spill every channel buffer; returns the bytes of RAM released."""
+        return sum(buf.spill(directory) for buf in self.buffers)
+
+    def release_audio(self) -> None:
+        for buf in self.buffers:
+            buf.release()
+
+    def touch(self) -> None:
+        """Mark the session as active now."""
+        self.last_active = time.monotonic()
+
+    def idle_for(self, now: float | None = None) -> float:
+        """Seconds since the session was last active."""
+        return (now if now is not None else time.monotonic()) - self.last_active
+
+    def footprint(self) -> dict:
+        """Per-session memory report for the admin endpoint."""
+        return {
+            "id": self.id,
+            "channels": len(self.buffers),
+            "audio_bytes": self.audio_bytes,
+            "spilled_bytes": self.spilled_bytes,
+            "features_bytes": self.features_bytes,
+            "pending_bytes": self.pending_bytes,
+            "resident_bytes": self.resident_bytes,
+            "buffered_samples": len(self.audio),
+            "idle_s": round(self.idle_for(), 3),
+            "age_s": round(time.monotonic() - self.created_at, 3),
+            "stream": self.stream.stats(),
+            "language": self.language_lock.stats() if self.language_lock is not None else None,
+            "partial_interval_s": round(self.partial_interval_s, 3)
+            if self.partial_interval_s is not None
+            else None,
+        }
+
+    async def close(self, reason: str) -> None:
+        """Free the session's buffers and ask its transport to close."""
+        if self.closed:
+            return
+        self.closed = True
+        self.release_audio()
+        self.features_bytes = 0
+        self.pending_bytes = 0
+        if self._close is not None:
+            try:
+                await self._close(reason)
+            except Exception:
+                logger.debug("Close callback failed for session %s", self.id, exc_info=True)
+
+
+class SessionManager:
+    """Singleton registry of live sessions with a global memory budget.
+
+    When the resident total exceeds the budget, parked sessions are
+    dropped oldest first, then idle sessions are spilled to scratch files,
+    then evicted oldest-idle first. Sessions idle past the timeout are
+    closed by the reaper task. Dropped sessions can be parked in
+    ``resumable`` until their client reconnects; their audio counts
+    towards the budget.
+    """
+
+    _instance: "SessionManager | None" = None
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        idle_timeout_s: float,
+        spill_after_s: float,
+        spill_dir: str = "",
+        resume_ttl_s: float = 60.0,
+        resume_max_entries: int = 256,
+        cadence: PartialCadence | None = None,
+    ) -> None:
+        self.budget_bytes = budget_bytes
+        self.idle_timeout_s = idle_timeout_s
+        self.spill_after_s = spill_after_s
+        self.spill_dir = spill_dir
+        self.resumable = ResumeStore(ttl_s=resume_ttl_s, max_entries=resume_max_entries)
+        self.cadence = cadence or PartialCadence()
+        self._sessions: dict[str, Session] = {}
+
+    @classmethod
+    def get_instance(cls) -> "SessionManager":
+        """Return the singleton instance, creating it from settings if necessary."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    from app.config import settings
+
+                    cls._instance = cls(
+                        budget_bytes=settings.session_memory_budget_mb * 1024 * 1024,
+                        idle_timeout_s=settings.session_idle_timeout_s,
+                        spill_after_s=settings.session_spill_after_s,
+                        spill_dir=settings.session_spill_dir,
+                        resume_ttl_s=settings.session_resume_ttl_s,
+                        resume_max_entries=settings.session_resume_max_entries,
+                        cadence=PartialCadence(
+                            floor_s=settings.partial_interval_min_s,
+                            ceiling_s=settings.partial_interval_max_s,
+                            engine_share=settings.partial_engine_share,
+                        ),
+                    )
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Reset singleton (for testing only)."""
+        with cls._lock:
+            cls._instance = None
+
+    @property
+    def sessions(self) -> list[Session]:
+        return list(self._sessions.values())
+
+    @property
+    def total_bytes(self) -> int:
+        """Resident bytes across all sessions, live and parked."""
+        return sum(s.resident_bytes for s in self._sessions.values()) + self.resumable.nbytes
+
+    def open(self, close: CloseCallback | None = None) -> Session:
+        """Register a new session."""
+        session = Session(close)
+        self._sessions[session.id] = session
+        return session
+
+    def park(self, token: str, state: ResumeState) -> None:
+        """Park a dropped session for resumption, within the memory budget.
+
+        Parked sessions are dropped oldest first (``state`` itself last)
+        while the total exceeds the budget.
+        """
+        self.resumable.park(token, state)
+        self._drop_parked()
+
+    def _drop_parked(self) -> None:
+        """Drop parked sessions, oldest first, until the total is under budget."""
+        while self.total_bytes > self.budget_bytes and self.resumable.drop_oldest():
+            logger.warning("Dropped a parked session: memory budget exceeded")
+
+    def release(self, session: Session) -> None:
+        """Forget a finished session and free its buffers."""
+        self._sessions.pop(session.id, None)
+        self.cadence.forget(session.id)
+        session.release_audio()
+
+    async def enforce_budget(self, current: Session) -> bool:
+        """Bring the resident total back under budget.
+
+        Spills idle sessions, then evicts them. ``current`` (the session
+        that just grew) is never spilled or evicted by this call.
+
+        Returns:
+            False if the budget is still exceeded and ``current`` must be
+            rejected.
+        """
+        if self.total_bytes <= self.budget_bytes:
+            return True
+
+        self._drop_parked()
+        if self.total_bytes <= self.budget_bytes:
+            return True
+
+        now = time.monotonic()
+        others = [s for s in self._sessions.values() if s is not current and not s.closed]
+        idle = [s for s in others if s.idle_for(now) >= self.spill_after_s]
+
+        for session in sorted(idle, key=lambda s: s.audio_bytes, reverse=True):
+            freed = session.spill(self.spill_dir)
+            if freed:
+                logger.info("Spilled session %s (%d bytes)", session.id, freed)
+            if self.total_bytes <= self.budget_bytes:
+                return True
+
+        for session in sorted(others, key=lambda s: s.last_active):
+            logger.warning("Evicting session %s: memory budget exceeded", session.id)
+            await session.close("Memory budget exceeded")
+            self.release(session)
+            if self.total_bytes <= self.budget_bytes:
+                return True
+
+        return self.total_bytes <= self.budget_bytes
+
+    async def reap_idle(self) -> int:
+        """Close sessions idle for longer than the timeout.
+
+        Returns:
+            Number of sessions closed.
+        """
+        now = time.monotonic()
+        stale = [s for s in self._sessions.values() if s.idle_for(now) > self.idle_timeout_s]
+        for session in stale:
+            logger.info("Closing abandoned session %s", session.id)
+            await session.close("Session idle timeout")
+            self.release(session)
+        return len(stale)
+
+    async def run_reaper(self, interval_s: float = 5.0) -> None:
+        """Periodically reap idle sessions until cancelled."""
+        while True:
+            await asyncio.sleep(interval_s)
+            try:
+                await self.reap_idle()
+            except Exception:
+                logger.exception("Session reaper failed")
+
+    def report(self) -> dict:
+        """Memory report across all sessions."""
+        return {
+            "budget_bytes": self.budget_bytes,
+            "total_bytes": self.total_bytes,
+            "parked_sessions": len(self.resumable),
+            "parked_bytes": self.resumable.nbytes,
+            "cadence": self.cadence.stats(),
+            "sessions": [s.footprint() for s in self._sessions.values()],
+        }
@@ -0,0 +1,138 @@
+"""Recording of inbound WebSocket traffic for replay (``STT_RECORD_DIR``).
+
+Each recorded session is one append-only file: the magic line, then one
+record per inbound message (configure, audio frames, stop, disconnect):
+
+    uint32 microseconds since the previous record
+    uint8  kind (TEXT, BINARY or CLOSE)
+    uint32 payload length
+    payload
+
+The timing gaps are what make latency problems reproducible, so they
+are kept exactly; audio is stored as received (int16 PCM). A file cut
+short by a crash reads up to its last complete record.
+"""
+
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"STTREC1\n"
+SUFFIX = ".sttrec"
+
+TEXT = 1
+BINARY = 2
+CLOSE = 3
+
+_RECORD = struct.Struct("<IBI")
+# Longest gap one record can express; longer pauses are clamped
+_MAX_GAP_US = 2**32 - 1
+
+
+@dataclass(frozen=True)
+class Frame:
+    """One recorded inbound message."""
+
+    t: float  # Seconds since the session started
+    kind: int
+    payload: bytes
+
+    @property
+    def text(self) -> str:
+        return self.payload.decode()
+
+
+class SessionRecorder:
+    """Appends the inbound messages of one session to ``path``."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._last = time.monotonic()
+
+    def __bool__(self) -> bool:
+        return True
+
+    def _write(self, kind: int, payload: bytes) -> None:
+        if self._file.closed:
+            return
+        now = time.monotonic()
+        gap_us = min(int((now - self._last) * 1_000_000), _MAX_GAP_US)
+        self._last = now
+        self._file.write(_RECORD.pack(gap_us, kind, len(payload)))
+        self._file.write(payload)
+
+    def text(self, data: str) -> None:
+        self._write(TEXT, data.encode())
+
+    def message(self, message: dict) -> None:
+        """Record a message as returned by ``WebSocket.receive()``."""
+        if message["type"] == "websocket.disconnect":
+            self._write(CLOSE, str(message.get("code", 1000)).encode())
+        elif message.get("bytes"):
+            self._write(BINARY, message["bytes"])
+        elif message.get("text"):
+            self.text(message["text"])
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NullRecorder:
+    """Stand-in while recording is disabled; records nothing."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def text(self, data: str) -> None:
+        pass
+
+    def message(self, message: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NULL_RECORDER = NullRecorder()
+
+
+def start_recording(session_id: str) -> SessionRecorder | NullRecorder:
+    """A recorder for a new session, or ``NULL_RECORDER`` if recording is off."""
+    from app.config import settings
+
+    if not settings.record_dir:
+        return NULL_RECORDER
+    directory = Path(settings.record_dir)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        return SessionRecorder(
+            directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{session_id}{SUFFIX}"
+        )
+    except OSError:
+        logger.warning("Cannot record session %s in %s", session_id, directory, exc_info=True)
+        return NULL_RECORDER
+
+
+def read_recording(path: str | Path) -> Iterator[Frame]:
+    """The frames of a recording, with times relative to the session start."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        t = 0.0
+        while len(header := f.read(_RECORD.size)) == _RECORD.size:
+            gap_us, kind, length = _RECORD.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                break
+            t += gap_us / 1_000_000
+            yield Frame(t, kind, payload)
@@ -0,0 +1,99 @@
+"""Bounded, TTL-limited store of dropped streaming sessions awaiting reconnect."""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Characters of committed transcript kept as the decoder prompt
+PROMPT_CHARS = 224
+
+
+class ResumeState:
+    """What a dropped session needs to continue after reconnecting."""
+
+    def __init__(
+        self,
+        language: str,
+        committed: list[str],
+        audio_tail: np.ndarray,
+        sample_offset: int,
+        transcribed_samples: int = 0,
+    ) -> None:
+        self.language = language
+        self.committed = committed
+        self.audio_tail = audio_tail
+        self.sample_offset = sample_offset
+        self.transcribed_samples = transcribed_samples
+
+    @property
+    def prompt(self) -> str:
+        """Tail of the committed transcript, used to condition the decoder."""
+        return " ".join(self.committed)[-PROMPT_CHARS:].strip()
+
+    @property
+    def channels(self) -> int:
+        """Channels of the parked audio (a 2-D tail holds one row per channel)."""
+        return 1 if self.audio_tail.ndim == 1 else self.audio_tail.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.audio_tail.nbytes + sum(len(t.encode()) for t in self.committed)
+
+
+class ResumeStore:
+    """In-process store of parked sessions keyed by session token.
+
+    Entries expire after ``ttl_s`` and the oldest entry is dropped when
+    more than ``max_entries`` are parked. Claiming a token removes it, so
+    each parked session can be resumed at most once.
+    """
+
+    def __init__(self, ttl_s: float, max_entries: int) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, ResumeState]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by parked sessions."""
+        return sum(state.nbytes for _, state in self._entries.values())
+
+    def park(self, token: str, state: ResumeState, now: float | None = None) -> None:
+        """Keep ``state`` under ``token`` for the grace period."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            self._entries[token] = (now + self.ttl_s, state)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def claim(self, token: str, now: float | None = None) -> ResumeState | None:
+        """Remove and return the state parked under ``token``, if still valid."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.pop(token, None)
+        return entry[1] if entry is not None else None
+
+    def drop_oldest(self) -> bool:
+        """Drop the entry parked longest ago; False if there is none."""
+        with self._lock:
+            if not self._entries:
+                return False
+            self._entries.popitem(last=False)
+        return True
+
+    def _expire(self, now: float) -> None:
+        """Drop expired entries (oldest first; insertion order is expiry order)."""
+        while self._entries:
+            token, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[token]
@@ -0,0 +1,276 @@
+"""Per-request tracing: where the time of one partial, final or upload went.
+
+A ``Trace`` is a flat list of timed spans (receive, queue, mel, encode,
+decode, send, ...) for one request. The active trace lives in a context
+variable, so engine code records spans without being handed the trace;
+the scheduler carries it over to its worker thread. Finished traces
+are kept in a bounded set of the slowest ones (``GET /admin/traces``)
+and, with ``STT_TRACE_OTLP_ENDPOINT`` set and the ``tracing`` extra
+installed, exported to an OpenTelemetry collector.
+
+Tracing is off by default. Disabled, ``start()`` returns ``NULL_TRACE``,
+whose methods do nothing, and engine code only pays a context-variable
+lookup per span.
+"""
+
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+now = time.perf_counter
+
+
+class _Span:
+    """Context manager recording one span of a trace."""
+
+    __slots__ = ("_trace", "_name", "_attrs", "_start")
+
+    def __init__(self, trace: "Trace", name: str, attrs: dict) -> None:
+        self._trace = trace
+        self._name = name
+        self._attrs = attrs
+
+    def __enter__(self) -> None:
+        self._start = now()
+
+    def __exit__(self, *exc) -> None:
+        self._trace.add(self._name, self._start, now(), **self._attrs)
+
+
+class Trace:
+    """Timed spans of one request.
+
+    Args:
+        name: What the request is (``ws.partial``, ``ws.final``, ``upload``).
+        start: ``now()`` at which the request began (defaults to now).
+        **attrs: Request attributes (session id, audio length, ...).
+    """
+
+    def __init__(self, name: str, start: float | None = None, **attrs) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.start = start if start is not None else now()
+        # Wall clock at ``start``, for exporting absolute timestamps
+        self.wall_start_ns = time.time_ns() - int((now() - self.start) * 1e9)
+        self.end: float | None = None
+        # (name, start, end, attrs); appended from the loop and the engine thread
+        self.spans: list[tuple[str, float, float, dict]] = []
+
+    def __bool__(self) -> bool:
+        return True
+
+    @property
+    def duration_s(self) -> float:
+        return (self.end if self.end is not None else now()) - self.start
+
+    def span(self, name: str, **attrs) -> _Span:
+        """Time the ``with`` block as span ``name``."""
+        return _Span(self, name, attrs)
+
+    def add(self, name: str, start: float, end: float, **attrs) -> None:
+        """Record a span measured elsewhere (``now()`` timestamps)."""
+        self.spans.append((name, start, end, attrs))
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def finish(self) -> None:
+        """End the trace and hand it to the recorder and exporter (once)."""
+        if self.end is None:
+            self.end = now()
+            _finished(self)
+
+    def as_dict(self) -> dict:
+        """The trace with span offsets and durations in milliseconds."""
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration_s * 1000, 3),
+            "attrs": self.attrs,
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": round((start - self.start) * 1000, 3),
+                    "duration_ms": round((end - start) * 1000, 3),
+                    **({"attrs": attrs} if attrs else {}),
+                }
+                for name, start, end, attrs in sorted(self.spans, key=lambda s: s[1])
+            ],
+        }
+
+
+class NullTrace:
+    """Stand-in for a trace while tracing is disabled; records nothing."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def span(self, name: str, **attrs) -> contextlib.nullcontext:
+        return _NULL_SPAN
+
+    def add(self, name: str, start: float, end: float, **attrs) -> None:
+        pass
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_TRACE = NullTrace()
+_NULL_SPAN = contextlib.nullcontext()
+
+_current: contextvars.ContextVar["Trace | NullTrace"] = contextvars.ContextVar(
+    "stt_trace", default=NULL_TRACE
+)
+
+
+class TraceRecorder:
+    """Keeps the ``capacity`` slowest finished traces."""
+
+    def __init__(self, capacity: int = 50) -> None:
+        self.capacity = capacity
+        self._heap: list[tuple[float, int, Trace]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, trace: Trace) -> None:
+        entry = (trace.duration_s, next(self._seq), trace)
+        with self._lock:
+            if len(self._heap) < self.capacity:
+                heapq.heappush(self._heap, entry)
+            elif self.capacity and entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def slowest(self, limit: int | None = None, name: str | None = None) -> list[Trace]:
+        """Recorded traces, slowest first, optionally only those called ``name``."""
+        with self._lock:
+            entries = sorted(self._heap, reverse=True)
+        traces = [trace for _, _, trace in entries if name is None or trace.name == name]
+        return traces[:limit] if limit is not None else traces
+
+    def reset(self) -> None:
+        """Forget all traces (for testing only)."""
+        with self._lock:
+            self._heap.clear()
+
+
+RECORDER = TraceRecorder()
+_enabled = False
+_exporter = None
+
+
+def configure(enabled: bool, slowest: int = 50, otlp_endpoint: str = "") -> None:
+    """Turn tracing on or off and set where finished traces go."""
+    global _enabled, _exporter
+    _enabled = enabled
+    RECORDER.capacity = slowest
+    _exporter = _otlp_exporter(otlp_endpoint) if enabled and otlp_endpoint else None
+
+
+def configure_from_settings() -> None:
+    from app.config import settings
+
+    configure(settings.trace_enabled, settings.trace_slowest, settings.trace_otlp_endpoint)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def start(name: str, start: float | None = None, **attrs) -> "Trace | NullTrace":
+    """A new trace, or ``NULL_TRACE`` while tracing is disabled."""
+    if not _enabled:
+        return NULL_TRACE
+    return Trace(name, start, **attrs)
+
+
+def current() -> "Trace | NullTrace":
+    """The trace of the running request (``NULL_TRACE`` if none)."""
+    return _current.get()
+
+
+def span(name: str, **attrs):
+    """Time the ``with`` block as a span of the current trace."""
+    return _current.get().span(name, **attrs)
+
+
+@contextlib.contextmanager
+def activate(trace: "Trace | NullTrace", finish: bool = False) -> Iterator[None]:
+    """Make ``trace`` the current trace inside the ``with`` block.
+
+    An exception leaving the block is noted on the trace as ``error``;
+    with ``finish`` the trace is finished on the way out.
+    """
+    if not trace:
+        yield
+        return
+    token = _current.set(trace)
+    try:
+        yield
+    except BaseException as e:
+        trace.set(error=type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        if finish:
+            trace.finish()
+
+
+def _finished(trace: Trace) -> None:
+    RECORDER.record(trace)
+    if _exporter is not None:
+        try:
+            _exporter(trace)
+        except Exception:
+            logger.warning("Trace export failed", exc_info=True)
+
+
+def _otlp_exporter(endpoint: str):
+    """Export function sending traces to an OTLP/HTTP collector; None if unavailable."""
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.trace import set_span_in_context
+    except ImportError:
+        logger.warning(
+            "STT_TRACE_OTLP_ENDPOINT is set but OpenTelemetry is not installed "
+            "(pip install 'stt-local-backend[tracing]'); keeping traces in memory only"
+        )
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "stt-local"}))
+    provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint.rstrip("/") + "/v1/traces"))
+    )
+    tracer = provider.get_tracer(__name__)
+
+    def export(trace: Trace) -> None:
+        def ns(t: float) -> int:
+            return trace.wall_start_ns + int((t - trace.start) * 1e9)
+
+        def attributes(attrs: dict) -> dict:
+            return {k: v for k, v in attrs.items() if v is not None}
+
+        root = tracer.start_span(
+            trace.name, start_time=ns(trace.start), attributes=attributes(trace.attrs)
+        )
+        parent = set_span_in_context(root)
+        for name, start, end, attrs in trace.spans:
+            tracer.start_span(
+                name, context=parent, start_time=ns(start), attributes=attributes(attrs)
+            ).end(end_time=ns(end))
+        root.end(end_time=ns(trace.end))
+
+    return export
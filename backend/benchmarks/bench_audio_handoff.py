@@ -0,0 +1,96 @@
+"""Benchmark handing audio buffers to another process: pickling versus the arena.
+
+A child process stands in for an engine worker. Each handoff sends one
+buffer and waits for the child to read its last sample:
+
+* ``pickle``       the array itself through a pipe (what an executor does)
+* ``arena_copy``   copied into the shared audio arena, handle through the pipe
+* ``arena``        already in the arena (a session buffer), handle only
+
+Usage (from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.bench_audio_handoff --durations 5 30 600
+"""
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import time
+
+import numpy as np
+
+from app.audio.arena import AudioArena, open_views
+from benchmarks.common import SAMPLE_RATE, print_table
+
+MODES = ("pickle", "arena_copy", "arena")
+
+
+def _child(conn) -> None:
+    """Read each buffer (array or arena handle) and answer with its last sample."""
+    while (message := conn.recv()) is not None:
+        audio = open_views([message])[0] if isinstance(message, dict) else message
+        conn.send(float(audio[-1]))
+
+
+def measure(durations_s: list[float], runs: int = 20) -> list[dict]:
+    """Median and p95 milliseconds per handoff, per buffer duration and mode."""
+    largest = int(max(durations_s) * SAMPLE_RATE)
+    arena = AudioArena(2 * largest * 4 + 2 * SAMPLE_RATE * 4)
+    parent, child = multiprocessing.get_context("spawn").Pipe()
+    process = multiprocessing.get_context("spawn").Process(target=_child, args=(child,))
+    process.start()
+    rows = []
+    try:
+        for duration_s in durations_s:
+            audio = np.random.default_rng(0).standard_normal(
+                int(duration_s * SAMPLE_RATE)
+            ).astype(np.float32)
+            resident = arena.alloc(len(audio))
+            arena.view(resident)[:] = audio
+            sources = {"pickle": audio, "arena_copy": audio, "arena": arena.view(resident)}
+            for mode in MODES:
+                timings = []
+                for _ in range(runs + 1):
+                    start = time.perf_counter()
+                    if mode == "pickle":
+                        parent.send(sources[mode])
+                        parent.recv()
+                    else:
+                        handle = arena.share(sources[mode])
+                        parent.send(handle.as_dict())
+                        parent.recv()
+                        arena.release(handle)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings = sorted(timings[1:])  # The first run attaches the arena
+                rows.append({
+                    "duration_s": duration_s,
+                    "mode": mode,
+                    "median_ms": round(statistics.median(timings), 3),
+                    "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 3),
+                })
+            arena.release(resident)
+            del sources
+    finally:
+        parent.send(None)
+        process.join()
+        arena.close()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[5.0, 30.0, 600.0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    rows = measure(args.durations, args.runs)
+    print_table(rows, ["duration_s", "mode", "median_ms", "p95_ms"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark bytes sent per minute of speech with full versus delta partials.
+
+Replays each reference clip as a live stream through the incremental
+decoder: a partial every ``--partial-s`` seconds of audio and a final
+every ``--final-s`` seconds, as the WebSocket route does. Every partial
+and final is serialized as the route would send it, once as full
+``partial`` messages and once as ``partial_delta`` updates. Longer final
+windows make full partials re-send more text. Usage (from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.bench_partial_bytes --size tiny --final-s 5 15 30
+"""
+
+import argparse
+import json
+
+from app.config import get_model_repo
+from app.models import FinalResult, PartialResult
+from app.session.delta import PartialDiffer, Segment
+from benchmarks.common import SAMPLE_RATE, load_reference_set, print_table, use_cpu_backend
+
+
+def _segments(result: dict) -> list[Segment]:
+    return [
+        (seg["text"].strip(), round(seg["start"] * 1000), round(seg["end"] * 1000))
+        for seg in result.get("segments", [])
+        if seg["text"].strip()
+    ]
+
+
+def _size(message: dict) -> int:
+    """Bytes of a JSON text frame as Starlette's ``send_json`` encodes it."""
+    return len(json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def wire_bytes(windows: list[tuple[list[list[Segment]], list[Segment]]], delta: bool) -> dict:
+    """Bytes and messages sent for a stream.
+
+    Args:
+        windows: Per final window, the segments of each partial and of the final.
+        delta: Send partials as ``partial_delta`` updates instead of in full.
+    """
+    differ = PartialDiffer()
+    partial_bytes = final_bytes = messages = 0
+    for partials, final in windows:
+        for segments in partials:
+            if delta:
+                update = differ.diff(segments)
+                sent = [update.model_dump(exclude_none=True)] if update is not None else []
+            else:
+                sent = [
+                    PartialResult(text=t, start_ms=s, end_ms=e).model_dump(exclude_none=True)
+                    for t, s, e in segments
+                ]
+            partial_bytes += sum(map(_size, sent))
+            messages += len(sent)
+        for t, s, e in final:
+            final_bytes += _size(FinalResult(text=t, start_ms=s, end_ms=e).model_dump(exclude_none=True))
+            messages += 1
+        differ.reset()
+    return {"partial_bytes": partial_bytes, "final_bytes": final_bytes, "messages": messages}
+
+
+def replay(engine, clip, partial_s: float, final_s: float):
+    """Stream one clip through the engine; returns the segments of every message."""
+    step = int(partial_s * SAMPLE_RATE)
+    window = int(final_s * SAMPLE_RATE)
+    stream = engine.open_stream()
+    windows = []
+    partials: list[list[Segment]] = []
+    start = end = 0
+    while end < len(clip.audio):
+        end = min(end + step, len(clip.audio))
+        result = engine.transcribe_stream(stream, clip.audio[start:end], clip.language)
+        if end - start >= window or end == len(clip.audio):
+            windows.append((partials, _segments(result)))
+            partials = []
+            stream.reset()
+            start = end
+        else:
+            partials.append(_segments(result))
+    return windows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="tiny")
+    parser.add_argument("--precision", default="fp16")
+    parser.add_argument("--partial-s", type=float, default=2.0)
+    parser.add_argument("--final-s", type=float, nargs="+", default=[5.0, 15.0, 30.0])
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    from app.engine.factory import TranscriptionEngine
+
+    use_cpu_backend()
+    clips = load_reference_set()
+    engine = TranscriptionEngine()
+    engine.load(
+        model_repo=get_model_repo(args.size, args.precision),
+        language=clips[0].language,
+        precision=args.precision,
+    )
+    minutes = sum(len(clip.audio) for clip in clips) / SAMPLE_RATE / 60
+
+    rows = []
+    for final_s in args.final_s:
+        windows = [w for clip in clips for w in replay(engine, clip, args.partial_s, final_s)]
+        for mode in ("full", "delta"):
+            sent = wire_bytes(windows, delta=mode == "delta")
+            rows.append({
+                "final_s": final_s,
+                "partials": mode,
+                "partial_bytes_per_min": round(sent["partial_bytes"] / minutes),
+                "total_bytes_per_min": round((sent["partial_bytes"] + sent["final_bytes"]) / minutes),
+                "messages_per_min": round(sent["messages"] / minutes, 1),
+            })
+
+    print_table(
+        rows,
+        ["final_s", "partials", "partial_bytes_per_min", "total_bytes_per_min", "messages_per_min"],
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark encoder/decoder pipelining under concurrent short clips.
+
+Queues ``--concurrency`` short clips at once (as many live sessions
+would) and measures clips per second with the stages run back-to-back on
+the MLX thread (depth 0) and with the mel + encoder stage of queued clips
+running ahead on the scheduler's prefetch thread (each ``--depths``
+value bounds the clips encoded ahead). Runs on the MLX CPU device, where
+the two threads can compute at once. Usage (from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.bench_pipeline --size tiny --length 3 --depths 0 1 2
+
+``--synthetic ENCODE_MS DECODE_MS`` drives the scheduler with sleeping
+stages of those lengths instead of the model, to check the scheduling
+alone on machines without mlx-whisper.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.config import get_model_repo, settings
+from app.engine.scheduler import LIVE_PARTIAL, Scheduler
+from benchmarks.bench_short_clips import cut
+from benchmarks.common import load_reference_set, print_table
+
+
+def simulate(encode_ms: float, decode_ms: float, jobs: int, depth: int) -> float:
+    """Jobs per second through a scheduler whose stages sleep for the given times."""
+    scheduler = Scheduler(name=f"sim-{depth}", prefetch=depth)
+    started = time.perf_counter()
+    futures = [
+        scheduler.submit(
+            lambda features: time.sleep(decode_ms / 1000),
+            LIVE_PARTIAL,
+            prepare=lambda: time.sleep(encode_ms / 1000),
+        )
+        for _ in range(jobs)
+    ]
+    for future in futures:
+        future.result()
+    return jobs / (time.perf_counter() - started)
+
+
+async def _throughput(engine, pieces: list, concurrency: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(pieces), concurrency):
+        await asyncio.gather(*(
+            engine.transcribe_async(audio, language, job_class=LIVE_PARTIAL)
+            for language, audio in pieces[start:start + concurrency]
+        ))
+    return len(pieces) / (time.perf_counter() - started)
+
+
+def measure_model(args) -> list[dict]:
+    from app.engine.factory import TranscriptionEngine
+
+    clips = load_reference_set()
+    pieces = cut(clips, args.length) * args.repeat
+    if not pieces:
+        raise SystemExit(f"No reference clip is {args.length} s long")
+    repo = get_model_repo(args.size, args.precision)
+    rows = []
+    for depth in args.depths:
+        # Engines share mlx-whisper's model cache, so the weights load once
+        engine = TranscriptionEngine()
+        engine.load(
+            model_repo=repo,
+            language=clips[0].language,
+            short_clip_buckets_s=settings.short_clip_buckets_s,
+            device="cpu",
+            pipeline_depth=depth,
+        )
+        if not engine.short_clip_buckets_s:
+            raise SystemExit("Short-clip fast path is not supported by this backend")
+        asyncio.run(_throughput(engine, pieces[:1], 1))  # Warm up both stages
+        rows.append({
+            "depth": depth,
+            "clips": len(pieces),
+            "clips_per_s": round(asyncio.run(_throughput(engine, pieces, args.concurrency)), 2),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="tiny")
+    parser.add_argument("--precision", default="fp16")
+    parser.add_argument("--length", type=float, default=3.0, help="clip length in seconds")
+    parser.add_argument("--repeat", type=int, default=2, help="passes over the clips")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--synthetic", type=float, nargs=2, metavar=("ENCODE_MS", "DECODE_MS"))
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        encode_ms, decode_ms = args.synthetic
+        rows = [
+            {"depth": depth, "clips": args.concurrency * args.repeat, "clips_per_s": round(
+                simulate(encode_ms, decode_ms, args.concurrency * args.repeat, depth), 2
+            )}
+            for depth in args.depths
+        ]
+    else:
+        rows = measure_model(args)
+    base = rows[0]["clips_per_s"]
+    for row in rows:
+        row["speedup"] = round(row["clips_per_s"] / base, 2)
+    print_table(rows, ["depth", "clips", "clips_per_s", "speedup"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark speed, memory and WER for each (model size, precision) pair.
+
+Each pair runs in its own subprocess on the MLX CPU backend so peak
+memory is measured per model. Usage (from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.bench_precision --sizes tiny small \\
+        --precisions fp16 int8 int4 --runs 3
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from app.config import MODEL_PRECISIONS, get_model_repo
+from benchmarks.common import (
+    load_reference_set,
+    peak_rss_mb,
+    print_table,
+    use_cpu_backend,
+    word_error_rate,
+)
+
+
+def run_pair(size: str, precision: str, runs: int) -> dict:
+    """Load one model variant and measure it on the reference set."""
+    from app.engine.factory import TranscriptionEngine
+
+    use_cpu_backend()
+    clips = load_reference_set()
+    repo = get_model_repo(size, precision)
+
+    engine = TranscriptionEngine()
+    started = time.perf_counter()
+    engine.load(model_repo=repo, language=clips[0].language, precision=precision)
+    load_s = time.perf_counter() - started
+
+    audio_s = 0.0
+    compute_s = 0.0
+    errors = []
+    for clip in clips:
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = engine.transcribe(clip.audio, clip.language)
+            compute_s += time.perf_counter() - started
+            audio_s += clip.duration_s
+        errors.append(word_error_rate(clip.text, result["text"]))
+
+    return {
+        "size": size,
+        "precision": precision,
+        "repo": repo,
+        "load_s": round(load_s, 2),
+        "rtf": round(compute_s / audio_s, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "wer": round(sum(errors) / len(errors), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base", "small"])
+    parser.add_argument("--precisions", nargs="+", default=list(MODEL_PRECISIONS))
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per clip")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--pair", nargs=2, metavar=("SIZE", "PRECISION"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.pair:
+        print(json.dumps(run_pair(args.pair[0], args.pair[1], args.runs)))
+        return
+
+    rows = []
+    for size in args.sizes:
+        for precision in args.precisions:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_precision",
+                 "--pair", size, precision, "--runs", str(args.runs)],
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{size}/{precision} failed:\n{proc.stderr}", file=sys.stderr)
+                continue
+            rows.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print_table(rows, ["size", "precision", "load_s", "rtf", "peak_rss_mb", "wer"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
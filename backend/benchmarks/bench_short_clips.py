@@ -0,0 +1,104 @@
+"""Benchmark the short-clip fast path against full 30 s windows.
+
+Cuts the reference clips into short pieces (command-length utterances)
+and transcribes each piece with the full window and with the truncated
+window of its length bucket. Reports latency per clip and the WER of the
+fast path against the full-window transcript. Usage (from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.bench_short_clips --size tiny --lengths 1 2 3 5 8
+"""
+
+import argparse
+import json
+import time
+
+from app.config import get_model_repo, settings
+from benchmarks.common import (
+    SAMPLE_RATE,
+    load_reference_set,
+    print_table,
+    use_cpu_backend,
+    word_error_rate,
+)
+
+
+def cut(clips, length_s: float) -> list:
+    """Split every clip into consecutive pieces of ``length_s`` seconds."""
+    n = int(length_s * SAMPLE_RATE)
+    return [
+        (clip.language, clip.audio[start:start + n])
+        for clip in clips
+        for start in range(0, len(clip.audio) - n + 1, n)
+    ]
+
+
+def timed(engine, pieces, runs: int) -> tuple[float, list[str]]:
+    """Mean milliseconds per piece, and the transcript of each piece."""
+    texts = []
+    elapsed = 0.0
+    for language, audio in pieces:
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = engine.transcribe(audio, language)
+            elapsed += time.perf_counter() - started
+        texts.append(result["text"])
+    return 1000 * elapsed / (len(pieces) * runs), texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="tiny")
+    parser.add_argument("--precision", default="fp16")
+    parser.add_argument("--lengths", nargs="+", type=float, default=[1.0, 2.0, 3.0, 5.0, 8.0])
+    parser.add_argument(
+        "--buckets", nargs="+", type=float, default=settings.short_clip_buckets_s,
+        help="fast-path length buckets in seconds",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per piece")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    from app.engine.factory import TranscriptionEngine
+    from app.engine.window import bucket_for
+
+    use_cpu_backend()
+    clips = load_reference_set()
+    repo = get_model_repo(args.size, args.precision)
+
+    # Both engines share mlx-whisper's model cache, so the weights load once
+    full = TranscriptionEngine()
+    full.load(model_repo=repo, language=clips[0].language, short_clip_buckets_s=[])
+    fast = TranscriptionEngine()
+    fast.load(model_repo=repo, language=clips[0].language, short_clip_buckets_s=args.buckets)
+    if not fast.short_clip_buckets_s:
+        raise SystemExit("Short-clip fast path is not supported by this backend")
+
+    rows = []
+    for length_s in args.lengths:
+        pieces = cut(clips, length_s)
+        if not pieces:
+            continue
+        full_ms, full_texts = timed(full, pieces, args.runs)
+        fast_ms, fast_texts = timed(fast, pieces, args.runs)
+        errors = [word_error_rate(ref, hyp) for ref, hyp in zip(full_texts, fast_texts)]
+        rows.append({
+            "length_s": length_s,
+            "bucket_s": bucket_for(int(length_s * SAMPLE_RATE), fast.short_clip_buckets_s),
+            "clips": len(pieces),
+            "full_ms": round(full_ms, 1),
+            "window_ms": round(fast_ms, 1),
+            "speedup": round(full_ms / fast_ms, 2),
+            "wer_vs_full": round(sum(errors) / len(errors), 4),
+        })
+
+    print_table(
+        rows,
+        ["length_s", "bucket_s", "clips", "full_ms", "window_ms", "speedup", "wer_vs_full"],
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark stateless versus incremental decoding of streaming partials.
+
+Replays each reference clip as a live stream: a partial every
+``--partial-s`` seconds of audio and a final every ``--final-s`` seconds,
+as the WebSocket route does. Reports decoder steps and latency per
+partial for both modes, plus the WER of the concatenated finals. Usage
+(from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.bench_stream_decode --size tiny
+"""
+
+import argparse
+import json
+import time
+
+from app.config import get_model_repo
+from app.engine.stream import count_decoder_steps
+from benchmarks.common import (
+    SAMPLE_RATE,
+    load_reference_set,
+    print_table,
+    use_cpu_backend,
+    word_error_rate,
+)
+
+
+def replay(engine, clip, incremental: bool, partial_s: float, final_s: float) -> dict:
+    """Stream one clip through the engine and collect per-partial costs."""
+    step = int(partial_s * SAMPLE_RATE)
+    window = int(final_s * SAMPLE_RATE)
+    stream = engine.open_stream()
+    finals: list[str] = []
+    steps: list[int] = []
+    latencies: list[float] = []
+
+    start = 0
+    end = 0
+    while end < len(clip.audio):
+        end = min(end + step, len(clip.audio))
+        audio = clip.audio[start:end]
+        is_final = end - start >= window or end == len(clip.audio)
+
+        began = time.perf_counter()
+        if incremental:
+            before = stream.decoder_steps
+            result = engine.transcribe_stream(stream, audio, clip.language)
+            steps.append(stream.decoder_steps - before)
+        else:
+            result = engine.transcribe(audio, clip.language)
+            steps.append(count_decoder_steps(result))
+        latencies.append(time.perf_counter() - began)
+
+        if is_final:
+            finals.append(result["text"].strip())
+            stream.reset()
+            start = end
+
+    return {
+        "steps": steps,
+        "latencies": latencies,
+        "wer": word_error_rate(clip.text, " ".join(finals)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="tiny")
+    parser.add_argument("--precision", default="fp16")
+    parser.add_argument("--partial-s", type=float, default=2.0)
+    parser.add_argument("--final-s", type=float, default=5.0)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    from app.engine.factory import TranscriptionEngine
+
+    use_cpu_backend()
+    clips = load_reference_set()
+    engine = TranscriptionEngine()
+    engine.load(
+        model_repo=get_model_repo(args.size, args.precision),
+        language=clips[0].language,
+        precision=args.precision,
+    )
+
+    rows = []
+    for mode, incremental in (("stateless", False), ("incremental", True)):
+        steps: list[int] = []
+        latencies: list[float] = []
+        errors = []
+        for clip in clips:
+            run = replay(engine, clip, incremental, args.partial_s, args.final_s)
+            steps += run["steps"]
+            latencies += run["latencies"]
+            errors.append(run["wer"])
+        rows.append({
+            "mode": mode,
+            "partials": len(steps),
+            "steps_per_partial": round(sum(steps) / len(steps), 1),
+            "ms_per_partial": round(1000 * sum(latencies) / len(latencies), 1),
+            "wer": round(sum(errors) / len(errors), 4),
+        })
+
+    print_table(rows, ["mode", "partials", "steps_per_partial", "ms_per_partial", "wer"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
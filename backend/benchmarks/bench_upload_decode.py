@@ -0,0 +1,113 @@
+"""Benchmark concurrent upload decoding: decode threads versus the process pool.
+
+Decodes ``--concurrency`` copies of one upload at once through a
+``DecodePool`` of each size (0 = a thread per upload, the old path) and
+reports decoded files per second. Meanwhile a probe task sleeps 10 ms in
+a loop on the same event loop; how late it wakes up (p50/p99 loop lag)
+is the delay WebSocket frames would see while the uploads decode.
+
+The default upload is a synthetic 30 s 44.1 kHz stereo WAV, so every
+decode resamples. Usage (from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.bench_upload_decode --workers 0 1 2 4
+    .venv/bin/python -m benchmarks.bench_upload_decode --file talk.mp3
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import time
+import wave
+
+import numpy as np
+
+from app.audio.arena import AudioArena
+from app.audio.decode_pool import DecodePool
+from benchmarks.common import print_table
+
+PROBE_S = 0.010
+
+
+def synthetic_wav(duration_s: float = 30.0, rate: int = 44100) -> bytes:
+    """A stereo 16-bit WAV of noise at ``rate`` Hz."""
+    samples = np.random.default_rng(0).integers(
+        -8000, 8000, size=(int(duration_s * rate), 2), dtype=np.int16
+    )
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_S)
+        lags.append((time.perf_counter() - start - PROBE_S) * 1000)
+
+
+async def _run(pool: DecodePool, raw: bytes, concurrency: int) -> dict:
+    async def one() -> None:
+        async with pool.decode(raw):
+            pass
+
+    await one()  # Start the pool processes outside the measurement
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    lags.sort()
+    return {
+        "files_per_s": round(concurrency / elapsed, 2),
+        "lag_p50_ms": round(lags[len(lags) // 2], 2) if lags else 0.0,
+        "lag_p99_ms": round(lags[int(0.99 * (len(lags) - 1))], 2) if lags else 0.0,
+    }
+
+
+def measure(raw: bytes, workers: list[int], concurrency: int, arena_mb: int = 0) -> list[dict]:
+    """Throughput and event-loop lag per decode pool size."""
+    rows = []
+    for count in workers:
+        arena = AudioArena(arena_mb * 1024 * 1024) if arena_mb and count else None
+        pool = DecodePool(count, max_pending=concurrency, arena=arena)
+        try:
+            rows.append({"workers": count, **asyncio.run(_run(pool, raw, concurrency))})
+        finally:
+            pool.shutdown()
+            if arena is not None:
+                arena.close()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", help="upload to decode (default: synthetic 30 s WAV)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--arena-mb", type=int, default=0,
+                        help="return samples through a shared arena of this size")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            raw = f.read()
+    else:
+        raw = synthetic_wav()
+    rows = measure(raw, args.workers, args.concurrency, args.arena_mb)
+    print_table(rows, ["workers", "files_per_s", "lag_p50_ms", "lag_p99_ms"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
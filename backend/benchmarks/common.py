@@ -0,0 +1,83 @@
+"""Shared helpers for the benchmark scripts: reference set, WER, resource usage."""
+
+import json
+import re
+import resource
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REFERENCE_MANIFEST = Path(__file__).parent / "reference" / "manifest.json"
+SAMPLE_RATE = 16000
+
+
+class ReferenceClip:
+    """One entry of the reference set: audio, language and expected text."""
+
+    def __init__(self, id: str, audio: np.ndarray, language: str, text: str) -> None:
+        self.id = id
+        self.audio = audio
+        self.language = language
+        self.text = text
+
+    @property
+    def duration_s(self) -> float:
+        return len(self.audio) / SAMPLE_RATE
+
+
+def load_reference_set(manifest: Path = REFERENCE_MANIFEST) -> list[ReferenceClip]:
+    """Load the clips listed in a manifest (audio paths relative to it)."""
+    import librosa
+
+    clips = []
+    for entry in json.loads(manifest.read_text()):
+        audio, _ = librosa.load(manifest.parent / entry["audio"], sr=SAMPLE_RATE, mono=True)
+        clips.append(ReferenceClip(entry["id"], audio, entry["language"], entry["text"]))
+    return clips
+
+
+def normalize_text(text: str) -> list[str]:
+    """Lower-case, strip punctuation and split into words."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word error rate of ``hypothesis`` against ``reference`` (Levenshtein on words)."""
+    ref = normalize_text(reference)
+    hyp = normalize_text(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def use_cpu_backend() -> None:
+    """Run MLX on the CPU so results are comparable across node classes."""
+    import mlx.core as mx
+
+    mx.set_default_device(mx.cpu)
+
+
+def print_table(rows: list[dict], columns: list[str]) -> None:
+    """Print rows as an aligned plain-text table."""
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
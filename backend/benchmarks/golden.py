@@ -0,0 +1,126 @@
+"""Check that transcripts have not drifted from recorded golden outputs.
+
+Runs the reference set through every decode preset and compares each
+transcript with the one recorded in ``reference/golden-<size>.json``.
+A change meant to be output-neutral (a faster kernel, a new batching
+path, a different precision) should show zero drift; any clip whose
+word-level difference from its golden transcript exceeds ``--max-drift``
+is flagged and the exit status is 1.
+
+The engine loads from the usual ``STT_`` settings, so an optimization
+switched by a setting is checked by running once with it off and
+``--update``, then again with it on. Usage (from ``backend/``)::
+
+    .venv/bin/python -m benchmarks.golden --size tiny --update
+    STT_SHORT_CLIP_BUCKETS_S='[]' .venv/bin/python -m benchmarks.golden --size tiny
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import load_reference_set, print_table, use_cpu_backend, word_error_rate
+
+GOLDEN_DIR = Path(__file__).parent / "reference"
+
+
+def golden_path(size: str) -> Path:
+    return GOLDEN_DIR / f"golden-{size}.json"
+
+
+def run_presets(size: str, presets: list[str]) -> tuple[dict[str, dict[str, str]], dict[str, float]]:
+    """Transcribe the reference set with each preset.
+
+    Returns ``{preset: {clip id: text}}`` and the real-time factor of each preset.
+    """
+    from app.config import settings
+    from app.engine.factory import TranscriptionEngine, load_kwargs_from_settings
+    from app.engine.options import preset_options
+
+    use_cpu_backend()
+    clips = load_reference_set()
+    config = settings.model_copy(update={"model_size": size, "language": clips[0].language})
+    engine = TranscriptionEngine()
+    engine.load(**load_kwargs_from_settings(config))
+
+    outputs: dict[str, dict[str, str]] = {}
+    rtf: dict[str, float] = {}
+    for preset in presets:
+        options = preset_options(preset)
+        compute_s = 0.0
+        outputs[preset] = {}
+        for clip in clips:
+            started = time.perf_counter()
+            result = engine.transcribe(clip.audio, clip.language, options=options)
+            compute_s += time.perf_counter() - started
+            outputs[preset][clip.id] = result["text"].strip()
+        rtf[preset] = compute_s / sum(clip.duration_s for clip in clips)
+    return outputs, rtf
+
+
+def compare(
+    golden: dict[str, dict[str, str]],
+    outputs: dict[str, dict[str, str]],
+    max_drift: float = 0.0,
+) -> tuple[list[dict], bool]:
+    """Compare transcripts with their golden versions.
+
+    Drift is the word error rate of a transcript against its golden
+    transcript. Clips or presets missing from ``golden`` are flagged too,
+    since nothing vouches for them.
+
+    Returns one row per (preset, clip) and whether any row drifted.
+    """
+    rows = []
+    for preset, texts in outputs.items():
+        for clip_id, text in texts.items():
+            expected = golden.get(preset, {}).get(clip_id)
+            drift = 1.0 if expected is None else word_error_rate(expected, text)
+            rows.append({
+                "preset": preset,
+                "clip": clip_id,
+                "drift": round(drift, 4),
+                "status": "missing" if expected is None else "drift" if drift > max_drift else "ok",
+                "text": text,
+            })
+    return rows, any(row["status"] != "ok" for row in rows)
+
+
+def main() -> int:
+    from app.engine.options import PRESETS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="tiny", help="model size")
+    parser.add_argument("--presets", nargs="+", default=list(PRESETS), choices=list(PRESETS))
+    parser.add_argument("--max-drift", type=float, default=0.0, help="word error rate tolerated per clip")
+    parser.add_argument("--update", action="store_true", help="record the outputs as the new golden set")
+    args = parser.parse_args()
+
+    outputs, rtf = run_presets(args.size, args.presets)
+    path = golden_path(args.size)
+    if args.update:
+        golden = json.loads(path.read_text()) if path.exists() else {}
+        golden.update(outputs)
+        path.write_text(json.dumps(golden, indent=2, ensure_ascii=False) + "\n")
+        print(f"Recorded {path}")
+        return 0
+    if not path.exists():
+        print(f"No golden outputs at {path}; record them with --update", file=sys.stderr)
+        return 2
+
+    rows, drifted = compare(json.loads(path.read_text()), outputs, args.max_drift)
+    print_table(rows, ["preset", "clip", "drift", "status"])
+    print_table(
+        [{"preset": preset, "rtf": round(value, 4)} for preset, value in rtf.items()],
+        ["preset", "rtf"],
+    )
+    for row in rows:
+        if row["status"] != "ok":
+            print(f"{row['preset']}/{row['clip']}: {row['text']!r}", file=sys.stderr)
+    return 1 if drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Tests for app.audio.arena (shared-memory audio arena)."""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from app.audio.arena import AudioArena, AudioHandle, open_views
+
+SLAB = 100
+
+
+@pytest.fixture()
+def arena():
+    arena = AudioArena(8 * SLAB * 4, slab_samples=SLAB)
+    yield arena
+    arena.close()
+
+
+def _read_in_child(fields: dict, conn) -> None:
+    conn.send(open_views([fields])[0].tolist())
+
+
+class TestAllocation:
+    def test_alloc_takes_whole_slabs(self, arena):
+        handle = arena.alloc(150)
+        assert (handle.slab, handle.slabs, handle.length) == (0, 2, 150)
+        assert arena.free_slabs == 6
+        assert len(arena.view(handle)) == 150
+
+    def test_release_frees_slabs_for_reuse(self, arena):
+        first = arena.alloc(SLAB)
+        second = arena.alloc(SLAB)
+        arena.release(first)
+        assert arena.alloc(SLAB).slab == first.slab
+        assert second.slab == 1
+
+    def test_needs_contiguous_run(self, arena):
+        handles = [arena.alloc(SLAB) for _ in range(8)]
+        for handle in handles[::2]:
+            arena.release(handle)
+        assert arena.free_slabs == 4
+        assert arena.alloc(2 * SLAB) is None
+
+    def test_full_arena_returns_none(self, arena):
+        assert arena.alloc(9 * SLAB) is None
+
+    def test_retained_allocation_survives_one_release(self, arena):
+        handle = arena.alloc(SLAB)
+        arena.retain(handle)
+        arena.release(handle)
+        assert arena.free_slabs == 7
+        arena.release(handle)
+        assert arena.free_slabs == 8
+        with pytest.raises(ValueError, match="released more often"):
+            arena.release(handle)
+
+
+class TestSharing:
+    def test_find_locates_views_inside_allocations(self, arena):
+        handle = arena.alloc(250)
+        view = arena.view(handle)
+        found = arena.find(view[120:200])
+        assert found == AudioHandle(arena.name, 0, 3, 120, 80)
+        assert arena.find(np.zeros(10, dtype=np.float32)) is None
+        assert arena.find(view[::2]) is None
+
+    def test_share_in_place_retains(self, arena):
+        handle = arena.alloc(SLAB)
+        view = arena.view(handle)
+        shared = arena.share(view[:50])
+        assert (shared.slab, shared.length) == (handle.slab, 50)
+        arena.release(handle)
+        assert arena.free_slabs == 7  # still held by the shared handle
+        arena.release(shared)
+        assert arena.free_slabs == 8
+
+    def test_share_copies_private_arrays(self, arena):
+        audio = np.arange(30, dtype=np.float32)
+        shared = arena.share(audio)
+        np.testing.assert_array_equal(arena.view(shared), audio)
+
+    def test_view_in_another_process(self, arena):
+        handle = arena.alloc(5)
+        arena.view(handle)[:] = np.arange(5)
+        parent, child = multiprocessing.get_context("spawn").Pipe()
+        process = multiprocessing.get_context("spawn").Process(
+            target=_read_in_child, args=(handle.as_dict(), child)
+        )
+        process.start()
+        assert parent.recv() == [0.0, 1.0, 2.0, 3.0, 4.0]
+        process.join()
+
+    def test_attach_without_lock_is_read_only(self, arena):
+        handle = arena.alloc(5)
+        attached = AudioArena.attach(arena.name)
+        try:
+            assert len(attached.view(handle)) == 5
+            with pytest.raises(RuntimeError, match="read-only"):
+                attached.alloc(5)
+        finally:
+            attached.close()
+
+    def test_attach_unknown_name(self):
+        with pytest.raises(ValueError, match="does not exist"):
+            AudioArena.attach("stt-no-such-arena")
@@ -0,0 +1,210 @@
+"""Tests for offline batch transcription (app/batch.py, app/cli.py)."""
+
+import json
+
+import numpy as np
+import pytest
+import soundfile
+
+from app.batch import JsonlSink, find_audio, open_sink, run_batch
+from app.cli import main
+from app.engine.factory import TranscriptionEngine
+
+
+def _write_wav(path, seconds: float) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    soundfile.write(path, np.zeros(int(seconds * 16000), dtype=np.float32), 16000)
+
+
+@pytest.fixture()
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    _write_wav(root / "a.wav", 1.0)
+    _write_wav(root / "sub" / "b.wav", 2.0)
+    _write_wav(root / "long.wav", 3.0)
+    (root / "notes.txt").write_text("not audio")
+    return root
+
+
+@pytest.fixture()
+def engine(loaded_engine, monkeypatch):
+    """Engine whose results report the clip length in samples."""
+    calls = []
+
+    def mock_transcribe(audio, language=None, initial_prompt=None):
+        calls.append(len(audio))
+        text = f"len {len(audio)}"
+        return {"text": text, "segments": [{"text": text, "start": 0.0, "end": 1.0}]}
+
+    monkeypatch.setattr(loaded_engine, "transcribe", mock_transcribe)
+    loaded_engine.calls = calls
+    return loaded_engine
+
+
+def _records(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestFindAudio:
+    def test_recurses_and_filters_by_extension(self, corpus):
+        paths = find_audio([corpus])
+        assert [p.name for p in paths] == ["a.wav", "long.wav", "b.wav"]
+        assert all(p.is_absolute() for p in paths)
+
+    def test_missing_input_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            find_audio([tmp_path / "missing"])
+
+
+class TestJsonlSink:
+    def test_completed_drops_truncated_last_line(self, tmp_path):
+        out = tmp_path / "out.jsonl"
+        out.write_text(json.dumps({"path": "/a.wav"}) + "\n" + '{"path": "/b.w')
+        sink = JsonlSink(out)
+        assert sink.completed() == {"/a.wav"}
+        sink.write({"path": "/c.wav"})
+        sink.close()
+        assert [r["path"] for r in _records(out)] == ["/a.wav", "/c.wav"]
+
+    def test_failed_records_are_not_completed(self, tmp_path):
+        out = tmp_path / "out.jsonl"
+        out.write_text(
+            json.dumps({"path": "/a.wav", "error": None}) + "\n"
+            + json.dumps({"path": "/b.wav", "error": "Transcription failed: busy"}) + "\n"
+        )
+        assert JsonlSink(out).completed() == {"/a.wav"}
+
+    def test_open_sink_by_suffix(self, tmp_path):
+        assert isinstance(open_sink(tmp_path / "out.jsonl"), JsonlSink)
+
+
+class TestRunBatch:
+    async def test_transcribes_every_file(self, engine, corpus, tmp_path):
+        out = tmp_path / "out.jsonl"
+        stats = await run_batch(
+            engine, find_audio([corpus]), JsonlSink(out), decode_workers=0, chunk_s=2.5
+        )
+        records = {r["path"].rsplit("/", 1)[-1]: r for r in _records(out)}
+        assert records["a.wav"]["text"] == "len 16000"
+        assert records["b.wav"]["segments"][0]["end_ms"] == 1000
+        # Longer than chunk_s: transcribed in two chunks
+        assert records["long.wav"]["duration_ms"] == 3000.0
+        assert len(records["long.wav"]["segments"]) == 2
+        assert stats.files == 3 and stats.failed == 0
+        assert stats.audio_s == pytest.approx(6.0)
+        assert stats.files_per_s > 0
+
+    async def test_resumes_after_files_already_written(self, engine, corpus, tmp_path):
+        out = tmp_path / "out.jsonl"
+        paths = find_audio([corpus])
+        await run_batch(engine, paths[:1], JsonlSink(out), decode_workers=0)
+        engine.calls.clear()
+
+        stats = await run_batch(engine, paths, JsonlSink(out), decode_workers=0)
+        assert stats.skipped == 1
+        assert stats.files == 2
+        assert len(engine.calls) == 2
+        assert sorted(r["path"] for r in _records(out)) == sorted(str(p) for p in paths)
+
+    async def test_failed_files_are_retried_on_resume(self, engine, corpus, tmp_path, monkeypatch):
+        out = tmp_path / "out.jsonl"
+        paths = find_audio([corpus])[:1]
+
+        async def _fail(*args, **kwargs):
+            raise RuntimeError("worker gone")
+
+        with monkeypatch.context() as m:
+            m.setattr(engine, "transcribe_batch_async", _fail)
+            stats = await run_batch(engine, paths, JsonlSink(out), decode_workers=0)
+        assert stats.failed == 1
+
+        stats = await run_batch(engine, paths, JsonlSink(out), decode_workers=0)
+        assert (stats.skipped, stats.files, stats.failed) == (0, 1, 0)
+        failed, retried = _records(out)
+        assert failed["error"] == "Transcription failed: worker gone"
+        assert retried["error"] is None and retried["path"] == failed["path"]
+
+    async def test_undecodable_file_is_recorded_as_error(self, engine, tmp_path):
+        bad = tmp_path / "bad.wav"
+        bad.write_bytes(b"not audio at all")
+        out = tmp_path / "out.jsonl"
+        stats = await run_batch(engine, [bad], JsonlSink(out), decode_workers=0)
+        (record,) = _records(out)
+        assert record["error"].startswith("Could not decode audio file")
+        assert stats.failed == 1
+        assert engine.calls == []
+
+    async def test_decodes_in_worker_processes(self, engine, corpus, tmp_path):
+        out = tmp_path / "out.jsonl"
+        stats = await run_batch(
+            engine, find_audio([corpus]), JsonlSink(out), decode_workers=1, queue_size=1
+        )
+        assert stats.files == 3
+        assert sorted(engine.calls) == [16000, 32000, 48000]
+
+    async def test_decode_workers_write_into_arena(self, engine, corpus, tmp_path):
+        from app.audio.arena import AudioArena
+
+        arena = AudioArena(8 * 16000 * 4)
+        try:
+            stats = await run_batch(
+                engine, find_audio([corpus]), JsonlSink(tmp_path / "out.jsonl"),
+                decode_workers=1, arena=arena,
+            )
+            assert stats.files == 3
+            assert sorted(engine.calls) == [16000, 32000, 48000]
+            assert arena.free_slabs == arena.slabs
+        finally:
+            arena.close()
+
+    async def test_failed_run_releases_queued_audio(self, engine, corpus, tmp_path):
+        import asyncio
+
+        from app.audio.arena import AudioArena
+
+        class FailingSink(JsonlSink):
+            def write(self, record: dict) -> None:
+                raise OSError("disk full")
+
+        arena = AudioArena(8 * 16000 * 4)
+        try:
+            with pytest.raises(OSError, match="disk full"):
+                await run_batch(
+                    engine, find_audio([corpus]) * 3, FailingSink(tmp_path / "out.jsonl"),
+                    decode_workers=2, queue_size=2, batch_size=1, arena=arena,
+                )
+            # Decodes still running in the pool release theirs as they finish
+            for _ in range(100):
+                if arena.free_slabs == arena.slabs:
+                    break
+                await asyncio.sleep(0.05)
+            assert arena.free_slabs == arena.slabs
+        finally:
+            arena.close()
+
+    async def test_parquet_output(self, engine, corpus, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        out = tmp_path / "out.parquet"
+        await run_batch(engine, find_audio([corpus]), open_sink(out), decode_workers=0)
+        table = pq.read_table(out)
+        assert table.num_rows == 3
+        assert open_sink(out).completed() == set(table["path"].to_pylist())
+
+
+class TestCli:
+    def test_batch_command(self, corpus, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        out = tmp_path / "out.jsonl"
+        code = main(["batch", str(corpus), "-o", str(out), "--decode-workers", "0"])
+        assert code == 0
+        assert len(_records(out)) == 3
+        summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        assert summary["files"] == 3
+        assert "audio_hours_per_hour" in summary
+
+    def test_rejects_disabled_precision(self, corpus, tmp_path, monkeypatch):
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        out = tmp_path / "out.jsonl"
+        code = main(["batch", str(corpus), "-o", str(out), "--precision", "int4"])
+        assert code == 2
+        assert not out.exists()
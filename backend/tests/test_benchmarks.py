@@ -0,0 +1,113 @@
+"""Tests for the benchmark helpers in benchmarks/."""
+
+import pytest
+
+from benchmarks.bench_audio_handoff import MODES, measure
+from benchmarks.bench_partial_bytes import wire_bytes
+from benchmarks.bench_pipeline import simulate
+from benchmarks.bench_upload_decode import measure as measure_decode, synthetic_wav
+from benchmarks.common import load_reference_set, normalize_text, word_error_rate
+from benchmarks.golden import compare
+
+
+class TestWordErrorRate:
+    """WER is computed on normalised words."""
+
+    def test_identical(self):
+        assert word_error_rate("ask not what", "Ask not, what!") == 0.0
+
+    def test_substitution(self):
+        assert word_error_rate("ask not what", "ask now what") == pytest.approx(1 / 3)
+
+    def test_insertion_and_deletion(self):
+        assert word_error_rate("a b c d", "a c d e") == pytest.approx(2 / 4)
+
+    def test_empty_reference(self):
+        assert word_error_rate("", "") == 0.0
+        assert word_error_rate("", "noise") == 1.0
+
+    def test_normalize_keeps_apostrophes(self):
+        assert normalize_text("Don't STOP.") == ["don't", "stop"]
+
+
+class TestReferenceSet:
+    """The bundled reference set loads the repo's sample recording."""
+
+    def test_jfk_clip(self):
+        clips = load_reference_set()
+        jfk = next(c for c in clips if c.id == "jfk")
+        assert jfk.language == "en"
+        assert jfk.duration_s == pytest.approx(11.0, abs=0.1)
+
+
+class TestPartialBytes:
+    """Delta partials send less than full partials for a growing window."""
+
+    def test_delta_sends_fewer_bytes(self):
+        sentence = "and so my fellow americans ask not what your country can do for you "
+        partials = [
+            [(sentence.strip(), 0, 5000)],
+            [(sentence.strip(), 0, 5000), ((sentence * 2).strip(), 5000, 10000)],
+            [(sentence.strip(), 0, 5000), ((sentence * 3).strip(), 5000, 15000)],
+        ]
+        final = partials[-1]
+        full = wire_bytes([(partials, final)], delta=False)
+        delta = wire_bytes([(partials, final)], delta=True)
+        assert delta["final_bytes"] == full["final_bytes"]
+        assert delta["partial_bytes"] < full["partial_bytes"]
+        assert delta["messages"] < full["messages"]
+
+    def test_unchanged_partial_costs_nothing_in_delta_mode(self):
+        partials = [[("same", 0, 1000)], [("same", 0, 1000)]]
+        assert wire_bytes([(partials, [])], delta=True)["messages"] == 1
+
+
+class TestGoldenCompare:
+    """Transcripts that differ from their golden versions are flagged."""
+
+    def test_identical_outputs_pass(self):
+        golden = {"fast": {"jfk": "Ask not what your country can do for you."}}
+        rows, drifted = compare(golden, {"fast": {"jfk": "ask not what your country can do for you"}})
+        assert drifted is False
+        assert rows[0]["drift"] == 0.0
+
+    def test_changed_words_flagged(self):
+        golden = {"fast": {"jfk": "ask not what your country can do for you"}}
+        outputs = {"fast": {"jfk": "ask not what your county can do for you"}}
+        rows, drifted = compare(golden, outputs)
+        assert drifted is True
+        assert rows[0]["status"] == "drift"
+        # Within tolerance
+        assert compare(golden, outputs, max_drift=0.2)[1] is False
+
+    def test_missing_golden_flagged(self):
+        rows, drifted = compare({}, {"accurate": {"jfk": "text"}})
+        assert drifted is True
+        assert rows[0]["status"] == "missing"
+
+
+class TestAudioHandoff:
+    """The handoff benchmark runs every mode against a child process."""
+
+    def test_measures_every_mode(self):
+        rows = measure([0.5], runs=2)
+        assert [row["mode"] for row in rows] == list(MODES)
+        assert all(row["median_ms"] > 0 for row in rows)
+
+
+class TestUploadDecode:
+    """The upload decode benchmark reports every pool size."""
+
+    def test_measures_each_pool_size(self):
+        rows = measure_decode(synthetic_wav(0.5), workers=[0, 1], concurrency=2)
+        assert [row["workers"] for row in rows] == [0, 1]
+        assert all(row["files_per_s"] > 0 for row in rows)
+
+
+class TestPipeline:
+    """Overlapping the stages beats running them back-to-back."""
+
+    def test_prefetch_raises_throughput(self):
+        serial = simulate(encode_ms=20, decode_ms=20, jobs=8, depth=0)
+        pipelined = simulate(encode_ms=20, decode_ms=20, jobs=8, depth=1)
+        assert pipelined > 1.3 * serial
@@ -0,0 +1,173 @@
+"""Tests for app.audio.buffer.AudioBuffer."""
+
+import numpy as np
+import pytest
+
+from app.audio.arena import AudioArena
+from app.audio.buffer import AudioBuffer
+
+
+class TestAppend:
+    """Appending grows the buffer and keeps samples contiguous."""
+
+    def test_empty(self):
+        buf = AudioBuffer()
+        assert len(buf) == 0
+        assert buf.samples.dtype == np.float32
+        assert buf.nbytes == 0
+
+    def test_append_preserves_order(self):
+        buf = AudioBuffer()
+        buf.append(np.arange(3, dtype=np.float32))
+        buf.append(np.arange(3, 6, dtype=np.float32))
+        np.testing.assert_array_equal(buf.samples, np.arange(6, dtype=np.float32))
+
+    def test_growth_beyond_initial_capacity(self):
+        buf = AudioBuffer()
+        chunk = np.ones(10000, dtype=np.float32)
+        for _ in range(5):
+            buf.append(chunk)
+        assert len(buf) == 50000
+        assert buf.nbytes >= 50000 * 4
+        assert float(buf.samples.sum()) == 50000.0
+
+    def test_clear_keeps_capacity(self):
+        buf = AudioBuffer()
+        buf.append(np.ones(100, dtype=np.float32))
+        capacity = buf.nbytes
+        buf.clear()
+        assert len(buf) == 0
+        assert buf.nbytes == capacity
+
+    def test_release_frees_memory(self):
+        buf = AudioBuffer()
+        buf.append(np.ones(100, dtype=np.float32))
+        buf.release()
+        assert len(buf) == 0
+        assert buf.nbytes == 0
+
+
+class TestAppendPcm16:
+    """int16 samples are scaled exactly like pcm_to_float32."""
+
+    def test_matches_pcm_to_float32(self):
+        from app.audio.normalizer import pcm_to_float32
+
+        samples = np.array([0, 1, -1, 32767, -32768, 1234], dtype=np.int16)
+        buf = AudioBuffer()
+        buf.append_pcm16(samples[:3])
+        buf.append_pcm16(samples[3:])
+        np.testing.assert_array_equal(buf.samples, pcm_to_float32(samples.tobytes()))
+
+    def test_strided_view(self):
+        interleaved = np.array([1, 100, 2, 200], dtype=np.int16)
+        buf = AudioBuffer()
+        buf.append_pcm16(interleaved[1::2])
+        np.testing.assert_allclose(buf.samples * 32768, [100, 200])
+
+
+class TestSpill:
+    """Spilling moves samples to a scratch file and back."""
+
+    def test_spill_releases_ram(self, tmp_path):
+        buf = AudioBuffer()
+        data = np.linspace(-1, 1, 1000, dtype=np.float32)
+        buf.append(data)
+
+        freed = buf.spill(str(tmp_path))
+
+        assert freed > 0
+        assert buf.is_spilled
+        assert buf.nbytes == 0
+        assert buf.spilled_bytes == 4000
+        np.testing.assert_array_equal(buf.samples, data)
+        # The scratch file is unlinked immediately
+        assert list(tmp_path.iterdir()) == []
+
+    def test_append_after_spill_restores(self, tmp_path):
+        buf = AudioBuffer()
+        buf.append(np.zeros(10, dtype=np.float32))
+        buf.spill(str(tmp_path))
+        buf.append(np.ones(5, dtype=np.float32))
+        assert not buf.is_spilled
+        assert len(buf) == 15
+        assert float(buf.samples[-5:].sum()) == 5.0
+
+    def test_spill_empty_is_noop(self, tmp_path):
+        buf = AudioBuffer()
+        assert buf.spill(str(tmp_path)) == 0
+        assert not buf.is_spilled
+
+    def test_clear_after_spill(self, tmp_path):
+        buf = AudioBuffer()
+        buf.append(np.zeros(10, dtype=np.float32))
+        buf.spill(str(tmp_path))
+        buf.clear()
+        assert not buf.is_spilled
+        assert len(buf) == 0
+
+
+class TestArenaBacked:
+    """With an arena the samples live in shared memory."""
+
+    @pytest.fixture()
+    def arena(self):
+        arena = AudioArena(64000 * 4, slab_samples=16000)
+        yield arena
+        arena.close()
+
+    def test_samples_are_in_the_arena(self, arena):
+        buf = AudioBuffer(arena)
+        buf.append(np.arange(10, dtype=np.float32))
+        handle = arena.find(buf.samples)
+        assert handle is not None and handle.length == 10
+        np.testing.assert_array_equal(arena.view(handle), np.arange(10))
+
+    def test_growth_moves_to_a_larger_allocation(self, arena):
+        buf = AudioBuffer(arena)
+        buf.append(np.ones(16000, dtype=np.float32))
+        buf.append(np.ones(100, dtype=np.float32))
+        assert arena.find(buf.samples).slabs == 2
+        assert arena.free_slabs == 2
+        buf.release()
+        assert arena.free_slabs == 4
+
+    def test_full_arena_falls_back_to_private_memory(self, arena):
+        buf = AudioBuffer(arena)
+        buf.append(np.ones(5 * 16000, dtype=np.float32))
+        assert arena.find(buf.samples) is None
+        assert len(buf) == 5 * 16000
+
+    def test_spill_returns_slabs(self, arena, tmp_path):
+        buf = AudioBuffer(arena)
+        buf.append(np.arange(10, dtype=np.float32))
+        buf.spill(str(tmp_path))
+        assert arena.free_slabs == 4
+        buf.append(np.ones(1, dtype=np.float32))
+        assert arena.find(buf.samples) is not None
+        np.testing.assert_array_equal(buf.samples[:10], np.arange(10))
+
+    def test_snapshot_survives_growth_and_reuse(self, arena):
+        """A partial still holding a session's old view never sees another session's audio."""
+        session_a = AudioBuffer(arena)
+        session_a.append(np.full(16000, 1.0, dtype=np.float32))
+        in_flight = session_a.snapshot()
+        session_a.append(np.full(16000, 2.0, dtype=np.float32))  # grows into new slabs
+        session_b = AudioBuffer(arena)
+        session_b.append(np.full(16000, 3.0, dtype=np.float32))
+        np.testing.assert_array_equal(in_flight, np.full(16000, 1.0))
+        assert arena.find(session_b.samples).slab != arena.find(in_flight).slab
+
+        session_a.release()
+        session_b.release()
+        assert arena.free_slabs == 3
+        del in_flight
+        assert arena.free_slabs == 4
+
+    def test_snapshot_outliving_the_arena(self):
+        arena = AudioArena(16000 * 4, slab_samples=16000)
+        buf = AudioBuffer(arena)
+        buf.append(np.ones(10, dtype=np.float32))
+        snapshot = buf.snapshot()
+        arena.close()
+        del snapshot
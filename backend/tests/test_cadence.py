@@ -0,0 +1,96 @@
+"""Tests for the adaptive partial cadence (app/session/cadence.py)."""
+
+import json
+import struct
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.session.cadence import PartialCadence
+from app.session.manager import SessionManager
+
+
+@pytest.fixture()
+def cadence():
+    return PartialCadence(floor_s=0.5, ceiling_s=4.0, engine_share=0.5, speech_hold_s=5.0)
+
+
+class TestInterval:
+    def test_floor_until_measured(self, cadence):
+        assert cadence.interval_s("a", 1.0, speaking=True, now=0.0) == 0.5
+
+    def test_quiet_sessions_use_the_ceiling(self, cadence):
+        cadence.observe(0.1, 1.0)
+        assert cadence.interval_s("a", 1.0, speaking=False, now=0.0) == 4.0
+        cadence.interval_s("a", 1.0, speaking=True, now=0.0)
+        # Still counts as speaking within the hold time
+        assert cadence.interval_s("a", 1.0, speaking=False, now=3.0) < 4.0
+        assert cadence.interval_s("a", 1.0, speaking=False, now=6.0) == 4.0
+
+    def test_scales_with_rtf_and_speakers(self, cadence):
+        cadence.observe(0.2, 1.0)
+        # A 2 s window costs 0.4 engine s; at a 0.5 share that is one partial per 0.8 s
+        assert cadence.interval_s("a", 2.0, speaking=True, now=0.0) == pytest.approx(0.8)
+        cadence.interval_s("b", 2.0, speaking=True, now=0.0)
+        assert cadence.interval_s("a", 2.0, speaking=True, now=0.0) == pytest.approx(1.6)
+
+    def test_backlog_stretches_interval(self, cadence):
+        cadence.observe(0.1, 1.0)
+        base = cadence.interval_s("a", 3.0, speaking=True, now=0.0)
+        cadence.started()
+        assert cadence.interval_s("a", 3.0, speaking=True, now=0.0) == pytest.approx(2 * base)
+        cadence.finished()
+        cadence.finished()
+        assert cadence.in_flight == 0
+
+    def test_clamped_to_ceiling(self, cadence):
+        cadence.observe(2.0, 1.0)
+        assert cadence.interval_s("a", 5.0, speaking=True, now=0.0) == 4.0
+
+    def test_rtf_moving_average(self, cadence):
+        cadence.observe(1.0, 1.0)
+        cadence.observe(2.0, 1.0)
+        assert cadence.rtf == pytest.approx(1.2)
+        cadence.observe(1.0, 0.0)
+        assert cadence.rtf == pytest.approx(1.2)
+
+    def test_forget(self, cadence):
+        cadence.interval_s("a", 1.0, speaking=True)
+        assert cadence.speakers() == 1
+        cadence.forget("a")
+        assert cadence.speakers() == 0
+
+
+class TestWebSocket:
+    @pytest.fixture()
+    def engine(self, loaded_engine, monkeypatch):
+        monkeypatch.setattr(SessionManager, "_instance", None)
+        monkeypatch.setattr(
+            loaded_engine,
+            "transcribe",
+            lambda audio, language=None, **kwargs: {
+                "text": "hi", "segments": [{"text": "hi", "start": 0.0, "end": 0.5}]
+            },
+        )
+        return loaded_engine
+
+    def test_partial_after_floor_and_interval_reported(self, engine):
+        client = TestClient(app)
+        frame = struct.pack("<1600h", *([1000] * 1600))  # 100 ms of speech
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "en"}))
+            ws.receive_json()  # ready
+            for _ in range(5):
+                ws.send_bytes(frame)
+            assert ws.receive_json()["type"] == "partial"
+
+            report = client.get("/admin/sessions").json()
+            (session,) = report["sessions"]
+            assert session["partial_interval_s"] == 0.5
+            assert report["cadence"]["speakers"] == 1
+            assert report["cadence"]["rtf"] is not None
+            ws.send_text("stop")
+            while ws.receive_json()["type"] != "done":
+                pass
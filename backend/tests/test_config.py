@@ -0,0 +1,31 @@
+"""Tests for app.config model repo resolution."""
+
+import pytest
+
+from app.config import MODEL_PRECISIONS, MODEL_REPO_MAP, QUANTIZED_REPO_MAP, get_model_repo
+
+
+class TestGetModelRepo:
+    """get_model_repo maps (size, precision) to a repo."""
+
+    def test_default_precision_is_fp16(self):
+        assert get_model_repo("tiny") == "mlx-community/whisper-tiny"
+
+    def test_quantized_variant(self):
+        assert get_model_repo("tiny", "int4") == "mlx-community/whisper-tiny-mlx-4bit"
+        assert get_model_repo("large-v3-turbo", "int8") == "mlx-community/whisper-large-v3-turbo-8bit"
+
+    def test_every_size_has_every_precision(self):
+        for precision in MODEL_PRECISIONS:
+            for size in MODEL_REPO_MAP:
+                assert get_model_repo(size, precision)
+        for variants in QUANTIZED_REPO_MAP.values():
+            assert set(variants) == set(MODEL_REPO_MAP)
+
+    def test_unknown_size(self):
+        with pytest.raises(ValueError, match="Unknown model size"):
+            get_model_repo("huge")
+
+    def test_unknown_precision(self):
+        with pytest.raises(ValueError, match="Unknown model precision"):
+            get_model_repo("tiny", "fp8")
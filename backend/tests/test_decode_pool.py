@@ -0,0 +1,94 @@
+"""Tests for app.audio.decode_pool (bounded upload decoding)."""
+
+import asyncio
+import io
+import struct
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.audio.arena import AudioArena
+from app.audio.decode_pool import DecodeBusy, DecodePool
+from app.main import app
+
+
+def _wav(samples: np.ndarray) -> bytes:
+    pcm = (samples * 32767).astype(np.int16)
+    buf = io.BytesIO()
+    buf.write(b"RIFF" + struct.pack("<I", 36 + pcm.nbytes) + b"WAVEfmt ")
+    buf.write(struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16))
+    buf.write(b"data" + struct.pack("<I", pcm.nbytes) + pcm.tobytes())
+    return buf.getvalue()
+
+
+WAV = _wav(np.full(4000, 0.25, dtype=np.float32))
+
+
+class TestDecodePool:
+    async def test_decodes_in_thread(self):
+        pool = DecodePool(0, 2)
+        async with pool.decode(WAV) as audio:
+            assert len(audio) == 4000
+            assert audio[0] == pytest.approx(0.25, abs=1e-3)
+        assert pool.pending == 0
+
+    async def test_decodes_in_process_through_arena(self):
+        arena = AudioArena(16 * 1000 * 4, slab_samples=1000)
+        pool = DecodePool(1, 2, arena)
+        try:
+            async with pool.decode(WAV) as audio:
+                assert len(audio) == 4000
+                assert arena.find(audio) is not None
+                assert arena.free_slabs == 12
+            assert arena.free_slabs == 16
+        finally:
+            pool.shutdown()
+            arena.close()
+
+    async def test_refuses_beyond_max_pending(self, monkeypatch):
+        release = asyncio.Event()
+        pool = DecodePool(0, 1)
+
+        async def slow(func, raw):
+            await release.wait()
+            return np.zeros(10, dtype=np.float32)
+
+        monkeypatch.setattr(asyncio, "to_thread", slow)
+
+        async def hold():
+            async with pool.decode(WAV):
+                pass
+
+        first = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(DecodeBusy):
+            async with pool.decode(WAV):
+                pass
+        release.set()
+        await first
+        assert pool.pending == 0
+
+    async def test_decode_errors_propagate(self):
+        pool = DecodePool(0, 1)
+        with pytest.raises(Exception):
+            async with pool.decode(b"not audio"):
+                pass
+        assert pool.pending == 0
+
+
+class TestRoutes:
+    def test_upload_returns_429_when_full(self, loaded_engine, monkeypatch):
+        monkeypatch.setattr(DecodePool, "_instance", DecodePool(0, 0))
+        resp = TestClient(app).post(
+            "/api/transcribe", files={"file": ("a.wav", WAV, "audio/wav")}
+        )
+        assert resp.status_code == 429
+        assert "Retry-After" in resp.headers
+
+    def test_language_returns_429_when_full(self, loaded_engine, monkeypatch):
+        monkeypatch.setattr(DecodePool, "_instance", DecodePool(0, 0))
+        resp = TestClient(app).post(
+            "/api/language", files=[("files", ("a.wav", WAV, "audio/wav"))]
+        )
+        assert resp.status_code == 429
@@ -0,0 +1,57 @@
+"""Tests for partial-result diffing (app/session/delta.py)."""
+
+from app.session.delta import PartialDiffer
+
+
+class TestPartialDiffer:
+    def test_first_partial_sends_every_segment(self):
+        differ = PartialDiffer()
+        delta = differ.diff([("hello", 0, 900), ("world", 900, 1800)])
+        assert delta.count == 2
+        assert [(s.id, s.keep, s.text) for s in delta.segments] == [(0, 0, "hello"), (1, 0, "world")]
+
+    def test_only_changed_suffix_is_sent(self):
+        differ = PartialDiffer()
+        differ.diff([("the quick", 0, 1000)])
+        delta = differ.diff([("the quick brown", 0, 1500)])
+        (segment,) = delta.segments
+        assert (segment.id, segment.keep, segment.text) == (0, 9, " brown")
+        assert segment.end_ms == 1500
+
+    def test_unchanged_segments_are_omitted(self):
+        differ = PartialDiffer()
+        differ.diff([("one", 0, 500), ("two", 500, 1000)])
+        delta = differ.diff([("one", 0, 500), ("two three", 500, 1500)])
+        assert [s.id for s in delta.segments] == [1]
+
+    def test_revision_keeps_common_prefix(self):
+        differ = PartialDiffer()
+        differ.diff([("the whether is", 0, 1000)])
+        (segment,) = differ.diff([("the weather is", 0, 1000)]).segments
+        assert (segment.keep, segment.text) == (5, "eather is")
+
+    def test_identical_partial_sends_nothing(self):
+        differ = PartialDiffer()
+        differ.diff([("same", 0, 1000)])
+        assert differ.diff([("same", 0, 1000)]) is None
+        assert differ.updates == 1
+
+    def test_removed_segments_lower_count(self):
+        differ = PartialDiffer()
+        differ.diff([("a", 0, 500), ("b", 500, 1000)])
+        delta = differ.diff([("a", 0, 500)])
+        assert delta.count == 1
+        assert delta.segments == []
+
+    def test_channels_are_tracked_separately(self):
+        differ = PartialDiffer()
+        differ.diff([("left", 0, 1000)], channel=0)
+        delta = differ.diff([("left", 0, 1000)], channel=1)
+        assert delta.channel == 1
+        assert delta.segments[0].keep == 0
+
+    def test_reset_starts_over(self):
+        differ = PartialDiffer()
+        differ.diff([("text", 0, 1000)])
+        differ.reset()
+        assert differ.diff([("text", 0, 1000)]).segments[0].keep == 0
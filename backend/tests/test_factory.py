@@ -70,6 +70,22 @@ class TestTranscribeDelegation:
         loaded_engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
         assert calls[-1] == "en"
 
+    def test_initial_prompt_forwarded(self, loaded_engine, monkeypatch):
+        import sys
+        import numpy as np
+
+        seen = []
+
+        def _tracking_transcribe(audio, *, path_or_hf_repo="", language="cs", **kwargs):
+            seen.append(kwargs)
+            return {"text": "", "segments": []}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _tracking_transcribe)
+
+        loaded_engine.transcribe(np.zeros(16000, dtype=np.float32))
+        loaded_engine.transcribe(np.zeros(16000, dtype=np.float32), initial_prompt="ahoj")
+        assert seen == [{}, {"initial_prompt": "ahoj"}]
+
 
 class TestEngineProperties:
     """Test engine properties reflect loaded state."""
@@ -87,3 +103,454 @@ class TestEngineProperties:
         assert loaded_engine.model_size == "mlx-community/whisper-tiny"
         assert loaded_engine.backend == "mlx-whisper"
         assert loaded_engine.device == "mps"
+
+
+class TestTranscribeBatch:
+    """transcribe_batch returns one result per clip, in order."""
+
+    def test_batch_results_in_order(self, loaded_engine, monkeypatch):
+        import numpy as np
+
+        def _len_transcribe(audio, language=None):
+            return {"text": str(len(audio)), "segments": []}
+
+        monkeypatch.setattr(loaded_engine, "transcribe", _len_transcribe)
+        results = loaded_engine.transcribe_batch(
+            [np.zeros(3, dtype=np.float32), np.zeros(5, dtype=np.float32)]
+        )
+        assert [r["text"] for r in results] == ["3", "5"]
+
+    @pytest.mark.asyncio
+    async def test_batch_async(self, loaded_engine):
+        import numpy as np
+
+        results = await loaded_engine.transcribe_batch_async(
+            [np.zeros(16000, dtype=np.float32)] * 2, "en"
+        )
+        assert len(results) == 2
+
+
+class TestPrecisionVariants:
+    """Requests can select any precision enabled at load time."""
+
+    @pytest.fixture()
+    def engine(self, monkeypatch):
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(
+            model_repo="mlx-community/whisper-tiny",
+            language="cs",
+            precision="fp16",
+            variants={"int4": "mlx-community/whisper-tiny-mlx-4bit"},
+        )
+        return engine
+
+    def test_reports_precision(self, engine):
+        assert engine.precision == "fp16"
+        assert engine.precisions == ["fp16", "int4"]
+
+    def test_selected_variant_repo_used(self, engine, monkeypatch):
+        import sys
+        import numpy as np
+
+        repos = []
+
+        def _tracking_transcribe(audio, *, path_or_hf_repo="", language="cs", **kwargs):
+            repos.append(path_or_hf_repo)
+            return {"text": "", "segments": []}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _tracking_transcribe)
+
+        engine.transcribe(np.zeros(100, dtype=np.float32))
+        engine.transcribe(np.zeros(100, dtype=np.float32), precision="int4")
+        assert repos == ["mlx-community/whisper-tiny", "mlx-community/whisper-tiny-mlx-4bit"]
+
+    def test_disabled_precision_rejected(self, engine):
+        with pytest.raises(ValueError, match="not enabled"):
+            engine.repo_for("int8")
+
+
+class TestTranscribeStream:
+    """Incremental decoding forces the agreed prefix and reuses results."""
+
+    def test_prefix_forwarded_after_agreement(self, loaded_engine, monkeypatch):
+        import sys
+        import numpy as np
+
+        calls = []
+        texts = iter(["ask not what", "ask not what your", " country"])
+
+        def _transcribe(audio, **kwargs):
+            calls.append(kwargs)
+            return {"text": next(texts), "segments": []}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        state = loaded_engine.open_stream()
+        loaded_engine.transcribe_stream(state, np.zeros(16000, dtype=np.float32))
+        loaded_engine.transcribe_stream(state, np.zeros(32000, dtype=np.float32))
+        result = loaded_engine.transcribe_stream(state, np.zeros(48000, dtype=np.float32))
+
+        assert "prefix" not in calls[0] and "prefix" not in calls[1]
+        assert calls[2]["prefix"] == "ask not what"
+        assert calls[2]["without_timestamps"] is True
+        assert result["text"] == "ask not what country"
+        assert result["segments"][0]["end"] == 3.0
+
+    def test_unchanged_audio_skips_decode(self, loaded_engine, monkeypatch):
+        import sys
+        import numpy as np
+
+        calls = []
+
+        def _transcribe(audio, **kwargs):
+            calls.append(kwargs)
+            return {"text": "hello", "segments": []}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        state = loaded_engine.open_stream()
+        audio = np.zeros(16000, dtype=np.float32)
+        first = loaded_engine.transcribe_stream(state, audio)
+        second = loaded_engine.transcribe_stream(state, audio)
+        assert second is first
+        assert len(calls) == 1
+
+
+class TestShortClipFastPath:
+    """Short clips are decoded in truncated windows, bucketed by length."""
+
+    @pytest.fixture()
+    def engine(self, loaded_engine, monkeypatch):
+        import sys
+
+        monkeypatch.setattr(loaded_engine, "_short_clip_buckets_s", [5.0, 10.0])
+        self.windows = []
+        self.full = []
+        self.features = []
+
+        def _windows(
+            audios, bucket, repo, language, initial_prompt=None, prefix=None, options=None,
+            features=None,
+        ):
+            self.windows.append((bucket, [len(a) for a in audios]))
+            self.features.append(features)
+            return [
+                None if len(a) == 1234 else {"text": f"w{len(a)}", "segments": []}
+                for a in audios
+            ]
+
+        def _transcribe(audio, **kwargs):
+            self.full.append(len(audio))
+            return {"text": f"f{len(audio)}", "segments": []}
+
+        monkeypatch.setattr(loaded_engine, "_transcribe_windows", _windows)
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        return loaded_engine
+
+    def test_fast_path_disabled_without_backend_support(self, monkeypatch):
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(model_repo="repo", language="cs", short_clip_buckets_s=[5.0])
+        assert engine.short_clip_buckets_s == []
+
+    def test_short_clip_uses_window(self, engine):
+        import numpy as np
+
+        assert engine.transcribe(np.zeros(16000, np.float32))["text"] == "w16000"
+        assert self.windows == [(5.0, [16000])]
+        assert self.full == []
+
+    def test_long_clip_uses_full_window(self, engine):
+        import numpy as np
+
+        assert engine.transcribe(np.zeros(200000, np.float32))["text"] == "f200000"
+        assert self.windows == []
+
+    def test_failed_quality_check_falls_back(self, engine):
+        import numpy as np
+
+        assert engine.transcribe(np.zeros(1234, np.float32))["text"] == "f1234"
+        assert self.full == [1234]
+
+    def test_batch_grouped_by_bucket(self, engine):
+        import numpy as np
+
+        audios = [np.zeros(n, np.float32) for n in (16000, 100000, 8000, 200000, 1234)]
+        results = engine.transcribe_batch(audios)
+        assert [r["text"] for r in results] == ["w16000", "w100000", "w8000", "f200000", "f1234"]
+        assert sorted(self.windows) == [(5.0, [16000, 8000, 1234]), (10.0, [100000])]
+        assert self.full == [200000, 1234]
+
+    async def test_pipeline_encodes_short_clips_ahead(self, engine, monkeypatch):
+        import numpy as np
+
+        encoded = []
+
+        def _encode(audios, bucket, repo):
+            encoded.append(bucket)
+            return "features"
+
+        monkeypatch.setattr(engine, "_encode_windows", _encode)
+        monkeypatch.setattr(engine.scheduler, "prefetch", 1)
+        result = await engine.transcribe_async(np.zeros(16000, np.float32))
+        assert result["text"] == "w16000"
+        assert self.features == ["features"]
+        assert encoded == [5.0]
+
+        # Full-window jobs are not split
+        await engine.transcribe_async(np.zeros(200000, np.float32))
+        assert encoded == [5.0]
+
+    def test_pipeline_needs_the_cpu_device(self, monkeypatch):
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(model_repo="repo", language="cs", pipeline_depth=2)
+        assert engine.scheduler.prefetch == 0
+
+
+class TestWarmUp:
+    """Load warms up every input shape requests will use and times each."""
+
+    def test_full_window_only_without_buckets(self, loaded_engine):
+        (row,) = loaded_engine.load_progress["warmup"]
+        assert (row["window_s"], row["batch"]) == (30.0, 1)
+        assert row["ms"] >= 0
+
+    def test_every_bucket_and_batch_size(self, monkeypatch):
+        import sys
+        from types import ModuleType
+
+        from app.engine import window
+
+        core = ModuleType("mlx.core")
+        core.float16 = "float16"
+        holder = ModuleType("mlx_whisper.transcribe")
+        holder.ModelHolder = type(
+            "ModelHolder", (), {"get_model": staticmethod(lambda repo, dtype: "model")}
+        )
+        mlx = ModuleType("mlx")
+        mlx.core = core
+        monkeypatch.setitem(sys.modules, "mlx", mlx)
+        monkeypatch.setitem(sys.modules, "mlx.core", core)
+        monkeypatch.setitem(sys.modules, "mlx_whisper.transcribe", holder)
+        monkeypatch.setattr(window, "is_supported", lambda: True)
+        shapes = []
+
+        def _decode(model, audios, bucket_s, guard_config, **options):
+            shapes.append((bucket_s, len(audios), len(audios[0]), guard_config.no_speech_prob))
+            return []
+
+        monkeypatch.setattr(window, "decode_windows", _decode)
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(
+            model_repo="repo", language="cs", short_clip_buckets_s=[10.0, 5.0],
+            warmup_batch_sizes=[4, 1],
+        )
+        assert shapes == [
+            (5.0, 1, 80000, 1.0), (5.0, 4, 80000, 1.0),
+            (10.0, 1, 160000, 1.0), (10.0, 4, 160000, 1.0),
+        ]
+        warmup = engine.load_progress["warmup"]
+        assert [(r["window_s"], r["batch"]) for r in warmup] == [
+            (30.0, 1), (5.0, 1), (5.0, 4), (10.0, 1), (10.0, 4)
+        ]
+
+
+class TestDecodeGuards:
+    """Full-window decodes get a token budget and lose looping text."""
+
+    @pytest.fixture(autouse=True)
+    def _reset_metrics(self):
+        from app.metrics import REGISTRY
+
+        REGISTRY.reset()
+        yield
+        REGISTRY.reset()
+
+    def test_token_budget_forwarded(self, monkeypatch):
+        import sys
+        import numpy as np
+        from app.engine.guards import GuardConfig
+
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(
+            model_repo="repo",
+            language="cs",
+            guard_config=GuardConfig(tokens_per_s=10.0, min_tokens=20),
+        )
+        seen = []
+
+        def _transcribe(audio, **kwargs):
+            seen.append(kwargs.get("sample_len"))
+            return {"text": "", "segments": []}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        engine.transcribe(np.zeros(32000, dtype=np.float32))
+        assert seen == [40]
+
+    def test_looping_segment_cleaned_and_counted(self, loaded_engine, monkeypatch):
+        import sys
+        import numpy as np
+        from app.metrics import DECODE_ABORTS
+
+        looping = " ahoj" + " ano" * 20
+
+        def _transcribe(audio, **kwargs):
+            return {"text": looping, "segments": [{"text": looping, "start": 0.0, "end": 3.0}]}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        result = loaded_engine.transcribe(np.zeros(16000, dtype=np.float32))
+        assert result["text"] == " ahoj ano"
+        assert DECODE_ABORTS.value(reason="repetition") == 1
+
+    def test_token_budget_stop_counted(self, monkeypatch):
+        import sys
+        import numpy as np
+        from app.engine.guards import GuardConfig
+        from app.metrics import DECODE_ABORTS
+
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(
+            model_repo="repo",
+            language="cs",
+            guard_config=GuardConfig(tokens_per_s=10.0, min_tokens=20),
+        )
+        tokens = []
+
+        def _transcribe(audio, **kwargs):
+            segment = {"text": " ano", "seek": 0, "tokens": tokens, "start": 0.0, "end": 2.0}
+            return {"text": " ano", "segments": [segment]}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        tokens[:] = range(39)  # Ended before the 40-token budget
+        engine.transcribe(np.zeros(32000, dtype=np.float32))
+        assert DECODE_ABORTS.value(reason="token_budget") == 0
+        tokens[:] = range(40)
+        engine.transcribe(np.zeros(32000, dtype=np.float32))
+        assert DECODE_ABORTS.value(reason="token_budget") == 1
+
+
+class TestChunkedTranscription:
+    """Long audio is transcribed as scheduled chunks with shifted times."""
+
+    async def test_chunks_shifted_and_conditioned(self, loaded_engine, monkeypatch):
+        import numpy as np
+
+        calls = []
+
+        def _transcribe(audio, language=None, initial_prompt=None):
+            calls.append((len(audio), initial_prompt))
+            n = len(calls)
+            return {
+                "text": f" part{n}",
+                "segments": [{"text": f" part{n}", "start": 0.5, "end": 1.0}],
+                "language": "cs",
+            }
+
+        monkeypatch.setattr(loaded_engine, "transcribe", _transcribe)
+        audio = np.full(16000 * 5, 0.1, dtype=np.float32)
+        result = await loaded_engine.transcribe_chunked_async(audio, chunk_s=2.0)
+
+        assert result["text"] == "part1 part2 part3"
+        assert [c[1] for c in calls] == [None, "part1", "part2"]
+        assert sum(c[0] for c in calls) == len(audio)
+        starts = [seg["start"] for seg in result["segments"]]
+        assert starts[0] == 0.5 and starts[1] > 1.0 and starts[2] > starts[1]
+        assert result["language"] == "cs"
+
+    async def test_short_audio_single_job(self, loaded_engine, monkeypatch):
+        import numpy as np
+
+        calls = []
+        monkeypatch.setattr(
+            loaded_engine, "transcribe",
+            lambda audio, language=None: calls.append(len(audio)) or {"text": "", "segments": []},
+        )
+        await loaded_engine.transcribe_chunked_async(np.zeros(1000, np.float32), chunk_s=2.0)
+        assert calls == [1000]
+
+
+class TestDecodeOptions:
+    """Request decode options are layered over the server default."""
+
+    def test_options_forwarded_over_default(self, monkeypatch):
+        import sys
+        import numpy as np
+        from app.engine.options import DecodeOptions, preset_options
+
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(model_repo="repo", language="cs", decode_options=preset_options("balanced"))
+        seen = []
+
+        def _transcribe(audio, **kwargs):
+            seen.append(kwargs)
+            return {"text": "", "segments": []}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        engine.transcribe(np.zeros(16000, dtype=np.float32))
+        engine.transcribe(
+            np.zeros(16000, dtype=np.float32),
+            options=DecodeOptions(temperature=[0.0], initial_prompt="ahoj"),
+        )
+        assert seen[0]["temperature"] == (0.0, 0.4, 0.8)
+        assert seen[0]["condition_on_previous_text"] is True
+        assert "initial_prompt" not in seen[0]
+        assert seen[1]["temperature"] == (0.0,)
+        assert seen[1]["no_speech_threshold"] == 0.6
+        assert seen[1]["initial_prompt"] == "ahoj"
+
+    async def test_chunks_not_conditioned_when_disabled(self, loaded_engine, monkeypatch):
+        import numpy as np
+        from app.engine.options import preset_options
+
+        prompts = []
+
+        def _transcribe(audio, language=None, initial_prompt=None, options=None):
+            prompts.append(initial_prompt)
+            return {"text": " part", "segments": [], "language": "cs"}
+
+        monkeypatch.setattr(loaded_engine, "transcribe", _transcribe)
+        audio = np.full(16000 * 5, 0.1, dtype=np.float32)
+        await loaded_engine.transcribe_chunked_async(
+            audio, initial_prompt="ahoj", chunk_s=2.0, options=preset_options("fast")
+        )
+        assert prompts == ["ahoj", "ahoj", "ahoj"]
+
+
+class TestAutoLanguage:
+    """``auto`` asks mlx-whisper to detect the language."""
+
+    def test_auto_passes_no_language(self, loaded_engine, monkeypatch):
+        import sys
+        import numpy as np
+
+        seen = []
+
+        def _transcribe(audio, *, path_or_hf_repo="", language="cs", **kwargs):
+            seen.append(language)
+            return {"text": "", "segments": [], "language": "en"}
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _transcribe)
+        loaded_engine.transcribe(np.zeros(16000, dtype=np.float32), language="auto")
+        assert seen == [None]
+        # Without the mlx internals, detection falls back to a one-token decode
+        assert loaded_engine.detect_language([np.zeros(16000, dtype=np.float32)]) == [
+            {"language": "en", "probability": None}
+        ]
+
+    async def test_chunks_keep_first_detected_language(self, loaded_engine, monkeypatch):
+        import numpy as np
+
+        languages = []
+
+        def _transcribe(audio, language=None, initial_prompt=None):
+            languages.append(language)
+            return {"text": " part", "segments": [], "language": "de"}
+
+        monkeypatch.setattr(loaded_engine, "transcribe", _transcribe)
+        audio = np.full(16000 * 5, 0.1, dtype=np.float32)
+        await loaded_engine.transcribe_chunked_async(audio, "auto", chunk_s=2.0)
+        assert languages == ["auto", "de", "de"]
@@ -0,0 +1,87 @@
+"""Tests for app.engine.guards (hallucination and repetition guards)."""
+
+from app.engine.guards import (
+    COMPRESSION,
+    REPETITION,
+    GuardConfig,
+    budget_stops,
+    clean_result,
+    collapse_repetition,
+    compression_ratio,
+    repeated_tail,
+)
+
+
+class TestTokenBudget:
+    """The budget grows with duration, per 30 s window, up to Whisper's cap."""
+
+    def test_disabled_by_default(self):
+        assert GuardConfig().token_budget(5.0) is None
+
+    def test_proportional_to_duration(self):
+        config = GuardConfig(tokens_per_s=10.0, min_tokens=20)
+        assert config.token_budget(0.0) == 20
+        assert config.token_budget(2.5) == 45
+
+    def test_capped(self):
+        config = GuardConfig(tokens_per_s=10.0, min_tokens=20)
+        assert config.token_budget(60.0) == 224
+
+    def test_budget_stops_counted_per_window(self):
+        result = {"segments": [
+            {"seek": 0, "tokens": list(range(30))},
+            {"seek": 0, "tokens": list(range(10))},  # Window 0 used all 40
+            {"seek": 3000, "tokens": list(range(39))},
+        ]}
+        assert budget_stops(result, 40) == 1
+        assert budget_stops(result, 39) == 2
+        assert budget_stops({"text": "", "segments": []}, 40) == 0
+
+
+class TestRepetition:
+    """Back-to-back repeated n-grams at the end are detected."""
+
+    def test_single_token_loop(self):
+        assert repeated_tail([5] + [7] * 16) == (1, 16)
+        assert repeated_tail([7] * 15) is None
+
+    def test_ngram_loop(self):
+        tokens = [1, 2] + [3, 4, 5, 6] * 4
+        assert repeated_tail(tokens) == (4, 4)
+
+    def test_short_legitimate_repeat_ignored(self):
+        assert repeated_tail("no no no".split()) is None
+
+    def test_collapse_keeps_one_copy(self):
+        tokens = [1, 2] + [3, 4, 5, 6] * 4
+        assert collapse_repetition(tokens) == [1, 2, 3, 4, 5, 6]
+        assert collapse_repetition([1, 2, 3]) == [1, 2, 3]
+
+
+class TestCleanResult:
+    """Full-window results lose their looping text."""
+
+    def test_clean_result_unchanged(self):
+        result = {"text": " hello", "segments": [{"text": " hello", "start": 0.0, "end": 1.0}]}
+        assert clean_result(result) == (result, [])
+        assert clean_result(result)[0] is result
+
+    def test_repeated_tail_collapsed(self):
+        looping = " thanks for watching" + " thank you" * 8
+        result = {"text": looping, "segments": [{"text": looping, "start": 0.0, "end": 5.0}]}
+        cleaned, reasons = clean_result(result)
+        assert reasons == [REPETITION]
+        assert cleaned["text"] == " thanks for watching thank you"
+        assert cleaned["segments"][0]["end"] == 5.0
+
+    def test_repetitive_segment_dropped(self):
+        noise = " " + "la la la di da " * 20 + "hm"
+        result = {
+            "text": " ok" + noise,
+            "segments": [{"text": " ok"}, {"text": noise}],
+        }
+        assert compression_ratio(noise) > 2.4
+        cleaned, reasons = clean_result(result)
+        assert COMPRESSION in reasons
+        assert cleaned["text"] == " ok"
+        assert cleaned["segments"] == [{"text": " ok"}]
@@ -0,0 +1,121 @@
+"""Tests for the health, liveness and readiness endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.factory import TranscriptionEngine
+from app.main import app
+
+
+@pytest.fixture()
+def unloaded_engine(monkeypatch: pytest.MonkeyPatch) -> TranscriptionEngine:
+    """Return a fresh TranscriptionEngine singleton that has not been loaded."""
+    monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+    return TranscriptionEngine.get_instance()
+
+
+class TestLivez:
+    """GET /livez answers regardless of model state."""
+
+    def test_livez_while_loading(self, unloaded_engine):
+        resp = TestClient(app).get("/livez")
+        assert resp.status_code == 200
+        assert resp.json() == {"status": "alive"}
+
+
+class TestReadyz:
+    """GET /readyz reflects whether the model can serve requests."""
+
+    def test_not_ready_before_load(self, unloaded_engine):
+        resp = TestClient(app).get("/readyz")
+        assert resp.status_code == 503
+        body = resp.json()
+        assert body["status"] == "idle"
+        assert body["load"]["warmup_done"] is False
+
+    def test_ready_after_load(self, loaded_engine):
+        resp = TestClient(app).get("/readyz")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["status"] == "ready"
+        assert body["load"]["warmup_done"] is True
+
+    def test_failed_load(self, unloaded_engine, monkeypatch):
+        import sys
+
+        def _boom(audio, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _boom)
+        with pytest.raises(RuntimeError):
+            unloaded_engine.load(model_repo="mlx-community/whisper-tiny", language="cs")
+
+        resp = TestClient(app).get("/readyz")
+        assert resp.status_code == 503
+        assert resp.json()["status"] == "failed"
+        assert resp.json()["load"]["error"] == "boom"
+
+
+class TestHealth:
+    """GET /health keeps its shape and adds load progress."""
+
+    def test_health_loading(self, unloaded_engine):
+        resp = TestClient(app).get("/health")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "loading"
+        assert resp.json()["load"]["status"] == "idle"
+
+
+class TestLoadProgress:
+    """Load progress reports weight bytes from a local model directory."""
+
+    def test_local_weights_counted(self, unloaded_engine, tmp_path):
+        (tmp_path / "weights.safetensors").write_bytes(b"\0" * 1234)
+        (tmp_path / "config.json").write_text("{}")
+
+        unloaded_engine.load(model_repo=str(tmp_path), language="cs")
+
+        progress = unloaded_engine.load_progress
+        assert progress["weights_bytes_total"] == 1234
+        assert progress["weights_bytes_loaded"] == 1234
+        assert progress["status"] == "ready"
+
+    def test_weights_read_progressively(self, unloaded_engine, tmp_path, monkeypatch):
+        from app.engine import factory
+
+        (tmp_path / "weights.00.safetensors").write_bytes(b"\0" * 1234)
+        (tmp_path / "weights.01.safetensors").write_bytes(b"\0" * 100)
+        monkeypatch.setattr(factory, "WEIGHTS_READ_CHUNK", 500)
+        seen = []
+        monkeypatch.setattr(
+            unloaded_engine, "_weights_read", lambda nbytes: seen.append(nbytes)
+        )
+
+        unloaded_engine.load(model_repo=str(tmp_path), language="cs")
+
+        assert seen == [500, 1000, 1234, 1334]
+        assert unloaded_engine.load_progress["weights_bytes_loaded"] == 1334
+
+
+class TestWaitUntilLoaded:
+    """wait_until_loaded returns promptly in every state."""
+
+    @pytest.mark.asyncio
+    async def test_returns_true_when_loaded(self, loaded_engine):
+        assert await loaded_engine.wait_until_loaded(1.0) is True
+
+    @pytest.mark.asyncio
+    async def test_times_out_when_not_loaded(self, unloaded_engine):
+        assert await unloaded_engine.wait_until_loaded(0.1) is False
+
+    @pytest.mark.asyncio
+    async def test_sees_background_load(self, unloaded_engine):
+        import asyncio
+
+        async def _load_later():
+            await asyncio.sleep(0.1)
+            unloaded_engine.load(model_repo="mlx-community/whisper-tiny", language="cs")
+
+        task = asyncio.create_task(_load_later())
+        assert await unloaded_engine.wait_until_loaded(5.0) is True
+        await task
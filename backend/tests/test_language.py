@@ -0,0 +1,106 @@
+"""Tests for session language locking and the language-ID endpoint."""
+
+import io
+import struct
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.session.language import CADENCE, INITIAL, LOW_CONFIDENCE, LanguageLock
+
+
+def _wav(samples: np.ndarray) -> bytes:
+    pcm = (samples * 32767).astype(np.int16)
+    buf = io.BytesIO()
+    buf.write(b"RIFF" + struct.pack("<I", 36 + pcm.nbytes) + b"WAVEfmt ")
+    buf.write(struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16))
+    buf.write(b"data" + struct.pack("<I", pcm.nbytes) + pcm.tobytes())
+    return buf.getvalue()
+
+
+class TestLanguageLock:
+    def test_locks_after_confident_detection(self):
+        lock = LanguageLock(recheck_s=60.0, min_probability=0.5)
+        assert lock.due(now=0.0) == INITIAL
+        assert lock.update("de", 0.3, now=0.0) is False
+        assert lock.language is None
+        assert lock.due(now=1.0) == INITIAL
+        assert lock.update("en", 0.9, now=1.0) is True
+        assert lock.language == "en"
+        assert lock.due(now=2.0) is None
+        assert lock.detections == 2
+
+    def test_rechecks_on_cadence(self):
+        lock = LanguageLock(recheck_s=10.0)
+        lock.update("en", 0.9, now=0.0)
+        assert lock.due(now=9.0) is None
+        assert lock.due(now=10.0) == CADENCE
+        # An unsure re-check keeps the locked language
+        assert lock.update("de", 0.2, now=10.0) is False
+        assert lock.language == "en"
+        assert lock.due(now=11.0) is None
+
+    def test_no_cadence_when_disabled(self):
+        lock = LanguageLock(recheck_s=0.0)
+        lock.update("en", 0.9, now=0.0)
+        assert lock.due(now=1e6) is None
+
+    def test_low_confidence_segment_triggers_recheck(self):
+        lock = LanguageLock(recheck_s=0.0, recheck_logprob=-1.0)
+        lock.observe([{"segments": [{"avg_logprob": -2.0}]}])
+        assert lock.due() == INITIAL  # nothing locked yet, nothing flagged
+        lock.update("en", 0.9)
+        lock.observe([{"segments": [{"avg_logprob": -0.3}]}])
+        assert lock.due() is None
+        lock.observe([{"segments": [{"avg_logprob": -0.3}, {"avg_logprob": -1.7}]}])
+        assert lock.due() == LOW_CONFIDENCE
+        lock.update("de", 0.8)
+        assert lock.language == "de" and lock.due() is None
+
+    def test_unknown_probability_counts_as_sure(self):
+        lock = LanguageLock()
+        assert lock.update("cs", None) is True
+        assert lock.stats() == {"language": "cs", "probability": None, "detections": 1}
+
+
+class TestLanguageEndpoint:
+    @pytest.fixture()
+    def client(self, loaded_engine, monkeypatch):
+        self.calls = []
+
+        def _detect(audios, precision=None):
+            self.calls.append([len(a) for a in audios])
+            return [{"language": "en", "probability": 0.97} for _ in audios]
+
+        monkeypatch.setattr(loaded_engine, "detect_language", _detect)
+        return TestClient(app)
+
+    def test_files_identified_in_one_job(self, client):
+        audio = np.zeros(8000, dtype=np.float32)
+        resp = client.post(
+            "/api/language",
+            files=[
+                ("files", ("a.wav", _wav(audio), "audio/wav")),
+                ("files", ("b.wav", _wav(audio), "audio/wav")),
+            ],
+        )
+        assert resp.status_code == 200
+        assert resp.json()["results"] == [
+            {"filename": "a.wav", "language": "en", "probability": 0.97},
+            {"filename": "b.wav", "language": "en", "probability": 0.97},
+        ]
+        assert self.calls == [[8000, 8000]]
+
+    def test_undecodable_file_returns_400(self, client):
+        resp = client.post("/api/language", files=[("files", ("a.wav", b"junk", "audio/wav"))])
+        assert resp.status_code == 400
+
+    def test_disabled_precision_returns_400(self, client):
+        resp = client.post(
+            "/api/language",
+            files=[("files", ("a.wav", _wav(np.zeros(800, dtype=np.float32)), "audio/wav"))],
+            data={"precision": "int4"},
+        )
+        assert resp.status_code == 400
@@ -73,7 +73,53 @@ class TestLifespan:
         monkeypatch.setattr(TranscriptionEngine, "_instance", None)
 
         async with lifespan(app):
+            await app.state.engine_load_task
             engine = TranscriptionEngine.get_instance()
             assert engine.is_loaded is True
             assert engine.backend == "mlx-whisper"
             assert engine.device == "mps"
+
+    @pytest.mark.asyncio
+    async def test_lifespan_does_not_block_on_load(self, monkeypatch):
+        """The app starts serving before the model has finished loading."""
+        import threading
+
+        from app.main import lifespan
+
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        release = threading.Event()
+        engine = TranscriptionEngine.get_instance()
+        original_load = engine.load
+
+        def _slow_load(**kwargs):
+            release.wait(5)
+            original_load(**kwargs)
+
+        monkeypatch.setattr(engine, "load", _slow_load)
+
+        async with lifespan(app):
+            assert engine.is_loaded is False
+            release.set()
+            await app.state.engine_load_task
+            assert engine.is_loaded is True
+
+    @pytest.mark.asyncio
+    async def test_lifespan_survives_load_failure(self, monkeypatch):
+        """A failing load is recorded on the engine instead of crashing startup."""
+        import sys
+
+        from app.main import lifespan
+
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+
+        def _boom(audio, **kwargs):
+            raise RuntimeError("no weights")
+
+        monkeypatch.setattr(sys.modules["mlx_whisper"], "transcribe", _boom)
+
+        async with lifespan(app):
+            await app.state.engine_load_task
+            engine = TranscriptionEngine.get_instance()
+            assert engine.is_loaded is False
+            assert engine.status == "failed"
+            assert engine.load_progress["error"] == "no weights"
@@ -0,0 +1,48 @@
+"""Tests for app.metrics and the /metrics endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.metrics import DECODE_ABORTS, REGISTRY, Registry
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+class TestCounter:
+    """Counters accumulate per label set and render as Prometheus text."""
+
+    def test_inc_and_value(self):
+        registry = Registry()
+        counter = registry.counter("things_total", "Things", ("kind",))
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        counter.inc(kind="b")
+        assert counter.value(kind="a") == 3
+        assert counter.value(kind="c") == 0
+
+    def test_render(self):
+        registry = Registry()
+        registry.counter("things_total", "Things", ("kind",)).inc(kind="a")
+        assert registry.render() == (
+            "# HELP things_total Things\n"
+            "# TYPE things_total counter\n"
+            'things_total{kind="a"} 1\n'
+        )
+
+
+class TestMetricsEndpoint:
+    """GET /metrics exposes the process registry."""
+
+    def test_decode_aborts_exposed(self):
+        from app.main import app
+
+        DECODE_ABORTS.inc(reason="repetition")
+        resp = TestClient(app).get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert 'stt_decode_aborts_total{reason="repetition"} 1' in resp.text
@@ -4,7 +4,7 @@ import struct
 
 import numpy as np
 
-from app.audio.normalizer import pcm_to_float32
+from app.audio.normalizer import pcm16_channels, pcm_to_float32
 
 
 class TestPcmToFloat32:
@@ -55,3 +55,28 @@ class TestPcmToFloat32:
         result = pcm_to_float32(b"")
         assert len(result) == 0
         assert result.dtype == np.float32
+
+
+class TestPcm16Channels:
+    """Verify zero-copy deinterleaving of multi-channel PCM."""
+
+    def test_deinterleave(self):
+        data = struct.pack("<6h", 1, 2, 3, 4, 5, 6)
+        result = pcm16_channels(data, 2)
+        assert result.shape == (2, 3)
+        np.testing.assert_array_equal(result[0], [1, 3, 5])
+        np.testing.assert_array_equal(result[1], [2, 4, 6])
+
+    def test_views_share_input_memory(self):
+        data = struct.pack("<4h", 1, 2, 3, 4)
+        result = pcm16_channels(data, 2)
+        assert not result.flags.owndata
+        assert np.may_share_memory(result[0], result[1])
+
+    def test_mono(self):
+        data = struct.pack("<3h", 1, 2, 3)
+        np.testing.assert_array_equal(pcm16_channels(data, 1)[0], [1, 2, 3])
+
+    def test_partial_frame_dropped(self):
+        data = struct.pack("<5h", 1, 2, 3, 4, 5)
+        assert pcm16_channels(data, 2).shape == (2, 2)
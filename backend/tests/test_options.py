@@ -0,0 +1,64 @@
+"""Tests for decode options and presets (app.engine.options)."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.engine.options import PRESETS, DecodeOptions, preset_options, resolve_options
+
+
+class TestDecodeOptions:
+    def test_unset_fields_pass_nothing(self):
+        assert DecodeOptions().transcribe_kwargs() == {}
+        assert DecodeOptions().thresholds() == {}
+
+    def test_transcribe_kwargs(self):
+        options = DecodeOptions(
+            temperature=[0.0, 0.5], no_speech_threshold=0.5, initial_prompt="ahoj"
+        )
+        # The prompt is passed on its own, next to the engine's prompt argument
+        assert options.transcribe_kwargs() == {"temperature": (0.0, 0.5), "no_speech_threshold": 0.5}
+        assert options.thresholds() == {"no_speech_threshold": 0.5}
+
+    @pytest.mark.parametrize(
+        "fields",
+        [
+            {"temperature": []},
+            {"temperature": [1.5]},
+            {"no_speech_threshold": 2.0},
+            {"logprob_threshold": 0.5},
+            {"compression_ratio_threshold": 0},
+            {"beam_size": 5},
+        ],
+    )
+    def test_invalid_options_rejected(self, fields):
+        with pytest.raises(ValidationError):
+            DecodeOptions(**fields)
+
+    def test_merged_keeps_unset_fields(self):
+        base = preset_options("accurate")
+        merged = base.merged(DecodeOptions(no_speech_threshold=0.3))
+        assert merged.no_speech_threshold == 0.3
+        assert merged.temperature == base.temperature
+        assert base.merged(None) is base
+
+
+class TestPresets:
+    def test_presets_set_every_decode_field(self):
+        for options in PRESETS.values():
+            unset = {k for k, v in options.model_dump().items() if v is None}
+            assert unset == {"initial_prompt"}
+
+    def test_fast_never_falls_back(self):
+        assert preset_options("fast").temperature == (0.0,)
+        assert preset_options("fast").condition_on_previous_text is False
+
+    def test_unknown_preset(self):
+        with pytest.raises(ValueError, match="Unknown decode preset"):
+            preset_options("turbo")
+
+    def test_resolve(self):
+        assert resolve_options() is None
+        assert resolve_options("balanced") == PRESETS["balanced"]
+        overrides = DecodeOptions(temperature=[0.0])
+        assert resolve_options(None, overrides) == overrides
+        assert resolve_options("balanced", overrides).temperature == (0.0,)
@@ -0,0 +1,111 @@
+"""Tests for app.profiler and GET /admin/profile."""
+
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import LOOP_BLOCKED
+from app.profiler import LoopLagMonitor, ProfilerBusy, Sampler
+
+
+def _spin_until(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture()
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=_spin_until, args=(stop,), name="busy")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+class TestSampler:
+    def test_collapsed_stacks(self, busy_thread):
+        sampler = Sampler({"busy": busy_thread.ident}, interval_s=0.005)
+        sampler.run(0.1)
+        assert sampler.samples > 5
+        lines = sampler.collapsed().splitlines()
+        assert lines and all(line.startswith("busy;") for line in lines)
+        assert any("_spin_until (tests/test_profiler.py:" in line for line in lines)
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) <= sampler.samples
+
+    def test_speedscope(self, busy_thread):
+        sampler = Sampler({"busy": busy_thread.ident, "gone": -1}, interval_s=0.005)
+        sampler.run(0.05)
+        data = sampler.speedscope()
+        busy, gone = data["profiles"]
+        assert (busy["name"], busy["type"]) == ("busy", "sampled")
+        assert len(busy["samples"]) == len(busy["weights"]) > 0
+        names = {data["shared"]["frames"][i]["name"] for sample in busy["samples"] for i in sample}
+        assert "_spin_until" in names
+        assert gone["samples"] == []
+
+    def test_one_profile_at_a_time(self):
+        with Sampler._running:
+            with pytest.raises(ProfilerBusy):
+                Sampler({}).run(0.01)
+
+
+class TestEndpoint:
+    def test_collapsed_loop_profile(self):
+        resp = TestClient(app).get("/admin/profile", params={"seconds": 0.1, "interval_ms": 5})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert resp.text.startswith("loop;")
+
+    def test_speedscope_format(self):
+        resp = TestClient(app).get(
+            "/admin/profile", params={"seconds": 0.05, "format": "speedscope", "threads": "all"}
+        )
+        assert resp.status_code == 200
+        names = [p["name"] for p in resp.json()["profiles"]]
+        assert "loop" in names and "MainThread" in names
+
+    @pytest.mark.parametrize(
+        "params", [{"seconds": 3600}, {"threads": "gpu"}, {"format": "pprof"}]
+    )
+    def test_rejects_bad_requests(self, params):
+        resp = TestClient(app).get("/admin/profile", params={"seconds": 0.01, **params})
+        assert resp.status_code in (400, 422)
+
+    def test_busy(self):
+        with Sampler._running:
+            resp = TestClient(app).get("/admin/profile", params={"seconds": 0.01})
+        assert resp.status_code == 409
+
+
+class TestLoopLagMonitor:
+    async def test_logs_the_blocking_code(self, caplog):
+        def block_the_loop():
+            time.sleep(0.3)
+
+        monitor = LoopLagMonitor(threshold_s=0.05, interval_s=0.01)
+        before = LOOP_BLOCKED.value()
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            with caplog.at_level(logging.WARNING, logger="app.profiler"):
+                block_the_loop()
+                await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+        assert LOOP_BLOCKED.value() == before + 1
+        (record,) = [r for r in caplog.records if "Event loop blocked" in r.getMessage()]
+        assert "block_the_loop" in record.getMessage()
+
+    async def test_quiet_when_the_loop_is_responsive(self, caplog):
+        monitor = LoopLagMonitor(threshold_s=0.1, interval_s=0.01)
+        monitor.start()
+        with caplog.at_level(logging.WARNING, logger="app.profiler"):
+            await asyncio.sleep(0.2)
+        await monitor.stop()
+        assert not [r for r in caplog.records if "Event loop blocked" in r.getMessage()]
@@ -0,0 +1,248 @@
+"""Tests for session recording and replay (app/session/recorder.py, app/replay.py)."""
+
+import asyncio
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.engine import fake
+from app.engine.factory import TranscriptionEngine
+from app.main import app
+from app.replay import ReplayError, ReplayStats, compare, default_url, find_recordings, replay, replay_session
+from app.session.recorder import (
+    BINARY,
+    CLOSE,
+    TEXT,
+    Frame,
+    SessionRecorder,
+    read_recording,
+)
+
+SECOND = b"\x00\x01" * 16000  # 1 s of 16 kHz mono PCM
+
+
+class TestRecorder:
+    def test_round_trip(self, tmp_path):
+        recorder = SessionRecorder(tmp_path / "a.sttrec")
+        recorder.text('{"type": "configure"}')
+        recorder.message({"type": "websocket.receive", "bytes": b"\x01\x02"})
+        recorder.message({"type": "websocket.receive", "text": "stop"})
+        recorder.message({"type": "websocket.disconnect", "code": 1001})
+        recorder.close()
+
+        frames = list(read_recording(tmp_path / "a.sttrec"))
+        assert [(f.kind, f.payload) for f in frames] == [
+            (TEXT, b'{"type": "configure"}'),
+            (BINARY, b"\x01\x02"),
+            (TEXT, b"stop"),
+            (CLOSE, b"1001"),
+        ]
+        assert all(a.t <= b.t for a, b in zip(frames, frames[1:]))
+
+    def test_truncated_file_reads_complete_records(self, tmp_path):
+        path = tmp_path / "a.sttrec"
+        recorder = SessionRecorder(path)
+        recorder.text("first")
+        recorder.text("second")
+        recorder.close()
+        path.write_bytes(path.read_bytes()[:-3])
+        assert [f.text for f in read_recording(path)] == ["first"]
+
+    def test_rejects_other_files(self, tmp_path):
+        (tmp_path / "a.wav").write_bytes(b"RIFF....")
+        with pytest.raises(ValueError, match="not a session recording"):
+            list(read_recording(tmp_path / "a.wav"))
+
+    def test_websocket_sessions_are_recorded(self, loaded_engine, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "record_dir", str(tmp_path))
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "en"}))
+            ws.receive_json()  # ready
+            ws.send_bytes(struct.pack("<100h", *([1000] * 100)))
+            ws.send_text("stop")
+            while ws.receive_json()["type"] != "done":
+                pass
+
+        (path,) = find_recordings([str(tmp_path)])
+        frames = list(read_recording(path))
+        assert [f.kind for f in frames] == [TEXT, BINARY, TEXT]
+        assert json.loads(frames[0].text)["language"] == "en"
+        assert len(frames[1].payload) == 200
+
+
+class TestFakeEngine:
+    def test_transcript_follows_audio_length(self):
+        result = fake.transcribe(np.zeros(40000, dtype=np.float32), language="cs")
+        assert result["text"] == " alpha bravo charlie"
+        assert result["segments"][-1]["end"] == 2.5
+        assert result["language"] == "cs"
+
+    def test_prefix_returns_only_the_rest(self):
+        result = fake.transcribe(np.zeros(48000, dtype=np.float32), prefix="alpha")
+        assert result["text"] == "bravo charlie"
+
+    def test_engine_loads_the_fake(self, monkeypatch):
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(model_repo="mlx-community/whisper-tiny", language="en", fake_rtf=0.0)
+        assert engine.transcribe(np.zeros(16000, dtype=np.float32))["text"] == " alpha"
+
+
+class FakeConnection:
+    """Server stand-in answering the frames ``replay_session`` sends."""
+
+    def __init__(self, delay_s: float = 0.0, cadence: str = "fixed") -> None:
+        self.delay_s = delay_s
+        self.cadence = cadence
+        self.sent: list = []
+        self.closed = False
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._samples = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def send(self, data) -> None:
+        self.sent.append(data)
+        await asyncio.sleep(self.delay_s)
+        if isinstance(data, bytes):
+            self._samples += len(data) // 2
+            if self._samples >= 80000:
+                self._samples = 0
+                self._outbox.put_nowait({"type": "final", "text": "x"})
+            elif self._samples % 32000 == 0:
+                self._outbox.put_nowait({"type": "partial", "text": "x"})
+                self._outbox.put_nowait({"type": "partial", "text": "y"})
+        elif data == "stop":
+            self._outbox.put_nowait({"type": "done"})
+        elif json.loads(data).get("type") == "configure":
+            self._outbox.put_nowait({"type": "ready", "partial_cadence": self.cadence})
+
+    async def close(self) -> None:
+        self.closed = True
+        self._outbox.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        message = await self._outbox.get()
+        if message is None:
+            raise StopAsyncIteration
+        return json.dumps(message)
+
+
+def _recording(seconds: int, stop: bool = True) -> list[Frame]:
+    frames = [Frame(0.0, TEXT, json.dumps({"type": "configure", "session_token": "old"}).encode())]
+    frames += [Frame(float(i + 1), BINARY, SECOND) for i in range(seconds)]
+    if stop:
+        frames.append(Frame(seconds + 0.5, TEXT, b"stop"))
+    return frames
+
+
+def _record(tmp_path: Path) -> Path:
+    path = tmp_path / "a.sttrec"
+    recorder = SessionRecorder(path)
+    for frame in _recording(2):
+        if frame.kind == TEXT:
+            recorder.text(frame.text)
+        else:
+            recorder.message({"type": "websocket.receive", "bytes": frame.payload})
+    recorder.close()
+    return path
+
+
+class TestReplay:
+    async def test_latency_per_trigger(self):
+        ws = FakeConnection(delay_s=0.001)
+        stats = ReplayStats()
+        await replay_session(ws, _recording(5), speed=0, stats=stats)
+        assert "session_token" not in json.loads(ws.sent[0])
+        # Partials at 2 s and 4 s (the second message of each is not counted), final at 5 s
+        assert [len(stats.latencies_ms[m]) for m in ("partial", "final", "done")] == [2, 1, 1]
+        assert stats.messages == 7  # With ready
+
+    async def test_speed_scales_the_recorded_gaps(self):
+        stats = ReplayStats()
+        start = asyncio.get_running_loop().time()
+        await replay_session(FakeConnection(), _recording(2), speed=20, stats=stats)
+        assert asyncio.get_running_loop().time() - start >= 2.5 / 20
+
+    async def test_recording_without_stop_closes(self):
+        ws = FakeConnection()
+        stats = ReplayStats()
+        await replay_session(ws, _recording(1, stop=False), speed=0, stats=stats)
+        assert ws.closed
+        assert stats.latencies_ms["done"] == []
+
+    async def test_adaptive_cadence_is_refused_before_audio(self):
+        ws = FakeConnection(cadence="adaptive")
+        with pytest.raises(ReplayError, match="STT_PARTIAL_CADENCE=fixed"):
+            await replay_session(ws, _recording(5), speed=0, stats=ReplayStats())
+        assert not any(isinstance(data, bytes) for data in ws.sent)
+
+    async def test_adaptive_cadence_stops_the_run(self, tmp_path):
+        path = _record(tmp_path)
+        with pytest.raises(ReplayError):
+            await replay(
+                [path], "ws://test", speed=0, concurrency=2, repeat=2,
+                connect=lambda url: FakeConnection(cadence="adaptive"),
+            )
+
+    def test_server_reports_its_cadence(self, loaded_engine, monkeypatch):
+        monkeypatch.setattr(settings, "partial_cadence", "adaptive")
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure"}))
+            assert ws.receive_json()["partial_cadence"] == "adaptive"
+
+    async def test_concurrent_sessions(self, tmp_path):
+        path = _record(tmp_path)
+
+        stats = await replay(
+            [path], "ws://test", speed=0, concurrency=3, repeat=4,
+            connect=lambda url: FakeConnection(),
+        )
+        assert (stats.sessions, stats.failed) == (4, 0)
+        summary = stats.summary()
+        assert summary["latency_ms"]["done"]["count"] == 4
+        assert summary["latency_ms"]["final"] == {
+            "count": 0, "p50": None, "p90": None, "p99": None, "max": None
+        }
+
+
+class TestDefaultUrl:
+    @pytest.mark.parametrize("host,expected", [
+        ("0.0.0.0", "ws://127.0.0.1:9000/ws/transcribe"),
+        ("10.0.0.5", "ws://10.0.0.5:9000/ws/transcribe"),
+        ("::1", "ws://[::1]:9000/ws/transcribe"),
+    ])
+    def test_follows_the_server_settings(self, monkeypatch, host, expected):
+        monkeypatch.setattr(settings, "host", host)
+        monkeypatch.setattr(settings, "port", 9000)
+        assert default_url() == expected
+
+
+class TestCompare:
+    def test_flags_regressions_over_the_threshold(self):
+        baseline = {"latency_ms": {"partial": {"p50": 100.0, "p90": 200.0, "p99": 300.0}}}
+        current = {"latency_ms": {"partial": {"p50": 110.0, "p90": 200.0, "p99": 450.0}}}
+        rows, regressed = compare(baseline, current, max_regression=0.2)
+        assert regressed
+        assert [row["regressed"] for row in rows] == [False, False, True]
+        assert rows[0]["change"] == pytest.approx(0.1)
+
+    def test_missing_baseline_values_are_skipped(self):
+        rows, regressed = compare({"latency_ms": {}}, {"latency_ms": {"done": {"p50": 1.0}}})
+        assert (rows, regressed) == ([], False)
@@ -0,0 +1,70 @@
+"""Tests for app.session.resume — parked session store."""
+
+import numpy as np
+
+from app.session.resume import PROMPT_CHARS, ResumeState, ResumeStore
+
+
+def _state(offset: int = 0) -> ResumeState:
+    return ResumeState(
+        language="cs",
+        committed=["ahoj", "světe"],
+        audio_tail=np.zeros(100, dtype=np.float32),
+        sample_offset=offset,
+    )
+
+
+class TestResumeState:
+    """ResumeState derives the prompt and its size."""
+
+    def test_prompt_joins_committed(self):
+        assert _state().prompt == "ahoj světe"
+
+    def test_prompt_truncated(self):
+        state = _state()
+        state.committed = ["x" * 1000]
+        assert len(state.prompt) == PROMPT_CHARS
+
+    def test_channels(self):
+        assert _state().channels == 1
+        state = _state()
+        state.audio_tail = np.zeros((2, 50), dtype=np.float32)
+        assert state.channels == 2
+
+    def test_nbytes(self):
+        assert _state().nbytes == 400 + len("ahoj".encode()) + len("světe".encode())
+
+
+class TestResumeStore:
+    """Parked sessions can be claimed once, until they expire."""
+
+    def test_claim_returns_parked_state(self):
+        store = ResumeStore(ttl_s=10, max_entries=4)
+        state = _state(42)
+        store.park("tok", state, now=0)
+        assert store.claim("tok", now=1) is state
+        # Claiming removes the entry
+        assert store.claim("tok", now=1) is None
+
+    def test_unknown_token(self):
+        store = ResumeStore(ttl_s=10, max_entries=4)
+        assert store.claim("nope") is None
+
+    def test_expired_entries_dropped(self):
+        store = ResumeStore(ttl_s=10, max_entries=4)
+        store.park("tok", _state(), now=0)
+        assert store.claim("tok", now=11) is None
+        assert len(store) == 0
+
+    def test_bounded_by_max_entries(self):
+        store = ResumeStore(ttl_s=10, max_entries=2)
+        for i in range(3):
+            store.park(f"tok{i}", _state(i), now=0)
+        assert len(store) == 2
+        assert store.claim("tok0", now=0) is None
+        assert store.claim("tok2", now=0).sample_offset == 2
+
+    def test_nbytes(self):
+        store = ResumeStore(ttl_s=10, max_entries=2)
+        store.park("tok", _state(), now=0)
+        assert store.nbytes == _state().nbytes
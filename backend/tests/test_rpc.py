@@ -0,0 +1,368 @@
+"""Tests for the gateway <-> engine worker RPC (app.rpc)."""
+
+import asyncio
+import io
+import json
+import struct
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.engine.factory import TranscriptionEngine, get_engine
+from app.engine.scheduler import LIVE_FINAL, LIVE_PARTIAL, JobDropped
+from app.main import app
+from app.rpc.client import WorkerClient
+from app.rpc.pool import RemoteEngine
+from app.rpc.protocol import is_local, pack_arrays, parse_address, unpack_arrays
+from app.rpc.worker import WorkerServer
+
+
+def _engine(name: str, release: threading.Event | None = None) -> TranscriptionEngine:
+    """A loaded engine (outside the singleton) whose results name it."""
+    engine = TranscriptionEngine()
+    engine.load(model_repo="mlx-community/whisper-tiny", language="cs")
+
+    def mock_transcribe(audio, language=None, initial_prompt=None, prefix=None):
+        if release is not None:
+            release.wait(5)
+        text = f"{name} {len(audio)}" + (f" after {prefix}" if prefix else "")
+        return {"text": text, "segments": [{"text": text, "start": 0.0, "end": 1.0}]}
+
+    engine.transcribe = mock_transcribe
+    return engine
+
+
+async def _start(engines: list[TranscriptionEngine], tmp_path) -> list[WorkerServer]:
+    servers = [
+        WorkerServer(engine, f"unix://{tmp_path}/worker{i}.sock")
+        for i, engine in enumerate(engines)
+    ]
+    for server in servers:
+        await server.start()
+    return servers
+
+
+class TestProtocol:
+    def test_arrays_round_trip(self):
+        arrays = [np.arange(5, dtype=np.float32), np.zeros(0, dtype=np.float32), np.ones(3)]
+        lengths, body = pack_arrays(arrays)
+        assert lengths == [5, 0, 3]
+        out = unpack_arrays(lengths, body)
+        for a, b in zip(arrays, out):
+            np.testing.assert_array_equal(a, b)
+            assert b.dtype == np.float32
+
+    def test_parse_address(self):
+        assert parse_address("tcp://127.0.0.1:9100") == ("tcp", "127.0.0.1", 9100)
+        assert parse_address("unix:///tmp/w.sock") == ("unix", "/tmp/w.sock", 0)
+        with pytest.raises(ValueError):
+            parse_address("127.0.0.1:9100")
+
+    def test_is_local(self):
+        assert is_local("unix:///tmp/w.sock")
+        assert is_local("tcp://127.0.0.1:9100")
+        assert not is_local("tcp://10.0.0.7:9100")
+
+    async def test_tcp_call_round_trip(self):
+        server = WorkerServer(_engine("w0"), "tcp://127.0.0.1:0")
+        await server.start()
+        client = WorkerClient(server.address)
+        try:
+            status = await client.call("status")
+            assert status["loaded"] is True
+            assert status["model"] == "mlx-community/whisper-tiny"
+            result = await client.call("transcribe", {}, [np.zeros(160, dtype=np.float32)])
+            assert result["text"] == "w0 160"
+            with pytest.raises(ValueError, match="Unknown method"):
+                await client.call("nope")
+        finally:
+            await client.close()
+            await server.close()
+
+
+class TestRemoteEngine:
+    async def test_reports_worker_status(self, tmp_path):
+        servers = await _start([_engine("w0"), _engine("w1")], tmp_path)
+        remote = RemoteEngine([s.address for s in servers])
+        try:
+            assert remote.is_loaded is False
+            assert await remote.wait_until_loaded(1.0) is True
+            assert remote.status == "ready"
+            assert remote.backend == "mlx-whisper"
+            assert remote.precisions == ["fp16"]
+            assert [w["address"] for w in remote.load_progress["workers"]] == [
+                s.address for s in servers
+            ]
+        finally:
+            await remote.close()
+            for server in servers:
+                await server.close()
+
+    async def test_least_loaded_worker_gets_the_next_call(self, tmp_path):
+        release = threading.Event()
+        servers = await _start([_engine("w0", release), _engine("w1")], tmp_path)
+        remote = RemoteEngine([s.address for s in servers])
+        audio = np.zeros(160, dtype=np.float32)
+        try:
+            await remote.refresh()
+            busy = asyncio.create_task(remote.transcribe_async(audio))
+            await asyncio.sleep(0.05)
+            # w0 is busy, so the next call goes to w1
+            assert (await remote.transcribe_async(audio))["text"] == "w1 160"
+            assert (await remote.transcribe_async(audio))["text"] == "w1 160"
+            release.set()
+            assert (await busy)["text"] == "w0 160"
+        finally:
+            release.set()
+            await remote.close()
+            for server in servers:
+                await server.close()
+
+    async def test_fails_over_when_a_worker_dies(self, tmp_path):
+        servers = await _start([_engine("w0"), _engine("w1")], tmp_path)
+        remote = RemoteEngine([s.address for s in servers])
+        audio = np.zeros(160, dtype=np.float32)
+        try:
+            await remote.refresh()
+            await servers[0].close()
+            result = await remote.transcribe_async(audio)
+            assert result["text"] == "w1 160"
+            assert remote.load_progress["workers"][0]["connected"] is False
+            # The dead worker is no longer picked
+            assert remote.pick().address == servers[1].address
+        finally:
+            await remote.close()
+            await servers[1].close()
+
+    async def test_cancel_drops_queued_partial_on_worker(self, tmp_path):
+        release = threading.Event()
+        servers = await _start([_engine("w0", release)], tmp_path)
+        remote = RemoteEngine([servers[0].address])
+        audio = np.zeros(160, dtype=np.float32)
+        try:
+            await remote.refresh()
+            running = asyncio.create_task(remote.transcribe_async(audio, job_class=LIVE_FINAL))
+            await asyncio.sleep(0.05)
+            partial = asyncio.create_task(
+                remote.transcribe_async(audio, job_class=LIVE_PARTIAL, key="s1")
+            )
+            await asyncio.sleep(0.05)
+            assert remote.scheduler.cancel("s1") is True
+            with pytest.raises(JobDropped):
+                await partial
+            release.set()
+            await running
+        finally:
+            release.set()
+            await remote.close()
+            await servers[0].close()
+
+    async def test_decode_options_reach_worker(self, tmp_path):
+        from app.engine.options import DecodeOptions
+
+        engine = _engine("w0")
+        seen = []
+        engine.transcribe = lambda audio, language=None, options=None: (
+            seen.append(options) or {"text": "", "segments": []}
+        )
+        servers = await _start([engine], tmp_path)
+        remote = RemoteEngine([servers[0].address])
+        try:
+            await remote.refresh()
+            options = DecodeOptions(temperature=[0.0], condition_on_previous_text=False)
+            await remote.transcribe_async(np.zeros(160, dtype=np.float32), options=options)
+            assert seen == [options]
+        finally:
+            await remote.close()
+            await servers[0].close()
+
+    async def test_audio_goes_through_arena(self, tmp_path, monkeypatch):
+        from app.audio.arena import AudioArena
+        from app.audio.buffer import AudioBuffer
+
+        arena = AudioArena(4 * 16000 * 4)
+        engine = _engine("w0")
+        seen = []
+        engine.transcribe = lambda audio, language=None: (
+            seen.append(audio.copy()) or {"text": "", "segments": []}
+        )
+        servers = await _start([engine], tmp_path)
+        remote = RemoteEngine([servers[0].address], arena)
+        buf = AudioBuffer(arena)
+        buf.append(np.arange(160, dtype=np.float32))
+
+        def no_bytes(arrays):
+            raise AssertionError("audio sent in the frame body")
+
+        monkeypatch.setattr("app.rpc.client.pack_arrays", no_bytes)
+        try:
+            await remote.refresh()
+            await remote.transcribe_async(buf.samples)
+            await remote.transcribe_async(np.ones(80, dtype=np.float32))
+            np.testing.assert_array_equal(seen[0], np.arange(160))
+            np.testing.assert_array_equal(seen[1], np.ones(80))
+            # Only the session buffer still holds slabs
+            assert arena.free_slabs == arena.slabs - 1
+        finally:
+            buf.release()
+            await remote.close()
+            await servers[0].close()
+            arena.close()
+
+    async def test_arena_audio_held_until_worker_answers(self, tmp_path):
+        from app.audio.arena import AudioArena
+
+        arena = AudioArena(4 * 16000 * 4)
+        release = threading.Event()
+        servers = await _start([_engine("w0", release)], tmp_path)
+        remote = RemoteEngine([servers[0].address], arena)
+        try:
+            await remote.refresh()
+            call = asyncio.create_task(remote.transcribe_async(np.ones(160, dtype=np.float32)))
+            await asyncio.sleep(0.05)
+            # Cancelled (e.g. superseded) while the worker decodes it
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+            assert arena.free_slabs == arena.slabs - 1
+            release.set()
+            for _ in range(100):
+                if arena.free_slabs == arena.slabs:
+                    break
+                await asyncio.sleep(0.01)
+            assert arena.free_slabs == arena.slabs
+        finally:
+            release.set()
+            await remote.close()
+            await servers[0].close()
+            arena.close()
+
+    async def test_detect_language_on_worker(self, tmp_path):
+        engine = _engine("w0")
+        engine.detect_language = lambda audios, precision=None: [
+            {"language": "en", "probability": 0.9} for _ in audios
+        ]
+        servers = await _start([engine], tmp_path)
+        remote = RemoteEngine([servers[0].address])
+        try:
+            await remote.refresh()
+            audios = [np.zeros(160, dtype=np.float32), np.zeros(320, dtype=np.float32)]
+            assert await remote.detect_language_async(audios) == [
+                {"language": "en", "probability": 0.9}
+            ] * 2
+        finally:
+            await remote.close()
+            await servers[0].close()
+
+    async def test_stream_forces_agreed_prefix(self, tmp_path):
+        servers = await _start([_engine("w0")], tmp_path)
+        remote = RemoteEngine([servers[0].address])
+        state = remote.open_stream()
+        try:
+            await remote.refresh()
+            audio = np.zeros(4800, dtype=np.float32)
+            await remote.transcribe_stream_async(state, audio[:1600])
+            await remote.transcribe_stream_async(state, audio[:3200])
+            assert state.prefix == "w0"
+            # The gateway keeps the agreed prefix and the worker is told to force it
+            result = await remote.transcribe_stream_async(state, audio)
+            assert result["text"].endswith("w0 4800 after w0")
+            # An unchanged window is answered from the gateway's cache
+            assert await remote.transcribe_stream_async(state, audio) is result
+            assert state.decodes == 3
+        finally:
+            await remote.close()
+            await servers[0].close()
+
+    async def test_transcribe_goes_through_the_engine_pipeline(self, tmp_path):
+        engine = _engine("w0")
+        calls = []
+        transcribe_async = engine.transcribe_async
+
+        async def spy(*args, **kwargs):
+            calls.append(kwargs)
+            return await transcribe_async(*args, **kwargs)
+
+        engine.transcribe_async = spy
+        servers = await _start([engine], tmp_path)
+        remote = RemoteEngine([servers[0].address])
+        try:
+            await remote.refresh()
+            result = await remote.transcribe_async(
+                np.zeros(160, dtype=np.float32), job_class=LIVE_PARTIAL, key="s1", prefix="hi"
+            )
+            assert result["text"] == "w0 160 after hi"
+            assert [(c["job_class"], c["key"], c["prefix"]) for c in calls] == [
+                (LIVE_PARTIAL, "s1", "hi")
+            ]
+        finally:
+            await remote.close()
+            await servers[0].close()
+
+
+@pytest.fixture()
+def worker_thread(tmp_path):
+    """An engine worker served from its own event loop thread."""
+    loop = asyncio.new_event_loop()
+    server = WorkerServer(_engine("remote"), f"unix://{tmp_path}/gateway.sock")
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+@pytest.fixture()
+def gateway(worker_thread, monkeypatch):
+    """The app in gateway mode, forwarding to one worker."""
+    monkeypatch.setattr(settings, "engine_workers", [worker_thread.address])
+    monkeypatch.setattr(settings, "ready_wait_s", 2.0)
+    monkeypatch.setattr(RemoteEngine, "_instance", None)
+    monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+    with TestClient(app) as client:
+        yield client
+
+
+class TestGateway:
+    def test_get_engine_selects_remote(self, gateway):
+        assert isinstance(get_engine(), RemoteEngine)
+        assert TranscriptionEngine._instance is None
+
+    def test_health_reports_worker(self, gateway):
+        for _ in range(100):
+            body = gateway.get("/health").json()
+            if body["status"] == "ok":
+                break
+        assert body["status"] == "ok"
+        assert body["model"] == "mlx-community/whisper-tiny"
+        assert body["load"]["workers"][0]["connected"] is True
+
+    def test_upload_is_decoded_by_worker(self, gateway):
+        samples = np.zeros(8000, dtype=np.int16)
+        buf = io.BytesIO()
+        buf.write(b"RIFF" + struct.pack("<I", 36 + samples.nbytes) + b"WAVEfmt ")
+        buf.write(struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16))
+        buf.write(b"data" + struct.pack("<I", samples.nbytes) + samples.tobytes())
+        resp = gateway.post(
+            "/api/transcribe", files={"file": ("a.wav", buf.getvalue(), "audio/wav")}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["text"] == "remote 8000"
+
+    def test_websocket_final_is_decoded_by_worker(self, gateway):
+        with gateway.websocket_connect("/ws/transcribe") as ws:
+            assert ws.receive_json()["model"] == "mlx-community/whisper-tiny"
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ws.receive_json()  # ready
+            ws.send_bytes(struct.pack("<100h", *([0] * 100)))
+            ws.send_text("stop")
+            messages = []
+            while not messages or messages[-1]["type"] != "done":
+                messages.append(ws.receive_json())
+        finals = [m for m in messages if m["type"] == "final"]
+        assert finals and finals[0]["text"] == "remote 100"
@@ -0,0 +1,226 @@
+"""Tests for app.engine.scheduler — priority classes, deadlines, superseding."""
+
+import threading
+import time
+
+import pytest
+
+from app.engine.scheduler import (
+    BATCH,
+    LIVE_FINAL,
+    LIVE_PARTIAL,
+    UPLOAD,
+    JobDropped,
+    Scheduler,
+)
+from app.metrics import JOBS_DROPPED, QUEUE_TIME, REGISTRY
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def _block(scheduler: Scheduler) -> threading.Event:
+    """Occupy the worker until the returned event is set."""
+    gate = threading.Event()
+    started = threading.Event()
+
+    def _wait():
+        started.set()
+        gate.wait(5)
+
+    scheduler.submit(_wait, BATCH)
+    started.wait(5)
+    return gate
+
+
+class TestPriorities:
+    """Queued jobs run by class, then deadline, then submission order."""
+
+    def test_classes_run_in_priority_order(self):
+        scheduler = Scheduler()
+        gate = _block(scheduler)
+        order = []
+        futures = [
+            scheduler.submit(lambda c=c: order.append(c), c)
+            for c in (BATCH, UPLOAD, LIVE_PARTIAL, LIVE_FINAL)
+        ]
+        gate.set()
+        for future in futures:
+            future.result(5)
+        assert order == [LIVE_FINAL, LIVE_PARTIAL, UPLOAD, BATCH]
+
+    def test_earliest_deadline_first_within_class(self):
+        scheduler = Scheduler()
+        gate = _block(scheduler)
+        order = []
+        late = scheduler.submit(lambda: order.append("late"), UPLOAD, deadline_s=10)
+        early = scheduler.submit(lambda: order.append("early"), UPLOAD, deadline_s=1)
+        gate.set()
+        late.result(5), early.result(5)
+        assert order == ["early", "late"]
+
+    def test_unknown_class_rejected(self):
+        with pytest.raises(ValueError, match="Unknown job class"):
+            Scheduler().submit(lambda: None, "realtime")
+
+    def test_errors_propagate(self):
+        def _boom():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            Scheduler().submit(_boom).result(5)
+
+
+class TestDropping:
+    """Queued partials are dropped when superseded or expired."""
+
+    def test_newer_partial_supersedes_queued_one(self):
+        scheduler = Scheduler()
+        gate = _block(scheduler)
+        old = scheduler.submit(lambda: "old", LIVE_PARTIAL, key="s1")
+        other = scheduler.submit(lambda: "other", LIVE_PARTIAL, key="s2")
+        new = scheduler.submit(lambda: "new", LIVE_PARTIAL, key="s1")
+        gate.set()
+        with pytest.raises(JobDropped) as exc_info:
+            old.result(5)
+        assert exc_info.value.reason == "superseded"
+        assert (new.result(5), other.result(5)) == ("new", "other")
+        assert JOBS_DROPPED.value(job_class=LIVE_PARTIAL, reason="superseded") == 1
+
+    def test_expired_partial_dropped(self):
+        now = [0.0]
+        scheduler = Scheduler(clock=lambda: now[0])
+        gate = _block(scheduler)
+        partial = scheduler.submit(lambda: "late", LIVE_PARTIAL, deadline_s=1.0)
+        upload = scheduler.submit(lambda: "kept", UPLOAD, deadline_s=1.0)
+        now[0] = 5.0
+        gate.set()
+        with pytest.raises(JobDropped, match="expired"):
+            partial.result(5)
+        assert upload.result(5) == "kept"
+
+    def test_cancel_by_key(self):
+        scheduler = Scheduler()
+        gate = _block(scheduler)
+        partial = scheduler.submit(lambda: None, LIVE_PARTIAL, key="s1")
+        assert scheduler.depth()[LIVE_PARTIAL] == 1
+        assert scheduler.cancel("s1") is True
+        assert scheduler.cancel("s1") is False
+        assert scheduler.depth()[LIVE_PARTIAL] == 0
+        gate.set()
+        with pytest.raises(JobDropped):
+            partial.result(5)
+
+    def test_queue_time_recorded_per_class(self):
+        scheduler = Scheduler()
+        scheduler.submit(lambda: None, LIVE_FINAL).result(5)
+        assert QUEUE_TIME.count(job_class=LIVE_FINAL) == 1
+
+
+class TestPipeline:
+    """Two-stage jobs: prepare stages run ahead on the prefetch thread."""
+
+    def test_prepare_runs_ahead_of_the_worker(self):
+        scheduler = Scheduler(prefetch=2)
+        gate = _block(scheduler)
+        threads = []
+        prepared = threading.Event()
+
+        def prepare():
+            threads.append(threading.current_thread().name)
+            prepared.set()
+            return 21
+
+        future = scheduler.submit(lambda x: x * 2, UPLOAD, prepare=prepare)
+        # Prepared while the worker is still busy with the blocking job
+        assert prepared.wait(5)
+        gate.set()
+        assert future.result(5) == 42
+        assert threads == ["mlx-prefetch"]
+
+    def test_prefetch_is_bounded(self):
+        scheduler = Scheduler(prefetch=2)
+        gate = _block(scheduler)
+        prepared = []
+        futures = [
+            scheduler.submit(lambda x: x, UPLOAD, prepare=lambda i=i: prepared.append(i) or i)
+            for i in range(5)
+        ]
+        time.sleep(0.1)
+        assert prepared == [0, 1]
+        gate.set()
+        assert [f.result(5) for f in futures] == list(range(5))
+        assert sorted(prepared) == list(range(5))
+
+    def test_without_prefetch_the_worker_prepares(self):
+        scheduler = Scheduler()
+        threads = []
+
+        def prepare():
+            threads.append(threading.current_thread().name)
+            return "features"
+
+        assert scheduler.submit(lambda x: x, UPLOAD, prepare=prepare).result(5) == "features"
+        assert threads == ["mlx"]
+
+    def test_dropped_job_frees_its_slot(self):
+        scheduler = Scheduler(prefetch=1)
+        gate = _block(scheduler)
+        prepared = []
+        stale = scheduler.submit(
+            lambda x: x, LIVE_PARTIAL, key="s1", prepare=lambda: prepared.append("stale")
+        )
+        time.sleep(0.05)
+        fresh = scheduler.submit(
+            lambda x: x, LIVE_PARTIAL, key="s1", prepare=lambda: prepared.append("fresh") or 1
+        )
+        time.sleep(0.05)
+        assert prepared == ["stale", "fresh"]
+        gate.set()
+        with pytest.raises(JobDropped):
+            stale.result(5)
+        assert fresh.result(5) == 1
+
+    def test_prepare_errors_propagate(self):
+        scheduler = Scheduler(prefetch=1)
+
+        def prepare():
+            raise ValueError("encoder failed")
+
+        with pytest.raises(ValueError, match="encoder failed"):
+            scheduler.submit(lambda x: x, UPLOAD, prepare=prepare).result(5)
+
+
+class TestLiveLatencyUnderUploadLoad:
+    """Simulation: a chunked upload keeps a fake engine busy while a live
+    session requests partials; live latency stays bounded by one chunk."""
+
+    CHUNK_S = 0.02
+    CHUNKS = 25
+    PARTIAL_S = 0.002
+
+    def test_partials_wait_at_most_one_chunk(self):
+        scheduler = Scheduler()
+        upload = [
+            scheduler.submit(lambda: time.sleep(self.CHUNK_S), UPLOAD)
+            for _ in range(self.CHUNKS)
+        ]
+
+        latencies = []
+        for _ in range(8):
+            started = time.monotonic()
+            scheduler.submit(
+                lambda: time.sleep(self.PARTIAL_S), LIVE_PARTIAL, deadline_s=2.0, key="live"
+            ).result(5)
+            latencies.append(time.monotonic() - started)
+            time.sleep(self.CHUNK_S)
+
+        for future in upload:
+            future.result(5)
+        # FIFO would make the first partial wait for the whole upload (0.5 s)
+        assert max(latencies) < 3 * self.CHUNK_S + self.PARTIAL_S + 0.05
+        assert max(latencies) < self.CHUNK_S * self.CHUNKS / 2
@@ -0,0 +1,173 @@
+"""Tests for app.session.manager — memory accounting, budget and reaping."""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.session.manager import SessionManager
+
+
+def _fill(session, n_samples: int) -> None:
+    session.audio.append(np.zeros(n_samples, dtype=np.float32))
+
+
+@pytest.fixture()
+def manager(tmp_path) -> SessionManager:
+    return SessionManager(
+        budget_bytes=200_000,
+        idle_timeout_s=60.0,
+        spill_after_s=0.0,
+        spill_dir=str(tmp_path),
+    )
+
+
+class TestAccounting:
+    """Sessions report the bytes they hold."""
+
+    def test_footprint(self, manager):
+        session = manager.open()
+        _fill(session, 16000)
+        session.features_bytes = 100
+        session.pending_bytes = 10
+
+        fp = session.footprint()
+        assert fp["audio_bytes"] == 64000
+        assert fp["resident_bytes"] == 64110
+        assert fp["buffered_samples"] == 16000
+        assert manager.total_bytes == 64110
+
+    def test_release_forgets_session(self, manager):
+        session = manager.open()
+        _fill(session, 16000)
+        manager.release(session)
+        assert manager.sessions == []
+        assert manager.total_bytes == 0
+
+
+class TestBudget:
+    """Over-budget sessions are spilled, then evicted."""
+
+    @pytest.mark.asyncio
+    async def test_under_budget(self, manager):
+        session = manager.open()
+        _fill(session, 1000)
+        assert await manager.enforce_budget(session) is True
+
+    @pytest.mark.asyncio
+    async def test_idle_sessions_spilled_first(self, manager):
+        idle = manager.open()
+        _fill(idle, 40000)
+        current = manager.open()
+        _fill(current, 20000)
+
+        assert await manager.enforce_budget(current) is True
+        assert idle.audio.is_spilled
+        assert not idle.closed
+        assert not current.audio.is_spilled
+
+    @pytest.mark.asyncio
+    async def test_evicts_when_spilling_is_not_enough(self, manager):
+        manager.spill_after_s = 3600.0  # nothing counts as idle
+        closed = []
+
+        async def _close(reason):
+            closed.append(reason)
+
+        other = manager.open(close=_close)
+        _fill(other, 40000)
+        current = manager.open()
+        _fill(current, 20000)
+
+        assert await manager.enforce_budget(current) is True
+        assert other.closed
+        assert closed == ["Memory budget exceeded"]
+        assert other not in manager.sessions
+
+    @pytest.mark.asyncio
+    async def test_rejects_current_when_alone_over_budget(self, manager):
+        current = manager.open()
+        _fill(current, 100000)
+        assert await manager.enforce_budget(current) is False
+
+
+class TestParkedBudget:
+    """Parked sessions count towards the budget and are dropped first."""
+
+    def _state(self, n_samples: int):
+        from app.session.resume import ResumeState
+
+        return ResumeState("cs", [], np.zeros(n_samples, dtype=np.float32), n_samples)
+
+    def test_parked_bytes_counted(self, manager):
+        manager.park("a", self._state(1000))
+        assert manager.total_bytes == 4000
+
+    def test_park_drops_oldest_over_budget(self, manager):
+        manager.park("a", self._state(20000))
+        manager.park("b", self._state(20000))
+        manager.park("c", self._state(20000))  # 240 000 bytes > 200 000
+        assert manager.resumable.claim("a") is None
+        assert manager.resumable.claim("c") is not None
+        assert manager.total_bytes == 80000
+
+    @pytest.mark.asyncio
+    async def test_parked_dropped_before_live_sessions(self, manager):
+        manager.park("a", self._state(30000))
+        idle = manager.open()
+        _fill(idle, 10000)
+        current = manager.open()
+        _fill(current, 20000)
+
+        assert await manager.enforce_budget(current) is True
+        assert len(manager.resumable) == 0
+        assert not idle.audio.is_spilled
+
+
+class TestReaper:
+    """Abandoned sessions are closed after the idle timeout."""
+
+    @pytest.mark.asyncio
+    async def test_reap_idle(self, manager):
+        manager.idle_timeout_s = 0.0
+        closed = []
+
+        async def _close(reason):
+            closed.append(reason)
+
+        session = manager.open(close=_close)
+        _fill(session, 100)
+
+        assert await manager.reap_idle() == 1
+        assert closed == ["Session idle timeout"]
+        assert manager.sessions == []
+
+    @pytest.mark.asyncio
+    async def test_active_sessions_kept(self, manager):
+        manager.open()
+        assert await manager.reap_idle() == 0
+
+    @pytest.mark.asyncio
+    async def test_close_callback_errors_swallowed(self, manager):
+        async def _close(reason):
+            raise RuntimeError("already closed")
+
+        session = manager.open(close=_close)
+        await session.close("bye")
+        assert session.closed
+
+
+class TestAdminEndpoint:
+    """GET /admin/sessions reports live sessions."""
+
+    def test_report(self, monkeypatch, manager):
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+        session = manager.open()
+        _fill(session, 16000)
+
+        resp = TestClient(app).get("/admin/sessions")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["budget_bytes"] == 200_000
+        assert body["total_bytes"] == 64000
+        assert body["sessions"][0]["id"] == session.id
@@ -0,0 +1,63 @@
+"""Tests for app.engine.stream.StreamState."""
+
+import numpy as np
+
+from app.engine.stream import StreamState, count_decoder_steps
+
+
+def _result(text: str, tokens: int = 3) -> dict:
+    return {"text": text, "segments": [{"text": text, "tokens": list(range(tokens))}]}
+
+
+class TestAgreement:
+    """Consecutive partials agree on a growing prefix."""
+
+    def test_no_prefix_after_first_decode(self):
+        state = StreamState()
+        state.merge(np.zeros(10, np.float32), _result("ask not what"), "", 1.0)
+        assert state.prefix == ""
+
+    def test_common_prefix_becomes_stable(self):
+        state = StreamState()
+        state.merge(np.zeros(10, np.float32), _result("ask not what"), "", 1.0)
+        state.merge(np.zeros(20, np.float32), _result("ask not what your"), "", 2.0)
+        assert state.prefix == "ask not what"
+
+    def test_last_word_never_committed(self):
+        state = StreamState()
+        state.merge(np.zeros(10, np.float32), _result("ask not"), "", 1.0)
+        state.merge(np.zeros(20, np.float32), _result("ask not"), "", 2.0)
+        assert state.prefix == "ask"
+
+    def test_reset_forgets_window(self):
+        state = StreamState()
+        state.merge(np.zeros(10, np.float32), _result("ask not what"), "", 1.0)
+        state.merge(np.zeros(20, np.float32), _result("ask not what you"), "", 2.0)
+        state.reset()
+        assert state.prefix == ""
+        assert state.cached_result(np.zeros(20, np.float32)) is None
+
+
+class TestMerge:
+    """Prefix-forced results are expanded to the whole window."""
+
+    def test_prefix_prepended(self):
+        state = StreamState()
+        merged = state.merge(np.zeros(10, np.float32), _result(" your country"), "ask not", 3.0)
+        assert merged["text"] == "ask not your country"
+        assert merged["segments"] == [
+            {"text": "ask not your country", "start": 0.0, "end": 3.0}
+        ]
+
+    def test_identical_audio_reused(self):
+        state = StreamState()
+        audio = np.arange(10, dtype=np.float32)
+        first = state.merge(audio, _result("hello"), "", 1.0)
+        assert state.cached_result(audio.copy()) is first
+        assert state.cached_result(audio[:5]) is None
+        assert state.stats()["reused"] == 1
+
+    def test_decoder_steps_counted(self):
+        state = StreamState()
+        state.merge(np.zeros(10, np.float32), _result("a b", tokens=4), "", 1.0)
+        assert state.decoder_steps == count_decoder_steps(_result("a b", tokens=4)) == 5
@@ -0,0 +1,150 @@
+"""Tests for app.tracing and the traced routes."""
+
+import io
+import json
+import struct
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import tracing
+from app.engine.factory import TranscriptionEngine
+from app.engine.scheduler import LIVE_FINAL, Scheduler
+from app.main import app
+
+
+def _wav(samples: np.ndarray) -> bytes:
+    pcm = (samples * 32767).astype(np.int16)
+    buf = io.BytesIO()
+    buf.write(b"RIFF" + struct.pack("<I", 36 + pcm.nbytes) + b"WAVEfmt ")
+    buf.write(struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16))
+    buf.write(b"data" + struct.pack("<I", pcm.nbytes) + pcm.tobytes())
+    return buf.getvalue()
+
+
+@pytest.fixture()
+def traced():
+    """Tracing enabled for the test, with an empty recorder."""
+    tracing.RECORDER.reset()
+    tracing.configure(True, slowest=10)
+    yield tracing.RECORDER
+    tracing.configure(False)
+    tracing.RECORDER.reset()
+
+
+def _span_names(trace: dict) -> list[str]:
+    return [span["name"] for span in trace["spans"]]
+
+
+class TestDisabled:
+    def test_start_returns_null_trace(self):
+        trace = tracing.start("ws.partial")
+        assert trace is tracing.NULL_TRACE
+        assert not trace
+        with trace.span("decode"):
+            pass
+        with tracing.activate(trace, finish=True):
+            assert tracing.current() is tracing.NULL_TRACE
+        assert tracing.RECORDER.slowest() == []
+
+
+class TestTrace:
+    def test_spans_relative_to_start(self, traced):
+        trace = tracing.start("upload", start=10.0, filename="a.wav")
+        trace.add("read", 10.5, 10.75)
+        trace.finish()
+        data = trace.as_dict()
+        assert data["attrs"] == {"filename": "a.wav"}
+        assert data["spans"] == [{"name": "read", "start_ms": 500.0, "duration_ms": 250.0}]
+        assert traced.slowest() == [trace]
+
+    def test_recorder_keeps_the_slowest(self):
+        recorder = tracing.TraceRecorder(capacity=2)
+        for duration in (0.3, 0.1, 0.5, 0.2):
+            trace = tracing.Trace("ws.partial", start=0.0)
+            trace.end = duration
+            recorder.record(trace)
+        assert [t.duration_s for t in recorder.slowest()] == [0.5, 0.3]
+        assert recorder.slowest(name="upload") == []
+
+    def test_activate_records_errors_and_finishes(self, traced):
+        trace = tracing.start("ws.final")
+        with pytest.raises(KeyError):
+            with tracing.activate(trace, finish=True):
+                assert tracing.current() is trace
+                raise KeyError("x")
+        assert tracing.current() is tracing.NULL_TRACE
+        assert trace.attrs["error"] == "KeyError"
+        assert traced.slowest() == [trace]
+
+    def test_exporter_receives_finished_traces(self, traced, monkeypatch):
+        exported = []
+        monkeypatch.setattr(tracing, "_exporter", exported.append)
+        trace = tracing.start("upload")
+        trace.finish()
+        trace.finish()
+        assert exported == [trace]
+
+
+class TestScheduler:
+    async def test_job_runs_under_the_submitters_trace(self, traced):
+        scheduler = Scheduler("test-trace")
+        trace = tracing.start("ws.final")
+
+        def job():
+            with tracing.span("decode"):
+                return tracing.current()
+
+        with tracing.activate(trace):
+            assert await scheduler.run(job, job_class=LIVE_FINAL) is trace
+        assert [name for name, *_ in sorted(trace.spans, key=lambda s: s[1])] == [
+            "queue", "run", "decode"
+        ]
+
+
+class TestRoutes:
+    @pytest.fixture()
+    def engine(self, monkeypatch):
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        engine = TranscriptionEngine.get_instance()
+        engine.load(model_repo="mlx-community/whisper-tiny", language="cs")
+        monkeypatch.setattr(
+            engine,
+            "transcribe",
+            lambda audio, language=None: {
+                "text": "hi", "segments": [{"text": "hi", "start": 0.0, "end": 0.5}]
+            },
+        )
+        return engine
+
+    def test_websocket_final_trace(self, engine, traced):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ws.receive_json()  # ready
+            ws.send_bytes(struct.pack("<100h", *([1000] * 100)))
+            ws.send_text("stop")
+            while ws.receive_json()["type"] != "done":
+                pass
+
+        resp = client.get("/admin/traces", params={"name": "ws.final"})
+        assert resp.status_code == 200
+        (trace,) = resp.json()["traces"]
+        assert trace["attrs"]["audio_s"] == pytest.approx(100 / 16000)
+        assert {"settle", "engine", "queue", "run", "send"} <= set(_span_names(trace))
+
+    def test_upload_trace(self, engine, traced):
+        client = TestClient(app)
+        wav = _wav(np.zeros(8000, dtype=np.float32))
+        resp = client.post("/api/transcribe", files={"file": ("a.wav", wav, "audio/wav")})
+        assert resp.status_code == 200
+        (trace,) = client.get("/admin/traces").json()["traces"]
+        assert trace["name"] == "upload"
+        assert trace["attrs"]["filename"] == "a.wav"
+        assert {"read", "decode_audio", "queue", "run"} <= set(_span_names(trace))
+
+    def test_admin_reports_disabled(self):
+        data = TestClient(app).get("/admin/traces").json()
+        assert data == {"enabled": False, "traces": []}
@@ -1,15 +1,20 @@
 """Tests for the file upload transcription endpoint."""
 
 import io
+import json
 import struct
+import zipfile
 
 import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 
+from app.audio.decode_pool import DecodePool
+from app.config import settings
 from app.engine.factory import TranscriptionEngine
 from app.main import app
+from app.routes import upload
 
 
 def _make_wav_bytes(duration_s: float = 0.5, sample_rate: int = 16000) -> bytes:
@@ -80,6 +85,7 @@ class TestTranscribeFile:
             files={"file": ("test.wav", wav_bytes, "audio/wav")},
         )
         assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "5"
 
     def test_returns_segments_with_timing(self, client, loaded_engine):
         """When transcribe returns segments, they include timing."""
@@ -128,9 +134,235 @@ class TestTranscribeFile:
         assert resp.status_code == 500
 
 
+class TestPrecisionSelection:
+    """The upload endpoint validates and reports the weight precision."""
+
+    def test_default_precision_reported(self, client):
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _make_wav_bytes(), "audio/wav")},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["precision"] == "fp16"
+
+    def test_disabled_precision_returns_400(self, client):
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _make_wav_bytes(), "audio/wav")},
+            data={"precision": "int4"},
+        )
+        assert resp.status_code == 400
+        assert "not enabled" in resp.json()["detail"]
+
+
 class TestTranscribeRouteRegistered:
     """Test that the upload route is registered on the app."""
 
     def test_route_exists(self):
         route_paths = [r.path for r in app.routes]
         assert "/api/transcribe" in route_paths
+
+
+class TestDecodeOptions:
+    """The upload endpoint validates and forwards decode options."""
+
+    def test_preset_and_options_forwarded(self, client, loaded_engine, monkeypatch):
+        seen = []
+        original = loaded_engine.transcribe_chunked_async
+
+        async def _chunked(audio, language=None, **kwargs):
+            seen.append(kwargs["options"])
+            return await original(audio, language, **kwargs)
+
+        monkeypatch.setattr(loaded_engine, "transcribe_chunked_async", _chunked)
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _make_wav_bytes(), "audio/wav")},
+            data={"preset": "fast", "options": '{"no_speech_threshold": 0.3}'},
+        )
+        assert resp.status_code == 200
+        assert seen[0].temperature == (0.0,)
+        assert seen[0].no_speech_threshold == 0.3
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"preset": "turbo"},
+            {"options": '{"beam_size": 5}'},
+            {"options": '{"temperature": [2.0]}'},
+            {"options": "not json"},
+        ],
+    )
+    def test_invalid_options_return_400(self, client, data):
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _make_wav_bytes(), "audio/wav")},
+            data=data,
+        )
+        assert resp.status_code == 400
+
+
+def _zip(members: dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buf.getvalue()
+
+
+def _patch_member(archive: bytes, flag: int = 0, method: int | None = None) -> bytes:
+    """Set general purpose ``flag`` bits or the compression ``method`` of a one-member zip."""
+    raw = bytearray(archive)
+    # Local file header fields start after the 4-byte signature, the
+    # central directory entry's after the signature and "version made by"
+    for offset in (0, raw.find(b"PK\x01\x02") + 2):
+        raw[offset + 6] |= flag
+        if method is not None:
+            raw[offset + 8:offset + 10] = method.to_bytes(2, "little")
+    return bytes(raw)
+
+
+def _lines(resp) -> list[dict]:
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+class TestTranscribeBatch:
+    """Tests for POST /api/transcribe/batch."""
+
+    @pytest.fixture()
+    def batches(self, loaded_engine, monkeypatch):
+        """Decode in threads; record each engine batch and answer with clip lengths."""
+        monkeypatch.setattr(DecodePool, "_instance", DecodePool(0, max_pending=16))
+        calls = []
+
+        def _batch(audios, language=None, initial_prompt=None, precision=None, options=None):
+            calls.append([len(a) for a in audios])
+            return [
+                {"text": f"n{len(a)}", "segments": [{"text": f"n{len(a)}", "start": 0.0, "end": 0.1}]}
+                for a in audios
+            ]
+
+        monkeypatch.setattr(loaded_engine, "transcribe_batch", _batch)
+        return calls
+
+    def test_streams_records_in_order(self, client, batches):
+        resp = client.post(
+            "/api/transcribe/batch",
+            files=[
+                ("files", (f"{n}.wav", _make_wav_bytes(n / 16000), "audio/wav"))
+                for n in (8000, 16000, 4000)
+            ],
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        *records, summary = _lines(resp)
+        assert [(r["index"], r["filename"], r["text"]) for r in records] == [
+            (0, "8000.wav", "n8000"), (1, "16000.wav", "n16000"), (2, "4000.wav", "n4000")
+        ]
+        assert records[1]["duration_ms"] == 1000.0
+        assert records[1]["segments"] == [{"text": "n16000", "start_ms": 0, "end_ms": 100}]
+        assert summary == {"done": True, "files": 3, "failed": 0, "precision": "fp16"}
+        # Every clip went to the engine through a batch job
+        assert sum(len(call) for call in batches) == 3
+
+    def test_zip_members_are_unpacked(self, client, batches):
+        archive = _zip({
+            "notes/a.wav": _make_wav_bytes(0.25),
+            "notes/readme.txt": b"not audio",
+            "b.wav": _make_wav_bytes(0.5),
+        })
+        resp = client.post(
+            "/api/transcribe/batch",
+            files=[("files", ("clips.zip", archive, "application/zip"))],
+        )
+        *records, summary = _lines(resp)
+        assert [r["filename"] for r in records] == ["clips.zip/notes/a.wav", "clips.zip/b.wav"]
+        assert summary["files"] == 2
+
+    def test_bad_files_get_error_records(self, client, batches):
+        resp = client.post(
+            "/api/transcribe/batch",
+            files=[
+                ("files", ("bad.wav", b"not audio", "audio/wav")),
+                ("files", ("empty.wav", b"", "audio/wav")),
+                ("files", ("ok.wav", _make_wav_bytes(), "audio/wav")),
+            ],
+        )
+        bad, empty, ok, summary = _lines(resp)
+        assert bad["error"].startswith("Could not decode audio file")
+        assert empty["error"] == "Empty file"
+        assert (ok["error"], ok["text"]) == (None, "n8000")
+        assert summary["failed"] == 2
+
+    def test_long_files_are_chunked(self, client, batches, loaded_engine, monkeypatch):
+        monkeypatch.setattr(settings, "upload_chunk_s", 0.5)
+        chunked = []
+
+        async def _chunked(audio, language=None, **kwargs):
+            chunked.append(len(audio))
+            return {"text": "long", "segments": []}
+
+        monkeypatch.setattr(loaded_engine, "transcribe_chunked_async", _chunked)
+        resp = client.post(
+            "/api/transcribe/batch",
+            files=[
+                ("files", ("long.wav", _make_wav_bytes(1.0), "audio/wav")),
+                ("files", ("short.wav", _make_wav_bytes(0.25), "audio/wav")),
+            ],
+        )
+        long, short, _ = _lines(resp)
+        assert chunked == [16000]
+        assert batches == [[4000]]
+        assert (long["error"], short["text"]) == (None, "n4000")
+
+    def test_no_audio_returns_400(self, client, batches):
+        resp = client.post(
+            "/api/transcribe/batch",
+            files=[("files", ("docs.zip", _zip({"a.txt": b"x"}), "application/zip"))],
+        )
+        assert resp.status_code == 400
+
+    def test_encrypted_zip_returns_400(self, client, batches):
+        archive = _patch_member(_zip({"a.wav": _make_wav_bytes(0.25)}), flag=0x1)
+        resp = client.post(
+            "/api/transcribe/batch",
+            files=[("files", ("clips.zip", archive, "application/zip"))],
+        )
+        assert resp.status_code == 400
+        assert "encrypted" in resp.json()["detail"]
+        assert batches == []
+
+    def test_decode_pool_full_returns_429(self, client, batches):
+        DecodePool.get_instance().pending = 16
+        resp = client.post(
+            "/api/transcribe/batch",
+            files=[("files", ("a.wav", _make_wav_bytes(), "audio/wav"))],
+        )
+        assert resp.status_code == 429
+        assert "Retry-After" in resp.headers
+
+
+class TestUnpackUploads:
+    """Zips are replaced by their audio members, within the request limits."""
+
+    def test_limits(self, monkeypatch):
+        monkeypatch.setattr(upload, "BATCH_MAX_FILES", 2)
+        archive = _zip({f"{i}.wav": b"RIFF" for i in range(3)})
+        with pytest.raises(ValueError, match="At most 2 files"):
+            upload.unpack_uploads([("a.zip", archive)])
+        with pytest.raises(ValueError, match="At most 2 files"):
+            upload.unpack_uploads([(f"{i}.wav", b"RIFF") for i in range(3)])
+
+    def test_corrupt_zip(self):
+        with pytest.raises(ValueError, match="Could not read zip"):
+            upload.unpack_uploads([("a.zip", b"PK\x03\x04 truncated")])
+
+    def test_encrypted_member(self):
+        archive = _patch_member(_zip({"a.wav": b"RIFF"}), flag=0x1)
+        with pytest.raises(ValueError, match="Could not read zip.*encrypted"):
+            upload.unpack_uploads([("a.zip", archive)])
+
+    def test_unsupported_compression(self):
+        archive = _patch_member(_zip({"a.wav": b"RIFF"}), method=99)
+        with pytest.raises(ValueError, match="Could not read zip.*not supported"):
+            upload.unpack_uploads([("a.zip", archive)])
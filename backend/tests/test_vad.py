@@ -0,0 +1,52 @@
+"""Tests for app.audio.vad — energy-based voice activity detection."""
+
+import numpy as np
+
+from app.audio.vad import calculate_rms, chunk_bounds, has_speech
+
+
+class TestCalculateRms:
+    def test_empty(self):
+        assert calculate_rms(np.zeros(0, dtype=np.float32)) == 0.0
+
+    def test_constant(self):
+        assert abs(calculate_rms(np.full(100, 0.5, dtype=np.float32)) - 0.5) < 1e-6
+
+
+class TestHasSpeech:
+    def test_silence(self):
+        assert has_speech(np.zeros(16000, dtype=np.float32)) is False
+
+    def test_loud(self):
+        assert has_speech(np.full(16000, 0.1, dtype=np.float32)) is True
+
+    def test_short_burst_in_long_silence(self):
+        """A single loud frame is detected even when overall RMS is low."""
+        audio = np.zeros(16000 * 5, dtype=np.float32)
+        audio[1600:3200] = 0.05
+        assert calculate_rms(audio) < 0.01
+        assert has_speech(audio) is True
+
+    def test_burst_in_trailing_partial_frame(self):
+        audio = np.zeros(1600 + 100, dtype=np.float32)
+        audio[-100:] = 0.5
+        assert has_speech(audio) is True
+
+    def test_shorter_than_a_frame(self):
+        assert has_speech(np.full(10, 0.5, dtype=np.float32)) is True
+        assert has_speech(np.zeros(10, dtype=np.float32)) is False
+
+
+class TestChunkBounds:
+    def test_short_audio_single_chunk(self):
+        assert chunk_bounds(np.zeros(100, dtype=np.float32), 1000) == [(0, 100)]
+
+    def test_cuts_in_quietest_frame(self):
+        audio = np.full(16000 * 10, 0.1, dtype=np.float32)
+        # Quiet 100 ms frame 1 s before the 4 s chunk limit
+        audio[16000 * 3 : 16000 * 3 + 1600] = 0.0
+        bounds = chunk_bounds(audio, 16000 * 4)
+        assert bounds[0] == (0, 16000 * 3 + 800)
+        assert bounds[-1][1] == len(audio)
+        assert all(end - start <= 16000 * 4 for start, end in bounds)
+        assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
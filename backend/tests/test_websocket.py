@@ -23,6 +23,8 @@ def _reset_engine(monkeypatch: pytest.MonkeyPatch):
 def _small_buffer(monkeypatch: pytest.MonkeyPatch):
     """Use a tiny buffer threshold so tests trigger transcription quickly."""
     import app.routes.websocket as ws_mod
+    from app.config import settings
+    monkeypatch.setattr(settings, "partial_cadence", "fixed")
     monkeypatch.setattr(ws_mod, "MIN_SAMPLES_FOR_TRANSCRIBE", 10)
     monkeypatch.setattr(ws_mod, "MAX_BUFFER_SAMPLES", 500)
 
@@ -42,6 +44,20 @@ class TestHealthEndpoint:
         assert "version" in data
 
 
+class TestWebSocketNotReady:
+    """Connections made while the model is loading are closed with 1013."""
+
+    def test_closes_with_try_again_later(self, monkeypatch):
+        from starlette.websockets import WebSocketDisconnect
+
+        monkeypatch.setattr(TranscriptionEngine, "_instance", None)
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+        assert exc_info.value.code == 1013
+
+
 class TestWebSocketConnectConfigureReady:
     """Test the initial handshake: connect -> connected -> configure -> ready."""
 
@@ -178,6 +194,81 @@ class TestWebSocketPartialResults:
             final_msg = next(m for m in messages if m["type"] == "final")
             assert final_msg["text"] == "final text"
 
+    def test_stop_reuses_partial_decode(self, monkeypatch):
+        """A final over audio already decoded as a partial skips the engine."""
+        engine = TranscriptionEngine.get_instance()
+        calls = []
+
+        def mock_transcribe(audio, language=None):
+            calls.append(len(audio))
+            return {"text": "same", "segments": [{"text": "same", "start": 0.0, "end": 1.0}]}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ws.receive_json()  # ready
+
+            ws.send_bytes(struct.pack("<100h", *([0] * 100)))
+            assert ws.receive_json()["type"] == "partial"
+            ws.send_text("stop")
+
+            messages = [ws.receive_json() for _ in range(2)]
+            assert [m["type"] for m in messages] == ["final", "done"]
+        assert calls == [100]
+
+
+    def test_delta_partials_send_only_changes(self, monkeypatch):
+        """Sessions configured with partials=delta get partial_delta messages."""
+        engine = TranscriptionEngine.get_instance()
+        texts = iter(["hello wor", "hello world again"])
+
+        def mock_transcribe(audio, language=None):
+            text = next(texts)
+            return {"text": text, "segments": [{"text": text, "start": 0.0, "end": 1.0}]}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs", "partials": "delta"}))
+            ws.receive_json()  # ready
+
+            ws.send_bytes(struct.pack("<100h", *([0] * 100)))
+            first = ws.receive_json()
+            assert first["type"] == "partial_delta"
+            assert first["count"] == 1
+            assert first["segments"][0]["keep"] == 0
+            assert first["segments"][0]["text"] == "hello wor"
+
+            ws.send_bytes(struct.pack("<100h", *([0] * 100)))
+            second = ws.receive_json()
+            assert second["type"] == "partial_delta"
+            # Same segment, same timing: only the changed suffix
+            assert second["segments"] == [{"id": 0, "keep": 9, "text": "ld again"}]
+
+            # Finals are always sent in full
+            ws.send_text("stop")
+            messages = [ws.receive_json() for _ in range(2)]
+            assert messages[0] == {
+                "type": "final", "text": "hello world again", "start_ms": 0.0, "end_ms": 1000.0
+            }
+            assert messages[1]["type"] == "done"
+
+    def test_invalid_partials_mode_rejected(self):
+        from starlette.websockets import WebSocketDisconnect
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs", "partials": "diff"}))
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+        assert exc_info.value.code == 1003
+
 
 class TestWebSocketMaxBuffer:
     """Test that exceeding MAX_BUFFER_SAMPLES triggers force-finalize."""
@@ -270,3 +361,425 @@ class TestWebSocketErrorHandling:
             ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
             ws.receive_json()  # ready
             # Just close - should be handled gracefully
+
+
+class TestWebSocketSessionAccounting:
+    """Sessions are registered with the SessionManager while open."""
+
+    def test_session_released_after_stop(self, monkeypatch):
+        from app.session.manager import SessionManager
+
+        manager = SessionManager(budget_bytes=10**9, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ws.receive_json()  # ready
+            assert len(manager.sessions) == 1
+            ws.send_text("stop")
+            assert ws.receive_json()["type"] == "done"
+
+        assert manager.sessions == []
+
+    def test_over_budget_session_closed(self, monkeypatch):
+        from starlette.websockets import WebSocketDisconnect
+
+        from app.session.manager import SessionManager
+
+        manager = SessionManager(budget_bytes=1000, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ws.receive_json()  # ready
+            ws.send_bytes(struct.pack("<100h", *([0] * 100)))
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+            assert exc_info.value.code == 1008
+
+
+class TestWebSocketResume:
+    """A dropped session can be resumed with its token."""
+
+    def test_resume_continues_from_offset(self, monkeypatch):
+        from app.session.manager import SessionManager
+
+        manager = SessionManager(budget_bytes=10**9, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+
+        engine = TranscriptionEngine.get_instance()
+        calls = []
+
+        def mock_transcribe(audio, language=None, initial_prompt=None):
+            calls.append((len(audio), initial_prompt))
+            return {"text": "x", "segments": [{"text": "x", "start": 0.0, "end": 1.0}]}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            token = ws.receive_json()["session_token"]
+            assert token
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ready = ws.receive_json()
+            assert ready["resumed"] is False
+            # Below MIN_SAMPLES_FOR_TRANSCRIBE (10): buffered, not transcribed
+            ws.send_bytes(struct.pack("<5h", *([0] * 5)))
+        # Connection dropped without stop: session parked
+        assert len(manager.resumable) == 1
+
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(
+                json.dumps({"type": "configure", "language": "cs", "session_token": token})
+            )
+            ready = ws.receive_json()
+            assert ready["resumed"] is True
+            assert ready["sample_offset"] == 5
+
+            ws.send_text("stop")
+            msg = ws.receive_json()
+            assert msg["type"] == "final"
+            assert ws.receive_json()["type"] == "done"
+
+        # The final covered the audio received before the drop
+        assert calls == [(5, None)]
+        assert len(manager.resumable) == 0
+
+    def test_resume_twice_with_the_latest_token(self, monkeypatch):
+        from app.session.manager import SessionManager
+
+        manager = SessionManager(budget_bytes=10**9, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            first = ws.receive_json()["session_token"]
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ws.receive_json()  # ready
+            ws.send_bytes(struct.pack("<5h", *([0] * 5)))
+
+        with client.websocket_connect("/ws/transcribe") as ws:
+            second = ws.receive_json()["session_token"]
+            ws.send_text(
+                json.dumps({"type": "configure", "language": "cs", "session_token": first})
+            )
+            assert ws.receive_json()["sample_offset"] == 5
+            ws.send_bytes(struct.pack("<3h", *([0] * 3)))
+        # Dropped again: parked under the token of the second connection
+        assert second != first
+
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(
+                json.dumps({"type": "configure", "language": "cs", "session_token": second})
+            )
+            ready = ws.receive_json()
+            assert ready["resumed"] is True
+            assert ready["sample_offset"] == 8
+            ws.send_text("stop")
+            while ws.receive_json()["type"] != "done":
+                pass
+        assert len(manager.resumable) == 0
+
+    def test_unknown_token_starts_fresh(self, monkeypatch):
+        from app.session.manager import SessionManager
+
+        manager = SessionManager(budget_bytes=10**9, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(
+                json.dumps({"type": "configure", "language": "cs", "session_token": "stale"})
+            )
+            ready = ws.receive_json()
+            assert ready["resumed"] is False
+            assert ready["sample_offset"] == 0
+            ws.send_text("stop")
+            assert ws.receive_json()["type"] == "done"
+
+    def test_resumed_session_uses_committed_prompt(self, monkeypatch):
+        from app.session.manager import SessionManager
+        from app.session.resume import ResumeState
+
+        import numpy as np
+
+        manager = SessionManager(budget_bytes=10**9, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+        manager.resumable.park(
+            "tok",
+            ResumeState("cs", ["dobrý den"], np.zeros(5, dtype=np.float32), sample_offset=8005),
+        )
+
+        engine = TranscriptionEngine.get_instance()
+        prompts = []
+
+        def mock_transcribe(audio, language=None, initial_prompt=None):
+            prompts.append(initial_prompt)
+            return {"text": "", "segments": []}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(
+                json.dumps({"type": "configure", "language": "cs", "session_token": "tok"})
+            )
+            assert ws.receive_json()["sample_offset"] == 8005
+            ws.send_text("stop")
+            assert ws.receive_json()["type"] == "done"
+
+        assert prompts == ["dobrý den"]
+
+
+    def test_resume_restores_language(self, monkeypatch):
+        from app.session.manager import SessionManager
+        from app.session.resume import ResumeState
+
+        import numpy as np
+
+        manager = SessionManager(budget_bytes=10**9, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+        manager.resumable.park("tok", ResumeState("de", [], np.zeros(5, dtype=np.float32), 5))
+
+        engine = TranscriptionEngine.get_instance()
+        languages = []
+
+        def mock_transcribe(audio, language=None, initial_prompt=None):
+            languages.append(language)
+            return {"text": "", "segments": []}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(
+                json.dumps({"type": "configure", "language": "cs", "session_token": "tok"})
+            )
+            assert ws.receive_json()["resumed"] is True
+            ws.send_text("stop")
+            assert ws.receive_json()["type"] == "done"
+
+        assert languages == ["de"]
+
+    def test_resume_with_other_channel_count_rejected(self, monkeypatch):
+        from starlette.websockets import WebSocketDisconnect
+
+        from app.session.manager import SessionManager
+        from app.session.resume import ResumeState
+
+        import numpy as np
+
+        manager = SessionManager(budget_bytes=10**9, idle_timeout_s=60, spill_after_s=10)
+        monkeypatch.setattr(SessionManager, "_instance", manager)
+        manager.resumable.park(
+            "tok", ResumeState("cs", [], np.zeros((2, 5), dtype=np.float32), 5)
+        )
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(
+                json.dumps({"type": "configure", "channels": 1, "session_token": "tok"})
+            )
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+            assert exc_info.value.code == 1003
+
+        # Still parked for a reconnect with the original two channels
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(
+                json.dumps({"type": "configure", "channels": 2, "session_token": "tok"})
+            )
+            ready = ws.receive_json()
+            assert ready["resumed"] is True
+            assert ready["sample_offset"] == 5
+
+
+class TestWebSocketMultiChannel:
+    """Interleaved multi-channel audio is decoded per active channel."""
+
+    def test_only_active_channels_decoded(self, monkeypatch):
+        engine = TranscriptionEngine.get_instance()
+        decoded = []
+
+        def mock_transcribe(audio, language=None):
+            decoded.append(float(abs(audio).max()))
+            return {"text": "hi", "segments": [{"text": "hi", "start": 0.0, "end": 0.5}]}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs", "channels": 2}))
+            ws.receive_json()  # ready
+
+            # Channel 0 silent, channel 1 speaking (interleaved L/R frames)
+            frames = [v for _ in range(20) for v in (0, 16384)]
+            ws.send_bytes(struct.pack(f"<{len(frames)}h", *frames))
+
+            msg = ws.receive_json()
+            assert msg["type"] == "partial"
+            assert msg["channel"] == 1
+            assert msg["text"] == "hi"
+
+            ws.send_text("stop")
+            messages = []
+            for _ in range(10):
+                msg = ws.receive_json()
+                messages.append(msg)
+                if msg["type"] == "done":
+                    break
+
+        finals = [m for m in messages if m["type"] == "final"]
+        assert [m["channel"] for m in finals] == [1]
+        # Only channel 1 audio (amplitude 0.5) was ever decoded
+        assert decoded == [0.5, 0.5]
+
+    def test_mono_results_have_no_channel(self, monkeypatch):
+        engine = TranscriptionEngine.get_instance()
+
+        def mock_transcribe(audio, language=None):
+            return {"text": "hi", "segments": [{"text": "hi", "start": 0.0, "end": 0.5}]}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs"}))
+            ws.receive_json()  # ready
+            ws.send_bytes(struct.pack("<20h", *([0] * 20)))
+            msg = ws.receive_json()
+            assert "channel" not in msg
+            ws.send_text("stop")
+            for _ in range(10):
+                if ws.receive_json()["type"] == "done":
+                    break
+
+    def test_invalid_channel_count_rejected(self):
+        from starlette.websockets import WebSocketDisconnect
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs", "channels": 0}))
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+        assert exc_info.value.code == 1003
+
+
+class TestWebSocketPrecision:
+    """Sessions may only select enabled precisions."""
+
+    def test_connected_reports_precision(self):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            assert ws.receive_json()["precision"] == "fp16"
+
+    def test_disabled_precision_rejected(self):
+        from starlette.websockets import WebSocketDisconnect
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs", "precision": "int4"}))
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+        assert exc_info.value.code == 1003
+
+
+class TestWebSocketLanguageLock:
+    """``auto`` sessions detect the language once and then reuse it."""
+
+    def _run(self, monkeypatch, logprob: float) -> tuple[list, list]:
+        engine = TranscriptionEngine.get_instance()
+        detections, languages = [], []
+
+        def mock_detect(audios, precision=None):
+            detections.append(len(audios))
+            return [{"language": "en", "probability": 0.9}]
+
+        def mock_transcribe(audio, language=None):
+            languages.append(language)
+            seg = {"text": "hello", "start": 0.0, "end": 0.5, "avg_logprob": logprob}
+            return {"text": "hello", "segments": [seg]}
+
+        monkeypatch.setattr(engine, "detect_language", mock_detect)
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "auto"}))
+            ws.receive_json()  # ready
+            for _ in range(3):
+                ws.send_bytes(struct.pack("<100h", *([3000, -3000] * 50)))
+            ws.send_text("stop")
+            while ws.receive_json()["type"] != "done":
+                pass
+        return detections, languages
+
+    def test_detects_once(self, monkeypatch):
+        detections, languages = self._run(monkeypatch, logprob=-0.2)
+        assert detections == [1]
+        assert languages and set(languages) == {"en"}
+
+    def test_low_confidence_rechecks(self, monkeypatch):
+        detections, languages = self._run(monkeypatch, logprob=-2.0)
+        assert len(detections) > 1
+        assert set(languages) == {"en"}
+
+
+class TestWebSocketDecodeOptions:
+    """Sessions may choose a decode preset and override its fields."""
+
+    def test_options_used_for_partials_and_finals(self, monkeypatch):
+        engine = TranscriptionEngine.get_instance()
+        seen = []
+
+        def mock_transcribe(audio, language=None, options=None):
+            seen.append(options)
+            return {"text": "ahoj", "segments": [{"text": "ahoj", "start": 0.0, "end": 0.5}]}
+
+        monkeypatch.setattr(engine, "transcribe", mock_transcribe)
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({
+                "type": "configure",
+                "language": "cs",
+                "preset": "fast",
+                "options": {"no_speech_threshold": 0.3},
+            }))
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_bytes(struct.pack("<100h", *([0] * 100)))
+            ws.send_text("stop")
+            while ws.receive_json()["type"] != "done":
+                pass
+        assert seen
+        assert all(o.temperature == (0.0,) and o.no_speech_threshold == 0.3 for o in seen)
+
+    @pytest.mark.parametrize(
+        "fields",
+        [{"preset": "turbo"}, {"options": {"beam_size": 5}}, {"options": {"temperature": []}}],
+    )
+    def test_invalid_options_rejected(self, fields):
+        from starlette.websockets import WebSocketDisconnect
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()  # connected
+            ws.send_text(json.dumps({"type": "configure", "language": "cs", **fields}))
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+        assert exc_info.value.code == 1003
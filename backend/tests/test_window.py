@@ -0,0 +1,79 @@
+"""Tests for app.engine.window (short-clip fast path helpers)."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.engine.window import bucket_for, group_by_bucket, is_supported, to_result
+
+
+def _decoded(**overrides) -> SimpleNamespace:
+    fields = {
+        "text": "turn on the lights",
+        "tokens": [1, 2, 3],
+        "temperature": 0.0,
+        "avg_logprob": -0.2,
+        "compression_ratio": 1.1,
+        "no_speech_prob": 0.01,
+    }
+    return SimpleNamespace(**{**fields, **overrides})
+
+
+class TestBuckets:
+    """Clips are padded to the smallest bucket that holds them."""
+
+    def test_smallest_fitting_bucket(self):
+        assert bucket_for(16000, [10.0, 5.0]) == 5.0
+        assert bucket_for(5 * 16000, [5.0, 10.0]) == 5.0
+        assert bucket_for(5 * 16000 + 1, [5.0, 10.0]) == 10.0
+
+    def test_too_long_for_any_bucket(self):
+        assert bucket_for(11 * 16000, [5.0, 10.0]) is None
+        assert bucket_for(100, []) is None
+
+    def test_group_by_bucket(self):
+        audios = [np.zeros(n, np.float32) for n in (16000, 200000, 100000, 8000)]
+        assert group_by_bucket(audios, [5.0, 10.0]) == {5.0: [0, 3], None: [1], 10.0: [2]}
+
+
+class TestToResult:
+    """Decoding results become mlx_whisper-style result dicts."""
+
+    def test_single_segment_covers_clip(self):
+        result = to_result(_decoded(), 1.5, "en")
+        assert result["text"] == "turn on the lights"
+        assert result["language"] == "en"
+        [segment] = result["segments"]
+        assert (segment["start"], segment["end"]) == (0.0, 1.5)
+        assert segment["tokens"] == [1, 2, 3]
+
+    def test_no_speech_is_empty(self):
+        result = to_result(_decoded(no_speech_prob=0.9, avg_logprob=-1.5), 1.0, "en")
+        assert result == {"text": "", "segments": [], "language": "en"}
+
+    def test_repetitive_result_needs_fallback(self):
+        assert to_result(_decoded(compression_ratio=3.0), 1.0, "en") is None
+
+    def test_low_confidence_result_needs_fallback(self):
+        assert to_result(_decoded(avg_logprob=-1.5), 1.0, "en") is None
+
+
+class TestSupport:
+    """Without the mlx internals (test stubs) the fast path is unavailable."""
+
+    def test_unsupported_under_stubs(self):
+        assert is_supported() is False
+
+
+class TestGuardedResults:
+    """Results cut short by a guard are never re-run on the full window."""
+
+    def test_no_speech_skip_is_empty(self):
+        assert to_result(None, 1.0, "en", "no_speech")["text"] == ""
+
+    def test_compression_abort_is_empty(self):
+        assert to_result(_decoded(compression_ratio=3.0), 1.0, "en", "compression")["text"] == ""
+
+    def test_guarded_low_confidence_kept(self):
+        result = to_result(_decoded(avg_logprob=-1.5), 1.0, "en", "token_budget")
+        assert result["text"] == "turn on the lights"